@@ -84,6 +84,9 @@ namespace Trick {
             /** Allows the current thread to give up the cpu during multi process job completion and dependency checking.\n */
             bool rt_nap;                      /**< trick_units(--) */
 
+            /** Scheduled thread job queues only visit the jobs due at each call time.\n */
+            bool time_indexed_queues;         /**< trick_units(--) */
+
             /** Software frame time.  The end_of_frame jobs will be run at this frequency.\n */
             double software_frame;            /**< trick_units(s) */
 
@@ -237,6 +240,13 @@ namespace Trick {
             /** Pointer to the advance_sim_time job.\n */
             Trick::JobData * advance_sim_time_job ;   /**< trick_io(**) */
 
+            /** Number of 64-bit words in the progress file record: tag, sequence number, time_tics,
+                time_tic_value, and terminate_time.\n */
+            static const int PROGRESS_RECORD_WORDS = 5 ;  /**< trick_io(**) */
+
+            /** Memory mapped progress file record, NULL if TRICK_PROGRESS_FILE is not set.\n */
+            volatile long long * progress_data ;      /**< trick_io(**) */
+
             /** Pointer to the current job in main thread.\n */
             Trick::JobData * curr_job ;               /**< trick_io(**) */
 
@@ -522,6 +532,14 @@ namespace Trick {
             */
             long long get_time_tics() ;
 
+            /**
+             @userdesc Command to get whether the scheduled job queues are time indexed.
+             @par Python Usage:
+             @code <my_int> = trick.exec_get_time_indexed_queues() @endcode
+             @return boolean (C integer 0/1) Executive::time_indexed_queues
+            */
+            bool get_time_indexed_queues() ;
+
             /**
              @userdesc Command to get the current simulation time in tics.
              @par Python Usage:
@@ -687,6 +705,19 @@ namespace Trick {
             */
             int set_time_tic_value(int in_tics) ;
 
+            /**
+             @userdesc Command to enable/disable time indexing of the scheduled job queues of all threads.
+             By default, every job in a thread's queue is checked at every call time, so the cost of a frame
+             grows with the total number of scheduled jobs.  A time indexed queue keeps jobs in a heap ordered
+             by their next call time and only visits the jobs due at each call time, which is faster for sims
+             with many jobs at differing rates.  Jobs are called in the same order either way.
+             @par Python Usage:
+             @code trick.exec_set_time_indexed_queues(<on_off>) @endcode
+             @param on_off - boolean yes (C integer 1) = index queues by call time, no (C integer 0) = check every job
+             @return always 0
+            */
+            int set_time_indexed_queues(bool on_off) ;
+
             /**
              @userdesc Command to set the time to terminate the simulation. Same as stop(in_time).
              @par Python Usage:
@@ -990,6 +1021,19 @@ namespace Trick {
              */
             virtual int advance_sim_time() ;
 
+            /**
+             * Opens and maps the file named by the TRICK_PROGRESS_FILE environment variable, which
+             * monitoring tools such as TrickOps read to follow the simulation's progress without
+             * connecting to the variable server.
+             * @return 0 if successful or not requested, -1 if the file could not be mapped
+             */
+            virtual int open_progress_file() ;
+
+            /**
+             * Writes the current time and terminate time to the progress file, if open.
+             */
+            void update_progress() ;
+
             /**
              * Job to synchronize AMF and ASYNC threads to the master.
              * @return always 0
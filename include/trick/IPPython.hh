@@ -77,6 +77,35 @@ namespace Trick {
             */
             virtual int parse_condition(std::string in_string, int & cond_return_val) ;
 
+            /**
+             @brief Compiles the given string as a condition expression to be run by parse_compiled_condition.
+             @return the compiled code, or NULL if the string does not compile or python is not running
+            */
+            virtual void * compile_condition(std::string in_string) ;
+
+            /**
+             @brief Compiles the given string as statements to be run by parse_compiled.
+             @return the compiled code, or NULL if the string does not compile or python is not running
+            */
+            virtual void * compile(std::string in_string) ;
+
+            /**
+             @brief Runs a condition compiled by compile_condition and sets cond_return_val to its truth value.
+             @return 0 on success, -1 if the condition raised an exception
+            */
+            virtual int parse_compiled_condition(void * code, int & cond_return_val) ;
+
+            /**
+             @brief Runs statements compiled by compile.
+             @return 0 on success, -1 if the statements raised an exception
+            */
+            virtual int parse_compiled(void * code) ;
+
+            /**
+             @brief Releases code returned by compile_condition or compile.
+            */
+            virtual void free_compiled(void * code) ;
+
             /**
              @brief Restore variables with memory manager names to python space.
              @return always 0
@@ -22,6 +22,8 @@ namespace Trick {
     struct condition_t {
 
         condition_t() ;
+        /** Releases the compiled python condition.\n */
+        ~condition_t() ;
         /** True means condition is to be evaluated during event processing.\n */
         char enabled ;                          /**< trick_io(*io) trick_units(--) */
         /** True means that when fired, condition stays fired.\n */
@@ -42,12 +44,18 @@ namespace Trick {
         Trick::JobData * job ;                  /**< trick_io(**) trick_units(--) */
         /** Type of condition string: 0=python, 1=variable, 2=job.\n */
         int  cond_type ;                        /**< trick_io(*io) trick_units(--) */
+        /** Python condition string that code was compiled from.\n */
+        std::string code_str;                   /**< trick_io(**) trick_units(--) */
+        /** Compiled python condition, NULL if code_str did not compile.\n */
+        void * code ;                           /**< trick_io(**) trick_units(--) */
     } ;
 
     /** Data associated with each event action.\n */
     struct action_t {
 
         action_t() ;
+        /** Releases the compiled python action.\n */
+        ~action_t() ;
         /** True means action is to be run when fired.\n */
         char enabled ;                          /**< trick_io(*io) trick_units(--) */
         /** True when the action was run.\n */
@@ -64,6 +72,10 @@ namespace Trick {
         JobData * job ;                         /**< trick_io(**) trick_units(--) */
         /** Type of action string: 0=python, 1=job ON, 2=job OFF 3=job call.\n */
         int  act_type ;                         /**< trick_io(*io) trick_units(--) */
+        /** Python action string that code was compiled from.\n */
+        std::string code_str;                   /**< trick_io(**) trick_units(--) */
+        /** Compiled python action, NULL if code_str did not compile.\n */
+        void * code ;                           /**< trick_io(**) trick_units(--) */
     } ;
 
 /**
@@ -414,6 +426,12 @@ namespace Trick {
   
         private:
 
+            friend struct condition_t ;
+            friend struct action_t ;
+
+            /* Releases a condition's or action's compiled python code through the python input processor */
+            static void free_compiled(void * code) ;
+
             /* A static pointer to the python input processor set at the S_define level */
             static Trick::IPPython * ip ;
 
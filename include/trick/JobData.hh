@@ -9,6 +9,7 @@ PROGRAMMERS:
 #ifndef JOBDATA_HH
 #define JOBDATA_HH
 
+#include <atomic>
 #include <string>
 #include <vector>
 #include <set>
@@ -140,6 +141,13 @@ namespace Trick {
             /** time tic value from the executive */
             static long long time_tic_value ;      /**< trick_io(**) */
 
+#ifndef SWIG
+            /** Count of changes to job call times made outside of the scheduled job queues.
+                Time indexed queues rebuild their index when it changes.  Atomic because child
+                threads change their jobs' call times while other threads read their queues. */
+            static std::atomic<unsigned int> schedule_changes ;      /**< trick_io(**) */
+#endif
+
             /** Constructor for new blank JobData instance */
             JobData() ;
 
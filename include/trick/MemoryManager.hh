@@ -36,6 +36,7 @@ namespace Trick {
     typedef std::map<std::string, ALLOC_INFO*> VARIABLE_MAP;
     typedef std::map<std::string, ALLOC_INFO*>::const_iterator VARIABLE_MAP_ITER ;
     typedef std::map<std::string, ENUM_ATTR*> ENUMERATION_MAP;
+    typedef std::map<std::string, REF2*> REF_CACHE;
 
 /**
   The Memory Manager provides memory-resource administration services.
@@ -466,6 +467,10 @@ namespace Trick {
             /**
              Generate and return a REF2 reference object for the named variable.
              Caller is responsible for freeing the returned REF2 object (using free() from stdlib.h ).
+             References are cached by name. A cached reference is reused until a named allocation
+             is declared, deleted, renamed or reallocated. Pointers along a cached reference are
+             followed again on every call, so they may change between calls. At most 10000
+             references are cached, names looked up after that are parsed on every call.
              @param name - fully qualified variable name.
              @return pointer to REF2 object, or NULL on failure.
              */
@@ -682,6 +687,9 @@ namespace Trick {
             VARIABLE_MAP    variable_map;    /**< ** Map of <name, ALLOC_INFO*> key-value pairs for each named-allocations. */
             ENUMERATION_MAP enumeration_map; /**< ** Enumeration map. */
             pthread_mutex_t mm_mutex;        /**< ** Mutex to control access to memory manager maps */
+            REF_CACHE       ref_cache;       /**< ** Map of <name, REF2*> copies of the references resolved by ref_attributes. */
+            unsigned int ref_cache_generation ; /**< ** Incremented whenever named allocations change, which invalidates ref_cache. */
+            unsigned int ref_cache_valid_generation ; /**< ** ref_cache_generation the entries of ref_cache were resolved in. */
 
             int alloc_info_map_counter ;     /**< ** counter to assign unique ids to allocations as they are added to map */
             int extern_alloc_info_map_counter ; /**< ** counter to assign unique ids to allocations as they are added to map */
@@ -798,6 +806,11 @@ namespace Trick {
              */
             void free_reference_attr( ATTRIBUTES* reference_attr);
 
+            /**
+             Delete all of the references cached by ref_attributes. Caller must hold mm_mutex.
+             */
+            void clear_ref_cache();
+
             /**
              Allocate one or more instances of the named class.
              @param class_name The name of the class to allocate.
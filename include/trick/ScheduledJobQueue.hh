@@ -7,6 +7,8 @@
 #define SCHEDULEDJOBQUEUE_HH
 
 #include <string>
+#include <utility>
+#include <vector>
 
 #include "trick/JobData.hh"
 
@@ -17,6 +19,11 @@ namespace Trick {
      * allocate memory during normal cycling through jobs and is considerably
      * faster than the generalized priority_queue.
      *
+     * By default find_next_job walks every job in the queue on every call time.  A queue
+     * may instead be time indexed, see set_time_indexed(bool), so that each call time only
+     * visits the jobs due at that time and the system class jobs, which set their own call
+     * times.  Jobs are still returned in job_class, phase, sim_object, and job id order.
+     *
      * @author Robert W. Bailey
      * @author many other Trick developers of the past who did not add their names.
      * @author Alexander S. Lin
@@ -190,8 +197,65 @@ namespace Trick {
              */
             int test_next_job_call_time(Trick::JobData * curr_job, long long time_tics) ;
 
+            /**
+             * @brief Turns the time index on or off.  A time indexed queue keeps non system
+             * class jobs in groups that share a next call time and cycle, ordered by next call
+             * time, so find_next_job and find_job only visit the jobs due at the requested time.  The index follows job call
+             * times changed by the queue, by the jobs themselves while they are called, and
+             * by JobData::set_next_call_time.  Other changes to next_tics of non system
+             * class jobs must be followed by an increment of JobData::schedule_changes.
+             * @param yes_no - true to index jobs by next call time
+             * @return always 0
+             */
+            int set_time_indexed(bool yes_no) ;
+
+            /**
+             * @brief Returns whether this queue is time indexed
+             * @return true if the queue is time indexed
+             */
+            bool get_time_indexed() ;
+
         private:
 
+            /**
+             * @brief Calculates the next call time of a job that was found due at its
+             * current next call time, and tracks the next lowest job call time.
+             */
+            void advance_job_call_time(Trick::JobData * curr_job) ;
+
+            /**
+             * @brief Returns an empty time index group with the given next call time and cycle.
+             */
+            unsigned int new_job_group(long long time, long long cycle) ;
+
+            /**
+             * @brief Pushes a time index group onto the time heap, or frees it if it has
+             * no jobs or no next call time.
+             */
+            void schedule_job_group(unsigned int group) ;
+
+            /**
+             * @brief Rebuilds the time index from the list.
+             */
+            void build_time_index() ;
+
+            /**
+             * @brief Fills due_jobs with the positions of the jobs due at the requested time
+             * and of all system class jobs, in queue order.
+             */
+            void find_due_jobs(long long time_tics) ;
+
+            /**
+             * @brief Returns the index of the first due job at or after curr_index.
+             */
+            unsigned int seek_due_jobs() ;
+
+            /**
+             * @brief Tracks the lowest next job call time after the requested time among the
+             * due jobs and the time index heap.
+             */
+            void track_indexed_next_job_call_time(long long time_tics) ;
+
             /** number of jobs in list */
             unsigned int list_size ;
 
@@ -203,6 +267,48 @@ namespace Trick {
 
             /** next lowest job call time as tracked by calls to find_next_job(long long) */
             long long next_job_time ;
+
+            /** true if jobs are found through the time index */
+            bool time_indexed ;
+
+            /** true if the time index reflects the current list */
+            bool time_index_valid ; /* ** */
+
+            /** JobData::schedule_changes when the time index was built */
+            unsigned int time_index_changes ; /* ** */
+
+            /** call time due_jobs was found for */
+            long long due_time ; /* ** */
+
+            /** Sorted list positions of the jobs in each time index group */
+            std::vector< std::vector< unsigned int > > group_jobs ; /* ** */
+
+            /** Next call time of each time index group */
+            std::vector< long long > group_time ; /* ** */
+
+            /** Cycle of each time index group */
+            std::vector< long long > group_cycle ; /* ** */
+
+            /** Time index groups not in use */
+            std::vector< unsigned int > free_groups ; /* ** */
+
+            /** Heap of (next call time, group) of the time index groups not due at due_time */
+            std::vector< std::pair< long long, unsigned int > > time_heap ; /* ** */
+
+            /** Time index groups due at due_time */
+            std::vector< unsigned int > due_groups ; /* ** */
+
+            /** Sorted list positions of the jobs due at due_time and of all system class jobs */
+            std::vector< unsigned int > due_jobs ; /* ** */
+
+            /** Scratch space for merging due_jobs */
+            std::vector< unsigned int > merged_jobs ; /* ** */
+
+            /** Index into due_jobs following the last due job found */
+            unsigned int due_cursor ; /* ** */
+
+            /** Sorted list positions of the system class jobs */
+            std::vector< unsigned int > system_jobs ; /* ** */
     } ;
 
 }
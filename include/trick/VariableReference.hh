@@ -43,6 +43,12 @@ namespace Trick {
         bool isStaged() const;
         bool isWriteReady() const;
 
+        // Change tracking for delta mode. hasChanged compares the write buffer to a copy of the value that was
+        // last sent to the client, and markWritten updates that copy. Call both after prepareForWrite.
+        bool hasChanged() const;
+        void markWritten();
+        void resetWritten();
+
         // Write out the value to the given outstream.
         // write_ready must be true
         int getSizeAscii() const;
@@ -84,6 +90,9 @@ namespace Trick {
         void *_stage_buffer;
         void *_write_buffer;  
 
+        void *_last_written_buffer;           // ** copy of the last value sent, allocated on first markWritten
+        int   _last_written_size;             // -- size of that value, or -1 if nothing has been sent
+
         std::string _base_units;
         std::string _requested_units; 
         std::string _name;
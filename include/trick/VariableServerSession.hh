@@ -89,6 +89,12 @@ namespace Trick {
         virtual int write_data(std::vector<VariableReference *>& var, VS_MESSAGE_TYPE message_type) ;
         virtual int write_data();
 
+        /**
+         @brief Write a keyframe or a delta of the session variables, depending on how many frames have passed
+            since the last keyframe. Called by write_data() when delta mode is on.
+        */
+        virtual int write_delta_data();
+
         int write_stdio(int stream, std::string text);
 
         void disconnect_references();
@@ -342,6 +348,24 @@ namespace Trick {
         */
         virtual int var_byteswap(bool on_off) ;
 
+        /**
+         @brief @userdesc Command to instruct the variable server to send only the variables whose values
+            have changed since they were last sent.
+            Delta messages have a message indicator of 6 and contain a count followed by index/value pairs,
+            where each index is the variable's position in the var_add list.
+            - var_binary mode: each entry is formatted as <index><type><size><value>.
+            - var_ascii mode: the message is "6", the number of entries, and then the index and value of each entry, separated by tabs.
+            .
+            A full set of values (a keyframe, message indicator 0) is sent first, every keyframe_interval messages after that,
+            and whenever the var_add list or its units change. var_send also sends a keyframe.
+            @par Python Usage:
+            @code trick.var_delta(<on_off>, <keyframe_interval>) @endcode
+            @param on_off - true (or 1) to send deltas, false (or 0) to send every value every cycle (the default)
+            @param keyframe_interval - the number of messages between keyframes, or 0 to send keyframes only when required
+            @return always 0
+        */
+        virtual int var_delta(bool on_off, int keyframe_interval = 100) ;
+
         /**
          @brief @userdesc Command to toggle variable server logged messages to a playback file.
             All messages received from all clients will be saved to file named "playback" in the RUN directory.
@@ -433,6 +457,18 @@ namespace Trick {
         // Helper methods to write out formatted data
         virtual int write_binary_data(const std::vector<VariableReference *>& given_vars, VS_MESSAGE_TYPE message_type);
         virtual int write_ascii_data(const std::vector<VariableReference *>& given_vars, VS_MESSAGE_TYPE message_type );
+        // Entries too large to send are removed from indices
+        virtual int write_binary_delta_data(std::vector<int>& indices);
+        virtual int write_ascii_delta_data(const std::vector<int>& indices);
+
+        // Whether write_binary_data can fit the variable in a message. It skips variables that don't fit.
+        bool fits_binary_message(VariableReference * var);
+
+        // Make the next delta mode message a keyframe. Safe to call while another thread writes.
+        void request_keyframe();
+
+        // Swap the buffers of the given vars if they are all staged. Returns false if nothing should be written.
+        bool prepare_for_write(std::vector<VariableReference *>& given_vars);
 
         virtual VariableReference * find_session_variable(std::string name) const;
 
@@ -502,6 +538,16 @@ namespace Trick {
         /** Toggle to tell variable server return data in binary format without the variable names.\n */
         bool _binary_data_nonames ;       /**<  trick_io(**) */
 
+        /** Toggle to tell variable server to send only changed values.\n */
+        bool _delta_mode ;                /**<  trick_io(**) */
+
+        /** Number of messages between keyframes in delta mode, 0 for keyframes only when required.\n */
+        int _delta_keyframe_interval ;    /**<  trick_io(**) */
+
+        /** Messages written since the last keyframe, or -1 if the next message must be a keyframe.
+            Guarded by _copy_mutex, since commands change it while another thread may be writing.\n */
+        int _delta_frames_since_keyframe ; /**<  trick_io(**) */
+
         /** Value (1,2,or 3) that causes the variable server to output increasing amounts of debug information.\n */
         int _debug ;                      /**<  trick_io(**) */
 
@@ -35,6 +35,7 @@ extern "C" {
     double exec_get_thread_amf_cycle_time(unsigned int thread_id) ;
     int exec_get_time_tic_value( void ) ;
     long long exec_get_time_tics( void ) ;
+    int exec_get_time_indexed_queues(void) ;
     int exec_get_trap_sigbus(void) ;
     int exec_get_trap_sigfpe(void) ;
     int exec_get_trap_sigsegv(void) ;
@@ -66,6 +67,7 @@ extern "C" {
     int exec_set_time( double in_time ) ;
     int exec_set_time_tics( long long in_time_tics ) ;
     int exec_set_time_tic_value( int in_time_tics ) ;
+    int exec_set_time_indexed_queues(int on_off) ;
     int exec_set_trap_sigbus(int on_off) ;
     int exec_set_trap_sigfpe(int on_off) ;
     int exec_set_trap_sigsegv(int on_off) ;
@@ -14,8 +14,9 @@ typedef enum {
     VS_LIST_SIZE = 3 ,
     VS_STDIO = 4,
     VS_SEND_ONCE = 5,
+    VS_VAR_LIST_DELTA = 6,
     VS_MIN_CODE = VS_IP_ERROR,
-    VS_MAX_CODE = VS_SEND_ONCE
+    VS_MAX_CODE = VS_VAR_LIST_DELTA
 } VS_MESSAGE_TYPE ;
 
 #endif
@@ -0,0 +1,516 @@
+"""
+This module contains an asyncio-native client for a sim's variable
+server. It mirrors the VariableServer class in variable_server.py and
+uses the same Variable class, but all I/O is performed with asyncio
+streams instead of blocking sockets and a sampling thread, so a single
+event loop can serve connections to many sims.
+
+Requires Python 3.7 or later.
+"""
+
+import asyncio
+import struct
+
+try:
+    from .variable_server import (
+      Message, UnexpectedMessageError, Variable, _MAX_MESSAGE_SIZE,
+      _VAR_SEND_ONCE, _assert_message_type, _assert_units_conversion,
+      _assert_value_count, _decode_binary_values, _parse_value,
+      _var_add_command)
+except ImportError:
+    from variable_server import (
+      Message, UnexpectedMessageError, Variable, _MAX_MESSAGE_SIZE,
+      _VAR_SEND_ONCE, _assert_message_type, _assert_units_conversion,
+      _assert_value_count, _decode_binary_values, _parse_value,
+      _var_add_command)
+
+class AsyncVariableServer(object):
+    """
+    Send commands to and receive responses from a simulation's variable
+    server using asyncio.
+
+    Instances are created with the connect coroutine. You must call
+    close on instances of this class to release resources allocated
+    during initialization, or use them as asynchronous context managers.
+    Concurrent queries on one instance are serialized.
+    """
+
+    def __init__(self, reader, writer):
+        """
+        Use connect instead of calling this directly.
+
+        Parameters
+        ----------
+        reader : asyncio.StreamReader
+            The reader for the query connection.
+        writer : asyncio.StreamWriter
+            The writer for the query connection.
+        """
+        self._reader = reader
+        self._writer = writer
+        self._lock = asyncio.Lock()
+        self._subscriptions = set()
+        self.hostname, self.port = writer.get_extra_info('peername')[:2]
+
+    @classmethod
+    async def connect(cls, hostname, port):
+        """
+        Create a connection to the simulation variable server at
+        host:port.
+
+        Parameters
+        ----------
+        hostname : str
+            The name of the machine that is running the simulation to
+            which you want to connect.
+        port : int
+            The port on which the simulation's variable server is
+            listening.
+
+        Returns
+        -------
+        AsyncVariableServer
+            The connected client.
+        """
+        reader, writer = await asyncio.open_connection(hostname, int(port))
+        instance = cls(reader, writer)
+        await instance.send('trick.var_pause()')
+        return instance
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def get_value(self, name, units=None, type_=str):
+        """
+        Get the value of the named variable. If units are specified, the
+        value is converted if possible. This is the asynchronous
+        equivalent of VariableServer.get_value.
+
+        Parameters
+        ----------
+        name, units, and type_ are as documented in Variable.
+
+        Returns
+        -------
+        type returned by type_
+            The result of calling type_ on the variable's value.
+
+        Raises
+        ------
+        IOError
+            If the remote endpoint has closed the connection.
+        UnexpectedMessageError
+            If the next message is not a set of variable values.
+        ValueCountError
+            If more than one value is received.
+        UnitsConversionError
+            If units are specified and the conversion fails.
+        Additional errors may be raised by type_.
+        """
+        async with self._lock:
+            await self.send(
+              _var_add_command(name, units) + '\ntrick.var_send()\n'
+              'trick.var_clear()')
+            values = await self._read_values()
+        _assert_value_count(1, len(values))
+
+        value, actual_units = _parse_value(values[0])
+        _assert_units_conversion(name, units, actual_units)
+
+        return type_(value)
+
+    async def get_values(self, *variables):
+        """
+        Get the values of variables, updating each in place. This is the
+        asynchronous equivalent of VariableServer.get_values, and the
+        same Variable semantics apply.
+
+        Parameters
+        ----------
+        variables : zero or more Variables
+            The variables for which to fetch values and units.
+
+        Returns
+        -------
+        [any]
+            A list of the requested values in order.
+
+        Raises
+        ------
+        IOError
+            If the remote endpoint has closed the connection.
+        UnexpectedMessageError
+            If the next message is not a set of variable values.
+        ValueCountError
+            If the number of received values does not match the number
+            of variables.
+        UnitsConversionError
+            If units are specified and the conversion fails.
+        """
+        if not variables:
+            return []
+
+        async with self._lock:
+            await self.send(
+              '\n'.join(_var_add_command(
+                variable.name,
+                variable.units if variable.units is not None else 'xx')
+                for variable in variables)
+              + '\ntrick.var_send()\ntrick.var_clear()')
+            values = await self._read_values()
+        _assert_value_count(len(variables), len(values))
+
+        _update_variables(variables, values)
+        return [variable.value for variable in variables]
+
+    async def set_value(self, name, value, units=None):
+        """
+        Set the value of the named variable. If units are specified, the
+        value is converted if possible. If the conversion fails, the
+        value is unchanged, and no error is raised.
+
+        Parameters
+        ----------
+        name : str
+            The fully-qualified name.
+        value : any
+            The value. This should be of the type expected by the
+            variable server.
+        units : str
+            The units.
+        """
+        await self.send(
+          'trick.var_set("{0}", {1}{2})'.format(
+            name,
+            '"{0}"'.format(value) if isinstance(value, str) else value,
+            ', "{0}"'.format(units) if units is not None else ''))
+
+    async def variable_exists(self, name):
+        """
+        Determine if name is known to the memory manager.
+
+        Parameters
+        ----------
+        name : str
+            The variable's name.
+
+        Returns
+        -------
+        bool
+            True if name has been registered with the memory manager.
+            False if not.
+        """
+        async with self._lock:
+            await self.send('trick.var_exists("{0}")'.format(name))
+            message = await _readline(self._reader)
+        _assert_message_type(message, Message.Indicator.VAR_EXISTS)
+        return message.data == '1'
+
+    def subscribe(self, *variables, period=None, binary=False):
+        """
+        Begin periodically sampling the given variables over a new
+        connection. The returned Subscription is an asynchronous
+        iterator that updates the variables in place and yields their
+        values each time a new set arrives.
+
+        Parameters
+        ----------
+        variables : one or more Variables
+            The variables to sample.
+        period : float or None
+            The sampling period (in seconds), or None to use the sim's
+            default.
+        binary : bool
+            True to sample with the binary protocol. See the binary
+            parameter of VariableServer.
+
+        Returns
+        -------
+        Subscription
+            The subscription. Use it with "async with" and "async for",
+            or call its close coroutine when finished.
+
+        Example
+        -------
+        >>> async def monitor():
+        ...     async with await AsyncVariableServer.connect(
+        ...       'localhost', 7000) as vs:
+        ...         position = Variable('ball.obj.state.output.position[0]',
+        ...                             type_=float)
+        ...         async with vs.subscribe(position, period=0.1) as sub:
+        ...             async for values in sub:
+        ...                 print(values)
+        """
+        subscription = Subscription(self, variables, period, binary)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    async def send(self, command):
+        """
+        Append a newline to command and send it on the query
+        connection, waiting until it has been flushed. Calling this
+        directly is only necessary if you want to send a command for
+        which there is not already a method in this class.
+
+        Parameters
+        ----------
+        command : str
+            The command to send.
+        """
+        await _send(self._writer, command)
+
+    async def close(self):
+        """
+        Close the query connection and any open subscriptions. No
+        methods can be called after this one.
+        """
+        for subscription in list(self._subscriptions):
+            await subscription.close()
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+    async def _read_values(self):
+        """
+        Read a set of variable values from the query connection.
+
+        Returns
+        -------
+        [str]
+            A list of values, which may include units.
+        """
+        message = await _readline(self._reader)
+        _assert_message_type(message, Message.Indicator.VAR_SEND)
+        return message.data.split('\t')
+
+    def __str__(self):
+        return 'AsyncVariableServer' + str((self.hostname, self.port))
+
+class Subscription(object):
+    """
+    Periodic sampling of a set of Variables over a dedicated connection.
+    Create instances with AsyncVariableServer.subscribe.
+    """
+
+    def __init__(self, server, variables, period, binary):
+        """
+        Use AsyncVariableServer.subscribe instead of calling this
+        directly.
+        """
+        self.variables = list(variables)
+        self._server = server
+        self._period = period
+        self._binary = binary
+        self._reader = None
+        self._writer = None
+        self._byte_order = None
+
+    async def open(self):
+        """
+        Open the connection and start sampling. This is called
+        automatically by "async with" and by the first iteration.
+
+        Raises
+        ------
+        UnitsConversionError
+            If units are specified and the conversion fails.
+        ValueCountError
+            In binary mode, if a variable is too large for the variable
+            server to send.
+        Additional errors are as documented in
+        AsyncVariableServer.get_values.
+        """
+        if self._writer is not None:
+            return
+        # check for type_ and units conversion errors
+        await self._server.get_values(*self.variables)
+        self._reader, self._writer = await asyncio.open_connection(
+          self._server.hostname, self._server.port)
+        commands = ['trick.var_pause()']
+        if self._binary:
+            commands.append('trick.var_binary_nonames()')
+        if self._period is not None:
+            commands.append('trick.var_cycle({0})'.format(float(self._period)))
+        commands.extend(_var_add_command(
+          variable.name,
+          variable.units if variable.units is not None else 'xx')
+          for variable in self.variables)
+        if self._binary:
+            await _send(self._writer, '\n'.join(commands))
+            try:
+                await self._assert_binary_value_count()
+            except BaseException:
+                await self.close()
+                raise
+            commands = []
+        commands.append('trick.var_unpause()')
+        await _send(self._writer, '\n'.join(commands))
+
+    async def close(self):
+        """
+        Stop sampling and close the connection.
+        """
+        self._server._subscriptions.discard(self)
+        if self._writer is None:
+            return
+        writer, self._writer = self._writer, None
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._writer is None:
+            if self._reader is not None:
+                raise StopAsyncIteration
+            await self.open()
+        try:
+            if self._binary:
+                values = await self._read_binary_values()
+                for variable, value in zip(self.variables, values):
+                    variable.value = value
+            else:
+                message = await _readline(self._reader)
+                _assert_message_type(message, Message.Indicator.VAR_SEND)
+                # Units were checked when the subscription was opened.
+                for variable, value in zip(
+                  self.variables, message.data.split('\t')):
+                    variable._set_text(value)
+        except IOError:
+            if self._writer is None:
+                raise StopAsyncIteration
+            raise
+        return [variable.value for variable in self.variables]
+
+    async def _read_binary_values(self):
+        """
+        Read and decode a set of binary variable values, combining sets
+        that were split across several messages.
+        """
+        values = []
+        while True:
+            indicator, body = await self._read_binary_message()
+            if indicator != Message.Indicator.VAR_SEND:
+                raise UnexpectedMessageError(
+                  Message.Indicator.VAR_SEND, indicator)
+            values.extend(_decode_binary_values(
+              body, 0, len(body), self._byte_order))
+            # Any amount of room can be left where a set is split, so
+            # only the number of values marks its end.
+            if len(values) >= len(self.variables):
+                return values
+
+    async def _assert_binary_value_count(self):
+        """
+        Make sure the variable server sends a binary value for each
+        variable. It skips variables too large to fit in a message,
+        which would leave the values misaligned with their variables.
+        A set is requested while sampling is paused, followed by a
+        var_send_once of the sim time, whose response marks its end.
+
+        Raises
+        ------
+        UnexpectedMessageError
+            If a message is neither a set of variable values nor the
+            response to var_send_once.
+        ValueCountError
+            If the number of values does not match the number of
+            variables.
+        """
+        await _send(self._writer, 'trick.var_send()\n'
+                                  'trick.var_send_once("time", 1)')
+        received = 0
+        while True:
+            indicator, body = await self._read_binary_message()
+            if indicator == _VAR_SEND_ONCE:
+                break
+            if indicator != Message.Indicator.VAR_SEND:
+                raise UnexpectedMessageError(
+                  Message.Indicator.VAR_SEND, indicator)
+            received += struct.unpack_from(self._byte_order + 'i', body)[0]
+        _assert_value_count(len(self.variables), received)
+
+    async def _read_binary_message(self):
+        """
+        Read a binary message.
+
+        Returns
+        -------
+        int, bytearray
+            The message indicator and the message body, which starts
+            with the variable count.
+        """
+        header = await _readexactly(self._reader, 8)
+        if self._byte_order is None:
+            size = int.from_bytes(header[4:], 'little')
+            self._byte_order = '<' if 0 < size <= _MAX_MESSAGE_SIZE else '>'
+        byteorder = 'little' if self._byte_order == '<' else 'big'
+        indicator = int.from_bytes(header[:4], byteorder, signed=True)
+        size = int.from_bytes(header[4:], byteorder)
+        return indicator, bytearray(await _readexactly(self._reader, size - 4))
+
+async def _send(writer, command):
+    """
+    Append a newline to command, write it, and wait for it to be flushed.
+    """
+    writer.write('{0}\n'.format(command).encode())
+    await writer.drain()
+
+async def _readline(reader):
+    """
+    Read a newline-terminated message. The newline character is
+    stripped.
+
+    Raises
+    ------
+    IOError
+        If the remote endpoint has closed the connection.
+    """
+    line = await reader.readline()
+    if not line:
+        raise IOError("The remote endpoint has closed the connection")
+    line = line.decode().rstrip('\n').split('\t', 1)
+    return Message(int(line[0]), line[1])
+
+async def _readexactly(reader, count):
+    """
+    Read exactly count bytes.
+
+    Raises
+    ------
+    IOError
+        If the remote endpoint has closed the connection.
+    """
+    try:
+        return await reader.readexactly(count)
+    except asyncio.IncompleteReadError:
+        raise IOError("The remote endpoint has closed the connection")
+
+def _update_variables(variables, values):
+    """
+    Update Variables from ASCII values, checking units conversions as
+    VariableServer.get_values does.
+    """
+    for variable, entry in zip(variables, values):
+        value, units = _parse_value(entry)
+        if variable.units is not None:
+            _assert_units_conversion(variable.name, variable.units, units)
+        else:
+            variable.units = units
+        variable.value = value
@@ -0,0 +1,140 @@
+import asyncio
+import inspect
+import os
+import struct
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(inspect.getsourcefile(lambda:0))), '..')))
+from aio_variable_server import *
+from variable_server import UnitsConversionError, ValueCountError
+
+class TestAsyncVariableServer(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.variable_server = await AsyncVariableServer.connect(
+          'localhost', 7000)
+        self.variables = [
+            Variable('ball.obj.state.input.position[0]', type_=int),
+            Variable('ball.obj.state.input.mass', units='g', type_=float)
+        ]
+
+    async def asyncTearDown(self):
+        await self.variable_server.close()
+
+    async def test_get_value(self):
+        variable = 'ball.obj.state.input.mass'
+
+        self.assertEqual('10',
+          await self.variable_server.get_value(variable))
+
+        self.assertEqual(10000.0,
+          await self.variable_server.get_value(variable, units='g',
+                                               type_=float))
+
+        # bad units
+        with self.assertRaises(UnitsConversionError):
+            await self.variable_server.get_value(variable, units='fjarnskaggl')
+
+    async def test_set_value(self):
+        variable = 'ball.obj.state.input.position[1]'
+        await self.variable_server.set_value(variable, 1337)
+        self.assertEqual('1337',
+          await self.variable_server.get_value(variable))
+
+    async def test_get_values(self):
+        # empty call
+        self.assertEqual([], await self.variable_server.get_values())
+        self.assertEqual([5, 10000.0],
+          await self.variable_server.get_values(*self.variables))
+        self.assertEqual('m', self.variables[0].units)
+
+    async def test_concurrent_get_values(self):
+        results = await asyncio.gather(*(
+          self.variable_server.get_value('ball.obj.state.input.mass')
+          for _ in range(10)))
+        self.assertEqual(['10'] * 10, results)
+
+    async def test_variable_exists(self):
+        self.assertTrue(
+          await self.variable_server.variable_exists(self.variables[0].name))
+        self.assertFalse(
+          await self.variable_server.variable_exists('fjarnskaggl'))
+
+    async def test_subscribe(self):
+        for binary in False, True:
+            async with self.variable_server.subscribe(
+              *self.variables, period=0.1, binary=binary) as subscription:
+                count = 0
+                async for values in subscription:
+                    self.assertEqual([5, 10000.0], values)
+                    count += 1
+                    if count == 3:
+                        break
+        self.assertFalse(self.variable_server._subscriptions)
+
+class TestAsyncBinaryMessages(unittest.IsolatedAsyncioTestCase):
+    """
+    Tests of binary message handling that feed messages to a Subscription
+    directly instead of connecting to a sim.
+    """
+
+    def feed_values(self, reader, values, indicator=Message.Indicator.VAR_SEND):
+        """
+        Feed one var_binary_nonames message holding (format, value) pairs
+        to reader, as VariableServerSession::write_binary_data sends it.
+        """
+        types = {'i': 6, 'd': 11}
+        body = b''
+        for format_, value in values:
+            data = struct.pack('<' + format_ * len(value), *value)
+            body += struct.pack('<ii', types[format_], len(data)) + data
+        reader.feed_data(struct.pack('<iii', indicator, len(body) + 8,
+                                     len(values)) + body)
+
+    async def test_split_set(self):
+        # The set is split before the array, which doesn't fit in the room
+        # left in the first message.
+        first = [('i', [1])] + [('d', [float(i)]) for i in range(506)]
+        second = [('d', [float(i) for i in range(100)]), ('i', [2])]
+        variables = [Variable(str(i)) for i in range(len(first) + len(second))]
+        subscription = Subscription(None, variables, 0.1, True)
+        subscription._reader = asyncio.StreamReader()
+        self.feed_values(subscription._reader, first)
+        self.feed_values(subscription._reader, second)
+        self.feed_values(subscription._reader, [('i', [3])] * len(variables))
+
+        values = await subscription._read_binary_values()
+        self.assertEqual(len(variables), len(values))
+        self.assertEqual(505.0, values[506])
+        self.assertEqual([float(i) for i in range(100)], values[507])
+        self.assertEqual(2, values[508])
+        self.assertEqual([3] * len(variables),
+                         await subscription._read_binary_values())
+
+    async def test_oversized_variable(self):
+        class Writer(object):
+            def write(self, data):
+                pass
+            async def drain(self):
+                pass
+
+        variables = [Variable('small'), Variable('large'), Variable('last')]
+        subscription = Subscription(None, variables, 0.1, True)
+        subscription._reader = asyncio.StreamReader()
+        subscription._writer = Writer()
+
+        # all three values fit, then the var_send_once of the sim time
+        self.feed_values(subscription._reader,
+                         [('i', [1]), ('d', [2.0]), ('i', [3])])
+        self.feed_values(subscription._reader, [('d', [0.0])], 5)
+        await subscription._assert_binary_value_count()
+
+        # the variable server skips the array, which is too large to send
+        self.feed_values(subscription._reader, [('i', [1]), ('i', [3])])
+        self.feed_values(subscription._reader, [('d', [0.0])], 5)
+        with self.assertRaises(ValueCountError):
+            await subscription._assert_binary_value_count()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,18 @@
 import inspect
 import os
+import socket
+import struct
 import sys
+import threading
+import time
 import unittest
 
 # TODO: Get rid of this and use automatic discovery when Trick requires Python 2.7
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(inspect.getsourcefile(lambda:0))), '..')))
 from variable_server import *
+from variable_server import _BinaryMessageReader
+import variable_server
+from variable_server_benchmark import StandInServer
 
 class TestVariableServer(unittest.TestCase):
 
@@ -66,6 +73,47 @@ class TestVariableServer(unittest.TestCase):
         self.assertEqual(10000.0, self.variables[1].value)
         self.assertEqual('g', self.variables[1].units)
 
+    def test_get_values_repeated(self):
+        # repeated polling of the same set reuses the sim's list
+        for _ in range(3):
+            self.assertEqual([5, 10000.0],
+                             self.variable_server.get_values(*self.variables))
+        self.assertEqual(
+          (('ball.obj.state.input.position[0]', 'm'),
+           ('ball.obj.state.input.mass', 'g')),
+          self.variable_server._polled_entries)
+        # a different set replaces it
+        self.assertEqual('10',
+          self.variable_server.get_value('ball.obj.state.input.mass'))
+        self.assertEqual((('ball.obj.state.input.mass', None),),
+          self.variable_server._polled_entries)
+
+    def test_typed_variables(self):
+        position = FloatVariable('ball.obj.state.input.position[0]')
+        mass = IntVariable('ball.obj.state.input.mass', units='g')
+        enabled = BoolVariable('trick_real_time.rt_sync.disable_flag')
+        self.assertEqual([5.0, 10000, False],
+          self.variable_server.get_values(position, mass, enabled))
+        self.assertEqual('m', position.units)
+
+        array = ArrayVariable('ball.obj.state.input.position', units='m')
+        self.variable_server.get_values(array)
+        self.assertEqual(2, len(array.value))
+        self.assertEqual(5.0, array.value[0])
+
+    def test_lazy_decoding(self):
+        calls = []
+        def convert(value):
+            calls.append(value)
+            return float(value)
+        variable = Variable('ball.obj.state.input.mass', type_=convert)
+        self.variable_server.get_values(variable)
+        del calls[:]
+        # repeated reads of the same sample convert once
+        for _ in range(3):
+            self.assertEqual(10.0, variable.value)
+        self.assertEqual(1, len(calls))
+
     def test_add_variables(self):
         # empty call
         self.variable_server.add_variables()
@@ -88,6 +136,110 @@ class TestVariableServer(unittest.TestCase):
           Variable('ball.obj.state.input.mass', type_=dict))
 
 
+    def test_binary(self):
+        self.variable_server.close()
+        self.variable_server = VariableServer('localhost', 7000, binary=True)
+        self.variable_server.add_variables(*self.variables)
+        self.assertEqual(self.variables, self.variable_server._variables)
+        self.assertEqual(5, self.variables[0].value)
+        self.assertEqual(10000.0, self.variables[1].value)
+        self.assertEqual('g', self.variables[1].units)
+
+        # values sampled via the binary protocol are decoded numbers
+        updated = threading.Event()
+        self.variable_server.register_callback(updated.set)
+        self.assertTrue(updated.wait(5))
+        self.assertEqual(5, self.variables[0].value)
+        self.assertEqual(10000.0, self.variables[1].value)
+        self.assertEqual('g', self.variables[1].units)
+
+    def test_delta(self):
+        for binary in [False, True]:
+            self.variable_server.close()
+            self.variable_server = VariableServer(
+              'localhost', 7000, binary=binary)
+            block = VariableBlock(['ball.obj.state.input.mass'], 'g')
+            self.variable_server.add_variables(self.variables[0])
+            self.variable_server.add_block(block)
+            self.variable_server.enable_delta(keyframe_interval=0)
+
+            # unchanged values survive empty deltas
+            updated = threading.Event()
+            self.variable_server.register_callback(updated.set)
+            for _ in range(3):
+                updated.clear()
+                self.assertTrue(updated.wait(5))
+            self.assertEqual(5, self.variables[0].value)
+            self.assertEqual([10000.0], list(block.values))
+
+            # changes are applied by index
+            self.variable_server.set_value(
+              'ball.obj.state.input.mass', 20, 'kg')
+            for _ in range(3):
+                updated.clear()
+                self.assertTrue(updated.wait(5))
+            self.assertEqual([20000.0], list(block.values))
+            self.variable_server.set_value(
+              'ball.obj.state.input.mass', 10, 'kg')
+
+    def test_add_block(self):
+        block = VariableBlock(
+          [variable.name for variable in self.variables], ['m', 'g'])
+        # repeated call
+        for _ in range(2):
+            self.variable_server.add_block(block)
+            self.assertEqual([block], self.variable_server._blocks)
+        self.assertEqual([5.0, 10000.0], list(block.values))
+        self.assertEqual(['m', 'g'], list(block.units))
+        self.assertRaises(ValueError, block.values.__setitem__, 0, 1.0)
+
+        # bad units
+        self.assertRaises(
+          UnitsConversionError,
+          self.variable_server.add_block,
+          VariableBlock(['ball.obj.state.input.mass'], 'fjarnskaggl'))
+
+        # mismatched units
+        self.assertRaises(
+          ValueError, VariableBlock, ['ball.obj.state.input.mass'], ['m', 'g'])
+
+    def test_remove_block(self):
+        block = VariableBlock([variable.name for variable in self.variables])
+        self.variable_server.add_block(block)
+        # repeated call
+        for _ in range(2):
+            self.variable_server.remove_block(block)
+            self.assertFalse(self.variable_server._blocks)
+
+    def test_variable_history(self):
+        history = VariableHistory(
+          [variable.name for variable in self.variables], 3, ['m', 'g'])
+        self.assertEqual(VariableHistory.TIME_TICS, history.names[0])
+        self.assertEqual(0, history.count)
+
+        updated = threading.Event()
+        def count_updates():
+            if history.count == history.capacity:
+                updated.set()
+        self.variable_server.register_callback(count_updates)
+        self.variable_server.set_period(0.01)
+        self.variable_server.add_block(history)
+        self.assertTrue(updated.wait(5))
+
+        rows = history.to_numpy()
+        self.assertEqual((3, 3), rows.shape)
+        self.assertEqual([5.0, 10000.0], list(rows[-1, 1:]))
+        self.assertEqual(list(rows[-1]), list(history[-1]))
+        self.assertEqual(list(rows[1:, 0]), list(history.latest(2)[:, 0]))
+        self.assertEqual(list(rows[1:2, 0]),
+                         list(history.window(rows[1, 0], rows[1, 0])[:, 0]))
+
+        history.clear()
+        self.assertEqual(0, len(history.to_numpy()))
+
+        # bad capacity
+        self.assertRaises(ValueError, VariableHistory, ['x'], 0)
+
     def test_remove_variables(self):
         self.variable_server.add_variables(*self.variables)
         # empty call
@@ -193,6 +345,196 @@ class TestVariableServer(unittest.TestCase):
         self.assertTrue(self.variable_server.get_value(
           'trick_real_time.rt_sync.enable_flag', type_=bool))
 
+    def test_discovery(self):
+        simulation = get_discovery().find(port=7000, timeout=10)
+        self.assertEqual('7000', simulation.port)
+        self.assertTrue(simulation.matches(port=7000, pid=simulation.pid))
+        self.assertFalse(simulation.matches(port=7001))
+        self.assertIn(simulation, get_discovery().simulations())
+
+        find_simulation(port=7000, timeout=10).close()
+
+    def test_pool(self):
+        with VariableServerPool() as pool:
+            variable_server = pool.connect(port=7000, timeout=10)
+            self.assertEqual('10',
+              variable_server.get_value('ball.obj.state.input.mass'))
+            variable_server.add_variables(*self.variables)
+            pool.release(variable_server)
+            self.assertFalse(variable_server._variables)
+            # released connections are reused
+            self.assertIs(variable_server, pool.connect(port=7000, timeout=10))
+            # connections in use are not shared
+            other = pool.acquire('localhost', 7000)
+            self.assertIsNot(variable_server, other)
+
+class TestBinaryMessages(unittest.TestCase):
+    """
+    Tests of binary message handling that feed messages to a VariableServer
+    directly instead of connecting to a sim.
+    """
+
+    def setUp(self):
+        self.sim_socket, client_socket = socket.socketpair()
+        self.variable_server = VariableServer.__new__(VariableServer)
+        self.variable_server._binary_reader = _BinaryMessageReader(
+          client_socket)
+        self.variable_server._blocks = []
+        self.client_socket = client_socket
+
+    def tearDown(self):
+        self.sim_socket.close()
+        self.client_socket.close()
+
+    def send_values(self, values, indicator=Message.Indicator.VAR_SEND):
+        """
+        Send one var_binary_nonames message holding (format, value) pairs,
+        as VariableServerSession::write_binary_data does.
+        """
+        types = {'i': 6, 'd': 11}
+        body = b''
+        for format_, value in values:
+            data = struct.pack('<' + format_ * len(value), *value)
+            body += struct.pack('<ii', types[format_], len(data)) + data
+        header = struct.pack('<iii', indicator, len(body) + 8, len(values))
+        self.sim_socket.sendall(header + body)
+
+    def test_split_set(self):
+        # The set is split before the array, which doesn't fit in the room
+        # left in the first message.
+        first = [('i', [1])] + [('d', [float(i)]) for i in range(506)]
+        second = [('d', [float(i) for i in range(100)]), ('i', [2])]
+        self.variable_server._variables = [None] * (len(first) + len(second))
+        self.send_values(first)
+        self.send_values(second)
+        # the next set must not be mistaken for the rest of this one
+        self.send_values([('i', [3])] * len(self.variable_server._variables))
+
+        values, changes = self.variable_server._read_binary_values()
+        self.assertIsNone(changes)
+        self.assertEqual(len(first) + len(second), len(values))
+        self.assertEqual(1, values[0])
+        self.assertEqual(505.0, values[506])
+        self.assertEqual([float(i) for i in range(100)], values[507])
+        self.assertEqual(2, values[508])
+
+        values, changes = self.variable_server._read_binary_values()
+        self.assertEqual([3] * len(self.variable_server._variables), values)
+
+    def test_oversized_variable(self):
+        self.variable_server._synchronous_socket = self.client_socket
+        self.variable_server._asynchronous_socket = self.client_socket
+        self.variable_server._session_changed = False
+
+        # all three values fit, then the var_send_once of the sim time
+        self.send_values([('i', [1]), ('d', [2.0]), ('i', [3])])
+        self.send_values([('d', [0.0])], variable_server._VAR_SEND_ONCE)
+        self.variable_server._assert_binary_value_count(3)
+
+        # the variable server skips the array, which is too large to send
+        self.send_values([('i', [1]), ('i', [3])])
+        self.send_values([('d', [0.0])], variable_server._VAR_SEND_ONCE)
+        with self.assertRaises(ValueCountError):
+            self.variable_server._assert_binary_value_count(3)
+
+        # the probe leaves the session as it was
+        self.assertFalse(self.variable_server._session_changed)
+
+    def send_delta(self, changes, total):
+        """
+        Send one binary var_delta message holding (index, value) pairs of
+        doubles, as VariableServerSession::write_binary_delta_data does.
+        """
+        body = b''.join(struct.pack('<iiid', index, 11, 8, value)
+                        for index, value in changes)
+        header = struct.pack('<iiii', 6, len(body) + 12, len(changes), total)
+        self.sim_socket.sendall(header + body)
+
+    def test_split_delta(self):
+        self.variable_server._variables = [None] * 1000
+        changes = [(index, float(index)) for index in range(600)]
+        self.send_delta(changes[:300], len(changes))
+        self.send_delta(changes[300:], len(changes))
+        self.send_delta([], 0)
+
+        values, received = self.variable_server._read_binary_values()
+        self.assertIsNone(values)
+        self.assertEqual(changes, received)
+        # an empty delta is a frame of its own
+        self.assertEqual((None, []), self.variable_server._read_binary_values())
+
+class TestVariableServerPool(unittest.TestCase):
+    """
+    Tests of VariableServerPool against a stand-in variable server.
+    """
+
+    def setUp(self):
+        self.server = StandInServer()
+        self.pool = VariableServerPool()
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.close()
+
+    def test_release_changed(self):
+        variable_server = self.pool.acquire(self.server.host, self.server.port)
+        variable_server.set_period(0.5)
+        self.pool.release(variable_server)
+        # changed sessions are closed instead of being handed out again
+        self.assertFalse(variable_server._open)
+        self.assertNotIn(variable_server, self.pool._keys)
+        other = self.pool.acquire(self.server.host, self.server.port)
+        self.assertIsNot(variable_server, other)
+
+        # adding and removing variables leaves the session clean
+        other.add_variables(Variable('a'))
+        self.pool.release(other)
+        self.assertTrue(other._open)
+        self.assertIs(other, self.pool.acquire(self.server.host, self.server.port))
+
+    def test_closed_connections_dropped(self):
+        variable_server = self.pool.acquire(self.server.host, self.server.port)
+        self.pool.release(variable_server)
+        variable_server.close()
+        other = self.pool.acquire(self.server.host, self.server.port)
+        self.assertIsNot(variable_server, other)
+        self.assertEqual([other], list(self.pool._keys))
+
+        other.close()
+        self.pool.release(other)
+        self.assertFalse(self.pool._keys)
+
+class TestSimulationDiscovery(unittest.TestCase):
+    """
+    Tests of the SimulationDiscovery registry, without a multicast socket.
+    """
+
+    def setUp(self):
+        self.discovery = SimulationDiscovery.__new__(SimulationDiscovery)
+        self.discovery._simulations = {}
+        self.discovery._condition = threading.Condition()
+
+    def announce(self, pid, last_seen):
+        simulation = SimulationAnnouncement(
+          'localhost', '7000', 'user', pid, '/SIM_test', 'S_main_test.exe',
+          'RUN_test/input.py', '19.0', 'tag', last_seen)
+        self.discovery._simulations[
+          simulation.host, simulation.port, simulation.pid] = simulation
+        return simulation
+
+    def test_stopped_announcing(self):
+        simulation = self.announce('1', time.time())
+        self.assertEqual(simulation, self.discovery.find(timeout=0.1, pid=1))
+
+        # the sim exits, and its last announcement ages out
+        self.announce('1', time.time() - 2 * variable_server._ANNOUNCEMENT_MAX_AGE)
+        self.assertEqual([], self.discovery.simulations())
+        with self.assertRaises(socket.timeout):
+            self.discovery.find(timeout=0.1, pid=1)
+
+        # unless the caller asks for every sim ever seen
+        self.assertEqual(1, len(self.discovery.simulations(max_age=None)))
+
 # TODO: Get rid of this and use automatic discovery when Trick requires Python 2.7
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,49 @@
+import inspect
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(inspect.getsourcefile(lambda:0))), '..')))
+from variable_server_benchmark import *
+
+class TestVariableServerBenchmark(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StandInServer()
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_run_benchmark(self):
+        for protocol in PROTOCOLS:
+            # 600 binary values do not fit in one message
+            for count in [1, 600]:
+                result = run_benchmark(
+                  self.server.host, self.server.port, ['a'] * count,
+                  protocol=protocol, period=0.02, duration=0.5, polls=5,
+                  timestamps=True)
+                self.assertEqual(count, result['count'])
+                self.assertGreater(result['frames'], 0)
+                self.assertGreater(result['bytes_per_second'], 0)
+                self.assertGreater(result['bytes_per_frame'], 8 * count)
+                self.assertIsNotNone(result['client_cpu_per_frame'])
+                for latency in [result['latency'], result['poll_latency']]:
+                    self.assertLessEqual(latency['p50'], latency['max'])
+                    self.assertGreaterEqual(latency['p50'], 0)
+
+    def test_no_timestamps(self):
+        result = run_benchmark(
+          self.server.host, self.server.port, ['a'], period=0.02,
+          duration=0.2, polls=1)
+        self.assertIsNone(result['latency'])
+
+    def test_percentiles(self):
+        self.assertIsNone(percentiles([]))
+        summary = percentiles(list(range(100)))
+        self.assertEqual(50, summary['p50'])
+        self.assertEqual(90, summary['p90'])
+        self.assertEqual(99, summary['p99'])
+        self.assertEqual(99, summary['max'])
+
+if __name__ == '__main__':
+    unittest.main()
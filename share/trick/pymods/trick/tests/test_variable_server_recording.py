@@ -0,0 +1,115 @@
+import inspect
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(inspect.getsourcefile(lambda:0))), '..')))
+from variable_server import *
+from variable_server_benchmark import StandInServer
+from variable_server_recording import *
+
+class TestVariableServerRecording(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.paths = {}
+        with StandInServer() as server:
+            for binary in [False, True]:
+                path = os.path.join(cls.directory, str(binary))
+                with StreamRecorder(server.host, server.port, path,
+                                    ['a', 'b'], [None, 's'], binary,
+                                    0.02) as recorder:
+                    time.sleep(0.3)
+                cls.paths[binary] = path
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    def test_recording(self):
+        for binary, path in self.paths.items():
+            with Recording(path) as recording:
+                self.assertEqual(binary, recording.binary)
+                self.assertEqual(('a', 'b'), recording.names)
+                self.assertEqual(('s', 's'), recording.units)
+                self.assertGreater(len(recording), 5)
+                self.assertGreater(recording.duration, 0.1)
+                values = recording.values(0)
+                if binary:
+                    self.assertAlmostEqual(
+                      recording.timestamps[0], values[0], delta=0.1)
+                else:
+                    self.assertEqual(values[0] + ' {s}', values[1])
+                self.assertEqual(0, recording.find(-1))
+                self.assertEqual(len(recording), recording.find(10))
+
+    def test_rebuild_index(self):
+        path = os.path.join(self.directory, 'truncated')
+        with open(self.paths[False], 'rb') as source:
+            data = source.read()
+        with Recording(self.paths[False]) as recording:
+            expected = recording.timestamps
+            # cut the index and half of the last frame
+            end = recording._offsets[-1] + 10
+        with open(path, 'wb') as destination:
+            destination.write(data[:end])
+        with Recording(path) as recording:
+            self.assertEqual(expected[:-1], recording.timestamps)
+
+    def test_replay(self):
+        for recorded_binary, path in self.paths.items():
+            with Recording(path) as recording:
+                expected = [float(recording.values(i)[0])
+                            for i in range(len(recording))]
+            for binary in [False, True]:
+                with ReplayServer(path, speed=0) as server:
+                    variable_server = VariableServer(
+                      server.host, server.port, binary)
+                    try:
+                        a = Variable('a', type_=float)
+                        b = Variable('b', 's', float)
+                        c = Variable('c')
+                        received = []
+                        done = threading.Event()
+                        def record():
+                            received.append((a.value, b.value, c.value))
+                            if len(received) == len(expected):
+                                done.set()
+                        variable_server.register_callback(record)
+                        variable_server.add_variables(a, b, c)
+                        self.assertTrue(done.wait(5))
+                    finally:
+                        variable_server.close()
+                for frame, value in zip(received, expected):
+                    self.assertEqual((value, value), frame[:2])
+                    if not binary:
+                        self.assertEqual('BAD_REF', frame[2])
+
+    def test_seek(self):
+        with ReplayServer(self.paths[False], speed=0) as server:
+            server.seek(server.recording.duration / 2)
+            position = server.recording.find(server.recording.duration / 2)
+            self.assertLess(0, position)
+            expected = float(server.recording.values(position)[0])
+            variable_server = VariableServer(server.host, server.port)
+            try:
+                a = Variable('a', type_=float)
+                received = []
+                done = threading.Event()
+                def record():
+                    received.append(a.value)
+                    done.set()
+                variable_server.register_callback(record)
+                variable_server.add_variables(a)
+                self.assertTrue(done.wait(5))
+            finally:
+                variable_server.close()
+            self.assertEqual(expected, received[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -122,22 +122,245 @@ class Message(namedtuple('Message', ['indicator', 'data'])):
     """
     Indicator = _create_enum('Indicator', ['VAR_SEND', 'VAR_EXISTS'])
 
+# The largest message the variable server will send. Larger variable sets
+# are split across multiple messages. See VariableServerSession_write_data.cpp.
+_MAX_MESSAGE_SIZE = 8192
+
+# Sims announce themselves each time their listen thread waits 2 seconds
+# without a new connection. See TCPClientListener::checkForNewConnections.
+# Sims that have not announced themselves for a few periods have exited.
+_ANNOUNCEMENT_MAX_AGE = 6.0
+
+# Maps TRICK_TYPE (see parameter_types.h) to the struct format character
+# used to decode one element of a binary value. Sims are assumed to be LP64,
+# so longs are 8 bytes. Booleans are decoded as ints to match the ASCII
+# protocol, which sends them as 0 or 1.
+_BINARY_FORMATS = {
+  1: 'b',   # TRICK_CHARACTER
+  2: 'B',   # TRICK_UNSIGNED_CHARACTER
+  4: 'h',   # TRICK_SHORT
+  5: 'H',   # TRICK_UNSIGNED_SHORT
+  6: 'i',   # TRICK_INTEGER
+  7: 'I',   # TRICK_UNSIGNED_INTEGER
+  8: 'q',   # TRICK_LONG
+  9: 'Q',   # TRICK_UNSIGNED_LONG
+  10: 'f',  # TRICK_FLOAT
+  11: 'd',  # TRICK_DOUBLE
+  12: 'i',  # TRICK_BITFIELD
+  13: 'I',  # TRICK_UNSIGNED_BITFIELD
+  14: 'q',  # TRICK_LONG_LONG
+  15: 'Q',  # TRICK_UNSIGNED_LONG_LONG
+  17: 'B',  # TRICK_BOOLEAN
+  18: 'i',  # TRICK_WCHAR
+  21: 'i',  # TRICK_ENUMERATED
+}
+
+_BINARY_SIZES = dict((trick_type, struct.calcsize('=' + format_))
+                     for trick_type, format_ in _BINARY_FORMATS.items())
+
+_TRICK_CHARACTER = 1
+_TRICK_STRING = 3
+
+# The indicator of a var_delta message, which contains only the values that
+# changed since they were last sent. See VariableServerSession_write_data.cpp.
+_VAR_LIST_DELTA = 6
+
+# The indicator of a response to var_send_once.
+_VAR_SEND_ONCE = 5
+
+# The variable server commands that change nothing about a session but the
+# variables it samples. Other var_ commands change state that a
+# VariableServerPool can't restore. See VariableServer.send.
+_SAMPLING_COMMANDS = ('trick.var_add(', 'trick.var_remove(', 'trick.var_clear(',
+                      'trick.var_send(', 'trick.var_units(',
+                      'trick.var_exists(')
+
+class _BinaryMessageReader(object):
+    """
+    Read binary variable server messages from a socket. Data is received
+    directly into a reusable buffer, and messages are returned as offsets
+    into that buffer, so no intermediate strings or lists are created.
+    """
+
+    def __init__(self, sock, size=_MAX_MESSAGE_SIZE * 8):
+        """
+        Parameters
+        ----------
+        sock : socket.socket
+            The socket from which to read.
+        size : int
+            The size of the receive buffer. It must be able to hold at
+            least one complete message.
+        """
+        self._socket = sock
+        self.buffer = bytearray(size)
+        self._view = memoryview(self.buffer)
+        self._start = 0
+        self._end = 0
+        self.byte_order = None
+
+    def _fill(self, count):
+        """
+        Block until at least count unread bytes are buffered.
+
+        Raises
+        ------
+        IOError
+            If the remote endpoint has closed the connection.
+        """
+        if self._start + count > len(self.buffer):
+            remaining = self._end - self._start
+            self._view[:remaining] = self._view[self._start:self._end]
+            self._start, self._end = 0, remaining
+        while self._end - self._start < count:
+            received = self._socket.recv_into(self._view[self._end:])
+            if not received:
+                raise IOError("The remote endpoint has closed the connection")
+            self._end += received
+
+    def read_message(self):
+        """
+        Read the next message, blocking if necessary. The returned offsets
+        are only valid until the next call.
+
+        Returns
+        -------
+        int, int, int
+            A tuple containing:
+                - The message indicator.
+                - The offset in buffer of the message body, which starts
+                  with the variable count.
+                - The offset in buffer of the end of the message.
+
+        Raises
+        ------
+        IOError
+            If the remote endpoint has closed the connection.
+        """
+        self._fill(8)
+        if self.byte_order is None:
+            # The sim writes in its native byte order unless var_byteswap is
+            # on. Valid sizes are small, so only one interpretation fits.
+            size, = struct.unpack_from('<i', self.buffer, self._start + 4)
+            self.byte_order = '<' if 0 < size <= _MAX_MESSAGE_SIZE else '>'
+        indicator, size = struct.unpack_from(
+          self.byte_order + 'ii', self.buffer, self._start)
+        self._fill(4 + size)
+        offset = self._start + 8
+        self._start += 4 + size
+        return indicator, offset, self._start
+
+def _decode_binary_values(buffer, offset, end, byte_order):
+    """
+    Decode the variables in the body of a var_binary_nonames message.
+
+    Parameters
+    ----------
+    buffer : bytearray
+        The buffer containing the message.
+    offset : int
+        The offset of the message body, which starts with the variable
+        count.
+    end : int
+        The offset of the end of the message.
+    byte_order : str
+        The struct byte order character.
+
+    Returns
+    -------
+    [any]
+        The values in order. Numbers are decoded as int or float, strings
+        and character arrays as str, and other arrays as lists. Values of
+        unsupported types are returned as raw bytes.
+    """
+    count, = struct.unpack_from(byte_order + 'i', buffer, offset)
+    offset += 4
+    header = struct.Struct(byte_order + 'ii')
+    values = []
+    for _ in range(count):
+        trick_type, size = header.unpack_from(buffer, offset)
+        offset += 8
+        values.append(_decode_binary_value(
+          buffer, offset, end, trick_type, size, byte_order))
+        offset += size
+    return values
+
+def _decode_binary_delta(buffer, offset, end, byte_order):
+    """
+    Decode the entries in the body of a binary var_delta message.
+
+    Parameters
+    ----------
+    As documented in _decode_binary_values.
+
+    Returns
+    -------
+    [(int, any)], int
+        A tuple containing:
+            - The index in the var_add list and the value of each changed
+              variable in this message. Values are decoded as in
+              _decode_binary_values.
+            - The number of changed variables in the whole delta, which
+              may be split across several messages.
+    """
+    count, total = struct.unpack_from(byte_order + 'ii', buffer, offset)
+    offset += 8
+    header = struct.Struct(byte_order + 'iii')
+    changes = []
+    for _ in range(count):
+        index, trick_type, size = header.unpack_from(buffer, offset)
+        offset += 12
+        changes.append((index, _decode_binary_value(
+          buffer, offset, end, trick_type, size, byte_order)))
+        offset += size
+    return changes, total
+
+def _decode_binary_value(buffer, offset, end, trick_type, size, byte_order):
+    """
+    Decode one binary value of the given TRICK_TYPE and size, which
+    starts at offset in buffer.
+
+    Raises
+    ------
+    VariableServerError
+        If the value extends past end.
+    """
+    if offset + size > end:
+        raise VariableServerError('Binary message ends unexpectedly')
+    element_size = _BINARY_SIZES.get(trick_type)
+    if trick_type == _TRICK_STRING or (
+      trick_type == _TRICK_CHARACTER and size > 1):
+        value = bytes(buffer[offset:offset + size]).split(b'\0', 1)[0]
+        return value.decode('utf-8', 'replace')
+    if element_size is None or size % element_size:
+        return bytes(buffer[offset:offset + size])
+    length = size // element_size
+    value = struct.unpack_from(
+      '{0}{1}{2}'.format(byte_order, length, _BINARY_FORMATS[trick_type]),
+      buffer, offset)
+    return value[0] if length == 1 else list(value)
+
 class Variable(object):
     """
     A variable whose value and units will be updated from the sim. You
     should not directly change any part of this class.
 
+    Values are decoded lazily: sampled text is not split into value and
+    units, and type_ is not called, until value or units is read, and
+    the result is cached until the next update. Variables that are
+    sampled but rarely read therefore cost almost nothing per update.
+
     Attributes
     ----------
     name : str
         The fully-qualified name.
-    units : str
-        The units. Use 'xx' to specify default units.
 
     Properties
     ----------
     value : type returned by the type_ parameter of __init__ (or None)
         The value.
+    units : str
+        The units. Use 'xx' to specify default units.
     """
 
     def __init__(self, name, units=None, type_=str):
@@ -155,23 +378,89 @@ class Variable(object):
             custom function that does anything you like!
         """
         self.name = name
-        self.units = units
+        self._units = units
         self._type = type_
-        self._value = None
+        # The latest sample as (data, is_text). Text samples are raw
+        # ASCII values that may include units. The tuple is replaced,
+        # never modified, so readers on other threads always see a
+        # consistent sample.
+        self._sample = (None, False)
+        # (sample, converted value, parsed units) for the last sample
+        # that was decoded.
+        self._decoded = None
+
+    def _decode(self):
+        """
+        Decode the latest sample, at most once per sample.
+
+        Returns
+        -------
+        tuple
+            The sample, the converted value, and the units parsed from
+            it (None unless the sample is text).
+        """
+        sample = self._sample
+        decoded = self._decoded
+        if decoded is None or decoded[0] is not sample:
+            data, is_text = sample
+            units = None
+            if is_text:
+                data, units = _parse_value(data)
+            decoded = sample, self._convert(data), units
+            self._decoded = decoded
+        return decoded
+
+    def _convert(self, data):
+        """
+        Convert a received value. Subclasses override this to decode
+        specific types.
+
+        Parameters
+        ----------
+        data : str or decoded binary value
+            The value as received.
+        """
+        return self._type(data)
+
+    def _set_text(self, text):
+        """
+        Store sampled ASCII text, which may include units, without
+        parsing it.
+        """
+        self._sample = (text, True)
 
     @property
     def value(self):
         '''
         Get the converted value.
         '''
-        return self._type(self._value)
+        return self._decode()[1]
 
     @value.setter
     def value(self, value):
         '''
         Set the value.
         '''
-        self._value = value
+        self._sample = (value, False)
+
+    @property
+    def units(self):
+        '''
+        Get the units.
+        '''
+        if self._sample[1]:
+            return self._decode()[2]
+        return self._units
+
+    @units.setter
+    def units(self, units):
+        '''
+        Set the units.
+        '''
+        data, is_text = self._sample
+        if is_text:
+            self._sample = (_parse_value(data)[0], False)
+        self._units = units
 
     def __str__(self):
         return self.name
@@ -182,6 +471,420 @@ class Variable(object):
           self.value,
           ' {0}'.format(self.units) if self.units is not None else '')
 
+class FloatVariable(Variable):
+    """
+    A Variable whose value is a float.
+    """
+
+    def __init__(self, name, units=None):
+        super(FloatVariable, self).__init__(name, units, float)
+
+    def _convert(self, data):
+        return float(data)
+
+class IntVariable(Variable):
+    """
+    A Variable whose value is an int.
+    """
+
+    def __init__(self, name, units=None):
+        super(IntVariable, self).__init__(name, units, int)
+
+    def _convert(self, data):
+        return int(data)
+
+class BoolVariable(Variable):
+    """
+    A Variable whose value is a bool. Unlike passing type_=bool to
+    Variable, which is True for any non-empty string, this interprets
+    the sim's 0 and 1 correctly.
+    """
+
+    def __init__(self, name, units=None):
+        super(BoolVariable, self).__init__(name, units, bool)
+
+    def _convert(self, data):
+        if isinstance(data, basestring):
+            return bool(int(data))
+        return bool(data)
+
+class ArrayVariable(Variable):
+    """
+    A Variable for a whole array, such as 'ball.obj.state.output.position'.
+    The variable server sends every element of a constrained array named
+    without an index as a single value (x[0] through x[n-1]), which is
+    decoded into one NumPy array.
+
+    Requires NumPy.
+    """
+
+    def __init__(self, name, units=None, dtype=float):
+        """
+        Create a new ArrayVariable.
+
+        Parameters
+        ----------
+        name and units are as documented in Variable.
+        dtype : numpy.dtype or equivalent
+            The type of the array's elements.
+        """
+        import numpy
+
+        super(ArrayVariable, self).__init__(name, units, numpy.asarray)
+        self._numpy = numpy
+        self._dtype = dtype
+
+    def _convert(self, data):
+        if data is None:
+            return None
+        if isinstance(data, basestring):
+            data = data.split(',')
+        return self._numpy.array(data, dtype=self._dtype, ndmin=1)
+
+class VariableBlock(object):
+    """
+    A fixed set of variables whose values are sampled into one
+    preallocated NumPy array, with a parallel array of units. Each update
+    from the sim is written into the array with a single vectorized copy,
+    so watching thousands of values costs no per-variable Python objects.
+    Add a block to a VariableServer with add_block. You should not
+    directly change any part of this class.
+
+    Requires NumPy.
+
+    Attributes
+    ----------
+    names : tuple of str
+        The fully-qualified names, in array order.
+
+    Properties
+    ----------
+    values : numpy.ndarray
+        A read-only view of the values. The view is updated in place by
+        the sampling thread, so copy it from a callback (see
+        VariableServer.register_callback) if you need a consistent set.
+    units : numpy.ndarray
+        A read-only view of the units, parallel to values.
+    """
+
+    def __init__(self, names, units=None, dtype=float):
+        """
+        Create a new VariableBlock.
+
+        Parameters
+        ----------
+        names : iterable of str
+            The fully-qualified names.
+        units : str, iterable of str, or None
+            The units, either one for all variables or one per variable.
+            Use None or 'xx' to specify default units.
+        dtype : numpy.dtype or equivalent
+            The type of the values array. Every variable's value must be
+            convertible to it.
+
+        Raises
+        ------
+        ValueError
+            If the number of units does not match the number of names.
+        """
+        import numpy
+
+        self.names = tuple(names)
+        if units is None or isinstance(units, basestring):
+            units = [units] * len(self.names)
+        self._requested_units = list(units)
+        if len(self._requested_units) != len(self.names):
+            raise ValueError(
+              'Number of units ({0}) does not match number of names ({1})'
+              .format(len(self._requested_units), len(self.names)))
+        self._values = numpy.zeros(len(self.names), dtype=dtype)
+        self._units = numpy.array(self._requested_units, dtype=object)
+        self._values_view = self._values.view()
+        self._values_view.flags.writeable = False
+        self._units_view = self._units.view()
+        self._units_view.flags.writeable = False
+        # ASCII values only carry units if units were requested.
+        self._strip_units = any(units is not None
+                                for units in self._requested_units)
+
+    @property
+    def values(self):
+        '''
+        Get a read-only view of the values.
+        '''
+        return self._values_view
+
+    @property
+    def units(self):
+        '''
+        Get a read-only view of the units.
+        '''
+        return self._units_view
+
+    def _update(self, values, binary):
+        """
+        Copy a slice of a sampled set of values into the array.
+
+        Parameters
+        ----------
+        values : [any]
+            One value per variable, in order.
+        binary : bool
+            True if the values were decoded from the binary protocol.
+            False if they are ASCII strings.
+        """
+        if not binary and self._strip_units:
+            values = [value.partition(' {')[0] for value in values]
+        self._values[:] = values
+
+    def _update_elements(self, offsets, values, binary):
+        """
+        Copy the changed values from a delta into the array.
+
+        Parameters
+        ----------
+        offsets : [int]
+            The positions in the array of the changed values.
+        values : [any]
+            The changed values, parallel to offsets.
+        binary : bool
+            As documented in _update.
+        """
+        if not binary and self._strip_units:
+            values = [value.partition(' {')[0] for value in values]
+        self._values[offsets] = values
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return '\n'.join(
+          '{0} = {1}{2}'.format(
+            name, value, ' {0}'.format(units) if units is not None else '')
+          for name, value, units in zip(self.names, self._values, self._units))
+
+class VariableHistory(VariableBlock):
+    """
+    A VariableBlock that also records a bounded history of its values in
+    a preallocated circular buffer. Each row is stamped with the sim's
+    trick_sys.sched.time_tics, which is sampled as the first column, so
+    history can be queried by sim time without any per-update
+    allocations. Add a history to a VariableServer with add_block.
+
+    Requires NumPy. to_pandas additionally requires pandas.
+
+    Attributes
+    ----------
+    names : tuple of str
+        The fully-qualified names, in column order. The first is always
+        trick_sys.sched.time_tics.
+    capacity : int
+        The maximum number of rows retained. Older rows are overwritten.
+
+    Properties
+    ----------
+    count : int
+        The number of rows currently retained.
+    """
+
+    TIME_TICS = 'trick_sys.sched.time_tics'
+
+    def __init__(self, names, capacity, units=None, dtype=float):
+        """
+        Create a new VariableHistory.
+
+        Parameters
+        ----------
+        names : iterable of str
+            The fully-qualified names of the variables to record, not
+            including trick_sys.sched.time_tics.
+        capacity : int
+            The maximum number of rows to retain.
+        units : str, iterable of str, or None
+            As documented in VariableBlock, not including
+            trick_sys.sched.time_tics.
+        dtype : numpy.dtype or equivalent
+            The type of the buffer, including the time column. It must
+            be able to represent the sim's time_tics exactly.
+
+        Raises
+        ------
+        ValueError
+            If the number of units does not match the number of names,
+            or if capacity is not positive.
+        """
+        import numpy
+
+        names = list(names)
+        if units is not None and not isinstance(units, basestring):
+            units = list(units)
+            if len(units) != len(names):
+                raise ValueError(
+                  'Number of units ({0}) does not match number of names ({1})'
+                  .format(len(units), len(names)))
+        else:
+            units = [units] * len(names)
+        super(VariableHistory, self).__init__(
+          [self.TIME_TICS] + names, [None] + units, dtype)
+
+        self.capacity = int(capacity)
+        if self.capacity <= 0:
+            raise ValueError('capacity must be positive')
+        self._buffer = numpy.zeros((self.capacity, len(self.names)),
+                                   dtype=dtype)
+        self._next = 0
+        self._count = 0
+        self._history_lock = threading.Lock()
+
+    def _update(self, values, binary):
+        """
+        Update the latest values and record them as a new row.
+        """
+        super(VariableHistory, self)._update(values, binary)
+        self._record()
+
+    def _update_elements(self, offsets, values, binary):
+        """
+        Update the changed values and record the result as a new row.
+        """
+        super(VariableHistory, self)._update_elements(offsets, values, binary)
+        self._record()
+
+    def _record(self):
+        """
+        Append the latest values as a new row.
+        """
+        with self._history_lock:
+            self._buffer[self._next] = self._values
+            self._next = (self._next + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+    @property
+    def count(self):
+        '''
+        Get the number of rows currently retained.
+        '''
+        return self._count
+
+    def clear(self):
+        """
+        Discard all recorded rows.
+        """
+        with self._history_lock:
+            self._next = 0
+            self._count = 0
+
+    def __getitem__(self, index):
+        """
+        Get rows by chronological index or slice, where 0 is the oldest
+        retained row and -1 is the newest. Slices with a step are not
+        supported.
+
+        Returns
+        -------
+        numpy.ndarray
+            A copy of the selected rows.
+        """
+        with self._history_lock:
+            if isinstance(index, slice):
+                if index.step not in (None, 1):
+                    raise ValueError('Slice steps are not supported')
+                start, stop, _ = index.indices(self._count)
+                return self._copy(start, max(start, stop))
+            if index < 0:
+                index += self._count
+            if not 0 <= index < self._count:
+                raise IndexError('history index out of range')
+            return self._buffer[
+              (self._next - self._count + index) % self.capacity].copy()
+
+    def _copy(self, start, stop):
+        """
+        Copy chronological rows [start, stop) into a new array with at
+        most two slice copies. The caller must hold self._history_lock.
+        """
+        first = (self._next - self._count + start) % self.capacity
+        length = stop - start
+        if first + length <= self.capacity:
+            return self._buffer[first:first + length].copy()
+        import numpy
+        return numpy.concatenate((self._buffer[first:],
+                                  self._buffer[:first + length - self.capacity]))
+
+    def latest(self, count):
+        """
+        Get the most recent rows.
+
+        Parameters
+        ----------
+        count : int
+            The maximum number of rows to return.
+
+        Returns
+        -------
+        numpy.ndarray
+            A copy of up to count rows, oldest first.
+        """
+        with self._history_lock:
+            count = min(max(int(count), 0), self._count)
+            return self._copy(self._count - count, self._count)
+
+    def window(self, start_tics=None, stop_tics=None):
+        """
+        Get the rows whose time_tics fall within [start_tics, stop_tics].
+        Rows are assumed to be in nondecreasing time order, which holds
+        unless the sim is restarted from a checkpoint.
+
+        Parameters
+        ----------
+        start_tics : number or None
+            The earliest time, or None for no lower bound.
+        stop_tics : number or None
+            The latest time, or None for no upper bound.
+
+        Returns
+        -------
+        numpy.ndarray
+            A copy of the matching rows, oldest first.
+        """
+        import numpy
+        with self._history_lock:
+            rows = self._copy(0, self._count)
+        times = rows[:, 0]
+        start = 0 if start_tics is None else numpy.searchsorted(
+          times, start_tics, 'left')
+        stop = len(rows) if stop_tics is None else numpy.searchsorted(
+          times, stop_tics, 'right')
+        return rows[start:stop]
+
+    def to_numpy(self):
+        """
+        Get all retained rows.
+
+        Returns
+        -------
+        numpy.ndarray
+            A copy of the retained rows, oldest first, with one column
+            per name.
+        """
+        with self._history_lock:
+            return self._copy(0, self._count)
+
+    def to_pandas(self):
+        """
+        Get all retained rows as a DataFrame indexed by time_tics.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One column per recorded variable.
+        """
+        import pandas
+        rows = self.to_numpy()
+        return pandas.DataFrame(
+          rows[:, 1:], columns=list(self.names[1:]),
+          index=pandas.Index(rows[:, 0], name=self.TIME_TICS))
+
 class VariableServer(object):
     """
     Send commands to and receive responses from a simulation's
@@ -194,7 +897,7 @@ class VariableServer(object):
     Channel = _create_enum('Channel', ['ASYNC', 'SYNC', 'BOTH'], False)
     CopyMode = _create_enum('CopyMode', ['ASYNC', 'SCHEDULED', 'TOP_OF_FRAME'])
 
-    def __init__(self, hostname, port):
+    def __init__(self, hostname, port, binary=False):
         """
         Create a connection to the simulation variable server at
         host:port.
@@ -207,11 +910,35 @@ class VariableServer(object):
         port : int
             The port on which the simulation's variable server is
             listening.
-        """
+        binary : bool
+            True to receive periodically sampled values (see
+            add_variables) using the variable server's binary protocol
+            (var_binary_nonames), which is much cheaper to decode than
+            the ASCII protocol when sampling many variables at high
+            rates. In this mode, each Variable's type_ is called on the
+            decoded number, string, or list instead of on a string, and
+            units are not updated after the variable is added.
+            False to use the ASCII protocol.
+            One-shot queries such as get_value always use ASCII.
+        """
+        self._binary = bool(binary)
+        # The set of (name, units) last polled on the synchronous channel,
+        # which the sim still holds. See _poll.
+        self._polled_entries = ()
         self._variables = []
+        self._blocks = []
+        # Everything being sampled, Variables and VariableBlocks alike, in
+        # the order the variable server sends values.
+        self._sampled = []
+        # The (target, offset) of each index in self._sampled, used to apply
+        # deltas. Rebuilt whenever self._sampled changes. See _apply_delta.
+        self._layout = None
         self._callbacks = {}
         self._error_callbacks = {}
         self._lock = threading.Lock()
+        # Whether a command changed the session since it was set up here.
+        # See VariableServerPool.release.
+        self._session_changed = False
         port = int(port)
         self._synchronous_socket = socket.create_connection((hostname, port))
         self._asynchronous_socket = socket.create_connection((hostname, port))
@@ -219,6 +946,11 @@ class VariableServer(object):
         self._asynchronous_file_interface = self._asynchronous_socket.makefile()
         self._open = True
         self.pause(channel=self.Channel.SYNC)
+        if self._binary:
+            self._binary_reader = _BinaryMessageReader(
+              self._asynchronous_socket)
+            self.send('trick.var_binary_nonames()', self.Channel.ASYNC)
+        self._session_changed = False
 
         # Define a local function to be used by the sampling thread.
         def update_variables():
@@ -227,7 +959,10 @@ class VariableServer(object):
             '''
             while True:
                 try:
-                    values = self._read_values(False)
+                    if self._binary:
+                        values, changes = self._read_binary_values()
+                    else:
+                        values, changes = self._read_sampled_values()
                 except Exception as exception:
                     if self._open:
                         for function, args in self._error_callbacks.items():
@@ -259,11 +994,27 @@ class VariableServer(object):
                     # doing that doesn't justify the work at this point.
                     # Besides, it would be corrected with the next
                     # message.
-                    if len(values) <= len(self._variables):
-                        for variable, value in zip(
-                          self._variables, values):
-                            variable.value, variable.units = \
-                              _parse_value(value)
+                    #
+                    # The same applies to deltas, which the variable
+                    # server follows with a full set of values whenever
+                    # variables are added or removed.
+                    if changes is not None:
+                        self._apply_delta(changes)
+                        for function, args in self._callbacks.items():
+                            function(*args[0], **args[1])
+                    elif self._blocks:
+                        self._update_sampled(values)
+                        for function, args in self._callbacks.items():
+                            function(*args[0], **args[1])
+                    elif len(values) <= len(self._variables):
+                        if self._binary:
+                            for variable, value in zip(
+                              self._variables, values):
+                                variable.value = value
+                        else:
+                            for variable, value in zip(
+                              self._variables, values):
+                                variable._set_text(value)
 
                         for function, args in self._callbacks.items():
                             function(*args[0], **args[1])
@@ -356,12 +1107,9 @@ class VariableServer(object):
         """
 
         # add the variable and poll its value
-        self._var_add(name, units, self.Channel.SYNC)
-        self._var_send()
-        self._var_clear(self.Channel.SYNC)
+        values = self._poll(((name, units),))
 
         # make sure we only got one
-        values = self._read_values()
         _assert_value_count(1, len(values))
 
         # check for units conversion
@@ -407,6 +1155,11 @@ class VariableServer(object):
         units and don't require periodic sampling. To sample values
         periodically, see add_variables.
 
+        All commands are sent in a single write. The sim retains the
+        most recently polled set of variables, so polling the same set
+        (same names and units, in the same order) repeatedly only sends
+        a var_send and does not make the sim resolve the names again.
+
         Parameters
         ----------
         variables : zero or more Variables
@@ -459,16 +1212,12 @@ class VariableServer(object):
             return []
 
         # add all the variables and poll their values
-        for variable in variables:
-            self._var_add(
-              variable.name,
-              variable.units if variable.units is not None else 'xx',
-              self.Channel.SYNC)
-        self._var_send()
-        self._var_clear(self.Channel.SYNC)
+        values = self._poll(tuple(
+          (variable.name,
+           variable.units if variable.units is not None else 'xx')
+          for variable in variables))
 
         # make sure we got as many as expected
-        values = self._read_values()
         _assert_value_count(len(variables), len(values))
 
         # update each Variable, checking units conversions
@@ -480,6 +1229,13 @@ class VariableServer(object):
                 variable.units = units
             variable.value = value
 
+        # Default units resolved to the actual units, so polling these
+        # Variables again with their now-known units can reuse the list.
+        self._polled_entries = tuple(
+          (variable.name,
+           variable.units if variable.units is not None else 'xx')
+          for variable in variables)
+
         return [variable.value for variable in variables]
 
     def add_variables(self, *variables):
@@ -507,7 +1263,8 @@ class VariableServer(object):
             If the next message is not a set of variable values.
         ValueCountError
             If the number of received values does not match the number
-            of variables.
+            of variables. In binary mode, this includes variables too
+            large for the variable server to send.
         UnitsConversionError
             If units are specified and the conversion fails. In this
             case, variables before the error will have been updated,
@@ -527,7 +1284,10 @@ class VariableServer(object):
 
         # check for type_ and units conversion errors
         self.get_values(*variables)
+        if self._binary:
+            self._assert_binary_value_count(len(variables))
 
+        commands = []
         for variable in variables:
             # No lock is needed here because:
             # - appending to the variables list while
@@ -537,9 +1297,13 @@ class VariableServer(object):
             #   length check ensures there are at least as many
             #   variables as values
             self._variables.append(variable)
-            self._var_add(
+            self._sampled.append(variable)
+            self._layout = None
+            commands.append(_var_add_command(
               variable.name,
-              variable.units if variable.units is not None else 'xx')
+              variable.units if variable.units is not None else 'xx'))
+        if commands:
+            self.send('\n'.join(commands), self.Channel.ASYNC)
 
     def remove_variables(self, *variables):
         """
@@ -558,8 +1322,79 @@ class VariableServer(object):
                 # explanation.
                 with self._lock:
                     self._variables.remove(variable)
+                    self._sampled.remove(variable)
+                    self._layout = None
                 self._var_remove(variable.name)
 
+    def add_block(self, block):
+        """
+        Immediately update and begin periodically sampling the variables
+        in block. As with add_variables, sampling is performed on a
+        separate thread, and adding a block which is already being
+        sampled has no effect.
+
+        Parameters
+        ----------
+        block : VariableBlock
+            The block to begin sampling.
+
+        Raises
+        ------
+        IOError
+            If the remote endpoint has closed the connection.
+        UnexpectedMessageError
+            If the next message is not a set of variable values.
+        ValueCountError
+            If the number of received values does not match the number
+            of variables. In binary mode, this includes variables too
+            large for the variable server to send.
+        UnitsConversionError
+            If units are specified and the conversion fails.
+        ValueError
+            If a value cannot be converted to the block's dtype.
+
+        If any error occurs, the block is not scheduled for sampling.
+        """
+        if block in self._blocks or not len(block):
+            return
+
+        # check for units conversion errors and fetch the actual units
+        variables = [Variable(name, units)
+                     for name, units in zip(block.names, block._requested_units)]
+        self.get_values(*variables)
+        if self._binary:
+            self._assert_binary_value_count(len(variables))
+        block._values[:] = [variable.value for variable in variables]
+        block._units[:] = [variable.units for variable in variables]
+
+        with self._lock:
+            self._blocks.append(block)
+            self._sampled.append(block)
+            self._layout = None
+        self.send('\n'.join(
+          _var_add_command(name, units)
+          for name, units in zip(block.names, block._requested_units)),
+          self.Channel.ASYNC)
+
+    def remove_block(self, block):
+        """
+        Stop sampling the variables in block. Removing a block that is
+        not being sampled has no effect.
+
+        Parameters
+        ----------
+        block : VariableBlock
+            The block to stop sampling.
+        """
+        if block in self._blocks:
+            with self._lock:
+                self._blocks.remove(block)
+                self._sampled.remove(block)
+                self._layout = None
+            self.send('\n'.join(
+              'trick.var_remove("{0}")'.format(name) for name in block.names),
+              self.Channel.ASYNC)
+
     def remove_all_variables(self):
         """
         Stop sampling all variables. To merely suspend sampling,
@@ -574,6 +1409,10 @@ class VariableServer(object):
         # - If update_variables has not yet called zip, when it does,
         #   zip will return an empty generator, terminating the loop.
         self._variables = []
+        with self._lock:
+            self._blocks = []
+            self._sampled = []
+            self._layout = None
 
     def set_units(self, name, units):
         """
@@ -767,6 +1606,27 @@ class VariableServer(object):
         self.send('trick.var_set_write_mode({0})'.format(bool(enable)),
                   self.Channel.ASYNC)
 
+    def enable_delta(self, enable=True, keyframe_interval=100):
+        """
+        Set whether the variable server sends only the sampled values
+        that have changed since they were last sent, which greatly
+        reduces bandwidth and parsing when most values rarely change.
+        Variables and VariableBlocks are updated the same way in either
+        mode, and callbacks are still called every period.
+
+        Parameters
+        ----------
+        enable : bool
+            True to send only changed values.
+            False to send every value every period.
+        keyframe_interval : int
+            The number of periods between full sets of values, which
+            resynchronize the client, or 0 to send full sets only when
+            the sampled variables change.
+        """
+        self.send('trick.var_delta({0}, {1})'.format(
+          int(bool(enable)), int(keyframe_interval)), self.Channel.ASYNC)
+
     def validate_addresses(self, validate=True, channel=Channel.BOTH):
         """
         Set whether or not addresses are validated.
@@ -852,6 +1712,10 @@ class VariableServer(object):
             The checkpoint file name.
         """
         self.send('trick.load_checkpoint("' + filename + '")')
+        # Names polled before the checkpoint may no longer resolve to the
+        # same addresses.
+        self._var_clear(self.Channel.SYNC)
+        self._polled_entries = ()
 
     def enable_real_time(self, enable=True):
         """
@@ -888,6 +1752,11 @@ class VariableServer(object):
             The channel on which to send. You should almost certainly
             leave this as the default.
         """
+        if not self._session_changed:
+            self._session_changed = any(
+              line.startswith('trick.var_')
+              and not line.startswith(_SAMPLING_COMMANDS)
+              for line in command.split('\n'))
         command = '{0}\n'.format(command)
 
         for channel in {
@@ -943,10 +1812,7 @@ class VariableServer(object):
         channel : Channel
             The channel to affect.
         """
-        self.send(
-          'trick.var_add("{0}"{1})'
-          .format(name, ', "{0}"'.format(units) if units is not None else ''),
-          channel)
+        self.send(_var_add_command(name, units), channel)
 
     def _var_remove(self, name):
         """
@@ -973,6 +1839,89 @@ class VariableServer(object):
         """
         self.send('trick.var_send()', channel)
 
+    def _poll(self, entries):
+        """
+        Poll the values of a set of variables on the synchronous channel,
+        sending all commands in a single write. If entries matches the
+        previously polled set, the sim's existing list is reused.
+
+        Parameters
+        ----------
+        entries : tuple of (str, str)
+            The name and units of each variable, in order. Units may be
+            None.
+
+        Returns
+        -------
+        [str]
+            A list of values, which may include units.
+
+        Raises
+        ------
+        IOError
+            If the remote endpoint has closed the connection.
+        UnexpectedMessageError
+            If the next message is not a set of variable values.
+        """
+        commands = []
+        if entries != self._polled_entries:
+            commands.append('trick.var_clear()')
+            commands.extend(_var_add_command(name, units)
+                            for name, units in entries)
+        commands.append('trick.var_send()')
+        # Forget the set until the response arrives in case of errors.
+        self._polled_entries = None
+        self.send('\n'.join(commands))
+        values = self._read_values()
+        self._polled_entries = entries
+        return values
+
+    def _assert_binary_value_count(self, count):
+        """
+        Make sure the variable server sends a binary value for each of
+        the variables last polled on the synchronous channel. It skips
+        variables too large to fit in a message, which would leave the
+        sampled values misaligned with their variables. The values are
+        requested once in binary, followed by a var_send_once of the sim
+        time, whose response marks the end of the set.
+
+        Parameters
+        ----------
+        count : int
+            The number of variables last polled.
+
+        Raises
+        ------
+        IOError
+            If the remote endpoint has closed the connection.
+        UnexpectedMessageError
+            If a message is neither a set of variable values nor the
+            response to var_send_once.
+        ValueCountError
+            If the number of binary values does not match count.
+        """
+        if not count:
+            return
+        # These commands leave the session as it was, so they must not
+        # mark it changed.
+        session_changed = self._session_changed
+        self.send('\n'.join(['trick.var_binary_nonames()', 'trick.var_send()',
+                             'trick.var_send_once("time", 1)',
+                             'trick.var_ascii()']))
+        self._session_changed = session_changed
+        reader = _BinaryMessageReader(self._synchronous_socket)
+        received = 0
+        while True:
+            indicator, offset, end = reader.read_message()
+            if indicator == _VAR_SEND_ONCE:
+                break
+            if indicator != Message.Indicator.VAR_SEND:
+                raise UnexpectedMessageError(
+                  Message.Indicator.VAR_SEND, indicator)
+            received += struct.unpack_from(
+              reader.byte_order + 'i', reader.buffer, offset)[0]
+        _assert_value_count(count, received)
+
     def _read_values(self, synchronous_channel=True):
         """
         Read a set of variable values.
@@ -999,6 +1948,166 @@ class VariableServer(object):
         _assert_message_type(message, Message.Indicator.VAR_SEND)
         return message.data.split('\t')
 
+    def _read_sampled_values(self):
+        """
+        Read a set of sampled values or a delta from the asynchronous
+        channel in ASCII mode.
+
+        Returns
+        -------
+        [str] or None, [(int, str)] or None
+            A tuple containing either:
+                - A list of values, which may include units, and None.
+                - None and the index and value of each changed variable.
+
+        Raises
+        ------
+        IOError
+            If the remote endpoint has closed the connection.
+        UnexpectedMessageError
+            If the next message is neither a set of variable values nor
+            a delta.
+        """
+        message = self.readline(False)
+        if message.indicator == _VAR_LIST_DELTA:
+            # The first field is the number of changes.
+            fields = message.data.split('\t')
+            return None, list(zip(
+              [int(index) for index in fields[1::2]], fields[2::2]))
+        _assert_message_type(message, Message.Indicator.VAR_SEND)
+        return message.data.split('\t'), None
+
+    def _apply_delta(self, changes):
+        """
+        Distribute the changed values in a delta to the Variables and
+        VariableBlocks being sampled. The caller must hold self._lock.
+        Changes beyond the end of the sampled values are ignored.
+
+        Parameters
+        ----------
+        changes : [(int, any)]
+            The index in the var_add list and value of each changed
+            variable, as strings or as decoded binary values.
+        """
+        layout = self._layout
+        if layout is None:
+            layout = []
+            for target in self._sampled:
+                if isinstance(target, VariableBlock):
+                    layout.extend((target, offset)
+                                  for offset in range(len(target)))
+                else:
+                    layout.append((target, None))
+            self._layout = layout
+
+        blocks = {}
+        for index, value in changes:
+            if index >= len(layout):
+                continue
+            target, offset = layout[index]
+            if offset is None:
+                if self._binary:
+                    target.value = value
+                else:
+                    target._set_text(value)
+            else:
+                offsets, values = blocks.setdefault(target, ([], []))
+                offsets.append(offset)
+                values.append(value)
+        for block, (offsets, values) in blocks.items():
+            block._update_elements(offsets, values, self._binary)
+
+    def _update_sampled(self, values):
+        """
+        Distribute a set of sampled values to the Variables and
+        VariableBlocks being sampled. The caller must hold self._lock.
+
+        As in update_variables, if there are more values than are being
+        sampled, the set is discarded, and if there are fewer, only the
+        leading Variables and VariableBlocks that are complete are
+        updated.
+
+        Parameters
+        ----------
+        values : [any]
+            The sampled values, as strings or as decoded binary values.
+        """
+        index = 0
+        for target in self._sampled:
+            if isinstance(target, VariableBlock):
+                index += len(target)
+            else:
+                index += 1
+        if len(values) > index:
+            return
+
+        index = 0
+        for target in self._sampled:
+            if isinstance(target, VariableBlock):
+                stop = index + len(target)
+                if stop > len(values):
+                    return
+                target._update(values[index:stop], self._binary)
+                index = stop
+            else:
+                if index >= len(values):
+                    return
+                if self._binary:
+                    target.value = values[index]
+                else:
+                    target._set_text(values[index])
+                index += 1
+
+    def _read_binary_values(self):
+        """
+        Read a set of variable values from the asynchronous channel in
+        binary mode. Sets too large for a single message are sent as
+        several messages, which are combined here.
+
+        Deltas are split and combined the same way, except that the
+        number of entries in a delta is sent with each of its messages.
+
+        Returns
+        -------
+        [any] or None, [(int, any)] or None
+            A tuple containing either:
+                - A list of decoded values and None.
+                - None and the index and decoded value of each changed
+                  variable.
+
+        Raises
+        ------
+        IOError
+            If the remote endpoint has closed the connection.
+        UnexpectedMessageError
+            If the next message is neither a set of variable values nor
+            a delta.
+        """
+        reader = self._binary_reader
+        count = len(self._variables) + sum(len(block) for block in self._blocks)
+        values = []
+        changes = []
+        while True:
+            indicator, offset, end = reader.read_message()
+            if indicator == _VAR_LIST_DELTA and not values:
+                message_changes, total = _decode_binary_delta(
+                  reader.buffer, offset, end, reader.byte_order)
+                changes.extend(message_changes)
+                # Every message of a delta carries its total entry count.
+                if len(changes) >= total:
+                    return None, changes
+            elif indicator == Message.Indicator.VAR_SEND and not changes:
+                values.extend(_decode_binary_values(
+                  reader.buffer, offset, end, reader.byte_order))
+                # A set is split wherever the next variable doesn't fit,
+                # which can leave any amount of room at the end of a
+                # message, so only the number of values marks its end.
+                if len(values) >= count:
+                    return values, None
+            else:
+                raise UnexpectedMessageError(
+                  Message.Indicator.VAR_SEND, indicator)
+
     def _var_clear(self, channel=Channel.ASYNC):
         """
         Send a var_clear command to the variable server.
@@ -1032,6 +2141,348 @@ class VariableServer(object):
     def __str__(self):
         return 'VariableServer' + str(self._synchronous_socket.getpeername())
 
+class SimulationAnnouncement(namedtuple('SimulationAnnouncement', [
+  'host', 'port', 'user', 'pid', 'sim_directory', 's_main', 'input_file',
+  'version', 'tag', 'last_seen'])):
+    """
+    A simulation's announcement on the multicast channel. All fields
+    except last_seen are strings, as sent by the sim.
+
+    Attributes
+    ----------
+    host, port, user, pid, sim_directory, s_main, input_file, version,
+    and tag are as documented in find_simulation.
+    last_seen : float
+        The time.time() at which the sim last announced itself.
+    """
+
+    def matches(self, host=None, port=None, user=None, pid=None,
+                version=None, sim_directory=None, s_main=None,
+                input_file=None, tag=None):
+        """
+        Determine if this announcement matches all of the provided
+        arguments that are not None. Arguments are as documented in
+        find_simulation.
+
+        Returns
+        -------
+        bool
+            True if all non-None arguments match.
+        """
+        candidate = self
+        if not str(sim_directory).startswith('/'):
+            candidate = self._replace(
+              sim_directory=os.path.basename(self.sim_directory))
+        for parameter, candidate_parameter in zip(
+          [host, port, user, pid, sim_directory,
+           s_main, input_file, version, tag],
+          candidate[:9]):
+            if parameter is not None and str(parameter) != candidate_parameter:
+                return False
+        return True
+
+class SimulationDiscovery(object):
+    """
+    Maintain a live, deduplicated registry of the simulations announcing
+    themselves on the multicast channel. A single socket and daemon
+    thread receive all announcements, no matter how many callers are
+    looking for sims. Most programs should share the instance returned
+    by get_discovery rather than creating their own.
+
+    You must call close on instances of this class to release the
+    socket and thread.
+    """
+
+    def __init__(self, group='224.3.14.15', port=9265):
+        """
+        Begin listening for announcements.
+
+        Parameters
+        ----------
+        group : str
+            The multicast group on which sims announce themselves.
+        port : int
+            The multicast port.
+        """
+        self._simulations = {}
+        self._condition = threading.Condition()
+        self._open = True
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(('', port))
+        self._socket.setsockopt(
+          socket.IPPROTO_IP,
+          socket.IP_ADD_MEMBERSHIP,
+          struct.pack('=4sl', socket.inet_aton(group), socket.INADDR_ANY))
+        # Wake periodically so close doesn't wait on a quiet channel.
+        self._socket.settimeout(0.5)
+        self._thread = threading.Thread(
+          target=self._listen, name='Simulation Discovery')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _listen(self):
+        """
+        Receive and record announcements until closed.
+        """
+        while self._open:
+            try:
+                data = self._socket.recv(4096)
+            except socket.timeout:
+                continue
+            except Exception:
+                return
+            now = time.time()
+            with self._condition:
+                for line in data.decode('utf-8', 'replace').splitlines():
+                    # 0: host
+                    # 1: port
+                    # 2: user
+                    # 3: pid
+                    # 4: SIM_*
+                    # 5: S_main*
+                    # 6: RUN_*
+                    # 7: version
+                    # 8: tag
+                    fields = line.split('\t')[:9]
+                    if len(fields) < 9:
+                        continue
+                    announcement = SimulationAnnouncement(*(fields + [now]))
+                    self._simulations[
+                      announcement.host, announcement.port,
+                      announcement.pid] = announcement
+                self._condition.notify_all()
+
+    def simulations(self, max_age=_ANNOUNCEMENT_MAX_AGE):
+        """
+        Get the simulations that have announced themselves.
+
+        Parameters
+        ----------
+        max_age : float or None
+            Only include sims that have announced themselves within this
+            many seconds. Sims that have exited stop announcing but are
+            never removed from the registry, so the default excludes sims
+            that have missed a few announcements. Pass None to include
+            every sim ever seen.
+
+        Returns
+        -------
+        [SimulationAnnouncement]
+            The latest announcement from each sim.
+        """
+        with self._condition:
+            simulations = list(self._simulations.values())
+        if max_age is not None:
+            oldest = time.time() - max_age
+            simulations = [simulation for simulation in simulations
+                           if simulation.last_seen >= oldest]
+        return simulations
+
+    def find(self, timeout=None, max_age=_ANNOUNCEMENT_MAX_AGE, **criteria):
+        """
+        Wait for a simulation that matches criteria.
+
+        Parameters
+        ----------
+        timeout : positive float or None
+            How long to wait before giving up. Pass None to wait
+            indefinitely.
+        max_age : float or None
+            As documented in simulations.
+        criteria
+            Keyword arguments as documented in find_simulation.
+
+        Returns
+        -------
+        SimulationAnnouncement
+            The first matching announcement found.
+
+        Raises
+        ------
+        socket.timeout
+            If a timeout occurs.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while True:
+                for simulation in self.simulations(max_age):
+                    if simulation.matches(**criteria):
+                        return simulation
+                if deadline is None:
+                    self._condition.wait()
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise socket.timeout
+                    self._condition.wait(remaining)
+
+    def close(self):
+        """
+        Stop listening and release the socket.
+        """
+        self._open = False
+        self._thread.join()
+        self._socket.close()
+
+_discovery = None
+_discovery_lock = threading.Lock()
+
+def get_discovery():
+    """
+    Get the process-wide SimulationDiscovery, creating it on first use.
+    It remains open for the life of the process.
+
+    Returns
+    -------
+    SimulationDiscovery
+        The shared instance.
+    """
+    global _discovery
+    with _discovery_lock:
+        if _discovery is None:
+            _discovery = SimulationDiscovery()
+        return _discovery
+
+class VariableServerPool(object):
+    """
+    Hand out and reuse VariableServer connections keyed by host, port,
+    and pid. Each connection is used by one caller at a time: acquire
+    one, use it, and release it back to the pool.
+
+    You must call close on instances of this class to release the idle
+    connections.
+    """
+
+    def __init__(self, discovery=None, binary=False):
+        """
+        Create an empty pool.
+
+        Parameters
+        ----------
+        discovery : SimulationDiscovery or None
+            The discovery service used by connect, or None to use the
+            shared instance from get_discovery.
+        binary : bool
+            As documented in VariableServer.
+        """
+        self._discovery = discovery
+        self._binary = binary
+        self._idle = {}
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host, port, pid=None):
+        """
+        Get an idle connection to the sim at host:port, or create one.
+
+        Parameters
+        ----------
+        host : str
+            The host name of the sim's machine.
+        port : int
+            The sim's variable server port.
+        pid : int or None
+            The sim's process ID, which distinguishes successive sims
+            that happen to reuse a port.
+
+        Returns
+        -------
+        VariableServer
+            A connection for the caller's exclusive use.
+        """
+        key = str(host), str(port), None if pid is None else str(pid)
+        with self._lock:
+            idle = self._idle.get(key)
+            while idle:
+                variable_server = idle.pop()
+                if variable_server._open:
+                    return variable_server
+                del self._keys[variable_server]
+        variable_server = VariableServer(host, port, self._binary)
+        with self._lock:
+            self._keys[variable_server] = key
+        return variable_server
+
+    def connect(self, timeout=None, **criteria):
+        """
+        Find a sim as find_simulation does and acquire a connection to
+        it.
+
+        Parameters
+        ----------
+        timeout : positive float or None
+            How long to look for the sim before giving up.
+        criteria
+            Keyword arguments as documented in find_simulation.
+
+        Returns
+        -------
+        VariableServer
+            A connection for the caller's exclusive use.
+
+        Raises
+        ------
+        socket.timeout
+            If a timeout occurs.
+        """
+        discovery = self._discovery or get_discovery()
+        simulation = discovery.find(timeout=timeout, **criteria)
+        return self.acquire(simulation.host, simulation.port, simulation.pid)
+
+    def release(self, variable_server):
+        """
+        Return a connection to the pool. Its sampled variables and
+        callbacks are removed so the next user starts clean. A connection
+        whose session was otherwise changed, for instance by set_period,
+        pause, or enable_delta, is closed instead, as is any command
+        starting with "trick.var_" sent with send. Releasing a connection
+        that was not acquired from this pool has no effect.
+
+        Parameters
+        ----------
+        variable_server : VariableServer
+            A connection previously returned by acquire or connect.
+        """
+        discard = variable_server._session_changed or not variable_server._open
+        with self._lock:
+            key = self._keys.get(variable_server)
+            if key is not None and discard:
+                del self._keys[variable_server]
+        if key is None:
+            return
+        if discard:
+            if variable_server._open:
+                try:
+                    variable_server.close()
+                except Exception:
+                    pass
+            return
+        variable_server.remove_all_variables()
+        variable_server._callbacks.clear()
+        variable_server._error_callbacks.clear()
+        with self._lock:
+            self._idle.setdefault(key, []).append(variable_server)
+
+    def close(self):
+        """
+        Close every connection created by this pool, including those
+        that have not been released.
+        """
+        with self._lock:
+            variable_servers, self._keys, self._idle = list(self._keys), {}, {}
+        for variable_server in variable_servers:
+            try:
+                variable_server.close()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
 def find_simulation(host=None, port=None, user=None, pid=None,
                    version=None, sim_directory=None, s_main=None,
                    input_file=None, tag=None, timeout=None):
@@ -1044,6 +2495,10 @@ def find_simulation(host=None, port=None, user=None, pid=None,
     If all arguments are None, connect to the first sim we happen to find.
     Such matches will be non-deterministic.
 
+    Announcements are collected by the process-wide SimulationDiscovery
+    (see get_discovery), so concurrent calls share a single multicast
+    socket, and sims that have already been seen match immediately.
+
     Parameters
     ----------
     host : str
@@ -1081,50 +2536,32 @@ def find_simulation(host=None, port=None, user=None, pid=None,
     socket.timeout
         If a timeout occurs.
     """
-    clock = time.time()
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    sock.bind(('', 9265))
-    sock.setsockopt(
-      socket.IPPROTO_IP,
-      socket.IP_ADD_MEMBERSHIP,
-      struct.pack('=4sl', socket.inet_aton('224.3.14.15'), socket.INADDR_ANY))
-    file_interface = sock.makefile()
-
-    def candidate_matches(candidate):
-        for parameter, candidate_parameter in zip(
-          [host, port, user, pid, sim_directory,
-           s_main, input_file, version, tag],
-          candidate) :
-            if parameter is not None and str(parameter) != candidate_parameter:
-                return False
-        return True
+    simulation = get_discovery().find(
+      timeout=timeout, host=host, port=port, user=user, pid=pid,
+      version=version, sim_directory=sim_directory, s_main=s_main,
+      input_file=input_file, tag=tag)
+    return VariableServer(simulation.host, simulation.port)
 
-    # the socket will clean itself up when it's garbage-collected
-    while True:
-        if timeout is not None:
-            timeout -= (time.time() - clock)
-            if timeout < 0:
-                raise socket.timeout
-            clock = time.time()
-            sock.settimeout(timeout)
-
-        # 0: host
-        # 1: port
-        # 2: user
-        # 3: pid
-        # 4: SIM_*
-        # 5: S_main*
-        # 6: RUN_*
-        # 7: version
-        # 8: tag
-        candidate = file_interface.readline().split('\t')[:9]
+def _var_add_command(name, units=None):
+    """
+    Format a var_add command.
 
-        if not str(sim_directory).startswith('/'):
-            candidate[4] = os.path.basename(candidate[4])
+    Parameters
+    ----------
+    name : str
+        The variable's name.
+    units : str
+        The units in which to report the variable's value, or None.
+
+    Returns
+    -------
+    str
+        The command, without a trailing newline.
+    """
+    return 'trick.var_add("{0}"{1})'.format(
+      name, ', "{0}"'.format(units) if units is not None else '')
 
-        if candidate_matches(candidate):
-            return VariableServer(candidate[0], candidate[1])
+_VALUE_WITH_UNITS = re.compile(r"(?P<value>.*)(?: {(?P<units>.*)})")
 
 def _parse_value(text):
     """
@@ -1142,7 +2579,7 @@ def _parse_value(text):
             - The value.
             - The units, which may be None.
     """
-    match = re.match(r"(?P<value>.*)(?: {(?P<units>.*)})", text)
+    match = _VALUE_WITH_UNITS.match(text)
     if match:
         return match.group('value'), match.group('units')
     return text, None
@@ -0,0 +1,600 @@
+"""
+Throughput and latency benchmarks for the variable server and the Python
+client in variable_server.py.
+
+Each benchmark samples a set of variables for a fixed duration and
+measures frames per second, bytes per second, latency percentiles, and
+the client's CPU time per frame. Benchmarks run against either a running
+sim or a StandInServer, which speaks the part of the variable server
+protocol that sampling uses, so client performance can be tracked
+without building a sim. Results are written as JSON lines, one object per
+configuration, so runs can be compared to catch regressions.
+
+Run with --help for usage. For example, to benchmark the client against
+a stand-in server:
+
+    python variable_server_benchmark.py --counts 10 100 1000
+
+or against a running sim:
+
+    python variable_server_benchmark.py --host localhost --port 7000 \\
+      --copy-modes ASYNC SCHEDULED TOP_OF_FRAME
+
+Requires Python 3.
+"""
+
+import argparse
+import ast
+import json
+import os
+import platform
+import re
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+try:
+    from .variable_server import (
+      FloatVariable, VariableServer, _MAX_MESSAGE_SIZE, _VAR_SEND_ONCE)
+except ImportError:
+    from variable_server import (
+      FloatVariable, VariableServer, _MAX_MESSAGE_SIZE, _VAR_SEND_ONCE)
+
+PROTOCOLS = ('ascii', 'binary')
+WRITE_MODES = ('ASYNC', 'WHEN_COPIED')
+
+# The stand-in server's variables are all doubles.
+_TRICK_DOUBLE = 11
+
+_COMMAND = re.compile(r'trick\.(\w+)\((.*)\)\s*$')
+
+class StandInServer(object):
+    """
+    A stand-in for a sim's variable server. It accepts any variable name,
+    and every value is the wall-clock time (time.time()) at which the
+    frame was sent, so clients can measure end-to-end latency. Units are
+    always seconds. Commands other than those needed for sampling are
+    ignored. Copy and write modes are accepted but have no effect.
+
+    Use close or a with statement to shut it down.
+    """
+
+    def __init__(self, host='localhost', port=0):
+        """
+        Start serving on a background thread.
+
+        Parameters
+        ----------
+        host : str
+            The address on which to listen.
+        port : int
+            The port on which to listen, or 0 to pick a free port.
+        """
+        self._server = socketserver.ThreadingTCPServer(
+          (host, port), _StandInSession)
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = threading.Thread(
+          target=self._server.serve_forever, name='Stand-in Variable Server')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def close(self):
+        """
+        Stop serving. Open sessions end when their clients disconnect.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+class _StandInSession(socketserver.BaseRequestHandler):
+    """
+    One client connection to a StandInServer.
+    """
+
+    def setup(self):
+        self._names = []
+        # The units requested for each variable, or None
+        self._units = []
+        self._binary = False
+        self._nonames = False
+        self._paused = False
+        self._period = 0.1
+        self._write_lock = threading.Lock()
+        self._changed = threading.Condition()
+        self._closed = False
+
+    def handle(self):
+        sender = threading.Thread(target=self._send_cyclically)
+        sender.daemon = True
+        sender.start()
+        try:
+            for line in self.request.makefile('r'):
+                if not self._execute(line):
+                    break
+        except (IOError, OSError):
+            pass
+        finally:
+            with self._changed:
+                self._closed = True
+                self._changed.notify()
+
+    def _execute(self, line):
+        """
+        Execute one command. Returns False if the session should end.
+        """
+        match = _COMMAND.match(line.strip())
+        if not match:
+            return True
+        command = match.group(1)
+        try:
+            args = ast.literal_eval('({0},)'.format(match.group(2))) \
+              if match.group(2).strip() else ()
+        except (SyntaxError, ValueError):
+            return True
+
+        with self._changed:
+            if command == 'var_add':
+                self._names.append(args[0])
+                self._units.append(args[1] if len(args) > 1 else None)
+            elif command == 'var_units':
+                for i, name in enumerate(self._names):
+                    if name == args[0]:
+                        self._units[i] = args[1]
+            elif command == 'var_remove':
+                if args[0] in self._names:
+                    i = self._names.index(args[0])
+                    del self._names[i]
+                    del self._units[i]
+            elif command == 'var_clear':
+                self._names, self._units = [], []
+            elif command == 'var_pause':
+                self._paused = True
+            elif command == 'var_unpause':
+                self._paused = False
+            elif command == 'var_cycle':
+                self._period = float(args[0])
+            elif command == 'var_ascii':
+                self._binary = False
+            elif command == 'var_binary':
+                self._binary = True
+            elif command == 'var_binary_nonames':
+                self._binary = self._nonames = True
+            elif command == 'var_exit':
+                return False
+            self._changed.notify()
+
+        if command == 'var_send':
+            self._send_frame()
+        elif command == 'var_send_once':
+            self._send_once(args[0].split(','))
+        elif command == 'var_exists':
+            self._write('1\t{0}\n'.format(
+              int(self._variable_exists(args[0]))).encode())
+        return True
+
+    def _variable_exists(self, name):
+        """
+        Return True if name is a known variable. All names are known to
+        a stand-in.
+        """
+        return True
+
+    def _send_cyclically(self):
+        """
+        Send a frame every period while unpaused, like the variable
+        server's asynchronous write mode.
+        """
+        deadline = time.time()
+        while True:
+            with self._changed:
+                while not self._closed and (self._paused or not self._names):
+                    self._changed.wait()
+                    deadline = time.time()
+                if self._closed:
+                    return
+                period = self._period
+            delay = deadline - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            deadline = max(deadline + period, time.time())
+            try:
+                self._send_frame()
+            except (IOError, OSError):
+                return
+
+    def _send_frame(self):
+        """
+        Send the current value of every variable.
+        """
+        with self._changed:
+            names = list(self._names)
+            units = list(self._units)
+            binary = self._binary
+            nonames = self._nonames
+        if not names:
+            return
+        now = time.time()
+        if binary:
+            self._write(_binary_frame(names, now, nonames))
+        else:
+            value = repr(now)
+            self._write('0\t{0}\n'.format('\t'.join(
+              value + (' {s}' if unit else '') for unit in units)
+              ).encode())
+
+    def _send_once(self, names):
+        """
+        Send the current value of the named variables in response to
+        var_send_once.
+        """
+        with self._changed:
+            binary = self._binary
+            nonames = self._nonames
+        now = time.time()
+        if binary:
+            self._write(_binary_frame(names, now, nonames, _VAR_SEND_ONCE))
+        else:
+            self._write('{0}\t{1}\n'.format(_VAR_SEND_ONCE, '\t'.join(
+              [repr(now)] * len(names))).encode())
+
+    def _write(self, data):
+        with self._write_lock:
+            self.request.sendall(data)
+
+def _binary_frame(names, value, nonames, indicator=0):
+    """
+    Build a var_binary message for names that all have the given double
+    value, split into several messages as the variable server does.
+    indicator is the message indicator, 0 for a set of sampled values.
+    """
+    messages = []
+    entries = []
+    size = 12
+    encoded = struct.pack('=d', value)
+    for name in names:
+        entry = b'' if nonames else (
+          struct.pack('=i', len(name)) + name.encode())
+        entry += struct.pack('=ii', _TRICK_DOUBLE, 8) + encoded
+        if size + len(entry) > _MAX_MESSAGE_SIZE:
+            messages.append(struct.pack('=iii', indicator, size - 4, len(entries))
+                            + b''.join(entries))
+            entries, size = [], 12
+        entries.append(entry)
+        size += len(entry)
+    messages.append(struct.pack('=iii', indicator, size - 4, len(entries))
+                    + b''.join(entries))
+    return b''.join(messages)
+
+def start_stand_in_process(host='localhost', replay=None, speed=1.0):
+    """
+    Run a StandInServer, or a ReplayServer, in a separate process, so
+    that its CPU use is not counted against the client being
+    benchmarked.
+
+    Parameters
+    ----------
+    host : str
+        The address on which to listen.
+    replay : str or None
+        The path of a recording to replay in a loop (see
+        variable_server_recording.py), or None to run a StandInServer.
+    speed : float
+        The replay speed. See ReplayServer.
+
+    Returns
+    -------
+    subprocess.Popen, int
+        The process, which should be terminated when finished, and the
+        port on which it is listening.
+    """
+    if replay is None:
+        command = [sys.executable, __file__, '--serve', '--host', host]
+    else:
+        command = [
+          sys.executable,
+          os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                       'variable_server_recording.py'),
+          'serve', replay, '--host', host, '--speed', str(speed), '--loop']
+    process = subprocess.Popen(
+      command, stdout=subprocess.PIPE, universal_newlines=True)
+    return process, int(process.stdout.readline())
+
+def percentiles(samples):
+    """
+    Summarize latency samples.
+
+    Parameters
+    ----------
+    samples : [float]
+        The samples, in seconds.
+
+    Returns
+    -------
+    dict or None
+        The 50th, 90th, and 99th percentiles and the maximum, or None if
+        there are no samples.
+    """
+    if not samples:
+        return None
+    samples = sorted(samples)
+    def percentile(fraction):
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+    return {
+      'p50': percentile(0.5),
+      'p90': percentile(0.9),
+      'p99': percentile(0.99),
+      'max': samples[-1],
+    }
+
+def measure_bytes(host, port, names, protocol, period, copy_mode,
+                  write_mode, duration):
+    """
+    Sample names over a raw socket for duration seconds, counting bytes
+    and frames without decoding any values.
+
+    Parameters
+    ----------
+    As documented in run_benchmark.
+
+    Returns
+    -------
+    int, int
+        The number of complete frames and bytes received.
+    """
+    commands = ['trick.var_pause()']
+    if protocol == 'binary':
+        commands.append('trick.var_binary_nonames()')
+    commands.append('trick.var_cycle({0})'.format(period))
+    commands.append('trick.var_set_copy_mode({0})'.format(
+      getattr(VariableServer.CopyMode, copy_mode)))
+    commands.append('trick.var_set_write_mode({0})'.format(
+      WRITE_MODES.index(write_mode)))
+    commands.extend('trick.var_add("{0}")'.format(name) for name in names)
+    commands.append('trick.var_unpause()')
+
+    sock = socket.create_connection((host, port))
+    try:
+        sock.sendall(('\n'.join(commands) + '\n').encode())
+        sock.settimeout(max(period * 10, 1.0))
+        buffer = bytearray()
+        frames = total = 0
+        byte_order = None
+        values = 0
+        stop = time.time() + duration
+        while time.time() < stop:
+            try:
+                data = sock.recv(65536)
+            except socket.timeout:
+                break
+            if not data:
+                break
+            total += len(data)
+            if protocol == 'ascii':
+                frames += data.count(b'\n')
+                continue
+            buffer += data
+            while len(buffer) >= 12:
+                if byte_order is None:
+                    size, = struct.unpack_from('<i', buffer, 4)
+                    byte_order = '<' if 0 < size <= _MAX_MESSAGE_SIZE else '>'
+                _, size, count = struct.unpack_from(byte_order + 'iii', buffer)
+                if len(buffer) < size + 4:
+                    break
+                del buffer[:size + 4]
+                values += count
+                if values >= len(names):
+                    frames += 1
+                    values = 0
+    finally:
+        sock.close()
+    return frames, total
+
+def run_benchmark(host, port, names, protocol='ascii', period=0.1,
+                  copy_mode='ASYNC', write_mode='ASYNC', duration=5.0,
+                  polls=100, timestamps=False):
+    """
+    Benchmark one configuration.
+
+    Parameters
+    ----------
+    host : str
+        The variable server's host.
+    port : int
+        The variable server's port.
+    names : [str]
+        The variables to sample. Repeated names are sampled repeatedly.
+    protocol : str
+        'ascii' or 'binary'. See the binary parameter of VariableServer.
+    period : float
+        The sampling period (var_cycle), in seconds.
+    copy_mode : str
+        The name of a VariableServer.CopyMode.
+    write_mode : str
+        'ASYNC' or 'WHEN_COPIED'. See VariableServer.send_on_copy.
+    duration : float
+        The number of seconds over which to sample.
+    polls : int
+        The number of get_values calls over which to measure round-trip
+        latency.
+    timestamps : bool
+        True if the first variable's value is the wall-clock time at
+        which it was sent, as with a StandInServer, so that sampling
+        latency can be measured.
+
+    Returns
+    -------
+    dict
+        The configuration and its results. Latencies are in seconds and
+        are None when they were not measured.
+    """
+    frames_received, bytes_received = measure_bytes(
+      host, port, names, protocol, period, copy_mode, write_mode, duration)
+
+    variables = [FloatVariable(name) for name in names]
+    latencies = []
+    frames = [0]
+    started = threading.Event()
+
+    def on_frame():
+        now = time.time()
+        values = [variable.value for variable in variables]
+        if not started.is_set():
+            return
+        frames[0] += 1
+        if timestamps:
+            latencies.append(now - values[0])
+
+    with VariableServer(host, port, binary=protocol == 'binary') as variable_server:
+        variable_server.set_copy_mode(
+          getattr(VariableServer.CopyMode, copy_mode))
+        variable_server.send_on_copy(write_mode == 'WHEN_COPIED')
+
+        poll_latencies = []
+        for _ in range(polls):
+            start = time.time()
+            variable_server.get_values(*variables)
+            poll_latencies.append(time.time() - start)
+
+        variable_server.set_period(period)
+        variable_server.register_callback(on_frame)
+        variable_server.add_variables(*variables)
+        # Discard the first period, which includes connection setup.
+        time.sleep(period)
+        cpu = time.process_time()
+        started.set()
+        time.sleep(duration)
+        started.clear()
+        cpu = time.process_time() - cpu
+
+    return {
+      'protocol': protocol,
+      'period': period,
+      'count': len(names),
+      'copy_mode': copy_mode,
+      'write_mode': write_mode,
+      'duration': duration,
+      'frames': frames[0],
+      'frames_per_second': frames[0] / duration,
+      'bytes_per_second': bytes_received / duration,
+      'bytes_per_frame': bytes_received / frames_received
+                         if frames_received else None,
+      'latency': percentiles(latencies),
+      'poll_latency': percentiles(poll_latencies),
+      'client_cpu_per_frame': cpu / frames[0] if frames[0] else None,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+      description='Measure variable server throughput and latency. Results '
+                  'are written as one JSON object per line.')
+    parser.add_argument('--host', default='localhost',
+      help='the host of the sim to benchmark (default: %(default)s)')
+    parser.add_argument('--port', type=int,
+      help='the port of the sim to benchmark. If omitted, a stand-in '
+           'server is started on host.')
+    parser.add_argument('--replay',
+      help='instead of a stand-in server, replay this recording (see '
+           'variable_server_recording.py). Its variables and period are '
+           'used instead of --counts and --periods.')
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+      help='the replay speed, or 0 for as fast as possible '
+           '(default: %(default)s)')
+    parser.add_argument('--variables', nargs='+',
+      default=['trick_sys.sched.time_tics'],
+      help='the variables to sample from a sim, repeated as necessary to '
+           'reach each count (default: %(default)s)')
+    parser.add_argument('--protocols', nargs='+', choices=PROTOCOLS,
+      default=list(PROTOCOLS), help='(default: %(default)s)')
+    parser.add_argument('--periods', nargs='+', type=float,
+      default=[0.1, 0.01], help='var_cycle periods (default: %(default)s)')
+    parser.add_argument('--counts', nargs='+', type=int,
+      default=[1, 100, 1000],
+      help='numbers of variables to sample (default: %(default)s)')
+    parser.add_argument('--copy-modes', nargs='+',
+      choices=VariableServer.CopyMode._fields, default=['ASYNC'],
+      help='(default: %(default)s)')
+    parser.add_argument('--write-modes', nargs='+', choices=WRITE_MODES,
+      default=['ASYNC'], help='(default: %(default)s)')
+    parser.add_argument('--duration', type=float, default=5.0,
+      help='seconds to sample each configuration (default: %(default)s)')
+    parser.add_argument('--polls', type=int, default=100,
+      help='get_values calls per configuration (default: %(default)s)')
+    parser.add_argument('--output', type=argparse.FileType('w'), default='-',
+      help='the file to which to write results (default: stdout)')
+    parser.add_argument('--serve', action='store_true',
+      help='run a stand-in server on host and port, print its port, and '
+           'serve until interrupted')
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        with StandInServer(args.host, args.port or 0) as server:
+            print(server.port)
+            sys.stdout.flush()
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                pass
+        return 0
+
+    stand_in = None
+    server = '{0}:{1}'.format(args.host, args.port)
+    variables = args.variables
+    if args.replay is not None:
+        try:
+            from .variable_server_recording import Recording
+        except ImportError:
+            from variable_server_recording import Recording
+        with Recording(args.replay) as recording:
+            variables = list(recording.names)
+            args.periods = [recording.period or 0.1]
+            args.counts = [len(variables)]
+        stand_in, port = start_stand_in_process(
+          args.host, args.replay, args.replay_speed)
+        server = 'replay:' + os.path.basename(args.replay)
+    elif args.port is None:
+        stand_in, port = start_stand_in_process(args.host)
+        variables = ['benchmark.value']
+        server = 'stand-in'
+    else:
+        port = args.port
+
+    try:
+        for protocol in args.protocols:
+            for period in args.periods:
+                for count in args.counts:
+                    for copy_mode in args.copy_modes:
+                        for write_mode in args.write_modes:
+                            result = run_benchmark(
+                              args.host, port,
+                              [variables[i % len(variables)]
+                               for i in range(count)],
+                              protocol, period, copy_mode, write_mode,
+                              args.duration, args.polls,
+                              timestamps=server == 'stand-in')
+                            result.update(
+                              server=server,
+                              client=platform.node(),
+                              python=platform.python_version(),
+                              time=time.time())
+                            args.output.write(
+                              json.dumps(result, sort_keys=True) + '\n')
+                            args.output.flush()
+    finally:
+        if stand_in is not None:
+            stand_in.terminate()
+            stand_in.wait()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,756 @@
+"""
+Record a sim's variable server sampling stream to a file and replay it
+over the variable server protocol without the sim.
+
+A StreamRecorder samples variables over its own connection and stores
+each raw frame, exactly as it was received, with the time at which it
+arrived. A Recording reads the file back, and a ReplayServer serves it to
+any variable server client (VariableServer, AsyncVariableServer, or
+anything else) at the recorded rate, a multiple of it, or as fast as
+clients can read, with seeking. This makes it possible to reproduce
+display problems and to load test clients offline.
+
+Recordings consist of a header, the frames, and an index of frame times
+and offsets, so seeking doesn't require reading the frames. If a
+recorder is not closed, the index is missing, and it is rebuilt by
+scanning the frames when the recording is opened.
+
+Run with --help for command-line usage.
+
+Requires Python 3.
+"""
+
+import argparse
+import bisect
+import json
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+
+try:
+    from .variable_server import (
+      _BinaryMessageReader, _MAX_MESSAGE_SIZE,
+      _decode_binary_values, _parse_value, _var_add_command, basestring)
+    from .variable_server_benchmark import _StandInSession
+except ImportError:
+    from variable_server import (
+      _BinaryMessageReader, _MAX_MESSAGE_SIZE,
+      _decode_binary_values, _parse_value, _var_add_command, basestring)
+    from variable_server_benchmark import _StandInSession
+
+_MAGIC = b'TRICKVSR'
+_VERSION = 1
+# <magic><version><header length>, followed by the JSON header
+_FILE_HEADER = struct.Struct('<8sII')
+# <arrival time><length>, followed by the raw frame
+_FRAME_HEADER = struct.Struct('<dI')
+# <arrival time><offset of frame header>
+_INDEX_ENTRY = struct.Struct('<dQ')
+# <offset of index><frame count><magic>
+_TRAILER = struct.Struct('<QQ8s')
+
+# Trick types used when replaying an ASCII recording in binary. See
+# parameter_types.h.
+_TRICK_STRING = 3
+_TRICK_DOUBLE = 11
+_TRICK_LONG_LONG = 14
+# TRICK_NUMBER_OF_TYPES, which the sim sends, with an int 0, for names it
+# cannot resolve
+_TRICK_BAD_REF = 25
+
+class StreamRecorder(object):
+    """
+    Record the periodic values of variables from a sim. Sampling is
+    performed on a separate connection and thread. You must call close,
+    or use a with statement, to stop recording and write the index.
+
+    Attributes
+    ----------
+    names : tuple of str
+        The fully-qualified names, in frame order.
+    units : tuple of str
+        The units of each variable's values, as reported by the sim.
+    frames : int
+        The number of frames recorded so far.
+    """
+
+    def __init__(self, hostname, port, path, names, units=None,
+                 binary=False, period=None):
+        """
+        Connect to the sim at hostname:port and begin recording.
+
+        Parameters
+        ----------
+        hostname : str
+            The name of the machine that is running the simulation.
+        port : int
+            The port on which the simulation's variable server is
+            listening.
+        path : str
+            The file to which to record. It is overwritten if it exists.
+        names : iterable of str
+            The fully-qualified names of the variables to record.
+        units : str, iterable of str, or None
+            The units, either one for all variables or one per variable,
+            as for VariableBlock. Use None to record values in their
+            default units. ASCII values only include units if they were
+            requested, just like on the wire.
+        binary : bool
+            True to record the binary (var_binary_nonames) stream.
+            False to record the ASCII stream.
+        period : float or None
+            The sampling period (in seconds), or None to use the sim's
+            default.
+
+        Raises
+        ------
+        ValueError
+            If the number of units does not match the number of names.
+        """
+        self.names = tuple(names)
+        if units is None or isinstance(units, basestring):
+            units = [units] * len(self.names)
+        requested_units = list(units)
+        if len(requested_units) != len(self.names):
+            raise ValueError(
+              'Number of units ({0}) does not match number of names ({1})'
+              .format(len(requested_units), len(self.names)))
+        self.frames = 0
+        self._binary = bool(binary)
+        self._index = []
+        self._lock = threading.Lock()
+
+        self._socket = socket.create_connection((hostname, int(port)))
+        self._file_interface = self._socket.makefile('rb')
+        # Learn the units with a one-time ASCII query, then clear it so
+        # that only the requested units are included in ASCII frames.
+        self._send(['trick.var_pause()']
+          + [_var_add_command(name, units or 'xx')
+             for name, units in zip(self.names, requested_units)]
+          + ['trick.var_send()', 'trick.var_clear()'])
+        line = self._file_interface.readline().decode().rstrip('\n')
+        self.units = tuple(_parse_value(value)[1]
+                           for value in line.split('\t')[1:])
+
+        self._file = open(path, 'wb')
+        header = json.dumps({
+          'names': self.names,
+          'units': self.units,
+          'requested_units': requested_units,
+          'binary': self._binary,
+          'period': period,
+          'host': hostname,
+          'port': int(port),
+          'created': time.time(),
+        }).encode()
+        self._file.write(_FILE_HEADER.pack(_MAGIC, _VERSION, len(header)))
+        self._file.write(header)
+
+        commands = []
+        if self._binary:
+            commands.append('trick.var_binary_nonames()')
+        if period is not None:
+            commands.append('trick.var_cycle({0})'.format(float(period)))
+        commands.extend(_var_add_command(name, units)
+                        for name, units in zip(self.names, requested_units))
+        commands.append('trick.var_unpause()')
+        self._send(commands)
+
+        self._thread = threading.Thread(
+          target=self._record, name='Variable Server Recorder')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _send(self, commands):
+        self._socket.sendall(('\n'.join(commands) + '\n').encode())
+
+    def _record(self):
+        """
+        Write frames until the connection is closed.
+        """
+        try:
+            if self._binary:
+                # Nothing follows the units query until var_unpause, so
+                # the file interface has not buffered any binary data.
+                reader = _BinaryMessageReader(self._socket)
+                while True:
+                    messages = []
+                    values = 0
+                    while True:
+                        _, offset, end = reader.read_message()
+                        messages.append(bytes(reader.buffer[offset - 8:end]))
+                        count, = struct.unpack_from(
+                          reader.byte_order + 'i', reader.buffer, offset)
+                        values += count
+                        # Any amount of room can be left where a set is
+                        # split, so only the number of values ends it.
+                        if values >= len(self.names):
+                            break
+                    self._write_frame(b''.join(messages))
+            else:
+                for line in self._file_interface:
+                    # Only record sets of values, not stdio or other
+                    # messages.
+                    if line.startswith(b'0\t'):
+                        self._write_frame(line)
+        except (IOError, OSError, struct.error):
+            pass
+
+    def _write_frame(self, data):
+        arrival = time.time()
+        with self._lock:
+            if self._file.closed:
+                return
+            self._index.append((arrival, self._file.tell()))
+            self._file.write(_FRAME_HEADER.pack(arrival, len(data)))
+            self._file.write(data)
+            self.frames += 1
+
+    def close(self):
+        """
+        Stop recording, write the index, and close the file. No methods
+        can be called after this one.
+        """
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except (IOError, OSError):
+            pass
+        self._socket.close()
+        self._thread.join()
+        self._file_interface.close()
+        with self._lock:
+            if self._file.closed:
+                return
+            index_offset = self._file.tell()
+            for entry in self._index:
+                self._file.write(_INDEX_ENTRY.pack(*entry))
+            self._file.write(_TRAILER.pack(
+              index_offset, len(self._index), _MAGIC))
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+class Recording(object):
+    """
+    A recorded variable server stream. Frames can be read concurrently
+    from multiple threads. Call close, or use a with statement, when
+    finished.
+
+    Attributes
+    ----------
+    names : tuple of str
+        The fully-qualified names, in frame order.
+    units : tuple of str
+        The units of each variable's values.
+    requested_units : tuple of str or None
+        The units with which each variable was added. ASCII frames only
+        include units for variables whose requested units are not None.
+    binary : bool
+        True if the frames are var_binary_nonames messages.
+        False if they are ASCII lines.
+    period : float or None
+        The requested sampling period.
+    header : dict
+        All of the recording's metadata.
+    timestamps : [float]
+        The arrival time of each frame.
+    """
+
+    def __init__(self, path):
+        """
+        Open a recording.
+
+        Parameters
+        ----------
+        path : str
+            The recording's file.
+
+        Raises
+        ------
+        ValueError
+            If the file is not a recording.
+        """
+        self._file = open(path, 'rb')
+        self._lock = threading.Lock()
+        try:
+            magic, version, length = _FILE_HEADER.unpack(
+              self._file.read(_FILE_HEADER.size))
+        except struct.error:
+            magic = version = None
+        if magic != _MAGIC or version != _VERSION:
+            self._file.close()
+            raise ValueError('{0} is not a variable server recording'
+                             .format(path))
+        self.header = json.loads(self._file.read(length).decode())
+        self.names = tuple(self.header['names'])
+        self.units = tuple(self.header['units'])
+        self.requested_units = tuple(self.header['requested_units'])
+        self.binary = self.header['binary']
+        self.period = self.header['period']
+        self._byte_order = None
+
+        frames_start = self._file.tell()
+        self._file.seek(0, 2)
+        end = self._file.tell()
+        index = None
+        if end - frames_start >= _TRAILER.size:
+            self._file.seek(end - _TRAILER.size)
+            index_offset, count, magic = _TRAILER.unpack(
+              self._file.read(_TRAILER.size))
+            if (magic == _MAGIC and index_offset + count * _INDEX_ENTRY.size
+                                    + _TRAILER.size == end):
+                self._file.seek(index_offset)
+                index = list(_INDEX_ENTRY.iter_unpack(
+                  self._file.read(count * _INDEX_ENTRY.size)))
+        if index is None:
+            index = self._scan(frames_start, end)
+        self.timestamps = [timestamp for timestamp, _ in index]
+        self._offsets = [offset for _, offset in index]
+
+    def _scan(self, offset, end):
+        """
+        Rebuild the index of a recording whose recorder was not closed.
+        A truncated final frame is ignored.
+        """
+        index = []
+        while offset + _FRAME_HEADER.size <= end:
+            self._file.seek(offset)
+            timestamp, length = _FRAME_HEADER.unpack(
+              self._file.read(_FRAME_HEADER.size))
+            if offset + _FRAME_HEADER.size + length > end:
+                break
+            index.append((timestamp, offset))
+            offset += _FRAME_HEADER.size + length
+        return index
+
+    def __len__(self):
+        return len(self._offsets)
+
+    @property
+    def duration(self):
+        '''
+        Get the time between the first and last frames, in seconds.
+        '''
+        return self.timestamps[-1] - self.timestamps[0] if self else 0.0
+
+    def find(self, seconds):
+        """
+        Find the first frame at or after a time.
+
+        Parameters
+        ----------
+        seconds : float
+            The time, relative to the first frame.
+
+        Returns
+        -------
+        int
+            The frame's index, which is len(self) if there is none.
+        """
+        if not self:
+            return 0
+        return bisect.bisect_left(self.timestamps,
+                                  self.timestamps[0] + seconds)
+
+    def read(self, index):
+        """
+        Read a frame.
+
+        Parameters
+        ----------
+        index : int
+            The frame's index.
+
+        Returns
+        -------
+        bytes
+            The frame exactly as it was received: an ASCII line,
+            including its newline, or one or more binary messages.
+        """
+        with self._lock:
+            self._file.seek(self._offsets[index])
+            _, length = _FRAME_HEADER.unpack(
+              self._file.read(_FRAME_HEADER.size))
+            return self._file.read(length)
+
+    def values(self, index):
+        """
+        Read and decode a frame.
+
+        Parameters
+        ----------
+        index : int
+            The frame's index.
+
+        Returns
+        -------
+        [any]
+            For ASCII recordings, the value strings, which include units
+            if units were requested. For binary recordings, the decoded
+            values, as from a VariableServer in binary mode.
+        """
+        data = self.read(index)
+        if not self.binary:
+            return data.decode().rstrip('\n').split('\t')[1:]
+        if self._byte_order is None:
+            size, = struct.unpack_from('<i', data, 4)
+            self._byte_order = '<' if 0 < size <= _MAX_MESSAGE_SIZE else '>'
+        values = []
+        offset = 0
+        while offset < len(data):
+            size, = struct.unpack_from(self._byte_order + 'i', data, offset + 4)
+            values.extend(_decode_binary_values(
+              data, offset + 8, offset + 4 + size, self._byte_order))
+            offset += 4 + size
+        return values
+
+    def close(self):
+        """
+        Close the file.
+        """
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+class ReplayServer(object):
+    """
+    Serve a Recording over the variable server protocol. Each client
+    connection replays the recording from the current seek position as
+    long as it is unpaused and has added variables. Clients may add any
+    of the recorded variables, in any order, with or without units, and
+    in ASCII or binary mode. Frames are passed through untouched when a
+    client's variables and format match the recording. Variables that
+    were not recorded have the value BAD_REF, as they would in a sim.
+    Units cannot be converted, so requested units other than the
+    recorded ones are ignored. var_cycle is ignored in favor of the
+    recorded timing.
+
+    Use close or a with statement to shut it down.
+    """
+
+    def __init__(self, recording, host='localhost', port=0, speed=1.0,
+                 loop=False):
+        """
+        Start serving on a background thread.
+
+        Parameters
+        ----------
+        recording : Recording or str
+            The recording or the path of its file. A recording opened
+            from a path is closed by close.
+        host : str
+            The address on which to listen.
+        port : int
+            The port on which to listen, or 0 to pick a free port.
+        speed : float or None
+            The replay speed as a multiple of the recorded rate, or None
+            or 0 to send frames as fast as clients read them.
+        loop : bool
+            True to restart from the beginning at the end of the
+            recording. False to stop sending at the end.
+        """
+        self._owns_recording = isinstance(recording, basestring)
+        if self._owns_recording:
+            recording = Recording(recording)
+        self.recording = recording
+        self.speed = speed or None
+        self.loop = loop
+        self._position = 0
+        self._generation = 0
+        self._server = socketserver.ThreadingTCPServer(
+          (host, port), _ReplaySession)
+        self._server.daemon_threads = True
+        self._server.replay = self
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = threading.Thread(
+          target=self._server.serve_forever, name='Variable Server Replay')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def seek(self, seconds):
+        """
+        Move every connection to the first frame at or after a time. New
+        connections also start there.
+
+        Parameters
+        ----------
+        seconds : float
+            The time, relative to the first frame of the recording.
+        """
+        self._position = self.recording.find(seconds)
+        self._generation += 1
+
+    def close(self):
+        """
+        Stop serving. Open connections end when their clients disconnect.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+        if self._owns_recording:
+            self.recording.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+class _ReplaySession(_StandInSession):
+    """
+    One client connection to a ReplayServer.
+    """
+
+    def setup(self):
+        super(_ReplaySession, self).setup()
+        self._replay = self.server.replay
+        self._recording = self._replay.recording
+        self._next = self._replay._position
+        self._generation = self._replay._generation
+
+    def _variable_exists(self, name):
+        return name in self._recording.names
+
+    def _send_cyclically(self):
+        """
+        Send frames at their recorded times, scaled by the replay speed.
+        """
+        recording = self._recording
+        origin = None
+        while True:
+            with self._changed:
+                while not self._closed and (self._paused or not self._names):
+                    self._changed.wait()
+                    origin = None
+                if self._closed:
+                    return
+            if self._generation != self._replay._generation:
+                self._generation = self._replay._generation
+                self._next = self._replay._position
+                origin = None
+            if self._next >= len(recording):
+                if not self._replay.loop or not recording:
+                    with self._changed:
+                        self._changed.wait(0.1)
+                    continue
+                self._next = 0
+                origin = None
+            index = self._next
+            speed = self._replay.speed
+            if speed is not None:
+                if origin is None:
+                    origin = time.time(), recording.timestamps[index]
+                delay = (origin[0] + (recording.timestamps[index] - origin[1])
+                         / speed - time.time())
+                if delay > 0:
+                    time.sleep(delay)
+            self._next = index + 1
+            try:
+                self._write(self._frame(index))
+            except (IOError, OSError):
+                return
+
+    def _send_frame(self):
+        """
+        Send the most recently replayed frame in response to var_send.
+        """
+        if self._recording:
+            self._write(self._frame(max(0, min(self._next - 1,
+                                               len(self._recording) - 1))))
+
+    def _frame(self, index):
+        """
+        Format a recorded frame for this connection's variables, units,
+        and format.
+        """
+        recording = self._recording
+        with self._changed:
+            names = list(self._names)
+            units = list(self._units)
+            binary = self._binary
+            nonames = self._nonames
+        if not names:
+            return b''
+
+        if (binary == recording.binary and (nonames or not binary)
+          and names == list(recording.names)
+          and (binary or [unit is None for unit in units]
+                         == [unit is None
+                             for unit in recording.requested_units])):
+            return recording.read(index)
+
+        values = recording.values(index)
+        positions = dict((name, i) for i, name
+                         in reversed(list(enumerate(recording.names))))
+        selected = []
+        for name, unit in zip(names, units):
+            i = positions.get(name)
+            if i is None:
+                selected.append((name, 'BAD_REF', None))
+            else:
+                value = values[i]
+                if not recording.binary:
+                    value = _parse_value(value)[0]
+                selected.append((name, value, recording.units[i]
+                                              if unit is not None else None))
+        if binary:
+            return _binary_message(selected, not nonames, recording.binary)
+        return '0\t{0}\n'.format('\t'.join(
+          _ascii_value(value) + (' {' + unit + '}' if unit else '')
+          for _, value, unit in selected)).encode()
+
+def _ascii_value(value):
+    """
+    Format a decoded binary value as the variable server would in ASCII.
+    Doubles are written with enough digits to round-trip exactly.
+    """
+    if isinstance(value, float):
+        return repr(value)
+    if isinstance(value, list):
+        return ','.join(_ascii_value(element) for element in value)
+    if isinstance(value, bytes):
+        return value.decode('utf-8', 'replace')
+    return str(value)
+
+def _binary_entry(value, decoded):
+    """
+    Return the (type, value bytes) of a value for a binary message.
+    Values from ASCII recordings are strings, and are sent as the
+    narrowest of long long, double, or string that represents them.
+    """
+    if value == 'BAD_REF':
+        return _TRICK_BAD_REF, struct.pack('=i', 0)
+    if not decoded:
+        for type_, format_, convert in [
+          (_TRICK_LONG_LONG, '=q', int), (_TRICK_DOUBLE, '=d', float)]:
+            try:
+                return type_, struct.pack(format_, convert(value))
+            except (ValueError, struct.error):
+                pass
+        return _TRICK_STRING, value.encode() + b'\0'
+    if isinstance(value, float):
+        return _TRICK_DOUBLE, struct.pack('=d', value)
+    if isinstance(value, int):
+        return _TRICK_LONG_LONG, struct.pack('=q', value)
+    if isinstance(value, list):
+        if all(isinstance(element, int) for element in value):
+            return _TRICK_LONG_LONG, struct.pack(
+              '={0}q'.format(len(value)), *value)
+        return _TRICK_DOUBLE, struct.pack(
+          '={0}d'.format(len(value)), *value)
+    if isinstance(value, bytes):
+        return _TRICK_STRING, value
+    return _TRICK_STRING, value.encode() + b'\0'
+
+def _binary_message(selected, include_names, decoded):
+    """
+    Build one or more var_binary messages, split as the variable server
+    does.
+    """
+    messages = []
+    entries = []
+    size = 12
+    for name, value, _ in selected:
+        type_, data = _binary_entry(value, decoded)
+        entry = b''
+        if include_names:
+            entry = struct.pack('=i', len(name)) + name.encode()
+        entry += struct.pack('=ii', type_, len(data)) + data
+        if size + len(entry) > _MAX_MESSAGE_SIZE and entries:
+            messages.append(struct.pack('=iii', 0, size - 4, len(entries))
+                            + b''.join(entries))
+            entries, size = [], 12
+        entries.append(entry)
+        size += len(entry)
+    messages.append(struct.pack('=iii', 0, size - 4, len(entries))
+                    + b''.join(entries))
+    return b''.join(messages)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+      description='Record and replay variable server streams.')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    record = subparsers.add_parser('record',
+      help='record variables from a sim until interrupted')
+    record.add_argument('output', help='the recording to write')
+    record.add_argument('variables', nargs='+',
+      help='the names of the variables to record')
+    record.add_argument('--host', default='localhost',
+      help='(default: %(default)s)')
+    record.add_argument('--port', type=int, required=True)
+    record.add_argument('--units', nargs='+',
+      help='one units for all variables or one per variable')
+    record.add_argument('--binary', action='store_true',
+      help='record the binary stream instead of ASCII')
+    record.add_argument('--period', type=float,
+      help='the sampling period in seconds (default: the sim\'s)')
+    record.add_argument('--duration', type=float,
+      help='seconds to record (default: until interrupted)')
+
+    serve = subparsers.add_parser('serve',
+      help='replay a recording, print the port, and serve until '
+           'interrupted')
+    serve.add_argument('recording')
+    serve.add_argument('--host', default='localhost',
+      help='(default: %(default)s)')
+    serve.add_argument('--port', type=int, default=0,
+      help='(default: any free port)')
+    serve.add_argument('--speed', type=float, default=1.0,
+      help='the replay speed, or 0 for as fast as possible '
+           '(default: %(default)s)')
+    serve.add_argument('--loop', action='store_true',
+      help='restart at the end of the recording')
+    serve.add_argument('--start', type=float, default=0.0,
+      help='the time, relative to the first frame, at which to start '
+           '(default: %(default)s)')
+
+    info = subparsers.add_parser('info', help='describe a recording')
+    info.add_argument('recording')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        units = args.units
+        if units is not None and len(units) == 1:
+            units = units[0]
+        with StreamRecorder(args.host, args.port, args.output,
+                            args.variables, units, args.binary,
+                            args.period) as recorder:
+            try:
+                time.sleep(args.duration) if args.duration is not None \
+                  else threading.Event().wait()
+            except KeyboardInterrupt:
+                pass
+        print('Recorded {0} frames'.format(recorder.frames))
+    elif args.command == 'serve':
+        with ReplayServer(args.recording, args.host, args.port, args.speed,
+                          args.loop) as server:
+            server.seek(args.start)
+            print(server.port)
+            sys.stdout.flush()
+            try:
+                threading.Event().wait()
+            except KeyboardInterrupt:
+                pass
+    else:
+        with Recording(args.recording) as recording:
+            description = dict(recording.header)
+            description.update(frames=len(recording),
+                               duration=recording.duration)
+            print(json.dumps(description, indent=2, sort_keys=True))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
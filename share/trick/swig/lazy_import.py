@@ -0,0 +1,273 @@
+"""
+Lazy loading of the per header SWIG modules of the trick package.
+
+At build time this file is run as a script to index the names and proxy classes of every
+header module.  At run time, when TRICK_SWIG_LAZY_IMPORT is set, install() is called by the
+trick package instead of star importing every header module.  A header module is imported the
+first time one of its names is looked up in the trick package.
+
+SWIG modules import the modules of the headers their header includes.  Every header module is
+entered in sys.modules as a LazyModule, so those imports do not load anything until an
+attribute of the imported module is used, for instance as a base class.
+
+SWIG only wraps returned objects in their proxy class once the module defining the class is
+imported.  To keep returned objects usable before that, every proxy class is registered up
+front as a small placeholder class.  The first attribute access on a placeholder object
+imports the real module and turns the object into an instance of the real proxy class.
+isinstance() checks against the real class work before then, but type() returns the
+placeholder class until the object is first used.
+"""
+
+import ast
+import importlib
+import os
+import sys
+import types
+
+index_module = "lazy_import_index"
+
+def enabled():
+    """True when TRICK_SWIG_LAZY_IMPORT is set and Python supports module __getattr__."""
+    return sys.version_info >= (3, 7) and os.environ.get("TRICK_SWIG_LAZY_IMPORT", "0") not in ("", "0")
+
+# Statements whose bodies run as part of the module, such as SWIG's "if __package__ ..." imports.
+block_statements = tuple(getattr(ast, name) for name in ("If", "Try", "TryStar", "With") if hasattr(ast, name))
+
+def module_statements(body):
+    """Yields the statements run at the top level of a module, including those in if, try, and with blocks."""
+    for node in body:
+        yield node
+        if isinstance(node, block_statements):
+            for block in (node.body, getattr(node, "orelse", []), getattr(node, "finalbody", [])):
+                for nested in module_statements(block):
+                    yield nested
+            for handler in getattr(node, "handlers", []):
+                for nested in module_statements(handler.body):
+                    yield nested
+
+def read_module(directory, module):
+    """
+    Returns the names a star import of the module would define, in order, and the proxy
+    classes the module registers with SWIG.
+    """
+    with open(os.path.join(directory, module + ".py")) as f:
+        tree = ast.parse(f.read())
+    names = []
+    classes = []
+    for node in module_statements(tree.body):
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            names.append(node.name)
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    names.append(target.id)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                names.append((alias.asname or alias.name).split(".")[0])
+        elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Call):
+            # SWIG registers proxies with "_module.Foo_swigregister(Foo)" or "Foo_swigregister(Foo)"
+            func = node.value.func
+            func_name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", "")
+            args = node.value.args
+            if func_name.endswith("_swigregister") and len(args) == 1 and isinstance(args[0], ast.Name):
+                classes.append(args[0].id)
+    return [name for name in names if not name.startswith("_") and name != "*"], classes
+
+def write_index(directory, module_list):
+    """
+    Write the index of the modules listed one per line in module_list, in the order they are
+    star imported.
+    """
+    with open(module_list) as f:
+        modules = f.read().split()
+    names = {}
+    classes = {}
+    eager = []
+    for module in modules:
+        # Modules built elsewhere, like those of trickified libraries, are imported up front.
+        if not os.path.isfile(os.path.join(directory, module + ".py")):
+            eager.append(module)
+            continue
+        names[module], module_classes = read_module(directory, module)
+        if module_classes:
+            classes[module] = module_classes
+    with open(os.path.join(directory, index_module + ".py"), "w") as f:
+        f.write("# Generated by lazy_import.py, do not edit\n")
+        f.write("modules = %r\n" % modules)
+        f.write("names = %r\n" % names)
+        f.write("classes = %r\n" % classes)
+        f.write("eager = %r\n" % eager)
+
+class LazyModule(types.ModuleType):
+    """
+    Stands in for a header module in sys.modules until one of its attributes is used.  Then the
+    real module is imported, and its attributes are copied into the stand in so references to
+    the stand in keep working.
+    """
+
+    def __getattr__(self, name):
+        return getattr(load_module(self), name)
+
+def load_module(module):
+    """Returns the real module of a module or module name, importing it if it is still lazy."""
+    if isinstance(module, str):
+        module = importlib.import_module(module)
+    if not isinstance(module, LazyModule):
+        return module
+    real = module.__dict__.get("_lazy_real_module")
+    if real is None:
+        name = module.__name__
+        if sys.modules.get(name) is module:
+            del sys.modules[name]
+        try:
+            real = importlib.import_module(name)
+        except BaseException:
+            sys.modules[name] = module
+            raise
+        module.__dict__.update(real.__dict__)
+        module.__dict__["_lazy_real_module"] = real
+    return real
+
+# Special methods are looked up on the type, so placeholders forward them to the real class.
+forwarded_methods = (
+    "__repr__", "__str__", "__bool__", "__len__", "__iter__", "__contains__",
+    "__getitem__", "__setitem__", "__delitem__", "__call__", "__int__", "__float__", "__index__",
+    "__neg__",
+)
+forwarded_operators = (
+    "__eq__", "__ne__", "__lt__", "__le__", "__gt__", "__ge__",
+    "__add__", "__sub__", "__mul__", "__truediv__", "__floordiv__", "__mod__", "__pow__",
+    "__radd__", "__rsub__", "__rmul__", "__rtruediv__",
+    "__iadd__", "__isub__", "__imul__", "__itruediv__",
+)
+
+# The __class__ descriptor of object, used to change the class of a placeholder object.
+set_class = object.__dict__["__class__"].__set__
+
+def real_class(placeholder_class):
+    return getattr(load_module(placeholder_class._lazy_module), placeholder_class.__name__)
+
+def resolve(obj):
+    """Turns a placeholder object into an instance of its real class."""
+    if issubclass(type(obj), Placeholder):
+        set_class(obj, real_class(type(obj)))
+    return obj
+
+class Placeholder(object):
+    """Base class of the placeholders of the proxy classes."""
+
+    def __getattr__(self, name):
+        return getattr(resolve(self), name)
+
+    def __setattr__(self, name, value):
+        if name == "this":
+            object.__setattr__(self, name, value)
+        else:
+            setattr(resolve(self), name, value)
+
+    __hash__ = object.__hash__
+
+    # isinstance() falls back on __class__ when the type of the object does not match.
+    __class__ = property(lambda self: real_class(type(self)))
+
+def forward(method):
+    def forwarded(obj, *args):
+        real_method = getattr(type(resolve(obj)), method, None)
+        if real_method is not None:
+            return real_method(obj, *args)
+        # The real class does not define the method, behave as if the placeholder did not either.
+        if method == "__bool__":
+            return True
+        if method in forwarded_operators:
+            return NotImplemented
+        raise TypeError("'%s' object does not support %s" % (type(obj).__name__, method))
+    forwarded.__name__ = method
+    return forwarded
+
+for method in forwarded_methods + forwarded_operators:
+    setattr(Placeholder, method, forward(method))
+
+def placeholder(module, class_name, destroy=None):
+    """
+    Returns a placeholder for the proxy class class_name of module.  SWIG deletes the C++ object
+    of a garbage collected proxy with the __swig_destroy__ of the class registered for its type,
+    so the placeholder is given the destructor the real class would have.
+    """
+    attributes = {"__module__": module, "_lazy_module": module}
+    if destroy is not None:
+        attributes["__swig_destroy__"] = destroy
+    return type(class_name, (Placeholder,), attributes)
+
+class Loader(object):
+    """Imports header modules for the namespace of a package."""
+
+    def __init__(self, namespace, names):
+        self.namespace = namespace
+        self.names = names
+
+    def getattr(self, name):
+        """Module __getattr__ of the package."""
+        module = self.names.get(name)
+        if module is None:
+            raise AttributeError("module '%s' has no attribute '%s'" % (self.namespace.get("__name__"), name))
+        value = getattr(load_module(module), name)
+        self.namespace[name] = value
+        return value
+
+    def dir(self):
+        """Module __dir__ of the package."""
+        return sorted(set(self.namespace) | set(self.names))
+
+registered = False
+
+def register(index):
+    """Enter the header modules in sys.modules and register the placeholder classes, once."""
+    global registered
+    if registered:
+        return
+    registered = True
+    for module in index.names:
+        if module not in sys.modules:
+            sys.modules[module] = LazyModule(module)
+    for module, class_names in index.classes.items():
+        c_module = importlib.import_module("_" + module)
+        for class_name in class_names:
+            swig_register = getattr(c_module, class_name + "_swigregister", None)
+            if swig_register is not None:
+                swig_register(placeholder(module, class_name, getattr(c_module, "delete_" + class_name, None)))
+
+def install(namespace, modules=None):
+    """
+    Make the names of the header modules available through the namespace of a package
+    without importing the modules, as if they were star imported in order.  modules defaults
+    to every module in the index.  Must be called after the header extension modules are
+    imported.
+    """
+    index = importlib.import_module(index_module)
+    register(index)
+    names = {}
+    for module in index.modules if modules is None else modules:
+        if module in index.names:
+            for name in index.names[module]:
+                names[name] = module
+                namespace.pop(name, None)
+        elif module in index.eager:
+            values = {}
+            exec("from %s import *" % module, values)
+            del values["__builtins__"]
+            for name in values:
+                names.pop(name, None)
+            namespace.update(values)
+    loader = Loader(namespace, names)
+    namespace["__getattr__"] = loader.getattr
+    namespace["__dir__"] = loader.dir
+    return loader
+
+def public_names(loader):
+    """Names exported by "from <package> import *", which imports every header module."""
+    return [name for name in loader.dir() if not name.startswith("_")]
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: lazy_import.py <python module directory> <module list>")
+    write_index(sys.argv[1], sys.argv[2])
@@ -0,0 +1,195 @@
+import inspect
+import os
+import shutil
+import sys
+import tempfile
+import textwrap
+import unittest
+
+sys.path.append(os.path.dirname(os.path.abspath(inspect.getsourcefile(lambda:0))))
+import lazy_import
+
+# Stand ins for SWIG generated header modules.  Each C extension module "_m*" registers and
+# creates objects of the proxy classes of its module, and each module records when it runs.
+stand_in_modules = {
+    "_mbase": """
+        classes = {}
+        def Base_swigregister(cls):
+            classes["Base"] = cls
+    """,
+    "mbase": """
+        import lazy_test_trace
+        lazy_test_trace.loaded.append("mbase")
+        import _mbase
+        class Base(object):
+            def base_value(self):
+                return 1
+        _mbase.Base_swigregister(Base)
+        shared = "mbase"
+        only_base = "mbase"
+    """,
+    "_mfoo": """
+        classes = {}
+        def Foo_swigregister(cls):
+            classes["Foo"] = cls
+        def delete_Foo(foo):
+            pass
+        def new_Foo():
+            foo = object.__new__(classes["Foo"])
+            foo.this = "pointer"
+            return foo
+    """,
+    "mfoo": """
+        import lazy_test_trace
+        lazy_test_trace.loaded.append("mfoo")
+        if __package__ or "." in __name__:
+            from . import _mfoo
+        else:
+            import _mfoo
+        import mbase
+        class Foo(mbase.Base):
+            __swig_destroy__ = _mfoo.delete_Foo
+            def value(self):
+                return 42
+            def __len__(self):
+                return 3
+        _mfoo.Foo_swigregister(Foo)
+        try:
+            def make_foo():
+                return _mfoo.new_Foo()
+        except NameError:
+            pass
+        shared = "mfoo"
+    """,
+    "mlast": """
+        import lazy_test_trace
+        lazy_test_trace.loaded.append("mlast")
+        import mfoo
+        shared = "mlast"
+    """,
+}
+
+# A module built elsewhere, which is imported up front.
+eager_module = """
+    shared = "meager"
+    only_eager = "meager"
+"""
+
+class TestLazyImport(unittest.TestCase):
+
+    modules = ["mbase", "meager", "mfoo", "mlast"]
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.eager_directory = tempfile.mkdtemp()
+        for name, source in stand_in_modules.items():
+            with open(os.path.join(self.directory, name + ".py"), "w") as f:
+                f.write(textwrap.dedent(source))
+        with open(os.path.join(self.directory, "lazy_test_trace.py"), "w") as f:
+            f.write("loaded = []\n")
+        with open(os.path.join(self.eager_directory, "meager.py"), "w") as f:
+            f.write(textwrap.dedent(eager_module))
+        module_list = os.path.join(self.directory, "swig_modules")
+        with open(module_list, "w") as f:
+            f.write("\n".join(self.modules) + "\n")
+        lazy_import.write_index(self.directory, module_list)
+        sys.path[:0] = [self.directory, self.eager_directory]
+        import lazy_test_trace
+        self.trace = lazy_test_trace
+        self.namespace = {"__name__": "trick", "shared": "sim_services", "only_base": "sim_services"}
+
+    def tearDown(self):
+        sys.path.remove(self.directory)
+        sys.path.remove(self.eager_directory)
+        for name in list(stand_in_modules) + ["meager", "lazy_test_trace", lazy_import.index_module]:
+            sys.modules.pop(name, None)
+        lazy_import.registered = False
+        shutil.rmtree(self.directory)
+        shutil.rmtree(self.eager_directory)
+
+    def test_write_index(self):
+        import lazy_import_index as index
+        self.assertEqual(index.modules, self.modules)
+        self.assertEqual(index.names["mbase"], ["lazy_test_trace", "Base", "shared", "only_base"])
+        self.assertEqual(index.names["mfoo"], ["lazy_test_trace", "mbase", "Foo", "make_foo", "shared"])
+        self.assertEqual(index.classes, {"mbase": ["Base"], "mfoo": ["Foo"]})
+        self.assertEqual(index.eager, ["meager"])
+
+    def test_names(self):
+        loader = lazy_import.install(self.namespace)
+        self.assertEqual(self.trace.loaded, [])
+
+        # Like consecutive star imports, the last module defining a name wins.
+        self.assertEqual(loader.getattr("shared"), "mlast")
+        self.assertEqual(self.trace.loaded, ["mlast"])
+        self.assertEqual(loader.getattr("only_base"), "mbase")
+        self.assertEqual(self.namespace["only_eager"], "meager")
+        self.assertIn("Foo", loader.dir())
+        self.assertIn("make_foo", lazy_import.public_names(loader))
+        with self.assertRaises(AttributeError):
+            loader.getattr("missing")
+
+        # Looked up names are kept in the namespace.
+        self.assertEqual(self.namespace["shared"], "mlast")
+
+    def test_subset_of_modules(self):
+        loader = lazy_import.install(self.namespace, ["mfoo", "mbase"])
+        self.assertEqual(loader.getattr("shared"), "mbase")
+        with self.assertRaises(AttributeError):
+            loader.getattr("only_eager")
+
+    def test_imported_modules_are_lazy(self):
+        loader = lazy_import.install(self.namespace)
+
+        # mlast imports mfoo, which is not loaded until one of its attributes is used.
+        loader.getattr("shared")
+        self.assertEqual(self.trace.loaded, ["mlast"])
+        mlast = sys.modules["mlast"]
+        self.assertEqual(mlast.mfoo.shared, "mfoo")
+        self.assertEqual(self.trace.loaded, ["mlast", "mfoo", "mbase"])
+
+        # The stand in module and the real module share their attributes.
+        from mfoo import Foo, make_foo
+        self.assertIs(mlast.mfoo.Foo, Foo)
+        self.assertIs(mlast.mfoo.make_foo, make_foo)
+
+    def test_placeholders(self):
+        lazy_import.install(self.namespace)
+        _mfoo = sys.modules["_mfoo"]
+
+        # Objects returned before their module is loaded are placeholders.
+        foo = _mfoo.new_Foo()
+        self.assertEqual(self.trace.loaded, [])
+        self.assertEqual(type(foo).__name__, "Foo")
+        self.assertEqual(foo.this, "pointer")
+
+        # The first use of a placeholder loads its module and turns it into the real class.
+        self.assertEqual(foo.value(), 42)
+        self.assertIn("mfoo", self.trace.loaded)
+        self.assertIs(type(foo), lazy_import.load_module("mfoo").Foo)
+        self.assertEqual(foo.base_value(), 1)
+
+    def test_placeholder_isinstance(self):
+        loader = lazy_import.install(self.namespace)
+        foo = sys.modules["_mfoo"].new_Foo()
+        self.assertTrue(isinstance(foo, loader.getattr("Foo")))
+        self.assertTrue(isinstance(foo, loader.getattr("Base")))
+
+    def test_placeholder_destructor(self):
+        lazy_import.install(self.namespace)
+
+        # SWIG deletes the C++ object of a proxy with the __swig_destroy__ of the registered class
+        _mfoo = sys.modules["_mfoo"]
+        self.assertIs(_mfoo.classes["Foo"].__swig_destroy__, _mfoo.delete_Foo)
+        self.assertFalse(hasattr(sys.modules["_mbase"].classes["Base"], "__swig_destroy__"))
+        self.assertEqual(self.trace.loaded, [])
+
+    def test_placeholder_special_methods(self):
+        lazy_import.install(self.namespace)
+        foo = sys.modules["_mfoo"].new_Foo()
+        self.assertEqual(len(foo), 3)
+        self.assertTrue(foo)
+        self.assertEqual(foo, foo)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+Resource-based admission of Jobs. WorkflowCommon.execute_jobs() asks the
+AdmissionController assigned to WorkflowCommon.admission_controller how much
+CPU and memory headroom the machine has before starting each job, and only
+starts a job that fits, so memory-heavy jobs aren't started together until
+they run out of memory and light jobs can use whatever is left over.
+
+Headroom is measured from the machine as a whole, so it accounts for work
+outside of TrickOps too. Jobs which were started only recently have not yet
+reached their full CPU and memory use, so their expected use is subtracted
+from the measured headroom until they have.
+
+The controller can also pin each job to its own set of CPUs, so concurrent
+sims don't compete for the same cores and caches.
+
+Requires psutil.
+"""
+
+import os, time
+from JobHistory import physical_memory
+
+def available_cpus():
+    """
+    Get the CPUs this process may run on.
+
+    >>> len(available_cpus()) > 0
+    True
+
+    Returns
+    -------
+    list
+        Sorted list of CPU numbers
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+class AdmissionController(object):
+    """
+    Measures how much CPU and memory headroom the machine has for more jobs.
+
+    >>> controller = AdmissionController(cpu_limit=2)
+    >>> cpus, memory = controller.headroom()
+    >>> cpus <= 2 and memory > 0
+    True
+    """
+    def __init__(self, cpu_limit=None, memory_reserve=0.05, ramp_time=5.0,
+                 sample_interval=0.5, pin_cpus=False):
+        """
+        Initialize this instance.
+
+        Parameters
+        ----------
+        cpu_limit : float or None
+            Number of busy CPUs above which no job is started, defaults to the
+            number of CPUs this process may run on
+        memory_reserve : float
+            Fraction of physical memory to keep available
+        ramp_time : float
+            Seconds a job is assumed to take to reach its full CPU and memory use
+        sample_interval : float
+            Minimum seconds between measurements of the machine, which is
+            also how often execute_jobs() checks again for headroom while
+            jobs are held back
+        pin_cpus : bool
+            Whether to pin each job to its own set of CPUs
+        """
+        self.cpus = available_cpus()        # CPUs jobs may run on
+        self.cpu_limit = cpu_limit or len(self.cpus)
+        self.memory_reserve = memory_reserve
+        self.ramp_time = ramp_time
+        self.sample_interval = sample_interval
+        self.pin_cpus = pin_cpus
+        self._free_cpus = list(self.cpus)   # CPUs no pinned job is running on
+        self._jobs = {}                     # Running Job to (start time, expected memory)
+        self._sample = None                 # Last (busy CPUs, available memory) measured
+        self._sample_time = None
+
+    def _measure(self):
+        """
+        Measure the number of busy CPUs among those jobs may run on and the
+        available memory, at most once every sample_interval seconds.
+
+        Returns
+        -------
+        tuple
+            (busy CPUs, available memory in bytes)
+        """
+        import psutil
+        now = time.monotonic()
+        if self._sample is None or now - self._sample_time >= self.sample_interval:
+            # Only the CPUs jobs may run on count against cpu_limit
+            percents = psutil.cpu_percent(interval=None, percpu=True)
+            busy = sum(percents[cpu] for cpu in self.cpus if cpu < len(percents)) / 100.0
+            self._sample = (busy, psutil.virtual_memory().available)
+            self._sample_time = now
+        return self._sample
+
+    def headroom(self):
+        """
+        Get the CPU and memory left for more jobs, less what recently started
+        jobs are still expected to take and the memory reserve.
+
+        Returns
+        -------
+        tuple
+            (CPUs, bytes of memory)
+        """
+        busy, available = self._measure()
+        now = time.monotonic()
+        for job, (start, memory) in self._jobs.items():
+            if now - start < self.ramp_time:
+                busy += job.cpus
+                available -= memory
+        cpus = self.cpu_limit - busy
+        if self.pin_cpus:
+            cpus = min(cpus, len(self._free_cpus))
+        return cpus, available - self.memory_reserve * (physical_memory() or 0)
+
+    def started(self, job, memory=0):
+        """
+        Record that a Job is about to be started, pinning it to CPUs of its own
+        if pin_cpus is set. Call this before Job.start().
+
+        Parameters
+        ----------
+        job : Job
+            The job
+        memory : int
+            The job's expected peak memory use in bytes
+        """
+        self._jobs[job] = (time.monotonic(), memory)
+        if self.pin_cpus and self._free_cpus:
+            count = min(max(job.cpus, 1), len(self._free_cpus))
+            job.cpu_set = self._free_cpus[:count]
+            del self._free_cpus[:count]
+
+    def finished(self, job):
+        """
+        Record that a Job finished, freeing any CPUs it was pinned to.
+
+        Parameters
+        ----------
+        job : Job
+            The finished job
+        """
+        self._jobs.pop(job, None)
+        if job.cpu_set:
+            self._free_cpus = sorted(self._free_cpus + list(job.cpu_set))
+            job.cpu_set = None
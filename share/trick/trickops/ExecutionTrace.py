@@ -0,0 +1,152 @@
+"""
+Timeline of Job executions. WorkflowCommon.execute_jobs() records when every
+Job it runs became ready, started, and stopped, along with its CPU time and
+peak memory use and the number of jobs running and waiting over time, in the
+ExecutionTrace assigned to WorkflowCommon.execution_trace.
+
+The timeline is written as Chrome trace event JSON, which chrome://tracing and
+https://ui.perfetto.dev display with one row per concurrently running job, and
+as a CSV summary with one line per job.
+"""
+
+import csv, heapq, json, os, time
+
+class ExecutionTrace(object):
+    """
+    A timeline of Job executions, written to a trace file and a summary file
+    after every call to WorkflowCommon.execute_jobs().
+
+    >>> trace = ExecutionTrace('/tmp/ExecutionTrace_doctest.json')
+    >>> trace.summary_file
+    '/tmp/ExecutionTrace_doctest.csv'
+    """
+    # Columns of the summary file. Times are in seconds, relative to the
+    # creation of the trace for queued, started, and stopped.
+    summary_columns = ['name', 'kind', 'status', 'exit_status', 'slot', 'queued',
+      'started', 'stopped', 'queue_wait', 'wall_time', 'cpu_time', 'peak_rss']
+
+    def __init__(self, trace_file, summary_file=None):
+        """
+        Start a timeline.
+
+        Parameters
+        ----------
+        trace_file : str
+            Path to which to write the Chrome trace event JSON
+        summary_file : str or None
+            Path to which to write the CSV summary, defaults to trace_file
+            with a .csv extension
+        """
+        self.trace_file = trace_file
+        self.summary_file = summary_file or os.path.splitext(trace_file)[0] + '.csv'
+        self.origin = time.time()  # Time zero of the timeline
+        self.events = []           # Chrome trace events
+        self.rows = []             # Summary rows, one per finished job
+        self._ready = {}           # Job to time it became ready to start
+        self._slots = {}           # Running job to the row it is drawn in
+        self._free = []            # Heap of rows no running job is drawn in
+        self._running = 0
+
+    def _us(self, seconds):
+        """
+        Convert a time to microseconds since the creation of this trace.
+        """
+        return round((seconds - self.origin) * 1e6)
+
+    def _count(self, waiting):
+        """
+        Add a counter event of the number of jobs running and waiting.
+        """
+        self.events.append({'name': 'jobs', 'ph': 'C', 'ts': self._us(time.time()),
+          'pid': 0, 'args': {'running': self._running, 'waiting': waiting}})
+
+    def ready(self, job):
+        """
+        Record that a Job is ready to start, its prerequisites having succeeded.
+
+        Parameters
+        ----------
+        job : Job
+            The job
+        """
+        self._ready.setdefault(job, time.time())
+
+    def started(self, job, waiting=0):
+        """
+        Record that a Job was started.
+
+        Parameters
+        ----------
+        job : Job
+            The job
+        waiting : int
+            Number of jobs still ready to start but waiting
+        """
+        if self._free:
+            self._slots[job] = heapq.heappop(self._free)
+        else:
+            self._slots[job] = len(self._slots) + 1
+            self.events.append({'name': 'thread_name', 'ph': 'M', 'pid': 0,
+              'tid': self._slots[job], 'args': {'name': 'Slot %d' % self._slots[job]}})
+        self._running += 1
+        self._count(waiting)
+
+    def finished(self, job, waiting=0):
+        """
+        Record that a Job finished.
+
+        Parameters
+        ----------
+        job : Job
+            The finished job
+        waiting : int
+            Number of jobs ready to start but waiting
+        """
+        slot = self._slots.pop(job, 0)
+        if slot:
+            heapq.heappush(self._free, slot)
+            self._running -= 1
+        start, stop = job._start_time, job._stop_time or time.time()
+        queued = self._ready.pop(job, start)
+        row = {'name': job.name, 'kind': type(job).__name__, 'status': job.enums[job.get_status()],
+          'exit_status': job.get_exit_status(), 'slot': slot,
+          'queued': queued - self.origin, 'started': start - self.origin,
+          'stopped': stop - self.origin, 'queue_wait': start - queued,
+          'wall_time': stop - start, 'cpu_time': job.get_cpu_time(),
+          'peak_rss': job.get_peak_rss()}
+        self.rows.append(row)
+        self.events.append({'name': job.name, 'cat': row['kind'], 'ph': 'X',
+          'ts': self._us(start), 'dur': round((stop - start) * 1e6), 'pid': 0, 'tid': slot,
+          'args': {key: row[key] for key in ('status', 'exit_status', 'queue_wait',
+            'cpu_time', 'peak_rss')}})
+        self._count(waiting)
+
+    def add_call(self, name, start, stop):
+        """
+        Record a call to execute_jobs(), drawn in its own row above the jobs.
+
+        Parameters
+        ----------
+        name : str
+            Name to show for the call
+        start : float
+            Time the call started
+        stop : float
+            Time the call returned
+        """
+        self.events.append({'name': name, 'cat': 'execute_jobs', 'ph': 'X',
+          'ts': self._us(start), 'dur': round((stop - start) * 1e6), 'pid': 0, 'tid': 0})
+
+    def write(self):
+        """
+        Write the trace and summary files.
+        """
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': 0, 'args': {'name': 'Jobs'}},
+          {'name': 'thread_name', 'ph': 'M', 'pid': 0, 'tid': 0,
+           'args': {'name': 'execute_jobs'}}]
+        with open(self.trace_file, 'w') as f:
+            json.dump({'traceEvents': metadata + self.events, 'displayTimeUnit': 'ms'}, f)
+        with open(self.summary_file, 'w', newline='') as f:
+            writer = csv.DictWriter(f, self.summary_columns)
+            writer.writeheader()
+            writer.writerows(self.rows)
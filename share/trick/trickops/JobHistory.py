@@ -0,0 +1,155 @@
+"""
+Persistent record of Job executions. WorkflowCommon.execute_jobs() records
+the wall time, peak memory use, and exit status of every Job it runs in the
+JobHistory assigned to WorkflowCommon.job_history, and uses the history to
+start the longest work first and to avoid running more at once than fits
+in memory.
+
+Executions are stored in a SQLite database keyed by job name and a hash of
+the job's command, so a job whose command changes starts a new history.
+"""
+
+import hashlib, os, sqlite3, time
+
+class JobHistory(object):
+    """
+    A local database of Job executions.
+
+    >>> history = JobHistory(':memory:')
+    >>> history.samples
+    5
+    >>> history.close()
+    """
+    def __init__(self, path, samples=5):
+        """
+        Open or create a database.
+
+        Parameters
+        ----------
+        path : str
+            Path to the database file, which is created if it does not exist
+        samples : int
+            Number of most recent executions averaged by estimate()
+        """
+        self.path = path
+        self.samples = samples
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS executions (
+                name TEXT NOT NULL,
+                command_hash TEXT NOT NULL,
+                finished REAL NOT NULL,
+                wall_time REAL,
+                peak_rss INTEGER,
+                exit_status INTEGER,
+                status INTEGER NOT NULL);
+            CREATE INDEX IF NOT EXISTS executions_by_job
+                ON executions (name, command_hash, finished);
+            """)
+
+    @staticmethod
+    def _key(job):
+        """
+        Get the (name, command hash) key of a Job.
+        """
+        return (job.name,
+          hashlib.sha1(job._command.encode(errors='ignore')).hexdigest())
+
+    def record(self, job):
+        """
+        Record a finished Job's execution. Jobs which have not been started are
+        ignored.
+
+        Parameters
+        ----------
+        job : Job
+            The finished job
+        """
+        status = job.get_status()
+        if status in (job.Status.NOT_STARTED, job.Status.RUNNING):
+            return
+        wall_time = None
+        if job._start_time is not None and job._stop_time is not None:
+            wall_time = job._stop_time - job._start_time
+        with self._connection:
+            self._connection.execute(
+              'INSERT INTO executions VALUES (?, ?, ?, ?, ?, ?, ?)',
+              self._key(job) + (time.time(), wall_time, job.get_peak_rss(),
+              job.get_exit_status(), status))
+
+    def get_executions(self, job):
+        """
+        Get all recorded executions of a Job, most recent first.
+
+        Parameters
+        ----------
+        job : Job
+            The job
+
+        Returns
+        -------
+        list
+            List of (finished time, wall time in seconds, peak RSS in bytes,
+            exit status, Job.Status) tuples. Wall time and peak RSS may be None
+            if they could not be measured.
+        """
+        return self._connection.execute(
+          'SELECT finished, wall_time, peak_rss, exit_status, status FROM executions'
+          ' WHERE name = ? AND command_hash = ? ORDER BY finished DESC',
+          self._key(job)).fetchall()
+
+    def estimate(self, job):
+        """
+        Estimate the wall time and peak memory use of a Job's next execution,
+        as the mean of its most recent successful executions, or of its most
+        recent executions if it has never succeeded.
+
+        Parameters
+        ----------
+        job : Job
+            The job
+
+        Returns
+        -------
+        tuple or None
+            (wall time in seconds or None, peak RSS in bytes or None), or None
+            if the job has never been executed
+        """
+        executions = self.get_executions(job)
+        if not executions:
+            return None
+        successes = [e for e in executions if e[4] == job.Status.SUCCESS]
+        executions = (successes or executions)[:self.samples]
+        def mean(values):
+            values = [v for v in values if v is not None]
+            return sum(values) / len(values) if values else None
+        return (mean(e[1] for e in executions), mean(e[2] for e in executions))
+
+    def close(self):
+        """
+        Close the database.
+        """
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+def physical_memory():
+    """
+    Get the total physical memory of this machine.
+
+    >>> physical_memory() is None or physical_memory() > 0
+    True
+
+    Returns
+    -------
+    int or None
+        Physical memory in bytes, or None if it cannot be determined
+    """
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
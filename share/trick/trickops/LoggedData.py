@@ -0,0 +1,255 @@
+"""
+Comparison of Trick logged data files. TrickWorkflow.Comparison uses these
+functions to compare a run's logged data against its baseline either byte for
+byte, streaming both files rather than reading them into memory, or
+numerically, comparing each recorded variable within absolute and relative
+tolerances and reporting where and by how much the data diverges.
+
+Numeric comparisons read CSV (.csv), Trick binary (.trk), and HDF5 (.h5) logs
+a block of rows at a time. They require numpy, and HDF5 logs also require
+h5py.
+"""
+
+import collections, concurrent.futures, itertools, os, struct
+
+# Result of compare_logged_data(). max_errors maps each variable to its largest
+# absolute difference, first_divergence is None or a (time, [variables]) tuple
+# for the first row out of tolerance, and error describes any other problem.
+ComparisonResult = collections.namedtuple('ComparisonResult',
+  ['passed', 'max_errors', 'first_divergence', 'error'])
+
+# Name of the variable holding the sim time of each row
+time_variable = 'sys.exec.out.time'
+
+# numpy kind of each Trick type that a .trk file can record as a number, see
+# TRICK_TYPE in include/trick/parameter_types.h
+_trk_kinds = {1: 'i', 2: 'u', 4: 'i', 5: 'u', 6: 'i', 7: 'u', 8: 'i', 9: 'u', 10: 'f',
+  11: 'f', 12: 'i', 13: 'u', 14: 'i', 15: 'u', 17: 'u', 21: 'i'}
+
+def files_identical(a, b, chunk_size=1 << 20):
+    """
+    Compare two files byte for byte, a chunk at a time.
+
+    >>> files_identical(__file__, __file__)
+    True
+
+    Parameters
+    ----------
+    a : str
+        Path to a file
+    b : str
+        Path to another file
+    chunk_size : int
+        Number of bytes to read from each file at a time
+
+    Returns
+    -------
+    bool
+        True if the files' contents are identical
+    """
+    if os.path.getsize(a) != os.path.getsize(b):
+        return False
+    with open(a, 'rb') as fa, open(b, 'rb') as fb:
+        while True:
+            chunk = fa.read(chunk_size)
+            if chunk != fb.read(chunk_size):
+                return False
+            if not chunk:
+                return True
+
+def _read_csv(path, rows):
+    import numpy
+    with open(path) as f:
+        header = f.readline()
+        names = [column.split('{')[0].strip() for column in header.split(',')]
+        yield names
+        read = 0
+        while True:
+            lines = list(itertools.islice(f, rows))
+            if not lines:
+                return
+            lines = [line for line in lines if not line.isspace()]
+            # numpy parses text with a separator in C without holding the GIL,
+            # unlike loadtxt, so compare_all() threads can parse in parallel
+            values = numpy.fromstring(''.join(lines).replace(',', ' '), sep=' ')
+            if values.size != len(lines) * len(names):
+                raise ValueError('%s rows %d to %d do not hold %d numbers each'
+                  % (path, read + 1, read + len(lines), len(names)))
+            read += len(lines)
+            if lines:
+                yield values.reshape(len(lines), len(names))
+
+def _read_trk(path, rows):
+    import numpy
+    with open(path, 'rb') as f:
+        magic = f.read(10)
+        if not magic.startswith(b'Trick-'):
+            raise ValueError('%s is not a Trick binary log' % path)
+        order = '<' if magic.endswith(b'L') else '>'
+        def read_int():
+            return struct.unpack(order + 'i', f.read(4))[0]
+        names, formats, numeric = [], [], []
+        for i in range(read_int()):
+            names.append(f.read(read_int()).decode(errors='replace'))
+            f.read(read_int())  # units
+            kind, size = _trk_kinds.get(read_int()), read_int()
+            formats.append(order + kind + str(size) if kind else 'V%d' % size)
+            if kind:
+                numeric.append(i)
+        record = numpy.dtype([('f%d' % i, fmt) for i, fmt in enumerate(formats)])
+        yield [names[i] for i in numeric]
+        while True:
+            data = f.read(rows * record.itemsize)
+            count = len(data) // record.itemsize
+            if not count:
+                return
+            data = numpy.frombuffer(data[:count * record.itemsize], record)
+            yield numpy.column_stack([data['f%d' % i].astype(float) for i in numeric])
+
+def _read_hdf5(path, rows):
+    import numpy
+    try:
+        import h5py
+    except ImportError:
+        raise ImportError('h5py is required to compare HDF5 logs numerically')
+    with h5py.File(path, 'r') as f:
+        names = [n.decode() if isinstance(n, bytes) else str(n)
+          for n in f['header/param_names'][:]]
+        yield names
+        datasets = [f[n] for n in names]
+        length = min(len(d) for d in datasets) if datasets else 0
+        for start in range(0, length, rows):
+            yield numpy.column_stack([d[start:start + rows].astype(float) for d in datasets])
+
+def read_logged_data(path, rows=65536):
+    """
+    Read a logged data file a block of rows at a time.
+
+    Parameters
+    ----------
+    path : str
+        Path to a .csv, .trk, or .h5 file
+    rows : int
+        Maximum number of rows per block
+
+    Returns
+    -------
+    generator
+        Generator yielding the list of variable names, then 2-D numpy arrays
+        of float with one column per variable
+
+    Raises
+    ------
+    ValueError
+        If the file's format cannot be determined from its extension
+    """
+    extension = os.path.splitext(path)[1].lower()
+    readers = {'.csv': _read_csv, '.trk': _read_trk, '.h5': _read_hdf5, '.hdf5': _read_hdf5}
+    if extension not in readers:
+        raise ValueError('Cannot compare %s numerically, expected a .csv, .trk, or .h5 file' % path)
+    return readers[extension](path, rows)
+
+def compare_logged_data(test_data, baseline_data, tolerances=None, rows=65536):
+    """
+    Compare two logged data files variable by variable, row by row. A value
+    is within tolerance if its absolute difference from the baseline is no
+    more than absolute + relative * abs(baseline). NaNs match NaNs.
+
+    Parameters
+    ----------
+    test_data : str
+        Path to the test logged data file
+    baseline_data : str
+        Path to the baseline logged data file
+    tolerances : dict or None
+        Dictionary of variable name to (absolute, relative) tolerance. The key
+        '*' sets the tolerance of all variables not named. Variables without a
+        tolerance must match exactly.
+    rows : int
+        Number of rows to read from each file at a time
+
+    Returns
+    -------
+    ComparisonResult
+        Whether the files match, and the details of any differences
+    """
+    import numpy
+    tolerances = tolerances or {}
+    try:
+        test, baseline = read_logged_data(test_data, rows), read_logged_data(baseline_data, rows)
+        test_names, names = next(test), next(baseline)
+    except (OSError, ValueError, ImportError, KeyError, StopIteration) as e:
+        return ComparisonResult(False, {}, None, str(e))
+    missing = [n for n in names if n not in test_names]
+    unexpected = [n for n in test_names if n not in names]
+    if missing or unexpected:
+        return ComparisonResult(False, {}, None, 'Variables differ: missing %s, unexpected %s'
+          % (missing or 'none', unexpected or 'none'))
+    columns = [test_names.index(n) for n in names]
+    time = names.index(time_variable) if time_variable in names else 0
+    default = tolerances.get('*', (0, 0))
+    absolute, relative = numpy.array([tolerances.get(n, default) for n in names],
+      dtype=float).reshape(-1, 2).T
+    max_errors = numpy.zeros(len(names))
+    first_divergence = None
+    counts = [0, 0]
+    t = b = numpy.empty((0, len(names)))
+    try:
+        while True:
+            if not len(t):
+                t = next(test, None)
+                t = t[:, columns] if t is not None else None
+                counts[0] += len(t) if t is not None else 0
+            if not len(b):
+                b = next(baseline, None)
+                counts[1] += len(b) if b is not None else 0
+            if t is None or b is None:
+                break
+            n = min(len(t), len(b))
+            tn, bn = t[:n], b[:n]
+            with numpy.errstate(invalid='ignore'):
+                errors = numpy.abs(tn - bn)
+                same = (tn == bn) | (numpy.isnan(tn) & numpy.isnan(bn))
+                errors[same] = 0
+                errors[numpy.isnan(errors)] = numpy.inf
+                bad = errors > absolute + relative * numpy.abs(bn)
+            max_errors = numpy.maximum(max_errors, errors.max(axis=0))
+            if first_divergence is None and bad.any():
+                row = bad.any(axis=1).argmax()
+                first_divergence = (float(bn[row, time]),
+                  [names[j] for j in numpy.flatnonzero(bad[row])])
+            t, b = t[n:], b[n:]
+        # Count whatever is left of the longer file
+        counts[0] += sum(len(block) for block in test) if t is not None else 0
+        counts[1] += sum(len(block) for block in baseline) if b is not None else 0
+    except (OSError, ValueError) as e:
+        return ComparisonResult(False, dict(zip(names, max_errors.tolist())),
+          first_divergence, str(e))
+    error = None
+    if counts[0] != counts[1]:
+        error = 'Test data has %d rows but baseline data has %d' % tuple(counts)
+    return ComparisonResult(first_divergence is None and error is None,
+      dict(zip(names, max_errors.tolist())), first_divergence, error)
+
+def compare_all(comparisons, max_workers=None):
+    """
+    Execute the compare() method of each of a list of comparisons, in parallel
+    threads. File reads, CSV parsing, and the numpy comparisons release the
+    GIL, so comparisons run in parallel, and unlike worker processes, threads
+    are safe to start while other threads are running.
+
+    Parameters
+    ----------
+    comparisons : list
+        TrickWorkflow.Comparison instances
+    max_workers : int or None
+        Maximum number of threads, or None for one per CPU
+    """
+    if len(comparisons) < 2 or max_workers == 1:
+        for comparison in comparisons:
+            comparison.compare()
+        return
+    with concurrent.futures.ThreadPoolExecutor(
+      max_workers=max_workers or os.cpu_count()) as executor:
+        for future in [executor.submit(c.compare) for c in comparisons]:
+            future.result()
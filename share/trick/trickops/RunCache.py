@@ -0,0 +1,238 @@
+"""
+Content-addressed cache of Trick run results. When a RunCache is assigned to
+TrickWorkflow.run_cache, execute_all() looks up each run that has comparisons
+and no analysis just before starting it. Runs are keyed by a hash of everything their result
+depends on: the sim binary, the input file and the Python files it imports or
+executes, the sim's Modified_data directory, the command line, and the
+environment. On a hit, the run's logged data files named in its 'compare'
+entries and its log are restored from the cache instead of running the sim.
+Runs that succeed are stored in the cache as they finish.
+
+Anything else a run reads, such as data files outside Modified_data, is not
+part of the key. Clear the cache (delete its directory) if such files change.
+"""
+
+import ast, hashlib, json, os, shutil, sys, tempfile
+
+# String literals parse as ast.Str before Python 3.8, and ast.Str is gone in 3.12
+if sys.version_info >= (3, 8):
+    def _string_literal(node):
+        return node.value if isinstance(node, ast.Constant) and isinstance(node.value, str) else None
+else:
+    def _string_literal(node):
+        return node.s if isinstance(node, ast.Str) else None
+
+class RunCache(object):
+    """
+    A directory of cached run results.
+
+    >>> cache = RunCache(tempfile.mkdtemp())
+    >>> cache.environment
+    ('PATH', 'LD_LIBRARY_PATH', 'PYTHONPATH')
+    >>> shutil.rmtree(cache.directory)
+    """
+    def __init__(self, directory, environment=('PATH', 'LD_LIBRARY_PATH', 'PYTHONPATH')):
+        """
+        Open or create a cache.
+
+        Parameters
+        ----------
+        directory : str
+            Path to the cache directory, which is created if it does not exist
+        environment : tuple of str
+            Names of environment variables, in addition to all TRICK_*
+            variables, whose values are part of every key
+        """
+        self.directory = directory
+        self.environment = tuple(environment)
+        self._digests = {}  # path to (size, mtime, digest) of previously hashed files
+        os.makedirs(directory, exist_ok=True)
+
+    def _file_digest(self, path):
+        """
+        Get the SHA-256 hex digest of a file's contents, reusing the previous
+        digest if the file's size and modification time have not changed.
+        """
+        stat = os.stat(path)
+        cached = self._digests.get(path)
+        if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        self._digests[path] = (stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _referenced_files(path, search_dirs):
+        """
+        Get the existing files a Python file imports as modules or names in
+        string literals ending in .py, e.g. exec(open('Modified_data/x.py').read()),
+        looking for each relative to search_dirs and the file's own directory.
+        """
+        try:
+            with open(path, 'rb') as f:
+                tree = ast.parse(f.read(), filename=path)
+        except (SyntaxError, ValueError):
+            return []
+        here = os.path.dirname(path)
+        candidates = []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                modules = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom):
+                base = (node.module or '').split('.') if node.module else []
+                modules = ['.'.join(base + [alias.name]) for alias in node.names]
+                if node.module:
+                    modules.append(node.module)
+            elif _string_literal(node) is not None:
+                if _string_literal(node).endswith('.py'):
+                    candidates.extend(os.path.join(d, _string_literal(node))
+                      for d in search_dirs + [here])
+                continue
+            else:
+                continue
+            dirs = [here] if getattr(node, 'level', 0) else search_dirs + [here]
+            for module in modules:
+                module = module.replace('.', os.sep)
+                for d in dirs:
+                    candidates.append(os.path.join(d, module + '.py'))
+                    candidates.append(os.path.join(d, module, '__init__.py'))
+        return [os.path.normpath(c) for c in candidates if os.path.isfile(c)]
+
+    def get_input_files(self, run):
+        """
+        Get the files a run's input file depends on: the input file itself, the
+        Python files it imports or executes, transitively, and every file in
+        the sim's Modified_data directory.
+
+        Parameters
+        ----------
+        run : TrickWorkflow.Run
+            The run
+
+        Returns
+        -------
+        list
+            Sorted list of file paths
+        """
+        files = set()
+        pending = [os.path.normpath(os.path.join(run.sim_dir, run.just_input))]
+        while pending:
+            path = pending.pop()
+            if path in files or not os.path.isfile(path):
+                continue
+            files.add(path)
+            pending.extend(self._referenced_files(path, [run.sim_dir]))
+        for root, dirs, names in os.walk(os.path.join(run.sim_dir, 'Modified_data')):
+            files.update(os.path.normpath(os.path.join(root, n)) for n in names)
+        return sorted(files)
+
+    def key(self, run):
+        """
+        Get the key of a run's result.
+
+        Parameters
+        ----------
+        run : TrickWorkflow.Run
+            The run
+
+        Returns
+        -------
+        str or None
+            Hex digest identifying the run's result, or None if the run's
+            binary does not exist
+        """
+        binary = os.path.join(run.sim_dir, run.binary)
+        if not os.path.isfile(binary):
+            return None
+        environment = sorted((name, value) for name, value in os.environ.items()
+          if name.startswith('TRICK_') or name in self.environment)
+        contents = {
+          'binary': self._file_digest(binary),
+          'inputs': [(os.path.relpath(f, run.sim_dir), self._file_digest(f))
+            for f in self.get_input_files(run)],
+          'command': run.get_run_job()._run_command,
+          'returns': run.returns,
+          'environment': environment,
+          'outputs': [c.test_data for c in run.comparisons],
+          }
+        return hashlib.sha256(json.dumps(contents, sort_keys=True).encode(
+          errors='surrogateescape')).hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def restore(self, key, run):
+        """
+        Copy a cached result's logged data files to where the run writes them.
+
+        Parameters
+        ----------
+        key : str
+            The key returned by key()
+        run : TrickWorkflow.Run
+            The run
+
+        Returns
+        -------
+        str or None
+            Path to the cached log of the run, or None if the result is not
+            in the cache
+        """
+        entry = self._entry(key)
+        try:
+            with open(os.path.join(entry, 'manifest.json')) as f:
+                outputs = json.load(f)['outputs']
+        except (OSError, ValueError, KeyError):
+            return None
+        for i, output in enumerate(outputs):
+            directory = os.path.dirname(output)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            shutil.copyfile(os.path.join(entry, str(i)), output)
+        return os.path.join(entry, 'log.txt')
+
+    def store(self, key, run, log_file):
+        """
+        Add a successful run's logged data files and log to the cache. Runs
+        which did not write all of their data files are not stored.
+
+        Parameters
+        ----------
+        key : str
+            The key returned by key() before the run started
+        run : TrickWorkflow.Run
+            The run
+        log_file : str
+            Path to the log of the run
+
+        Returns
+        -------
+        bool
+            True if the result was stored
+        """
+        outputs = [c.test_data for c in run.comparisons]
+        if not all(os.path.isfile(o) for o in outputs):
+            return False
+        entry = self._entry(key)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        # Build the entry beside its final location and rename it into place,
+        # so concurrent workflows never see a partial entry
+        staging = tempfile.mkdtemp(dir=os.path.dirname(entry))
+        try:
+            for i, output in enumerate(outputs):
+                shutil.copyfile(output, os.path.join(staging, str(i)))
+            if os.path.isfile(log_file):
+                shutil.copyfile(log_file, os.path.join(staging, 'log.txt'))
+            else:
+                open(os.path.join(staging, 'log.txt'), 'w').close()
+            with open(os.path.join(staging, 'manifest.json'), 'w') as f:
+                json.dump({'outputs': outputs}, f)
+            os.rename(staging, entry)
+        except OSError:
+            # Another workflow stored the same result first
+            shutil.rmtree(staging, ignore_errors=True)
+            return os.path.isdir(entry)
+        return True
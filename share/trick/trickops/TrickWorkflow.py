@@ -7,10 +7,13 @@ Requires: python3 and requirements.txt containing:
   PyYAML         # For reading input yml files
   psutil         # For child process acquisition
 """
-import os, sys, threading, socket, abc, time, re, copy, subprocess, hashlib, inspect
+import os, sys, threading, socket, abc, time, re, copy, subprocess, hashlib, inspect, collections, shlex
+import collections.abc, concurrent.futures, glob, json, mmap, shutil, struct
 from TrickWorkflowYamlVerifier import *  # TODO revisit this import - Jordan
 
 from WorkflowCommon import *
+from RunCache import RunCache
+import LoggedData
 import pprint
 # Import Trick natively supported python variable server utilities
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(
@@ -187,6 +190,9 @@ class TrickWorkflow(WorkflowCommon):
         self.trick_dir = trick_dir
         self.trick_host_cpu = self.get_trick_host_cpu()
         self.env = ''
+        self.run_cache = None           # Optional RunCache used by execute_all()
+        self.skip_unchanged_builds = False  # Skip builds of sims whose dependencies haven't changed
+        self.progress_source = 'file'   # Where runs get progress: 'file' or 'variable_server'
         self.config = self.yaml_verifier.verify()
         self.parsing_errors = self.yaml_verifier.parsing_errors  # All errors found during parsing
         for e in self.parsing_errors:
@@ -228,7 +234,7 @@ class TrickWorkflow(WorkflowCommon):
             description=self.config[s]['description'], labels=self.config[s]['labels'],
             prebuild_cmd=self.env, build_cmd=trick_CP,
             cpus=self.cpus, size=self.config[s]['size'], phase=self.config[s]['phase'],
-            log_dir=self.log_dir)
+            log_dir=self.log_dir, binary=self.config[s]['binary'])
           all_sim_paths.append(self.config[s]['path'])
 
           all_run_paths = []   # Keep a list of all paths for uniqueness check
@@ -251,14 +257,17 @@ class TrickWorkflow(WorkflowCommon):
                           binary= self.config[s]['binary'], prerun_cmd=self.env,
                           returns=self.config[s]['runs'][r]['returns'],
                           valgrind_flags=self.config[s]['runs'][r]['valgrind'],
-                          phase=self.config[s]['runs'][r]['phase'], log_dir=self.log_dir)
+                          phase=self.config[s]['runs'][r]['phase'], log_dir=self.log_dir,
+                          memory=self.config[s]['runs'][r]['memory'],
+                          cpus=self.config[s]['runs'][r]['cpus'])
 
             # The check for list allows all other non-list types in the yaml file,
             # allowing groups to define their own comparison methodology
             if isinstance(self.config[s]['runs'][r]['compare'], list):
               for cmp in self.config[s]['runs'][r]['compare']:
                 lhs, rhs = [ s.strip() for s in cmp.split(' vs.') ]
-                thisRun.add_comparison(test_data=lhs, baseline_data=rhs)
+                thisRun.add_comparison(test_data=lhs, baseline_data=rhs,
+                  tolerances=self.config[s]['runs'][r]['tolerances'])
 
             if self.config[s]['runs'][r]['analyze'] is not None:
               thisRun.add_analysis(cmd=self.config[s]['runs'][r]['analyze'])
@@ -272,8 +281,7 @@ class TrickWorkflow(WorkflowCommon):
                   % (r, s, self.config_file, e) )
               cprint(msg, 'DARK_RED')
 
-            for r in theseRuns:
-              thisSim.add_run(r)      # Add Run/Runs to this Sim()
+            thisSim.add_runs(theseRuns)  # Add Run/Runs to this Sim()
 
             all_run_paths.append(just_RUN_dir)  # Keep track of all runs to check parallel safety
 
@@ -410,11 +418,15 @@ class TrickWorkflow(WorkflowCommon):
         Print a summary of all jobs executed, and return 'SUCCESS' if all were successful, 'FAILURE'
         if any job was not successful
         """
+        # Runs of a [min-max] range which were never created never executed either
+        created_runs     = [ run for sim in self.sims for run in sim.runs.get_created_runs() ]
+        created_valgrind = [ run for sim in self.sims for run in sim.valgrind_runs.get_created_runs() ]
+
         all_builds      = self.get_jobs(kind='build')
-        all_runs        = self.get_jobs(kind='run')
-        all_analysis    = self.get_jobs(kind='analysis')
-        all_comparisons = self.get_comparisons()
-        all_valgrind    = self.get_jobs(kind='valgrind')
+        all_runs        = [ run.run_job for run in created_runs if run.run_job ]
+        all_analysis    = [ run.analysis for run in created_runs + created_valgrind if run.analysis ]
+        all_comparisons = [ c for run in created_runs for c in run.comparisons ]
+        all_valgrind    = [ run.run_job for run in created_valgrind if run.run_job ]
 
         executed_builds = [ build for build in all_builds if build.get_status() != Job.Status.NOT_STARTED ]
         executed_runs   = [ run for run in all_runs if run.get_status() != Job.Status.NOT_STARTED ]
@@ -446,20 +458,27 @@ class TrickWorkflow(WorkflowCommon):
         else:
           return 'FAILURE'
 
-    def compare(self):
+    def compare(self, max_workers=None):
         """
-        Execute sim.compare() on all sims in self.sims
+        Execute all comparisons of all sims in self.sims, in parallel threads
 
         >>> tw = TrickWorkflow(project_top_level=this_trick, log_dir='/tmp/', trick_dir=this_trick, config_file=os.path.join(this_trick,"share/trick/trickops/tests/trick_sims.yml"))
         >>> tw.compare()
         True
 
+        Parameters
+        ----------
+        max_workers : int or None
+            Maximum number of comparisons to execute at once, defaults to self.cpus
+
         Returns
         -------
         bool
             True if any comparison failed. False if all were successful.
         """
-        return any([sim.compare() for sim in self.sims])
+        comparisons = self.get_comparisons()
+        LoggedData.compare_all(comparisons, max_workers or self.cpus)
+        return any([c.get_status() != Job.Status.SUCCESS for c in comparisons])
 
     def get_jobs(self, kind, phase=None):
         """
@@ -504,12 +523,176 @@ class TrickWorkflow(WorkflowCommon):
         else:
             raise TypeError('get_jobs() only accepts kinds: build, run, valgrind, analysis')
         # If these jobs are of type SingleRun and self.quiet is True, tell the jobs to
-        # skip the variable server connection logic
+        # skip the progress logic, otherwise tell them where to get progress from
         for job in jobs:
-            if self.quiet and isinstance(job, SingleRun):
-                job.set_use_var_server(False)
+            if isinstance(job, SingleRun):
+                job.set_progress_source(self.progress_source)
+                if self.quiet:
+                    job.set_use_var_server(False)
         return (jobs)
 
+    def get_job_dependencies(self, phase=None):
+        """
+        Return the Jobs each build, run, valgrind, and analysis Job must wait
+        for, for use with execute_jobs(). Every run and valgrind run depends on
+        its sim's build, and every analysis depends on its run. Builds and runs
+        with a non-default phase also depend on all builds or runs,
+        respectively, in the next lower phase.
+
+        >>> tw = TrickWorkflow(project_top_level=this_trick, log_dir='/tmp/', trick_dir=this_trick, config_file=os.path.join(this_trick,"share/trick/trickops/tests/trick_sims.yml"))
+        >>> deps = tw.get_job_dependencies()
+        >>> sim = tw.get_sim('SIM_ball_L1')
+        >>> deps[sim.get_runs()[0].get_run_job()] == [sim.get_build_job()]
+        True
+
+        Parameters
+        ----------
+        phase : int, list of ints, or None
+            Optional filter to include only jobs of phase or phases given
+
+        Returns
+        -------
+        dict
+            Dictionary of Job to list of prerequisite Jobs
+        """
+        phases = TrickWorkflow.listify_phase(phase)
+        dependencies = collections.defaultdict(list)
+        builds = collections.defaultdict(list)  # phase to build jobs
+        runs = collections.defaultdict(list)    # phase to run and valgrind jobs
+        for sim in self.sims:
+            if sim.phase in phases:
+                builds[sim.phase].append(sim.get_build_job())
+            for run in sim.runs + sim.valgrind_runs:
+                if run.phase not in phases:
+                    continue
+                run_job = run.get_run_job()
+                runs[run.phase].append(run_job)
+                dependencies[run_job].append(sim.get_build_job())
+                if run.analysis:
+                    dependencies[run.analysis].append(run_job)
+        # Phases order jobs of the same kind
+        for jobs_by_phase in (builds, runs):
+            ordered = sorted(jobs_by_phase)
+            for previous, current in zip(ordered, ordered[1:]):
+                for job in jobs_by_phase[current]:
+                    dependencies[job].extend(jobs_by_phase[previous])
+        return dict(dependencies)
+
+    def execute_jobs(self, jobs, max_concurrent=None, header=None, job_timeout=None,
+                     dependencies=None, on_finish=None):
+        """
+        Execute jobs as WorkflowCommon.execute_jobs() does. If
+        self.skip_unchanged_builds is True, sim build jobs among them are skipped
+        if their sim's build fingerprint (see Sim.get_build_fingerprint()) matches
+        the one stored by its last successful build, checking all sims in
+        parallel, and the fingerprints of successful builds are stored.
+
+        Parameters and return value are the same as WorkflowCommon.execute_jobs()
+        """
+        jobs = list(jobs)
+        builds = {}  # build job to Sim, for builds that haven't run
+        if self.skip_unchanged_builds:
+            sims = {sim.build_job: sim for sim in self.sims if sim.build_job}
+            builds = {job: sims[job] for job in jobs if job in sims and
+              job.get_status() is Job.Status.NOT_STARTED}
+            with concurrent.futures.ThreadPoolExecutor() as executor:
+                up_to_date = list(executor.map(
+                  lambda sim: sim.build_is_up_to_date(), builds.values()))
+            for sim, skip in zip(builds.values(), up_to_date):
+                if skip:
+                    sim.skip_build()
+
+        def finish(job):
+            sim = builds.get(job)
+            if sim and not sim.build_skipped and job.get_status() is Job.Status.SUCCESS:
+                sim.store_build_fingerprint()
+            if on_finish:
+                on_finish(job)
+
+        return super().execute_jobs(jobs, max_concurrent=max_concurrent, header=header,
+          job_timeout=job_timeout, dependencies=dependencies, on_finish=finish)
+
+    def execute_all(self, phase=None, max_concurrent=None, header=None, job_timeout=None):
+        """
+        Execute all build, run, valgrind, and analysis jobs as a single dependency
+        graph (see get_job_dependencies()) and compare each run's logged data, in
+        worker threads, as soon as the run succeeds. Unlike executing each kind of job with a separate
+        call to execute_jobs(), work starts as soon as its inputs are ready: a sim's
+        runs start once that sim is built rather than once every sim is built.
+        Jobs whose prerequisites fail are not run.
+
+        If self.run_cache is set to a RunCache, each run with comparisons is looked
+        up in the cache when it is ready to start, and the logged data files named
+        in its comparisons are restored from the cache on a hit rather than running
+        the sim. Successful runs are added to the cache. Runs with an analysis are
+        never cached, since the analysis may read any of the run's output.
+
+        Parameters
+        ----------
+        phase : int, list of ints, or None
+            Optional filter to execute only jobs of phase or phases given
+        max_concurrent : int
+            The maximum number of jobs to execute simultaneously
+        header : str
+            Header text
+        job_timeout : float
+            Seconds after which a running job is killed, or None for no limit
+
+        Returns
+        -------
+        bool
+            True if any job failed or was not run or any comparison failed.
+            False if everything succeeded.
+        """
+        phases = TrickWorkflow.listify_phase(phase)
+        jobs = []
+        comparisons = {}  # run job to Run, for runs with comparisons
+        # Keep each sim's jobs together so that its runs are started before
+        # builds of sims listed after it
+        for sim in self.sims:
+            if sim.phase in phases:
+                jobs.append(sim.get_build_job())
+            for run in sim.runs + sim.valgrind_runs:
+                if run.phase in phases:
+                    jobs.append(run.get_run_job())
+                    if run.analysis:
+                        jobs.append(run.analysis)
+            comparisons.update((run.get_run_job(), run) for run in sim.runs
+              if run.phase in phases and run.comparisons)
+        for job in jobs:
+            if isinstance(job, SingleRun):
+                job.set_progress_source(self.progress_source)
+                if self.quiet:
+                    job.set_use_var_server(False)
+        for job, run in comparisons.items():
+            job.set_result_cache(None if run.analysis else self.run_cache, run)
+
+        # Comparisons execute in worker threads while other jobs keep running, on
+        # whatever CPUs the jobs leave free
+        pending = {}  # Future to Comparison
+        executor = concurrent.futures.ThreadPoolExecutor(
+          max_workers=max(1, self.cpus - (max_concurrent or self.cpus)))
+        def compare(job):
+            run = comparisons.get(job)
+            if not run or job.get_status() is not Job.Status.SUCCESS:
+                return
+            if self.run_cache and job._cache_key and not job.cached:
+                self.run_cache.store(job._cache_key, run, job.log_file)
+            for comparison in run.comparisons:
+                pending[executor.submit(comparison.compare)] = comparison
+
+        try:
+            failed = self.execute_jobs(jobs, max_concurrent=max_concurrent,
+              header=header, job_timeout=job_timeout,
+              dependencies=self.get_job_dependencies(phase), on_finish=compare)
+            for future in pending:
+                future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown()
+        return failed or any(c.get_status() != Job.Status.SUCCESS for c in pending.values())
+
     def get_comparisons(self):
         """
         Return a list of all Comparison() instances from the self.sims structure
@@ -639,7 +822,8 @@ class TrickWorkflow(WorkflowCommon):
         stored in the TrickWorkflow.sims list.
         """
         def __init__(self, name, sim_dir, description=None, labels=[], prebuild_cmd='',
-                     build_cmd='trick-CP', cpus=3, size=2200000, phase=0, log_dir='/tmp'):
+                     build_cmd='trick-CP', cpus=3, size=2200000, phase=0, log_dir='/tmp',
+                     binary=None):
             """
             Initialize this instance.
 
@@ -666,6 +850,9 @@ class TrickWorkflow(WorkflowCommon):
                 execution is not robust
              log_dir: str
                 Directory in which log files will be written
+             binary: str
+                Optional name of the sim binary the build produces, required to
+                skip unchanged builds
             """
             self.name = name               # Name of sim
             self.sim_dir = sim_dir         # Path to sim directory wrt to top level of project
@@ -677,9 +864,11 @@ class TrickWorkflow(WorkflowCommon):
             self.size = size               # Estimated size of successful build output in bytes
             self.phase = phase             # Phase associated with this sim build
             self.log_dir = log_dir         # Directory for which log file should be written
+            self.binary = binary           # Name of sim binary
             self.build_job = None          # Contains Build Job instance
-            self.runs = []                 # List of normal Run instances
-            self.valgrind_runs = []        # List of valgrind Run instances
+            self.build_skipped = False     # True if the build job was skipped as up to date
+            self.runs = TrickWorkflow.RunList()           # List of normal Run instances
+            self.valgrind_runs = TrickWorkflow.RunList()  # List of valgrind Run instances
             self.printer = ColorStr()      # Color printer utility
 
         def get_build_job( self):
@@ -705,6 +894,130 @@ class TrickWorkflow(WorkflowCommon):
                     size=self.size )
             return (self.build_job)
 
+        # Environment variables, in addition to all TRICK_* variables, that
+        # are part of build fingerprints
+        build_environment = ('PATH', 'LD_LIBRARY_PATH', 'CC', 'CXX')
+
+        def _get_build_dependencies(self):
+            """
+            Return the set of files the last build of this sim listed as dependencies
+            in the make dependency files in its build directory (*.d, Makefile_S_define,
+            Makefile_src_deps, Makefile_swig_deps) and in build/S_library_list, plus
+            the S_define and optional S_*.mk makefiles.
+            """
+            dependencies = set(os.path.join(self.sim_dir, f) for f in
+              ('S_define', 'S_overrides.mk', 'S_pre.mk', 'S_post.mk'))
+            build_dir = os.path.join(self.sim_dir, 'build')
+            for root, dirs, files in os.walk(build_dir):
+                for f in files:
+                    path = os.path.join(root, f)
+                    if f == 'S_library_list':
+                        with open(path, errors='replace') as lines:
+                            dependencies.update(l.strip() for l in lines if l.strip())
+                    elif f.endswith('.d') or f in ('Makefile_S_define',
+                      'Makefile_src_deps', 'Makefile_swig_deps'):
+                        with open(path, errors='replace') as rules:
+                            text = rules.read().replace('\\\n', ' ')
+                        for rule in text.splitlines():
+                            targets, colon, prerequisites = rule.partition(':')
+                            if colon and not rule.lstrip().startswith('#'):
+                                # Order-only prerequisites follow a |
+                                dependencies.update(p for p in prerequisites.split()
+                                  if p != '|')
+            return set(os.path.normpath(os.path.join(self.sim_dir, d))
+              for d in dependencies)
+
+        def get_build_fingerprint(self):
+            """
+            Fingerprint everything this sim's build depends on: the build command and
+            environment, the compiler, the Trick libraries, the S_define, and every file
+            the last build listed as a dependency, along with the binary the build
+            produced. Like make, files are compared by size and modification time
+            rather than contents.
+
+            >>> s = TrickWorkflow.Sim(name='alloc', sim_dir=os.path.join(this_trick, 'test/SIM_alloc_test'))
+            >>> s.get_build_fingerprint() is None  # No binary given
+            True
+
+            Returns
+            -------
+            str or None
+                Hex digest, or None if the binary was not given or does not exist
+            """
+            if not self.binary:
+                return None
+            files = self._get_build_dependencies()
+            files.add(os.path.join(self.sim_dir, self.binary))
+            for compiler in (os.environ.get('TRICK_CC', 'cc'), os.environ.get('TRICK_CXX', 'c++')):
+                path = shutil.which(compiler.split()[0]) if compiler.split() else None
+                if path:
+                    files.add(path)
+            trick_home = os.environ.get('TRICK_HOME')
+            executable = self.build_cmd.split()[0] if self.build_cmd.split() else ''
+            if executable.endswith(os.path.join('bin', 'trick-CP')):
+                trick_home = os.path.dirname(os.path.dirname(executable))
+            if trick_home:
+                files.update(glob.glob(os.path.join(trick_home, 'lib*', 'libtrick*')))
+            stats = {}
+            for f in sorted(files):
+                try:
+                    stat = os.stat(f)
+                    stats[f] = (stat.st_size, stat.st_mtime_ns)
+                except OSError:
+                    stats[f] = None
+            if stats[os.path.join(self.sim_dir, self.binary)] is None:
+                return None
+            environment = sorted((name, value) for name, value in os.environ.items()
+              if name.startswith('TRICK_') or name in self.build_environment)
+            return hashlib.sha256(json.dumps({
+              'command': [self.prebuild_cmd, self.build_cmd],
+              'environment': environment,
+              'files': stats,
+              }, sort_keys=True).encode(errors='surrogateescape')).hexdigest()
+
+        def _get_build_fingerprint_file(self):
+            # Inside build/ so that make clean discards it along with the build
+            return os.path.join(self.sim_dir, 'build', 'trickops_build_fingerprint')
+
+        def store_build_fingerprint(self):
+            """
+            Store this sim's build fingerprint, after a successful build, for
+            build_is_up_to_date() to compare against.
+            """
+            fingerprint = self.get_build_fingerprint()
+            if fingerprint and os.path.isdir(os.path.dirname(self._get_build_fingerprint_file())):
+                with open(self._get_build_fingerprint_file(), 'w') as f:
+                    f.write(fingerprint + '\n')
+
+        def build_is_up_to_date(self):
+            """
+            Check whether this sim's build fingerprint matches the one stored by its
+            last successful build, meaning building it again would change nothing.
+
+            >>> s = TrickWorkflow.Sim(name='alloc', sim_dir=os.path.join(this_trick, 'test/SIM_alloc_test'))
+            >>> s.build_is_up_to_date()
+            False
+
+            Returns
+            -------
+            bool
+                True if the sim is up to date
+            """
+            try:
+                with open(self._get_build_fingerprint_file()) as f:
+                    stored = f.read().strip()
+            except OSError:
+                return False
+            return stored == self.get_build_fingerprint()
+
+        def skip_build(self):
+            """
+            Make this sim's build job succeed without building.
+            """
+            job = self.get_build_job()
+            job._command = 'echo %s' % shlex.quote(self.sim_dir + ' is up to date, skipping build')
+            self.build_skipped = True
+
         def get_run_jobs( self, kind='normal', phase=None):
             """
             Collect all SingleRun() instances and return them for all sims subject to the filtering
@@ -786,10 +1099,8 @@ class TrickWorkflow(WorkflowCommon):
             if type(input_file) != str:
                 raise TypeError('get_run() only accepts the unique key representing the entire input to'
                   ' the sim binary. Ex: "RUN_test/input.py --flags-too"')
-            for run in self.runs:
-                if run.input_file == input_file:
-                   return run
-            return None
+            index = self.runs.find(input_file)
+            return None if index is None else self.runs[index]
 
         def get_runs(self):
             """
@@ -869,6 +1180,31 @@ class TrickWorkflow(WorkflowCommon):
             else:
                 self.runs.append(run)
 
+        def add_runs( self, runs):
+            """
+            Add each of a list of Run() instances with add_run(), or all runs of a
+            RunRange() without creating them
+
+            >>> s = TrickWorkflow.Sim(name='alloc', sim_dir=os.path.join(this_trick, 'test/SIM_alloc_test'))
+            >>> r = TrickWorkflow.Run(sim_dir=os.path.join(this_trick, 'test/SIM_alloc_test'), input_file='RUN_[01-10]/input.py', binary='S_main_Linux_x86_64.exe')
+            >>> s.add_runs(r.multiply())
+            >>> len(s.runs)
+            10
+
+            Parameters
+            -------
+            runs : list of Run() or RunRange()
+                Instances to add
+            """
+            if isinstance(runs, TrickWorkflow.RunRange):
+                if runs.run.valgrind_flags:
+                    self.valgrind_runs.extend(runs)
+                else:
+                    self.runs.extend(runs)
+            else:
+                for run in runs:
+                    self.add_run(run)
+
         def pop_run( self, input_file):
             """
             Remove a run by its unique self.input_file value
@@ -888,9 +1224,9 @@ class TrickWorkflow(WorkflowCommon):
             Run()
                 Instance in this sim's runs list matching self.input_file
             """
-            for i, run in enumerate(self.runs):
-              if run.input_file == input_file:
-                 return self.runs.pop(i)
+            index = self.runs.find(input_file)
+            if index is not None:
+              return self.runs.pop(index)
 
         def compare( self):
             """
@@ -942,7 +1278,7 @@ class TrickWorkflow(WorkflowCommon):
         runs: sub-dict will become a single instance of this management class
         """
         def __init__(self, sim_dir, input_file, binary, prerun_cmd = '', returns=0, valgrind_flags=None,
-                     phase=0, log_dir='/tmp/'):
+                     phase=0, log_dir='/tmp/', memory=None, cpus=1):
             """
             Initialize this instance.
 
@@ -969,6 +1305,10 @@ class TrickWorkflow(WorkflowCommon):
                 execution is not robust
              log_dir : str
                 Directory in which log files will be written
+             memory : int
+                Optional expected peak memory use of this run in MiB
+             cpus : int
+                Number of CPUs this run keeps busy
             """
             self.sim_dir = sim_dir        # Path to sim directory wrt to top level of project for this run
             self.prerun_cmd = prerun_cmd  # Optional string to execute in shell immediately before running (env)
@@ -977,6 +1317,8 @@ class TrickWorkflow(WorkflowCommon):
             self.valgrind_flags = valgrind_flags  # If not None, this run is to be run in valgrind w/ these flags
             self.phase = phase            # Phase associated with this run
             self.log_dir = log_dir        # Dir where all logged output will go
+            self.memory = memory          # Expected peak memory use in MiB, if known
+            self.cpus = cpus              # Number of CPUs this run keeps busy
             self.just_input = self.input_file.split(' ')[0]  # Strip flags if any
             # Derive Just the "RUN_something" part of run_dir_path
             self.just_run_dir = os.path.dirname(self.just_input)
@@ -988,7 +1330,7 @@ class TrickWorkflow(WorkflowCommon):
             self.comparisons = []    # List of comparison objects associated with this run
             self.analysis = None     # Job instance of after-run-completes custom analysis
 
-        def add_comparison(self, test_data, baseline_data):
+        def add_comparison(self, test_data, baseline_data, tolerances=None):
             """
             Given two data directories, add a new Comparison() instance to self.comparisons list
 
@@ -1001,8 +1343,11 @@ class TrickWorkflow(WorkflowCommon):
                 path to file containing test logged data
             baseline_dir : str
                 path to file containing baseline logged data
+            tolerances : dict or None
+                Optional dictionary of variable name to (absolute, relative) tolerance for
+                a numeric comparison, see Comparison.__init__()
             """
-            comparison = TrickWorkflow.Comparison( test_data, baseline_data );
+            comparison = TrickWorkflow.Comparison( test_data, baseline_data, tolerances );
             self.comparisons.append( comparison )
 
         def add_analysis(self, cmd):
@@ -1133,27 +1478,29 @@ class TrickWorkflow(WorkflowCommon):
 
                 self.run_job = SingleRun(name=name, command=(cmd),
                     expected_exit_status=self.returns, log_file=logfile)
+                self.run_job.cpus = self.cpus
+                if self.memory:
+                    self.run_job.memory_hint = self.memory * 2**20
             return (self.run_job)
 
-        def _get_range_list(self, pattern):
+        def _get_range(self, pattern):
             """
             Given a string matching the following pattern:
               [<int1>-<int2>]     - One set of enclosed in square braces
               <int1> < <int2>     - First integer must be less than second integer
               <int1> & <int2> > 0 - Both integers must be positive
               [001-999]           - Leading zeros must be included and consistent
-            Return a list(range(int1, int2+1)) with leading zeros maintained in
-            string format
+            Return range(int1, int2+1) and the number of digits, including leading
+            zeros, of each integer in string format
 
             >>> r = TrickWorkflow.Run(sim_dir='test/SIM_alloc_test', input_file='RUN_[01-04]/input.py', binary='S_main_Linux_x86_64.exe')
-            >>> rl =r._get_range_list('[0-4]')
-            >>> len(rl)
-            5
+            >>> r._get_range('[01-04]')
+            (range(1, 5), 2)
 
             Returns
             -------
-            list()
-                List of zero-padded integer range as strings
+            tuple
+                (range, int) of the integers and their zero-padded width
             Raises
             ------
             RuntimeError
@@ -1181,10 +1528,29 @@ class TrickWorkflow(WorkflowCommon):
             if min >= (max):
               msg = ("ERROR: Pattern %s minimum must be less than maximum." % pattern)
               raise RuntimeError(msg)
-            range_list = []
-            for num in range(min, max+1):
-              range_list.append(str(num).zfill(leading_zeros))
-            return (list(range_list))
+            return range(min, max+1), leading_zeros
+
+        def _get_range_list(self, pattern):
+            """
+            Given a string matching the pattern described in _get_range(), return
+            a list(range(int1, int2+1)) with leading zeros maintained in string format
+
+            >>> r = TrickWorkflow.Run(sim_dir='test/SIM_alloc_test', input_file='RUN_[01-04]/input.py', binary='S_main_Linux_x86_64.exe')
+            >>> rl =r._get_range_list('[0-4]')
+            >>> len(rl)
+            5
+
+            Returns
+            -------
+            list()
+                List of zero-padded integer range as strings
+            Raises
+            ------
+            RuntimeError
+               If pattern is unrecognized or contains errors
+            """
+            values, leading_zeros = self._get_range(pattern)
+            return [str(num).zfill(leading_zeros) for num in values]
 
 
         def multiply(self):
@@ -1201,11 +1567,14 @@ class TrickWorkflow(WorkflowCommon):
             >>> runs = r.multiply()
             >>> len(runs)
             4
+            >>> runs[1].input_file
+            'RUN_02/input.py'
 
             Returns
             -------
-            list of Run()
-                Resultant list of Run() instances after expansion
+            list of Run() or RunRange()
+                [self] if there is no pattern, otherwise a RunRange() which creates
+                each expanded Run() only when it is first accessed
             Raises
             ------
             RuntimeError
@@ -1227,17 +1596,264 @@ class TrickWorkflow(WorkflowCommon):
             if rs is None:
               return [self]
             else:
-              range_list = self._get_range_list(rs)
-              multiplied_runs = []
-              for i in range_list:
-                # replace the range string notation with the single run equivalent
-                acopy = copy.deepcopy(self)
-                acopy.input_file = self.input_file.replace(rs, i)
-                # Add comparisons back as multiplied set
-                for c in acopy.comparisons:
-                  c.pattern_replace(expecting_pattern=rs, replace_with=i)
-                multiplied_runs.append(acopy)
-              return multiplied_runs
+              values, leading_zeros = self._get_range(rs)
+              # Check comparison patterns now rather than when each run is created
+              for c in self.comparisons:
+                TrickWorkflow.Comparison(c.test_data, c.baseline_data).pattern_replace(
+                  expecting_pattern=rs, replace_with=str(values[0]).zfill(leading_zeros))
+              return TrickWorkflow.RunRange(self, rs, values, leading_zeros)
+
+    class RunRange(collections.abc.Sequence):
+        """
+        Sequence of the Run() instances expanded from a Run() whose input_file uses
+        [min-max] notation, see Run.multiply(). Each Run() is created from the
+        parameters of the original when it is first accessed, so holding a range
+        costs the same no matter how many runs it covers.
+        """
+        def __init__(self, run, pattern, values, leading_zeros, created=None):
+            """
+            Initialize this instance.
+
+            >>> r = TrickWorkflow.Run(sim_dir='test/SIM_alloc_test', input_file='RUN_[0000-9999]/input.py', binary='S_main_Linux_x86_64.exe')
+            >>> runs = TrickWorkflow.RunRange(r, '[0000-9999]', range(0, 10000), 4)
+            >>> len(runs), len(runs.get_created_runs())
+            (10000, 0)
+            >>> runs[-1].input_file
+            'RUN_9999/input.py'
+            >>> runs.get_created_runs() == [runs[9999]]
+            True
+
+            Parameters
+            ----------
+            run : Run()
+                Run() with the [min-max] pattern in its input_file and comparisons
+            pattern : str
+                The [min-max] pattern itself
+            values : range
+                Integers to replace the pattern with
+            leading_zeros : int
+                Number of digits, including leading zeros, of each integer
+            created : dict or None
+                Integer to Run() already created, shared with ranges sliced from this one
+            """
+            self.run = run                      # Run() this range is expanded from
+            self.pattern = pattern              # [min-max] pattern being replaced
+            self.values = values                # range of integers replacing the pattern
+            self.leading_zeros = leading_zeros  # Zero-padded width of each integer
+            self._created = {} if created is None else created  # Integer to Run() created so far
+
+        def __len__(self):
+            return len(self.values)
+
+        def __getitem__(self, index):
+            if isinstance(index, slice):
+                return TrickWorkflow.RunRange(self.run, self.pattern, self.values[index],
+                  self.leading_zeros, self._created)
+            value = self.values[index]
+            if value not in self._created:
+                self._created[value] = self._create(str(value).zfill(self.leading_zeros))
+            return self._created[value]
+
+        def __iter__(self):
+            for index in range(len(self)):
+                yield self[index]
+
+        def _create(self, replace_with):
+            """
+            Return a new Run() with the pattern replaced by replace_with
+            """
+            run = self.run
+            new = TrickWorkflow.Run(sim_dir=run.sim_dir,
+              input_file=run.input_file.replace(self.pattern, replace_with), binary=run.binary,
+              prerun_cmd=run.prerun_cmd, returns=run.returns, valgrind_flags=run.valgrind_flags,
+              phase=run.phase, log_dir=run.log_dir, memory=run.memory, cpus=run.cpus)
+            for c in run.comparisons:
+                comparison = TrickWorkflow.Comparison(c.test_data, c.baseline_data, c.tolerances)
+                comparison.pattern_replace(expecting_pattern=self.pattern, replace_with=replace_with)
+                new.comparisons.append(comparison)
+            if run.analysis:
+                new.analysis = Job(name=run.analysis.name, command=run.analysis._command,
+                  log_file=run.analysis.log_file,
+                  expected_exit_status=run.analysis._expected_exit_status)
+            return new
+
+        def find(self, input_file):
+            """
+            Return the index of the run with the given input_file without creating
+            any runs, or None if this range has no such run
+
+            >>> r = TrickWorkflow.Run(sim_dir='test/SIM_alloc_test', input_file='RUN_[01-04]/input.py', binary='S_main_Linux_x86_64.exe')
+            >>> runs = r.multiply()
+            >>> runs.find('RUN_03/input.py'), runs.find('RUN_3/input.py')
+            (2, None)
+            """
+            prefix, _, suffix = self.run.input_file.partition(self.pattern)
+            digits = input_file[len(prefix):len(input_file) - len(suffix)]
+            if (not input_file.startswith(prefix) or not input_file.endswith(suffix)
+                or len(digits) != self.leading_zeros or not digits.isdigit()):
+                return None
+            value = int(digits)
+            return self.values.index(value) if value in self.values else None
+
+        def get_created_runs(self):
+            """
+            Return the list of runs in this range which have been created so far
+            """
+            return [self._created[value] for value in sorted(self._created)
+              if value in self.values]
+
+    class RunList(collections.abc.MutableSequence):
+        """
+        List of Run() instances which holds each RunRange() extending it as a whole
+        rather than as the runs it expands to, see Sim.add_runs(). Runs in a range
+        are only created when the list is indexed or iterated over.
+        """
+        def __init__(self, runs=()):
+            """
+            Initialize this instance.
+
+            >>> r = TrickWorkflow.Run(sim_dir='test/SIM_alloc_test', input_file='RUN_[01-04]/input.py', binary='S_main_Linux_x86_64.exe')
+            >>> runs = TrickWorkflow.RunList(r.multiply())
+            >>> len(runs)
+            4
+            >>> runs.pop(1).input_file
+            'RUN_02/input.py'
+            >>> [run.input_file for run in runs]
+            ['RUN_01/input.py', 'RUN_03/input.py', 'RUN_04/input.py']
+
+            Parameters
+            ----------
+            runs : iterable
+                Run() instances, or a RunRange(), to start with
+            """
+            self._chunks = []  # Run() and RunRange() instances, in order
+            self.extend(runs)
+
+        @staticmethod
+        def _chunk_len(chunk):
+            return len(chunk) if isinstance(chunk, TrickWorkflow.RunRange) else 1
+
+        def _locate(self, index):
+            """
+            Return the (chunk index, index within that chunk) of the run at index
+            """
+            if index < 0:
+                index += len(self)
+            if index >= 0:
+                for i, chunk in enumerate(self._chunks):
+                    if index < self._chunk_len(chunk):
+                        return i, index
+                    index -= self._chunk_len(chunk)
+            raise IndexError('run index out of range')
+
+        def _split(self, index):
+            """
+            Split any range the run at index belongs to around it and return the
+            chunk index of the run
+            """
+            i, offset = self._locate(index)
+            chunk = self._chunks[i]
+            if isinstance(chunk, TrickWorkflow.RunRange):
+                parts = [chunk[:offset], chunk[offset], chunk[offset+1:]]
+                self._chunks[i:i+1] = [p for p in parts if self._chunk_len(p)]
+                i += 1 if offset else 0
+            return i
+
+        def __len__(self):
+            return sum(self._chunk_len(chunk) for chunk in self._chunks)
+
+        def __getitem__(self, index):
+            if isinstance(index, slice):
+                return [self[i] for i in range(len(self))[index]]
+            i, offset = self._locate(index)
+            chunk = self._chunks[i]
+            return chunk[offset] if isinstance(chunk, TrickWorkflow.RunRange) else chunk
+
+        def __setitem__(self, index, run):
+            if isinstance(index, slice):
+                runs = list(self)
+                runs[index] = run
+                self._chunks = runs
+            else:
+                self._chunks[self._split(index)] = run
+
+        def __delitem__(self, index):
+            if isinstance(index, slice):
+                runs = list(self)
+                del runs[index]
+                self._chunks = runs
+            else:
+                del self._chunks[self._split(index)]
+
+        def __iter__(self):
+            for chunk in self._chunks:
+                if isinstance(chunk, TrickWorkflow.RunRange):
+                    yield from chunk
+                else:
+                    yield chunk
+
+        def __add__(self, other):
+            return list(self) + list(other)
+
+        def __radd__(self, other):
+            return list(other) + list(self)
+
+        def __eq__(self, other):
+            if not isinstance(other, (list, TrickWorkflow.RunList)):
+                return NotImplemented
+            return list(self) == list(other)
+
+        def __repr__(self):
+            return repr(list(self))
+
+        def insert(self, index, run):
+            length = len(self)
+            index = max(index + length, 0) if index < 0 else index
+            if index >= length:
+                self._chunks.append(run)
+                return
+            i, offset = self._locate(index)
+            if offset:
+                chunk = self._chunks[i]
+                self._chunks[i:i+1] = [chunk[:offset], chunk[offset:]]
+                i += 1
+            self._chunks.insert(i, run)
+
+        def extend(self, runs):
+            if isinstance(runs, TrickWorkflow.RunRange):
+                if len(runs):
+                    self._chunks.append(runs)
+            else:
+                for run in list(runs):
+                    self.append(run)
+
+        def find(self, input_file):
+            """
+            Return the index of the run with the given input_file, or None if
+            there is no such run, without creating any runs
+            """
+            start = 0
+            for chunk in self._chunks:
+                if isinstance(chunk, TrickWorkflow.RunRange):
+                    index = chunk.find(input_file)
+                    if index is not None:
+                        return start + index
+                elif chunk.input_file == input_file:
+                    return start
+                start += self._chunk_len(chunk)
+            return None
+
+        def get_created_runs(self):
+            """
+            Return the list of runs which have been created so far, in order
+            """
+            runs = []
+            for chunk in self._chunks:
+                if isinstance(chunk, TrickWorkflow.RunRange):
+                    runs += chunk.get_created_runs()
+                else:
+                    runs.append(chunk)
+            return runs
 
     class Comparison(object):
         """
@@ -1246,7 +1862,7 @@ class TrickWorkflow(WorkflowCommon):
           test_data:     path to file that represents test data (data generated by a run)
           baseline_data: path to file that represents baseline data for a run
         """
-        def __init__(self, test_data, baseline_data):
+        def __init__(self, test_data, baseline_data, tolerances=None):
             """
             Initialize this instance.
 
@@ -1258,40 +1874,53 @@ class TrickWorkflow(WorkflowCommon):
                 Path to a single test logged data file
             baseline_data : str
                 Path to a single baseline logged data file
+            tolerances : dict or None
+                Optional dictionary of variable name to (absolute, relative) tolerance,
+                with the key '*' applying to all other variables. If given, the files
+                are compared numerically rather than byte for byte
             """
             self.test_data = test_data           # Test data file with respect to project top level
             self.baseline_data = baseline_data   # Baseline data file with respect to project top level
+            self.tolerances = tolerances         # Per-variable tolerances, None for exact comparison
             self.status = Job.Status.NOT_STARTED # Status of comparison
             self.error = None                    # Error details if found
             self.missing = []                    # List of Strings with details of missing files if any
+            self.max_errors = {}                 # Variable to largest absolute difference, if numeric
+            self.first_divergence = None         # (time, [variables]) first out of tolerance, if numeric
 
         def compare(self):
             """
-            Execute an md5sum hash comparison of self.test_data vs. self.baseline_data.
+            Compare self.test_data vs. self.baseline_data, streaming both files byte for
+            byte, or, if tolerances were given, numerically (see LoggedData.py).
 
             >>> c = TrickWorkflow.Comparison('share/trick/trickops/tests/baselinedata/log_a.csv','share/trick/trickops/tests/testdata/log_a.csv')
             >>> c.compare() == Job.Status.FAILED
             True
+            >>> os.chdir(this_trick)
+            >>> c = TrickWorkflow.Comparison('share/trick/trickops/tests/baselinedata/log_a.csv','share/trick/trickops/tests/testdata/log_a.csv', tolerances={'myvar': (0.5, 0)})
+            >>> c.compare() == Job.Status.SUCCESS
+            True
 
             Returns
             -------
             Job.Status ENUM
                 status of the comparison: Job.Status.SUCCESS on success, Job.Status.FAILED
             """
-            for hs in [self.test_data, self.baseline_data]:
-              if not os.path.exists(hs)  :
-                  self.missing.append(hs)
-                  self.status = Job.Status.FAILED
+            self.missing = [hs for hs in [self.test_data, self.baseline_data]
+              if not os.path.exists(hs)]
             if self.missing:
-                return  self.status
-            td = hashlib.new('md5', usedforsecurity=False)
-            bd = hashlib.new('md5', usedforsecurity=False)
-            td.update(open(self.test_data,'rb').read())
-            bd.update(open(self.baseline_data,'rb').read())
-            if (td.hexdigest() != bd.hexdigest()):
                 self.status = Job.Status.FAILED
+                return  self.status
+            if self.tolerances is None:
+                identical = LoggedData.files_identical(self.test_data, self.baseline_data)
             else:
-                self.status = Job.Status.SUCCESS
+                result = LoggedData.compare_logged_data(self.test_data, self.baseline_data,
+                  self.tolerances)
+                identical = result.passed
+                self.max_errors = result.max_errors
+                self.first_divergence = result.first_divergence
+                self.error = result.error
+            self.status = Job.Status.SUCCESS if identical else Job.Status.FAILED
             return  self.status
 
         def get_status(self):
@@ -1361,6 +1990,14 @@ class TrickWorkflow(WorkflowCommon):
             if self.baseline_data in self.missing:
               string += printer.colorstr(" (missing)", 'DARK_RED')
             tprint(string)
+            if self.error:
+              tprint(indent + "  " + printer.colorstr(self.error, 'DARK_RED'))
+            if self.first_divergence:
+              time, variables = self.first_divergence
+              tprint(indent + "  First out of tolerance at time %g: %s" % (time, ', '.join(variables)))
+              for variable, error in self.max_errors.items():
+                if error:
+                  tprint(indent + "    %-40s max error %g" % (variable, error))
 
         def pattern_replace(self, expecting_pattern, replace_with):
             """
@@ -1397,10 +2034,22 @@ class TrickWorkflow(WorkflowCommon):
 
 class SingleRun(Job):
     """
-    A single trick simulation run Job. SingleRun's can optionally connect to the
-    trick variable server to get progress bar information.
+    A single trick simulation run Job. SingleRun's can optionally get progress bar
+    information from the sim, either from a progress file the sim maps into memory
+    or by connecting to the trick variable server.
     """
-    def __init__(self, name, command, log_file, expected_exit_status=0, use_var_server=True):
+    # Record the Trick executive writes to the file named by TRICK_PROGRESS_FILE:
+    # tag, sequence number, time_tics, time_tic_value, and terminate_time. See
+    # Executive::open_progress_file()
+    _progress_record = struct.Struct('=8s4q')
+    _progress_tag = b'TRKPROG1'
+
+    # Seconds to wait for a sim to write its progress file before falling back
+    # to the variable server, as sims built with older versions of Trick never do
+    progress_file_timeout = 10
+
+    def __init__(self, name, command, log_file, expected_exit_status=0, use_var_server=True,
+                 progress_source='file'):
         """
         Initialize this instance.
 
@@ -1412,9 +2061,23 @@ class SingleRun(Job):
             The command to execute when start() is called.
         log_file : str
             The file to which to write log information.
+        use_var_server : bool
+            Whether to show the sim's progress at all
+        progress_source : str
+            'file' to read progress from a file the sim maps into memory, or
+            'variable_server' to connect to the sim's variable server
         """
         self._use_var_server = use_var_server
-        self._connected = False
+        self.set_progress_source(progress_source)
+        self._connected = False       # True once connected to the variable server
+        self._connecting = False      # True once the variable server thread is started
+        self._progress_file = None    # Path to the progress file, until the sim maps it
+        self._progress = None         # mmap of the progress file while the sim runs
+        self._last_progress = None    # Last (time_tics, time_tic_value, terminate_time) read
+        self._run_command = command  # Command which runs the sim, see start()
+        self._result_cache = None    # (RunCache, Run) to look this run up in, if any
+        self._cache_key = None       # Key of this run's result in _result_cache
+        self.cached = False          # True if the last start() restored a cached result
         super().__init__(name=name, command=command, log_file=log_file,
           expected_exit_status=expected_exit_status)
 
@@ -1428,14 +2091,135 @@ class SingleRun(Job):
     def get_use_var_server(self):
         return (self._use_var_server)
 
+    def set_progress_source(self, source):
+        if source not in ('file', 'variable_server'):
+            msg =("ERROR: SingleRun.set_progress_source() Requires 'file' or 'variable_server'")
+            raise RuntimeError(msg)
+        self._progress_source = source
+
+    def get_progress_source(self):
+        return (self._progress_source)
+
+    def set_result_cache(self, cache, run):
+        """
+        Look up this job's result in a RunCache when it is started, restoring
+        the result instead of running the sim on a hit.
+
+        Parameters
+        ----------
+        cache : RunCache or None
+            The cache, or None to always run the sim
+        run : TrickWorkflow.Run
+            The Run this job belongs to
+        """
+        self._result_cache = (cache, run) if cache is not None else None
+
     def start(self):
         """
-        Start this Simulation job. Attempts a connection to the sim variable server
-        in another thread after calling the base class Job() start() method
+        Start this Simulation job. With the 'file' progress source, creates a
+        progress file for the sim to publish its time to, otherwise attempts a
+        connection to the sim variable server in another thread after calling the
+        base class Job() start() method. If a result cache is set and holds this
+        run's result, the result is restored and the job replays the cached log
+        instead of running the sim.
         """
+        self._command = self._run_command
+        self._cache_key = None
+        self.cached = False
+        self._close_progress_file()
+        self._last_progress = None
+        if self._result_cache:
+            cache, run = self._result_cache
+            self._cache_key = cache.key(run)
+            log = cache.restore(self._cache_key, run) if self._cache_key else None
+            if log:
+                self.cached = True
+                self._command = 'cat %s; exit %d' % (shlex.quote(log),
+                  self._expected_exit_status)
+        if self._use_var_server and not self.cached and self._progress_source == 'file':
+            self._open_progress_file()
         super(SingleRun, self).start()
         self._connected = False
+        self._connecting = False
+        if self._use_var_server and not self.cached and self._progress_source == 'variable_server':
+            self._connect()
+
+    def _open_progress_file(self):
+        """
+        Create and map a zeroed progress file next to the log file and tell the sim
+        to publish its progress to it through the TRICK_PROGRESS_FILE environment
+        variable. Reading the file costs the sim nothing, and all running jobs'
+        files are read by whichever thread displays their status.
+        """
+        path = os.path.abspath(os.path.splitext(self.log_file)[0] + '.progress')
+        with open(path, 'wb+') as f:
+            f.write(bytes(self._progress_record.size))
+            f.flush()
+            self._progress = mmap.mmap(f.fileno(), self._progress_record.size)
+        self._progress_file = path
+        self._command = 'export TRICK_PROGRESS_FILE=%s; %s' % (shlex.quote(path), self._command)
+
+    def _remove_progress_file(self):
+        """
+        Remove the progress file, keeping the mapping if any.
+        """
+        if self._progress_file:
+            try:
+                os.remove(self._progress_file)
+            except OSError:
+                pass
+            self._progress_file = None
+
+    def _close_progress_file(self):
+        """
+        Remove and unmap the progress file, keeping the last progress read.
+        """
+        self._read_progress_file()
+        self._remove_progress_file()
+        if self._progress is not None:
+            self._progress.close()
+            self._progress = None
+
+    def _read_progress_file(self):
+        """
+        Read the progress file, retrying if the sim is in the middle of writing it.
+
+        Returns
+        -------
+        tuple or None
+            (time_tics, time_tic_value, terminate_time) or None if the sim has not
+            written the file
+        """
+        if self._progress is None:
+            return None
+        for attempt in range(100):
+            tag, sequence, tics, tic_value, terminate = self._progress_record.unpack_from(self._progress)
+            if tag != self._progress_tag:
+                return None
+            if sequence % 2 == 0 and self._progress_record.unpack_from(self._progress)[1] == sequence:
+                # The sim has the file mapped, so the file itself is no longer needed
+                self._remove_progress_file()
+                self._last_progress = (tics, tic_value, terminate)
+                return self._last_progress
+        return None
 
+    def _get_progress(self):
+        """
+        Get the sim's progress from whichever source is available.
+
+        Returns
+        -------
+        tuple or None
+            (time_tics, time_tic_value, terminate_time) or None if not known
+        """
+        if self._connected:
+            return (self._tics.value, self._tics_per_sec.value, self._terminate_time.value)
+        return self._read_progress_file() or self._last_progress
+
+    def _connect(self):
+        """
+        Connect to the sim's variable server in another thread.
+        """
         # Finding a sim via PID can take several seconds.
         # Do it on another thread so this method can return immediately.
         # Sims that complete especially quickly may terminate before we
@@ -1483,10 +2267,10 @@ class SingleRun(Job):
                 except IOError as e:
                     pass
 
-        if self._use_var_server:
-            thread = threading.Thread(target=connect, name='Looking for ' + self.name)
-            thread.daemon = True
-            thread.start()
+        self._connecting = True
+        thread = threading.Thread(target=connect, name='Looking for ' + self.name)
+        thread.daemon = True
+        thread.start()
 
     def get_status_string_line_count(self):
         return super(SingleRun, self).get_status_string_line_count() + 1
@@ -1497,23 +2281,35 @@ class SingleRun(Job):
     def _running_string(self):
         elapsed_time = super(SingleRun, self)._running_string()
 
-        if self._connected:
-            return (elapsed_time + self._connected_string() + '\n' +
-              self._connected_bar())
+        progress = self._get_progress()
+        if progress:
+            return (elapsed_time + self._connected_string(progress) + '\n' +
+              self._connected_bar(progress))
+
+        # Sims built with older versions of Trick never write the progress file
+        if (self._progress is not None and not self._connecting and
+            time.time() - self._start_time > self.progress_file_timeout):
+            self._connect()
 
         return (elapsed_time + '\n' +
           create_progress_bar(0, 'Connecting'))
 
     def _success_string(self):
+        self._close_progress_file()
         text = super(SingleRun, self)._success_string()
-        if self._connected:
-            text += self._connected_string()
+        progress = self._get_progress()
+        if progress:
+            text += self._connected_string(progress)
+        elif self.cached:
+            text += ' (cached result)'
         return text + '\n' + self._success_progress_bar
 
     def _failed_string(self):
+        self._close_progress_file()
         text = super(SingleRun, self)._failed_string()
-        if self._connected:
-            text += self._connected_string()
+        progress = self._get_progress()
+        if progress:
+            text += self._connected_string(progress)
         return text + '\n' + self._failed_progress_bar
 
     def die(self):
@@ -1521,6 +2317,7 @@ class SingleRun(Job):
             self._variable_server.close()
         except:
             pass
+        self._close_progress_file()
         super(SingleRun, self).die()
 
     def __del__(self):
@@ -1528,52 +2325,68 @@ class SingleRun(Job):
             self._variable_server.close()
         except:
             pass
+        try:
+            self._close_progress_file()
+        except:
+            pass
 
     def _create_variables(self):
-        self._tics = variable_server.Variable(
-          'trick_sys.sched.time_tics', type_=float)
-        self._tics_per_sec = variable_server.Variable(
-          'trick_sys.sched.time_tic_value', type_=float)
-        self._terminate_time = variable_server.Variable(
-          'trick_sys.sched.terminate_time', type_=float)
+        self._tics = variable_server.FloatVariable(
+          'trick_sys.sched.time_tics')
+        self._tics_per_sec = variable_server.FloatVariable(
+          'trick_sys.sched.time_tic_value')
+        self._terminate_time = variable_server.FloatVariable(
+          'trick_sys.sched.terminate_time')
         return self._tics, self._tics_per_sec, self._terminate_time
 
-    def _connected_string(self):
+    def _connected_string(self, progress):
         return '      {0}       {1}'.format(
-          self._sim_time(), self._average_speed())
+          self._sim_time(progress), self._average_speed(progress))
 
-    def _connected_bar(self):
-        if self._terminate_time.value <= 0.0:
+    def _connected_bar(self, progress):
+        tics, tics_per_sec, terminate_time = progress
+        if terminate_time <= 0.0:
           progress =  0.0
         else:
-          progress = self._tics.value / self._terminate_time.value
+          progress = tics / terminate_time
         return create_progress_bar(
           progress, '{0:.1f}%'.format(100 * progress))
 
-    def _sim_time(self):
+    def _sim_time(self, progress):
         """
         Get a string displaying the sim time.
 
+        Parameters
+        ----------
+        progress : tuple
+            (time_tics, time_tic_value, terminate_time) of the sim
+
         Returns
         -------
         str
             A string for displaying sim time.
         """
-        return 'Sim Time: {0:7.1f} sec'.format(
-          self._tics.value / self._tics_per_sec.value)
+        tics, tics_per_sec, terminate_time = progress
+        return 'Sim Time: {0:7.1f} sec'.format(tics / tics_per_sec)
 
-    def _average_speed(self):
+    def _average_speed(self, progress):
         """
         Get a string displaying the average speedup.
 
+        Parameters
+        ----------
+        progress : tuple
+            (time_tics, time_tic_value, terminate_time) of the sim
+
         Returns
         -------
         str
             A string for displaying the ratio of sim time to real time.
         """
+        tics, tics_per_sec, terminate_time = progress
         elapsed_time = (
           (self._stop_time if self._stop_time else time.time())
           - self._start_time)
         return 'Average Speed: {0:4.1f} X'.format(
-          self._tics.value / self._tics_per_sec.value / elapsed_time)
+          tics / tics_per_sec / elapsed_time)
 
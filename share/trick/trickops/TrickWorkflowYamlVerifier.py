@@ -44,9 +44,16 @@ class TrickWorkflowYamlVerifier():
             - ...                an alternate comparison method in a class extending this one
           analyze:         <-- optional arbitrary string to execute as job in bash shell from
                                project top level, for project-specific post-run analysis
+          tolerances:      <-- optional dict of variable name to [absolute, relative] tolerance.
+            '*': [0, 1.0e-9]     If given, compare: files are compared numerically within these
+            dyn.x: [1.0e-6, 0]   tolerances rather than byte for byte. '*' applies to all
+                                 variables not named
           phase:           <-- optional phase to be used for ordering runs if needed
           valgrind:        <-- optional string of flags passed to valgrind for this run.
                                If missing or empty, this run will not use valgrind
+          memory:          <-- optional expected peak memory use of this run in MiB, used to
+                               keep concurrent runs within available memory
+          cpus:            <-- optional number of CPUs this run keeps busy, defaults to 1
     non_sim_extension_example:
       will: be ignored by TrickWorkflow parsing for derived classes to implement as they wish
 
@@ -370,6 +377,17 @@ class TrickWorkflowYamlVerifier():
                      where=("In %s, compare section  " % (self.run_dict['input'])))
                 ):
                   self.run_dict['compare'].remove(compare)
+            # Verify the tolerances of the run, removing any that aren't a pair of
+            # non-negative numbers
+            if self.run_dict['tolerances'] is not None:
+              for variable, tolerance in list(self.run_dict['tolerances'].items()):
+                if (not isinstance(tolerance, list) or len(tolerance) != 2 or
+                    not all(isinstance(t, (int, float)) and not isinstance(t, bool) and t >= 0
+                    for t in tolerance)):
+                  self.errors.append("In %s, tolerances section value \"%s\" for \"%s\" expected "
+                    "to be [absolute, relative] where both are numbers >= 0. Ignoring." %
+                    (self.run_dict['input'], tolerance, variable))
+                  del self.run_dict['tolerances'][variable]
 
         def get_verified_run_dict(self):
             return (dict(self.run_dict)) # Return a copy
@@ -9,10 +9,13 @@ import argparse
 import curses, textwrap
 import pdb, sys, datetime, time, socket, stat
 import subprocess, signal, logging
-import os, re, collections
-import multiprocessing, platform
+import os, re, collections, selectors, heapq
+import multiprocessing, platform, threading
 from contextlib import contextmanager
 from ColorStr import ColorStr
+from JobHistory import JobHistory, physical_memory
+from ExecutionTrace import ExecutionTrace
+from AdmissionController import AdmissionController
 from pathlib import Path
 
 # Create a global color printer
@@ -248,6 +251,16 @@ class Job(object):
         self._exit_status = None
         self._expected_exit_status = expected_exit_status
         self._timeout = None
+        self._peak_rss = None
+        self._cpu_time = None
+        self._reap_lock = threading.Lock()
+        # Resource hints used by execute_jobs(): the number of CPUs this job
+        # keeps busy and its expected peak memory use in bytes, which takes
+        # precedence over any JobHistory estimate
+        self.cpus = 1
+        self.memory_hint = None
+        # CPUs to pin this job's process to, or None to run on any
+        self.cpu_set = None
 
     def start(self):
         """
@@ -258,9 +271,14 @@ class Job(object):
           logging.debug('Executing command: ' + self._command)
           self._start_time = time.time()
           self._log_file = open(self.log_file, 'w')
+          cpu_set = self.cpu_set
+          def setup():
+              os.setsid()
+              if cpu_set and hasattr(os, 'sched_setaffinity'):
+                  os.sched_setaffinity(0, cpu_set)
           self._process = subprocess.Popen(
             self._command, stdout=self._log_file, stderr=self._log_file,
-            stdin=open(os.devnull, 'r'), shell=True, preexec_fn=os.setsid,
+            stdin=open(os.devnull, 'r'), shell=True, preexec_fn=setup,
             close_fds=True)
 
     def get_status(self):
@@ -284,7 +302,7 @@ class Job(object):
         if self._process is None:
             return self.Status.NOT_STARTED
 
-        self._exit_status = self._process.poll()
+        self._exit_status = self._reap()
         if self._exit_status is None:
             return self.Status.RUNNING
 
@@ -302,6 +320,70 @@ class Job(object):
     def get_exit_status(self):
         return self._exit_status
 
+    def get_peak_rss(self):
+        """
+        Get the peak resident set size of this Job's process and the
+        descendants it waited for.
+
+        Returns
+        -------
+        int or None
+            Peak RSS in bytes, or None if this Job has not finished or it
+            could not be measured.
+        """
+        return self._peak_rss
+
+    def get_cpu_time(self):
+        """
+        Get the user plus system CPU time of this Job's process and the
+        descendants it waited for.
+
+        Returns
+        -------
+        float or None
+            CPU time in seconds, or None if this Job has not finished or it
+            could not be measured.
+        """
+        return self._cpu_time
+
+    def _reap(self, block=False):
+        """
+        Collect this Job's process if it has exited, recording its peak
+        memory use and CPU time.
+
+        Parameters
+        ----------
+        block : bool
+            Wait for the process to exit if True.
+
+        Returns
+        -------
+        int or None
+            The exit status, or None if the process is still running.
+        """
+        with self._reap_lock:
+            # Without wait4, as on Windows, Popen reaps the process and its
+            # resource use isn't measured.
+            if self._process.returncode is None and hasattr(os, 'wait4'):
+                try:
+                    pid, status, usage = os.wait4(
+                      self._process.pid, 0 if block else os.WNOHANG)
+                except OSError:
+                    # Collected elsewhere, Popen knows the exit status
+                    pass
+                else:
+                    if pid:
+                        # Encoded as Popen.returncode is: negative if killed by a signal
+                        if os.WIFSIGNALED(status):
+                            self._process.returncode = -os.WTERMSIG(status)
+                        else:
+                            self._process.returncode = os.WEXITSTATUS(status)
+                        # ru_maxrss is in kilobytes, except on macOS
+                        self._peak_rss = usage.ru_maxrss * (
+                          1 if sys.platform == 'darwin' else 1024)
+                        self._cpu_time = usage.ru_utime + usage.ru_stime
+            return self._process.wait() if block else self._process.poll()
+
     def get_status_string_line_count(self):
         """
         Get the constant number of lines in the status string.
@@ -428,7 +510,7 @@ class Job(object):
         """
         try:
             os.killpg(os.getpgid(self._process.pid), signal.SIGABRT)
-            self._process.wait()
+            self._reap(block=True)
         except:
             pass
 
@@ -475,6 +557,138 @@ class FileSizeJob(Job):
           self._failed_progress_bar)
 
 
+class _ExitWatcher(object):
+    """
+    Wait for running Jobs to exit without polling them. Where supported
+    (Linux 5.3+ and Python 3.9+), each Job's process is watched through a
+    pidfd, so waiting costs nothing no matter how many Jobs are running.
+    Otherwise, Jobs are polled every poll_interval seconds.
+    """
+    def __init__(self, input_fd=None, poll_interval=0.1):
+        """
+        Initialize this instance.
+
+        Parameters
+        ----------
+        input_fd : int
+            A file descriptor, such as stdin, whose readiness should also
+            end a wait, or None.
+        poll_interval : float
+            Seconds between polls of Jobs that cannot be watched.
+        """
+        self._selector = selectors.DefaultSelector()
+        self._fds = {}
+        self._polled = set()
+        self._poll_interval = poll_interval
+        if input_fd is not None:
+            self._selector.register(input_fd, selectors.EVENT_READ, None)
+
+    def add(self, job):
+        """
+        Start watching a running Job.
+        """
+        try:
+            fd = os.pidfd_open(job._process.pid)
+        except (AttributeError, OSError):
+            # No pidfd support, no process, or it has already been reaped
+            self._polled.add(job)
+        else:
+            self._fds[job] = fd
+            self._selector.register(fd, selectors.EVENT_READ, job)
+
+    def remove(self, job):
+        """
+        Stop watching a Job.
+        """
+        self._polled.discard(job)
+        fd = self._fds.pop(job, None)
+        if fd is not None:
+            self._selector.unregister(fd)
+            os.close(fd)
+
+    def wait(self, timeout=None):
+        """
+        Block until a watched Job exits, input_fd is readable, or timeout
+        seconds pass. Jobs that have exited are no longer watched.
+
+        Parameters
+        ----------
+        timeout : float
+            The maximum number of seconds to wait, or None to wait
+            indefinitely.
+
+        Returns
+        -------
+        tuple
+            A list of the Jobs that have exited, and True if input_fd is
+            readable.
+        """
+        if self._polled:
+            timeout = (self._poll_interval if timeout is None
+              else min(timeout, self._poll_interval))
+        candidates = list(self._polled)
+        input_ready = False
+        for key, _ in self._selector.select(
+          None if timeout is None else max(timeout, 0)):
+            if key.data is None:
+                input_ready = True
+            else:
+                candidates.append(key.data)
+        exited = [job for job in candidates
+          if job.get_status() is not job.Status.RUNNING]
+        for job in exited:
+            self.remove(job)
+        return exited, input_ready
+
+    def close(self):
+        """
+        Stop watching all Jobs and release all resources.
+        """
+        for job in list(self._fds):
+            self.remove(job)
+        self._selector.close()
+
+def _longest_paths(jobs, durations, dependents, indices):
+    """
+    Get the expected duration of the longest chain of jobs that starts with
+    each job and continues through the jobs that depend on it. Jobs in a
+    dependency cycle are treated as if the cycle were broken.
+
+    Parameters
+    ----------
+    jobs : list of Job
+        The jobs.
+    durations : list of float
+        The expected duration of each job.
+    dependents : dict
+        Maps a Job to a list of the Jobs that depend on it.
+    indices : dict
+        Maps a Job to its index in jobs.
+
+    Returns
+    -------
+    list of float
+        The expected duration of the longest chain starting with each job.
+    """
+    paths = [None] * len(jobs)
+    visiting = set()
+    for start in range(len(jobs)):
+        stack = [(start, False)]
+        while stack:
+            i, expanded = stack.pop()
+            children = [indices[dependent] for dependent
+              in dependents.get(jobs[i], ()) if dependent in indices]
+            if expanded:
+                visiting.discard(i)
+                paths[i] = durations[i] + max(
+                  [paths[child] or 0.0 for child in children], default=0.0)
+            elif paths[i] is None and i not in visiting:
+                visiting.add(i)
+                stack.append((i, True))
+                stack.extend((child, False) for child in children
+                  if paths[child] is None and child not in visiting)
+    return paths
+
 class WorkflowCommon:
     """
     Base class for a typical software workflow
@@ -484,6 +698,9 @@ class WorkflowCommon:
       * Provide log directory where output for jobs can be written
       * Get installed packages, host, and other OS information
     """
+    # Minimum seconds between redraws of the execute_jobs status display
+    status_refresh_interval = 0.2
+
     def __init__( self, project_top_level, log_dir='/tmp/', log_level=logging.DEBUG, env='', quiet=False ):
         """
         Initialize this instance.
@@ -519,6 +736,19 @@ class WorkflowCommon:
             self.quiet = False
         else:
             self.quiet = True
+        # Optional JobHistory in which execute_jobs() records every job it runs
+        # and which it uses to start the longest work first
+        self.job_history = None
+        # Bytes of memory execute_jobs() keeps the expected peak memory use of
+        # concurrent jobs under when job_history is set. None means all
+        # physical memory.
+        self.memory_limit = None
+        # Optional ExecutionTrace in which execute_jobs() records a timeline
+        # of every job it runs
+        self.execution_trace = None
+        # Optional AdmissionController execute_jobs() asks for the machine's
+        # CPU and memory headroom before starting each job
+        self.admission_controller = None
         logging.basicConfig(filename=self.log, level=log_level)
         os.chdir(self.project_top_level) # Automatically chdir to top of project
 
@@ -592,18 +822,60 @@ class WorkflowCommon:
         else:
             return 'unknown'
 
-    def execute_jobs(self, jobs, max_concurrent=None, header=None, job_timeout=None):
+    def execute_jobs(self, jobs, max_concurrent=None, header=None, job_timeout=None,
+                     dependencies=None, on_finish=None):
         """
         Run jobs, blocking until all have returned.
 
+        Rather than repeatedly polling every job, this sleeps until a job
+        exits, a job times out, a key is pressed, or the status display
+        is due to be refreshed (at most every status_refresh_interval
+        seconds), so large numbers of jobs cost little more than a few.
+
+        If self.job_history is set, every job's execution is recorded in it,
+        and ready jobs are started longest expected path first: the job
+        whose expected duration plus that of the longest chain of jobs
+        depending on it is greatest starts first, so long jobs don't end
+        up holding up the end of the execution. A job is also held back
+        while its expected peak memory use would push the total expected
+        use of running jobs over self.memory_limit. Jobs without history
+        are assumed to take the average time of those with history.
+
+        Each job keeps Job.cpus of max_concurrent busy while running, and
+        a job's Job.memory_hint, if set, is used as its expected peak
+        memory use in place of any history. If self.admission_controller
+        is set, a job is also held back while it needs more CPUs or memory
+        than the controller measures the machine to have left, and may be
+        pinned to CPUs of its own.
+
+        If self.execution_trace is set, when every job became ready, started,
+        and stopped, its CPU time and peak memory use, and the number of
+        jobs running and waiting over time are recorded in it, and its files
+        are written before returning.
+
         Parameters
         ----------
         jobs : iterable of Job
             The jobs to run.
         max_concurrent : int
-            The maximum number of jobs to execute simultaneously.
+            The maximum number of jobs, or of CPUs for jobs needing more
+            than one, to execute simultaneously.
         header : str
             Header text.
+        job_timeout : float
+            Seconds after which a running job is killed and marked as
+            timed out, or None for no limit.
+        dependencies : dict
+            Maps a Job to an iterable of the Jobs that must succeed before
+            it may start. A job is started as soon as all of its
+            prerequisites have succeeded, so independent chains of work
+            proceed without waiting on each other. A job whose
+            prerequisite fails, times out, or is neither in jobs nor
+            already successful is not run. Without job history, when
+            several jobs are ready, those earlier in jobs are started
+            first.
+        on_finish : callable
+            Called with each Job as soon as it finishes.
 
         Returns
         -------
@@ -621,6 +893,10 @@ class WorkflowCommon:
               'may not be automatically set.', 'DARK_RED')
             return True
 
+        call_start = time.time()
+        trace = self.execution_trace
+        controller = self.admission_controller
+        jobs = list(jobs)
         num_jobs = len(jobs)
         if max_concurrent is None or max_concurrent < 1:
             max_concurrent = num_jobs
@@ -681,16 +957,20 @@ class WorkflowCommon:
                 header_pad = curses.newpad(header.count('\n') + 1, 1000)
                 header_pad.addstr(header)
 
-                # Create a pad for the status.
-                # The total line count is:
-                #   all job status strings
-                # + a line for each job name
-                # + a blank line after each status string
-                # + a final line for the cursor to end on
-                status_pad = curses.newpad(
-                  sum(job.get_status_string_line_count() for job in jobs) +
-                    2 * len(jobs) + 1,
-                  1000)
+                # Create a pad for the status. Each job gets a fixed
+                # block of lines so that only the blocks of jobs whose
+                # status changed need to be redrawn. A block holds:
+                #   a line for the job name
+                # + the job status string
+                # + a blank line after the status string
+                # The pad also needs a final line for the cursor to end on.
+                job_lines = []
+                line_count = 0
+                for job in jobs:
+                    job_lines.append(line_count)
+                    line_count += job.get_status_string_line_count() + 2
+                job_lines.append(line_count)
+                status_pad = curses.newpad(line_count + 1, 1000)
 
                 # The top visible status pad line.
                 # Used for scrolling.
@@ -698,95 +978,252 @@ class WorkflowCommon:
                 header_height = header_pad.getmaxyx()[0]
                 status_height = status_pad.getmaxyx()[0]
 
-            while any(job.get_status() in
-              [job.Status.NOT_STARTED, job.Status.RUNNING]
-              for job in jobs):
-
-                # Start waiting jobs if cpus are available
-                waitingJobs = [job for job in jobs
-                  if job.get_status() is job.Status.NOT_STARTED]
-
-                if waitingJobs:
-                    available_cpus = max_concurrent - sum(1 for job in jobs
-                      if job.get_status() is job.Status.RUNNING)
-
-                    for i in range(min(len(waitingJobs), available_cpus)):
-                        waitingJobs[i].start()
-
-                if job_timeout is not None:
-                    # Check if any jobs have timed out
-                    runningJobs = [job for job in jobs if job.get_status() is job.Status.RUNNING]
-                    for runningJob in runningJobs:
-                        if time.time() - runningJob._start_time > job_timeout:
-                            runningJob._timeout = job_timeout
-                            runningJob._stop_time = time.time()
-                            runningJob.die()
-
-                # display the status if enabled
-                if stdscr:
-                    status_pad.erase()
-                    for i, job in enumerate(jobs):
-                        # print the name
-                        status_pad.addstr('Job {0:{width}d}/{1}: '.format(
-                          i + 1, num_jobs, width=len(str(num_jobs))))
-                        status_pad.addstr(job.name + '\n', curses.A_BOLD)
-
-                        # print the status string
-                        if use_colors:
-                            # color the status string
-                            status = job.get_status()
-                            if status is job.Status.FAILED:
-                                color = curses.color_pair(1)
-                            elif status is job.Status.SUCCESS:
-                                color = curses.color_pair(2)
-                            else:
-                                color = curses.color_pair(0)
-                            status_pad.addstr(
-                              job.get_status_string() + '\n\n', color)
-                        else:
-                            status_pad.addstr(
-                              job.get_status_string() + '\n\n')
+            def draw(i):
+                job = jobs[i]
+                for line in range(job_lines[i], job_lines[i + 1]):
+                    status_pad.move(line, 0)
+                    status_pad.clrtoeol()
+                status_pad.move(job_lines[i], 0)
+
+                # print the name
+                status_pad.addstr('Job {0:{width}d}/{1}: '.format(
+                  i + 1, num_jobs, width=len(str(num_jobs))))
+                status_pad.addstr(job.name + '\n', curses.A_BOLD)
+
+                # print the status string
+                if use_colors:
+                    # color the status string
+                    status = job.get_status()
+                    if status is job.Status.FAILED:
+                        color = curses.color_pair(1)
+                    elif status is job.Status.SUCCESS:
+                        color = curses.color_pair(2)
+                    else:
+                        color = curses.color_pair(0)
+                    status_pad.addstr(job.get_status_string() + '\n', color)
+                else:
+                    status_pad.addstr(job.get_status_string() + '\n')
+
+            def show():
+                nonlocal top_line
+                # prevent scrolling beyond the bounds of status_pad
+                screen_height, screen_width = stdscr.getmaxyx()
+                top_line = max(
+                  0,
+                  min(top_line,
+                      status_height - 2 - (screen_height - header_height)))
+
+                # Resizing the terminal can cause the actual
+                # screen width or height to become smaller than
+                # what we already got from getmaxyx, resulting
+                # in a curses.error in these calls. Note that
+                # even calling getmaxyx again right here isn't
+                # fool-proof. Resizing is asynchronous (curses
+                # responds to it via a signal handler), so the
+                # size can always change between when we get it
+                # and when we use it. Best to just use what we
+                # have and ignore errors.
+                try:
+                    header_pad.noutrefresh(
+                      0, 0, 0, 0, screen_height - 1, screen_width - 1)
+                    status_pad.noutrefresh(
+                      top_line, 0, header_height, 0,
+                      screen_height - 1, screen_width - 1)
+                except curses.error:
+                    pass
+                curses.doupdate()
+
+            # Jobs are moved between these queues as they start and
+            # finish, so each pass only touches the jobs whose state can
+            # have changed. waiting is a heap of the priorities of jobs
+            # that are ready to start. running is ordered by start time.
+            indices = {job: i for i, job in enumerate(jobs)}
+            waiting = []
+            running = collections.OrderedDict()
+            # indices of jobs whose status display is out of date
+            changed = set(range(num_jobs))
+            watcher = _ExitWatcher(sys.stdin.fileno() if stdscr else None)
+
+            # the number of prerequisites each blocked job is waiting on,
+            # and the jobs blocked by each prerequisite
+            unmet = {}
+            dependents = collections.defaultdict(list)
+            for job, prerequisites in (dependencies or {}).items():
+                pending = set(prerequisite for prerequisite in prerequisites
+                  if prerequisite.get_status() is not prerequisite.Status.SUCCESS)
+                if pending:
+                    unmet[job] = len(pending)
+                    for prerequisite in pending:
+                        dependents[prerequisite].append(job)
+
+            # the expected duration and peak memory use of each job
+            durations = [0.0] * num_jobs
+            memory = [0] * num_jobs
+            memory_limit = None
+            if self.job_history:
+                estimates = [self.job_history.estimate(job) for job in jobs]
+                known = [e[0] for e in estimates if e and e[0] is not None]
+                default = sum(known) / len(known) if known else 0.0
+                for i, estimate in enumerate(estimates):
+                    if estimate and estimate[0] is not None:
+                        durations[i] = estimate[0]
+                    else:
+                        durations[i] = default
+                    if estimate and estimate[1]:
+                        memory[i] = estimate[1]
+            for i, job in enumerate(jobs):
+                if job.memory_hint:
+                    memory[i] = job.memory_hint
+            if self.job_history or any(memory):
+                memory_limit = self.memory_limit or physical_memory()
+            # Jobs with the longest expected path through their dependents
+            # start first, then those earlier in jobs.
+            paths = _longest_paths(jobs, durations, dependents, indices)
+            priorities = [(-paths[i], i) for i in range(num_jobs)]
+            running_memory = 0
+            running_cpus = 0
+
+            for i, job in enumerate(jobs):
+                status = job.get_status()
+                if status is job.Status.NOT_STARTED:
+                    if job not in unmet:
+                        waiting.append(priorities[i])
+                        if trace:
+                            trace.ready(job)
+                elif status is job.Status.RUNNING:
+                    running[job] = None
+                    running_memory += memory[i]
+                    running_cpus += job.cpus
+                    watcher.add(job)
+            heapq.heapify(waiting)
+            next_refresh = 0
+
+            def finish(job):
+                nonlocal running_memory, running_cpus
+                del running[job]
+                running_memory -= memory[indices[job]]
+                running_cpus -= job.cpus
+                if controller:
+                    controller.finished(job)
+                changed.add(indices[job])
+                if self.job_history:
+                    self.job_history.record(job)
+                if job.get_status() is job.Status.SUCCESS:
+                    for dependent in dependents.pop(job, ()):
+                        unmet[dependent] -= 1
+                        if not unmet[dependent]:
+                            del unmet[dependent]
+                            if (dependent in indices and dependent.get_status()
+                              is dependent.Status.NOT_STARTED):
+                                heapq.heappush(
+                                  waiting, priorities[indices[dependent]])
+                                if trace:
+                                    trace.ready(dependent)
+                if trace:
+                    trace.finished(job, len(waiting))
+                if on_finish:
+                    on_finish(job)
+
+            try:
+                while waiting or running:
+
+                    # Start waiting jobs if cpus are available, taking the
+                    # highest priority job that is expected to fit in
+                    # memory and in the admission controller's headroom.
+                    # With nothing running, any job fits.
+                    while waiting and running_cpus < max_concurrent:
+                        if controller:
+                            cpu_room, memory_room = controller.headroom()
+                            if running and cpu_room < 1:
+                                break
+                        skipped = []
+                        while waiting:
+                            _, i = heapq.heappop(waiting)
+                            if not running or (
+                              running_cpus + jobs[i].cpus <= max_concurrent and
+                              (memory_limit is None or
+                               running_memory + memory[i] <= memory_limit) and
+                              (not controller or (jobs[i].cpus <= cpu_room and
+                               memory[i] <= memory_room))):
+                                break
+                            skipped.append(priorities[i])
+                            i = None
+                        for priority in skipped:
+                            heapq.heappush(waiting, priority)
+                        if i is None:
+                            break
+                        job = jobs[i]
+                        if controller:
+                            controller.started(job, memory[i])
+                        job.start()
+                        running[job] = None
+                        running_memory += memory[i]
+                        running_cpus += job.cpus
+                        watcher.add(job)
+                        changed.add(i)
+                        if trace:
+                            trace.started(job, len(waiting))
+
+                    now = time.time()
+                    if job_timeout is not None:
+                        # Jobs are in start order, so only the oldest can
+                        # have timed out.
+                        timed_out = False
+                        while running:
+                            job = next(iter(running))
+                            if now - job._start_time <= job_timeout:
+                                break
+                            job._timeout = job_timeout
+                            job._stop_time = now
+                            job.die()
+                            watcher.remove(job)
+                            finish(job)
+                            timed_out = True
+                        if timed_out:
+                            continue
+
+                    # display the status if enabled, at a limited rate and
+                    # redrawing only jobs whose status may have changed
+                    if stdscr and now >= next_refresh:
+                        changed.update(indices[job] for job in running)
+                        for i in changed:
+                            draw(i)
+                        changed.clear()
+                        show()
+                        next_refresh = now + self.status_refresh_interval
+
+                    # Sleep until a job exits, a key is pressed, a job
+                    # times out, the display needs refreshing, or the
+                    # admission controller may have more headroom.
+                    deadlines = []
+                    if controller and waiting and running:
+                        deadlines.append(now + controller.sample_interval)
+                    if stdscr and (running or changed):
+                        deadlines.append(next_refresh)
+                    if job_timeout is not None and running:
+                        deadlines.append(
+                          next(iter(running))._start_time + job_timeout)
+                    timeout = (max(0, min(deadlines) - time.time())
+                      if deadlines else None)
+                    exited, key_pressed = watcher.wait(timeout)
+                    for job in exited:
+                        finish(job)
 
                     # handle scrolling
-                    while True:
-                        key = stdscr.getch()
-                        if key == -1:
-                            # no input
-                            break
-                        if key == curses.KEY_UP:
-                            top_line -= 1
-                        elif key == curses.KEY_DOWN:
-                            top_line += 1
-
-                    # prevent scrolling beyond the bounds of status_pad
-                    screen_height, screen_width = stdscr.getmaxyx()
-                    top_line = max(
-                      0,
-                      min(top_line,
-                          status_height - 2 - (screen_height - header_height)))
-
-                    # Resizing the terminal can cause the actual
-                    # screen width or height to become smaller than
-                    # what we already got from getmaxyx, resulting
-                    # in a curses.error in these calls. Note that
-                    # even calling getmaxyx again right here isn't
-                    # fool-proof. Resizing is asynchronous (curses
-                    # responds to it via a signal handler), so the
-                    # size can always change between when we get it
-                    # and when we use it. Best to just use what we
-                    # have and ignore errors.
-                    try:
-                        header_pad.noutrefresh(
-                          0, 0, 0, 0, screen_height - 1, screen_width - 1)
-                        status_pad.noutrefresh(
-                          top_line, 0, header_height, 0,
-                          screen_height - 1, screen_width - 1)
-                    except curses.error:
-                        pass
-                    curses.doupdate()
-
-                # take a nap
-                time.sleep(0.1)
+                    if key_pressed:
+                        while True:
+                            key = stdscr.getch()
+                            if key == -1:
+                                # no input
+                                break
+                            if key == curses.KEY_UP:
+                                top_line -= 1
+                            elif key == curses.KEY_DOWN:
+                                top_line += 1
+                        show()
+            finally:
+                watcher.close()
+
             # When done clear everything, without this subsequent calls
             # to execute_jobs can show previous status bars if the number
             # of jobs is less on the subsequent executions
@@ -838,4 +1275,8 @@ class WorkflowCommon:
             # Print the summary status even if self.quiet is True
             tprint(text, color)
 
+        if trace:
+            trace.add_call(header.splitlines()[0], call_start, time.time())
+            trace.write()
+
         return any(job.get_status() is not job.Status.SUCCESS for job in jobs)
@@ -34,7 +34,9 @@ def run_tests(args):
 
     # Run all doc tests by eating our own dogfood
     doctest_files = ['TrickWorkflow.py', 'WorkflowCommon.py', 'TrickWorkflowYamlVerifier.py',
-      'MonteCarloGenerationHelper.py', 'send_hs.py']
+      'MonteCarloGenerationHelper.py', 'send_hs.py', 'JobHistory.py',
+      'RunCache.py', 'LoggedData.py', 'ExecutionTrace.py',
+      'AdmissionController.py']
     wc = WorkflowCommon(this_dir, quiet=True)
     jobs = []
     log_prepend = '_doctest_log.txt'
@@ -10,6 +10,11 @@ import ut_WorkflowCommon
 import ut_TrickWorkflowYamlVerifier
 import ut_TrickWorkflow
 import ut_MonteCarloGenerationHelper
+import ut_JobHistory
+import ut_RunCache
+import ut_LoggedData
+import ut_ExecutionTrace
+import ut_AdmissionController
 
 # Define load_tests function for dynamic loading using Nose2
 def load_tests(*args):
@@ -20,6 +25,11 @@ def load_tests(*args):
     suite.addTests(ut_TrickWorkflow.suite())
     suite.addTests(ut_WorkflowCommon.suite())
     suite.addTests(ut_MonteCarloGenerationHelper.suite())
+    suite.addTests(ut_JobHistory.suite())
+    suite.addTests(ut_RunCache.suite())
+    suite.addTests(ut_LoggedData.suite())
+    suite.addTests(ut_ExecutionTrace.suite())
+    suite.addTests(ut_AdmissionController.suite())
     return suite
 
 # Local module level execution only
@@ -30,5 +40,10 @@ if __name__ == '__main__':
     suites.addTests(ut_TrickWorkflow.suite())
     suites.addTests(ut_WorkflowCommon.suite())
     suites.addTests(ut_MonteCarloGenerationHelper.suite())
+    suites.addTests(ut_JobHistory.suite())
+    suites.addTests(ut_RunCache.suite())
+    suites.addTests(ut_LoggedData.suite())
+    suites.addTests(ut_ExecutionTrace.suite())
+    suites.addTests(ut_AdmissionController.suite())
 
     unittest.TextTestRunner(verbosity=2).run(suites)
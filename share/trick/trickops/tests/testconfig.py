@@ -1,8 +1,28 @@
 # This file contains any globals all tests use, so that it can be changed
 # in a single place if they ever need to be updated
-import os, sys, pdb
+import os, sys, pdb, shutil, tempfile, unittest
 # Global location of this trick instance, for all tests to use
 module_rel_path = 'share/trick/trickops'
 this_trick = os.path.abspath(os.path.join(os.getcwd(), '../../../..'))
 sys.path.append(os.path.join(this_trick, module_rel_path ))
 tests_dir = os.path.join(this_trick,  module_rel_path, 'tests')
+from WorkflowCommon import WorkflowCommon, Job
+
+class WorkflowTestCase(unittest.TestCase):
+    """
+    Base class of test cases that execute Jobs with a quiet WorkflowCommon
+    instance. Each test gets its own directory for job log files.
+    """
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.instance = WorkflowCommon(project_top_level=this_trick, log_dir='/tmp/', quiet=True)
+
+    def tearDown(self):
+        os.remove(self.instance.log)
+        shutil.rmtree(self.dir)
+        del self.instance
+        self.instance = None
+
+    def make_job(self, name, command):
+        return Job(name=name, command=command,
+          log_file=os.path.join(self.dir, name + '.txt'))
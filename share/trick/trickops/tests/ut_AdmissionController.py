@@ -0,0 +1,83 @@
+import os, sys
+import unittest
+from unittest import mock
+from testconfig import this_trick, tests_dir, WorkflowTestCase
+from WorkflowCommon import *
+
+def suite():
+    """Create test suite from AdmissionControllerTestCase unit test class and return"""
+    return unittest.TestLoader().loadTestsFromTestCase(AdmissionControllerTestCase)
+
+class AdmissionControllerTestCase(WorkflowTestCase):
+
+    def overlapped(self, first, second):
+        return (first._start_time < second._stop_time and
+                second._start_time < first._stop_time)
+
+    def test_headroom_counts_ramping_jobs(self):
+        controller = AdmissionController(cpu_limit=4, ramp_time=60)
+        controller._measure = lambda: (0.0, 8 * 2**30)
+        job = self.make_job('job', 'true')
+        job.cpus = 3
+        controller.started(job, 2**30)
+        cpus, memory = controller.headroom()
+        self.assertEqual(cpus, 1)
+        self.assertTrue(memory <= 7 * 2**30)
+        controller.finished(job)
+        self.assertEqual(controller.headroom()[0], 4)
+
+    def test_measure_counts_available_cpus_only(self):
+        controller = AdmissionController()
+        controller.cpus = [1, 3]
+        with mock.patch('psutil.cpu_percent', return_value=[100.0, 50.0, 100.0, 25.0]):
+            busy, memory = controller._measure()
+        self.assertAlmostEqual(busy, 0.75)
+        self.assertTrue(memory > 0)
+
+    def test_pin_cpus(self):
+        controller = AdmissionController(pin_cpus=True)
+        controller.cpus = controller._free_cpus = [0, 1, 2]
+        first, second = self.make_job('first', 'true'), self.make_job('second', 'true')
+        first.cpus = 2
+        controller.started(first)
+        controller.started(second)
+        self.assertEqual((first.cpu_set, second.cpu_set), ([0, 1], [2]))
+        self.assertEqual(controller._free_cpus, [])
+        controller.finished(first)
+        self.assertEqual(controller._free_cpus, [0, 1])
+        self.assertEqual(first.cpu_set, None)
+
+    def test_execute_jobs_holds_back_jobs_without_headroom(self):
+        controller = AdmissionController(cpu_limit=1, ramp_time=60, sample_interval=0.05)
+        controller._measure = lambda: (0.0, 8 * 2**30)
+        self.instance.admission_controller = controller
+        first = self.make_job('first', 'sleep 0.2')
+        second = self.make_job('second', 'sleep 0.2')
+        self.assertFalse(self.instance.execute_jobs([first, second], max_concurrent=2))
+        self.assertFalse(self.overlapped(first, second))
+        self.assertEqual(controller._jobs, {})
+
+    def test_execute_jobs_uses_memory_hints(self):
+        # Two jobs expected to use more than all of memory between them don't overlap
+        first = self.make_job('first', 'sleep 0.2')
+        second = self.make_job('second', 'sleep 0.2')
+        first.memory_hint = second.memory_hint = 2**62
+        self.assertFalse(self.instance.execute_jobs([first, second], max_concurrent=2))
+        self.assertFalse(self.overlapped(first, second))
+
+    def test_execute_jobs_counts_cpus(self):
+        first = self.make_job('first', 'sleep 0.2')
+        second = self.make_job('second', 'sleep 0.2')
+        first.cpus = 2
+        self.assertFalse(self.instance.execute_jobs([first, second], max_concurrent=2))
+        self.assertFalse(self.overlapped(first, second))
+
+    @unittest.skipUnless(hasattr(os, 'sched_getaffinity'), 'requires CPU affinity')
+    def test_pinned_job_affinity(self):
+        cpu = sorted(os.sched_getaffinity(0))[0]
+        job = self.make_job('pinned', "python3 -c 'import os; print(sorted(os.sched_getaffinity(0)))'")
+        job.cpu_set = [cpu]
+        job.start()
+        job._process.wait()
+        with open(job.log_file) as f:
+            self.assertEqual(f.read().strip(), str([cpu]))
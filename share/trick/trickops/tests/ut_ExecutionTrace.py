@@ -0,0 +1,55 @@
+import os, sys, csv, json
+import unittest
+from testconfig import this_trick, tests_dir, WorkflowTestCase
+from WorkflowCommon import *
+
+def suite():
+    """Create test suite from ExecutionTraceTestCase unit test class and return"""
+    return unittest.TestLoader().loadTestsFromTestCase(ExecutionTraceTestCase)
+
+class ExecutionTraceTestCase(WorkflowTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.instance.execution_trace = ExecutionTrace(os.path.join(self.dir, 'trace.json'))
+
+    def read_summary(self):
+        with open(os.path.join(self.dir, 'trace.csv')) as f:
+            return {row['name']: row for row in csv.DictReader(f)}
+
+    def test_trace(self):
+        first = self.make_job('first', 'sleep 0.2')
+        second = self.make_job('second', 'sleep 0.1')
+        third = self.make_job('third', 'exit 3')
+        self.instance.execute_jobs([first, second, third], max_concurrent=2,
+          header='Testing', dependencies={third: [first]})
+        with open(os.path.join(self.dir, 'trace.json')) as f:
+            events = json.load(f)['traceEvents']
+        jobs = {e['name']: e for e in events if e['ph'] == 'X' and e['cat'] == 'Job'}
+        self.assertEqual(set(jobs), {'first', 'second', 'third'})
+        # first and second run side by side, and third reuses the lowest free slot
+        self.assertEqual((jobs['first']['tid'], jobs['second']['tid']), (1, 2))
+        self.assertEqual(jobs['third']['tid'], 1)
+        self.assertTrue(jobs['first']['dur'] >= 200000)
+        self.assertEqual(jobs['third']['args']['status'], 'FAILED')
+        calls = [e for e in events if e['ph'] == 'X' and e['cat'] == 'execute_jobs']
+        self.assertEqual([c['name'] for c in calls], ['Testing'])
+        counts = [e['args'] for e in events if e['ph'] == 'C']
+        self.assertEqual(max(c['running'] for c in counts), 2)
+        self.assertEqual(counts[0], {'running': 1, 'waiting': 1})
+        self.assertEqual(counts[-1], {'running': 0, 'waiting': 0})
+        summary = self.read_summary()
+        self.assertEqual(summary['third']['exit_status'], '3')
+        self.assertEqual(summary['third']['kind'], 'Job')
+        self.assertTrue(float(summary['first']['cpu_time']) >= 0)
+        self.assertTrue(int(summary['first']['peak_rss']) > 0)
+        # third waited for first to finish, and then not at all
+        self.assertTrue(float(summary['third']['queued']) >= float(summary['first']['stopped']))
+        self.assertTrue(float(summary['third']['queue_wait']) < 0.1)
+        # second waited for a free slot with max_concurrent=1
+        self.instance.execution_trace = ExecutionTrace(os.path.join(self.dir, 'trace.json'))
+        first, second = self.make_job('first', 'sleep 0.2'), self.make_job('second', 'true')
+        self.instance.execute_jobs([first, second], max_concurrent=1)
+        summary = self.read_summary()
+        self.assertTrue(float(summary['second']['queue_wait']) >= 0.2)
+        self.assertEqual(summary['second']['slot'], '1')
@@ -0,0 +1,78 @@
+import os, sys
+import unittest, time
+from testconfig import this_trick, tests_dir, WorkflowTestCase
+from WorkflowCommon import *
+
+def suite():
+    """Create test suite from JobHistoryTestCase unit test class and return"""
+    return unittest.TestLoader().loadTestsFromTestCase(JobHistoryTestCase)
+
+class JobHistoryTestCase(WorkflowTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.instance.job_history = JobHistory(':memory:')
+
+    def tearDown(self):
+        self.instance.job_history.close()
+        super().tearDown()
+
+    def test_record(self):
+        job = self.make_job('fails', 'sleep 0.1; exit 2')
+        self.instance.execute_jobs([job])
+        executions = self.instance.job_history.get_executions(job)
+        self.assertEqual(len(executions), 1)
+        finished, wall_time, peak_rss, exit_status, status = executions[0]
+        self.assertTrue(wall_time >= 0.1)
+        self.assertTrue(peak_rss > 0)
+        self.assertEqual(exit_status, 2)
+        self.assertEqual(status, Job.Status.FAILED)
+        self.assertEqual(self.instance.job_history.estimate(job), (wall_time, peak_rss))
+        # A different command is a different job
+        self.assertIsNone(self.instance.job_history.estimate(self.make_job('fails', 'exit 2')))
+
+    def test_estimate_prefers_successes(self):
+        history = self.instance.job_history
+        job = self.make_job('flaky', 'true')
+        self.instance.execute_jobs([job])
+        job._start_time, job._stop_time = 0.0, 10.0
+        history.record(job)
+        job._exit_status, job._process.returncode = 1, 1
+        job._start_time, job._stop_time = 0.0, 1000.0
+        history.record(job)
+        self.assertEqual(len(history.get_executions(job)), 3)
+        self.assertTrue(history.estimate(job)[0] < 10.0)
+
+    def test_longest_first(self):
+        short = self.make_job('short', 'sleep 0.1')
+        long = self.make_job('long', 'sleep 0.4')
+        self.instance.execute_jobs([short, long])
+        # With history, the long job starts first despite being listed last
+        short = self.make_job('short', 'sleep 0.1')
+        long = self.make_job('long', 'sleep 0.4')
+        self.instance.execute_jobs([short, long], max_concurrent=1)
+        self.assertTrue(long._start_time < short._start_time)
+        # Prerequisites of long chains start before longer independent jobs
+        first = self.make_job('short', 'sleep 0.1')
+        second = self.make_job('long', 'sleep 0.4')
+        independent = self.make_job('independent', 'sleep 0.3')
+        independent_history = self.make_job('independent', 'sleep 0.3')
+        self.instance.execute_jobs([independent_history])
+        self.instance.execute_jobs([independent, first, second], max_concurrent=1,
+          dependencies={second: [first]})
+        self.assertTrue(first._start_time < independent._start_time)
+
+    def test_memory_packing(self):
+        big = [self.make_job('big%d' % i, 'sleep 0.2') for i in range(2)]
+        self.instance.execute_jobs(big)
+        for job in big:
+            job._peak_rss = 600
+            self.instance.job_history.record(job)
+        # Both fit in CPUs but not in memory, so they must run one at a time
+        self.instance.memory_limit = 1000
+        big = [self.make_job('big%d' % i, 'sleep 0.2') for i in range(2)]
+        self.instance.execute_jobs(big, max_concurrent=2)
+        first, second = sorted(big, key=lambda job: job._start_time)
+        self.assertTrue(second._start_time >= first._stop_time)
+        for job in big:
+            self.assertEqual(job.get_status(), Job.Status.SUCCESS)
@@ -0,0 +1,107 @@
+import os, sys, shutil, struct, tempfile
+import unittest
+from testconfig import this_trick, tests_dir
+from TrickWorkflow import *
+from LoggedData import *
+
+def suite():
+    """Create test suite from LoggedDataTestCase unit test class and return"""
+    return unittest.TestLoader().loadTestsFromTestCase(LoggedDataTestCase)
+
+class LoggedDataTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.baseline = os.path.join(tests_dir, 'baselinedata/log_a.csv')
+        self.test = os.path.join(tests_dir, 'testdata/log_a.csv')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write_trk(self, name, rows):
+        # time (double), count (int), and speed (float) variables
+        path = os.path.join(self.dir, name)
+        with open(path, 'wb') as f:
+            f.write(b'Trick-10-L' + struct.pack('<i', 3))
+            for variable, units, type_, size in [('sys.exec.out.time', 's', 11, 8),
+              ('count', '--', 6, 4), ('speed', 'm/s', 10, 4)]:
+                f.write(struct.pack('<i', len(variable)) + variable.encode())
+                f.write(struct.pack('<i', len(units)) + units.encode())
+                f.write(struct.pack('<ii', type_, size))
+            for row in rows:
+                f.write(struct.pack('<dif', *row))
+        return path
+
+    def test_files_identical(self):
+        self.assertTrue(files_identical(self.baseline, self.baseline, chunk_size=4))
+        self.assertFalse(files_identical(self.baseline, self.test, chunk_size=4))
+        copy = os.path.join(self.dir, 'copy.csv')
+        with open(self.baseline) as f:
+            data = f.read()
+        with open(copy, 'w') as f:
+            f.write(data[:-2] + 'X\n')  # Same size, last bytes differ
+        self.assertFalse(files_identical(self.baseline, copy, chunk_size=4))
+
+    def test_compare_csv(self):
+        # The test data is 0.1 lower than the baseline at every time
+        result = compare_logged_data(self.test, self.baseline, rows=2)
+        self.assertFalse(result.passed)
+        self.assertIsNone(result.error)
+        self.assertEqual(result.first_divergence, (0.0, ['myvar']))
+        self.assertEqual(result.max_errors['sys.exec.out.time'], 0)
+        self.assertAlmostEqual(result.max_errors['myvar'], 0.1)
+        result = compare_logged_data(self.test, self.baseline, {'myvar': (0.11, 0)}, rows=2)
+        self.assertTrue(result.passed)
+        self.assertIsNone(result.first_divergence)
+        # Relative tolerance scales with the baseline value: 0.1 is 20% of 0.5
+        # but 100% of 0.1
+        result = compare_logged_data(self.test, self.baseline, {'*': (0, 0.5)})
+        self.assertFalse(result.passed)
+        self.assertEqual(result.first_divergence, (0.0, ['myvar']))
+
+    def test_malformed_csv(self):
+        malformed = os.path.join(self.dir, 'malformed.csv')
+        with open(self.baseline) as f:
+            lines = f.readlines()
+        lines[4] = '3\n'
+        with open(malformed, 'w') as f:
+            f.writelines(lines)
+        result = compare_logged_data(malformed, self.baseline, rows=2)
+        self.assertFalse(result.passed)
+        self.assertEqual(result.error, '%s rows 3 to 4 do not hold 2 numbers each' % malformed)
+
+    def test_compare_trk(self):
+        rows = [(i * 0.1, i, i * 1.5) for i in range(10)]
+        baseline = self.write_trk('baseline.trk', rows)
+        rows[6] = (rows[6][0], 6, 9.25)
+        test = self.write_trk('test.trk', rows)
+        result = compare_logged_data(test, baseline, rows=4)
+        self.assertFalse(result.passed)
+        self.assertEqual(result.first_divergence, (rows[6][0], ['speed']))
+        self.assertEqual(result.max_errors, {'sys.exec.out.time': 0, 'count': 0, 'speed': 0.25})
+        self.assertTrue(compare_logged_data(test, baseline, {'speed': (0.25, 0)}, rows=4).passed)
+        # A shorter test file fails even when what it has matches
+        short = self.write_trk('short.trk', rows[:7])
+        result = compare_logged_data(short, test, rows=3)
+        self.assertFalse(result.passed)
+        self.assertEqual(result.error, 'Test data has 7 rows but baseline data has 10')
+        # Variables must match
+        result = compare_logged_data(self.test, baseline)
+        self.assertFalse(result.passed)
+        self.assertTrue(result.error.startswith('Variables differ'))
+
+    def test_unsupported_format(self):
+        result = compare_logged_data(__file__, __file__)
+        self.assertFalse(result.passed)
+        self.assertTrue('Cannot compare' in result.error)
+
+    def test_compare_all(self):
+        comparisons = [TrickWorkflow.Comparison(self.test, self.baseline),
+          TrickWorkflow.Comparison(self.baseline, self.baseline),
+          TrickWorkflow.Comparison(self.test, self.baseline, {'myvar': (0.11, 0)}),
+          TrickWorkflow.Comparison(self.test, os.path.join(self.dir, 'missing.csv'))]
+        compare_all(comparisons, max_workers=2)
+        self.assertEqual([c.get_status() for c in comparisons], [Job.Status.FAILED,
+          Job.Status.SUCCESS, Job.Status.SUCCESS, Job.Status.FAILED])
+        self.assertAlmostEqual(comparisons[2].max_errors['myvar'], 0.1)
+        self.assertEqual(comparisons[3].missing, [os.path.join(self.dir, 'missing.csv')])
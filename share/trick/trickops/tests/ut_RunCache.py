@@ -0,0 +1,135 @@
+import os, sys, shutil, tempfile
+import unittest
+from testconfig import this_trick, tests_dir
+from TrickWorkflow import *
+
+def suite():
+    """Create test suite from RunCacheTestCase unit test class and return"""
+    return unittest.TestLoader().loadTestsFromTestCase(RunCacheTestCase)
+
+class RunCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # A fake sim whose input file imports a module and executes a Modified_data file
+        self.sim_dir = tempfile.mkdtemp()
+        self.write('S_main_test.exe', 'binary')
+        self.write('RUN_test/input.py',
+          'import helper\nexec(open("Modified_data/setup.py").read())\n')
+        self.write('helper.py', 'from models import gravity\n')
+        self.write('models/__init__.py', '')
+        self.write('models/gravity.py', 'g = 9.81\n')
+        self.write('Modified_data/setup.py', 'x = 1\n')
+        self.write('Modified_data/table.csv', '1,2\n')
+        self.write('unrelated.py', '')
+        self.cache = RunCache(os.path.join(self.sim_dir, 'cache'))
+        self.run = self.make_run()
+
+    def tearDown(self):
+        shutil.rmtree(self.sim_dir)
+
+    def write(self, path, contents):
+        path = os.path.join(self.sim_dir, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(contents)
+
+    def make_run(self):
+        run = TrickWorkflow.Run(sim_dir=self.sim_dir, input_file='RUN_test/input.py',
+          binary='S_main_test.exe', log_dir='/tmp/')
+        run.add_comparison(os.path.join(self.sim_dir, 'RUN_test/log.csv'),
+          os.path.join(self.sim_dir, 'baseline.csv'))
+        return run
+
+    def test_get_input_files(self):
+        files = [os.path.relpath(f, self.sim_dir) for f in self.cache.get_input_files(self.run)]
+        self.assertEqual(files, ['Modified_data/setup.py', 'Modified_data/table.csv',
+          'RUN_test/input.py', 'helper.py', 'models/__init__.py', 'models/gravity.py'])
+
+    def test_key(self):
+        key = self.cache.key(self.run)
+        self.assertEqual(key, self.cache.key(self.make_run()))
+        # Changes to files outside the input file's dependencies do not matter
+        self.write('unrelated.py', 'y = 2\n')
+        self.assertEqual(key, self.cache.key(self.run))
+        for path in ['S_main_test.exe', 'models/gravity.py', 'Modified_data/table.csv']:
+            self.write(path, 'changed')
+            changed = self.cache.key(self.run)
+            self.assertNotEqual(key, changed)
+            key = changed
+        os.environ['TRICK_RUN_CACHE_TEST'] = '1'
+        try:
+            self.assertNotEqual(key, self.cache.key(self.run))
+        finally:
+            del os.environ['TRICK_RUN_CACHE_TEST']
+        self.assertEqual(key, self.cache.key(self.run))
+        self.run.returns = 1
+        self.assertNotEqual(key, self.cache.key(self.run))
+        os.remove(os.path.join(self.sim_dir, 'S_main_test.exe'))
+        self.assertIsNone(self.cache.key(self.run))
+
+    def test_store_and_restore(self):
+        key = self.cache.key(self.run)
+        log = os.path.join(self.sim_dir, 'run_log.txt')
+        self.write('run_log.txt', 'ran\n')
+        self.assertIsNone(self.cache.restore(key, self.run))
+        # Runs which did not write their data are not stored
+        self.assertFalse(self.cache.store(key, self.run, log))
+        self.write('RUN_test/log.csv', 'data\n')
+        self.assertTrue(self.cache.store(key, self.run, log))
+        os.remove(os.path.join(self.sim_dir, 'RUN_test/log.csv'))
+        cached_log = self.cache.restore(key, self.run)
+        with open(cached_log) as f:
+            self.assertEqual(f.read(), 'ran\n')
+        with open(os.path.join(self.sim_dir, 'RUN_test/log.csv')) as f:
+            self.assertEqual(f.read(), 'data\n')
+
+    def test_execute_all(self):
+        workflow = TrickWorkflow(project_top_level=this_trick, log_dir='/tmp/',
+          trick_dir=this_trick, config_file=os.path.join(tests_dir, "trick_sims.yml"),
+          quiet=True)
+        workflow.run_cache = self.cache
+        self.write('baseline.csv', 'data\n')
+        marker = os.path.join(self.sim_dir, 'ran')
+        def execute(analysis=False):
+            # Each execution uses new jobs, as a new workflow would
+            sim = TrickWorkflow.Sim(name='cached', sim_dir=self.sim_dir)
+            sim.build_job = Job(name='Build cached', command='true',
+              log_file='/tmp/RunCacheTestCase_build.txt')
+            run = self.make_run()
+            run.run_job = SingleRun(name='Run cached',
+              command='touch %s && echo data > %s' % (marker, run.comparisons[0].test_data),
+              log_file='/tmp/RunCacheTestCase_run.txt')
+            if analysis:
+                run.add_analysis('true')
+            sim.add_run(run)
+            workflow.sims = [sim]
+            self.assertFalse(workflow.execute_all())
+            self.assertEqual(run.comparisons[0].status, Job.Status.SUCCESS)
+            os.remove(run.comparisons[0].test_data)
+            ran = os.path.exists(marker)
+            if ran:
+                os.remove(marker)
+            return run.run_job, ran
+        try:
+            job, ran = execute()
+            self.assertTrue(ran)
+            self.assertFalse(job.cached)
+            # The second execution restores the data instead of running
+            job, ran = execute()
+            self.assertFalse(ran)
+            self.assertTrue(job.cached)
+            self.assertEqual(job.get_status(), Job.Status.SUCCESS)
+            # A changed input file misses the cache
+            self.write('Modified_data/setup.py', 'x = 2\n')
+            job, ran = execute()
+            self.assertTrue(ran)
+            self.assertFalse(job.cached)
+            # Runs with an analysis always run, as it may read any of their output
+            for _ in range(2):
+                job, ran = execute(analysis=True)
+                self.assertTrue(ran)
+                self.assertFalse(job.cached)
+        finally:
+            workflow._cleanup()
+            os.remove('/tmp/RunCacheTestCase_build.txt')
+            os.remove('/tmp/RunCacheTestCase_run.txt')
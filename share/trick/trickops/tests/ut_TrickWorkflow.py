@@ -1,4 +1,4 @@
-import os, sys, shutil
+import os, sys, shutil, tempfile, time
 import unittest
 import pdb
 from testconfig import this_trick, tests_dir
@@ -30,6 +30,43 @@ class TrickWorkflowSingleRunTestCase(unittest.TestCase):
         # Test the setter for var server interaction
         self.instance.set_use_var_server(False)
         self.assertEqual(self.instance.get_use_var_server(), False)
+        self.assertEqual(self.instance.get_progress_source(), 'file')
+        self.instance.set_progress_source('variable_server')
+        self.assertEqual(self.instance.get_progress_source(), 'variable_server')
+        with self.assertRaises(RuntimeError):
+            self.instance.set_progress_source('carrier_pigeon')
+
+    def test_SingleRun_progress_file(self):
+        # Stand in for a sim: publish 25 of 100 seconds at 1000 tics per second
+        # the way the Trick executive does, then wait to be told to exit
+        sim = ("import mmap, os, struct, time\n"
+          "with open(os.environ['TRICK_PROGRESS_FILE'], 'r+b') as f:\n"
+          "    m = mmap.mmap(f.fileno(), 40)\n"
+          "m[:40] = struct.pack('=8s4q', b'TRKPROG1', 2, 25000, 1000, 100000)\n"
+          "while not os.path.exists('/tmp/WorkflowCommonTestCase_progress_done'):\n"
+          "    time.sleep(0.01)\n")
+        job = SingleRun(name='progress', command='%s -c "%s"' % (sys.executable, sim),
+          log_file='/tmp/WorkflowCommonTestCase_progress.txt')
+        job.start()
+        self.assertIn('TRICK_PROGRESS_FILE=', job._command)
+        path = job._progress_file
+        self.assertTrue(os.path.exists(path))
+        try:
+            deadline = time.time() + 10
+            while job._get_progress() is None and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(job._get_progress(), (25000, 1000, 100000))
+            self.assertFalse(os.path.exists(path))  # Removed once the sim mapped it
+            self.assertIn('Sim Time:    25.0 sec', job._running_string())
+            self.assertIn('25.0%', job._running_string())
+            self.assertFalse(job._connecting)  # No variable server thread
+        finally:
+            open('/tmp/WorkflowCommonTestCase_progress_done', 'w').close()
+        job._reap(block=True)
+        self.assertEqual(job.get_status(), Job.Status.SUCCESS)
+        os.remove('/tmp/WorkflowCommonTestCase_progress_done')
+        self.assertIn('Sim Time:    25.0 sec', job._success_string())
+        self.assertIsNone(job._progress)  # Unmapped once finished
 
 class TrickWorkflowTestCase(unittest.TestCase):
 
@@ -570,6 +607,16 @@ class TrickWorkflowTestCase(unittest.TestCase):
         with self.assertRaises(RuntimeError):
             r.set_phase(TrickWorkflow.allowed_phase_range['min']-1)  # Under boundary
 
+    def test_run__resource_hints(self):
+        r = TrickWorkflow.Run(sim_dir='test/SIM_alloc_test', input_file='RUN_[01-02]/input.py',
+          binary='S_main_Linux_x86_64.exe', memory=512, cpus=2)
+        job = r.multiply()[1].get_run_job()
+        self.assertEqual(job.memory_hint, 512 * 2**20)
+        self.assertEqual(job.cpus, 2)
+        job = TrickWorkflow.Run(sim_dir='test/SIM_alloc_test', input_file='RUN_test/input.py',
+          binary='S_main_Linux_x86_64.exe').get_run_job()
+        self.assertEqual((job.memory_hint, job.cpus), (None, 1))
+
     def test_run__find_range_string(self):
         r = TrickWorkflow.Run(sim_dir='test/SIM_alloc_test', input_file='RUN_test/input.py',
           binary='S_main_Linux_x86_64.exe')
@@ -669,3 +716,125 @@ class TrickWorkflowTestCase(unittest.TestCase):
         r.add_comparison('testdata/RUN_[00-06]/log_common.csv', 'baselinedata/RUN_common/log_common.csv')
         with self.assertRaises(RuntimeError):
           runs = r.multiply()
+
+    def test_run__multiply_is_lazy(self):
+        r = TrickWorkflow.Run(sim_dir='test/SIM_alloc_test', input_file='RUN_[0000-9999]/input.py --flag',
+          binary='S_main_Linux_x86_64.exe', returns=3, phase=2)
+        r.add_comparison('testdata/RUN_[0000-9999]/log_a.csv', 'baselinedata/RUN_[0000-9999]/log_a.csv',
+          tolerances={'*': (0.1, 0)})
+        r.add_analysis('echo analysis')
+        runs = r.multiply()
+        # Nothing is created until accessed
+        self.assertEqual(runs.get_created_runs(), [])
+        self.assertEqual(runs.find('RUN_0042/input.py --flag'), 42)
+        self.assertEqual(runs.get_created_runs(), [])
+        run = runs[42]
+        self.assertIs(runs[42], run)  # Created once
+        self.assertEqual(runs.get_created_runs(), [run])
+        self.assertEqual(run.input_file, 'RUN_0042/input.py --flag')
+        self.assertEqual(run.run_dir_path, 'test/SIM_alloc_test/RUN_0042')
+        self.assertEqual((run.returns, run.phase), (3, 2))
+        self.assertEqual(run.comparisons[0].test_data, 'testdata/RUN_0042/log_a.csv')
+        self.assertEqual(run.comparisons[0].tolerances, {'*': (0.1, 0)})
+        self.assertEqual(run.analysis._command, r.analysis._command)
+        self.assertIsNot(run.analysis, r.analysis)
+        # A sim holds the range without creating its runs, even when popping one
+        s = TrickWorkflow.Sim(name='alloc', sim_dir='test/SIM_alloc_test')
+        s.add_runs(runs)
+        self.assertEqual(len(s.runs), 10000)
+        self.assertIs(s.get_run('RUN_0042/input.py --flag'), run)
+        popped = s.pop_run('RUN_5000/input.py --flag')
+        self.assertEqual(popped.input_file, 'RUN_5000/input.py --flag')
+        self.assertEqual(len(s.runs), 9999)
+        self.assertIsNone(s.get_run('RUN_5000/input.py --flag'))
+        self.assertEqual(s.runs[5000].input_file, 'RUN_5001/input.py --flag')
+        self.assertEqual(len(s.runs.get_created_runs()), 2)
+
+    def test_get_job_dependencies(self):
+        deps = self.instance.get_job_dependencies()
+        for sim in self.instance.sims:
+            for run in sim.runs + sim.valgrind_runs:
+                self.assertIn(sim.get_build_job(), deps[run.get_run_job()])
+                if run.analysis:
+                    self.assertEqual(deps[run.analysis], [run.get_run_job()])
+        # Builds in the lowest phase (-88) have no prerequisites, and each later
+        # phase waits on the one before it
+        first_builds = self.instance.get_jobs('build', phase=-88)
+        self.assertFalse(any(build in deps for build in first_builds))
+        self.assertEqual(deps[self.instance.get_jobs('build', phase=-1)[0]], first_builds)
+        for build in self.instance.get_jobs('build', phase=0):
+            self.assertEqual(deps[build], self.instance.get_jobs('build', phase=-1))
+        # Filtering by phase only includes jobs of that phase
+        deps = self.instance.get_job_dependencies(phase=970)
+        self.assertEqual(deps, {})
+
+    def test_execute_all(self):
+        def make_sim(name, build_cmd):
+            sim = TrickWorkflow.Sim(name=name, sim_dir=tests_dir)
+            sim.build_job = Job(name='Build ' + name, command=build_cmd,
+              log_file='/tmp/TrickWorkflowTestCase_build_%s.txt' % name)
+            run = TrickWorkflow.Run(sim_dir=tests_dir, input_file='RUN_test/input.py',
+              binary='S_main_Linux_x86_64.exe')
+            run.run_job = SingleRun(name='Run ' + name,
+              command='touch /tmp/TrickWorkflowTestCase_%s_ran' % name,
+              log_file='/tmp/TrickWorkflowTestCase_run_%s.txt' % name)
+            run.add_comparison(os.path.join(tests_dir, 'baselinedata/log_a.csv'),
+              os.path.join(tests_dir, 'baselinedata/log_a.csv'))
+            run.add_analysis('echo analysis')
+            sim.add_run(run)
+            return sim, run
+        good_sim, good_run = make_sim('good', 'sleep 0.2')
+        bad_sim, bad_run = make_sim('bad', 'exit 1')
+        self.instance.sims = [good_sim, bad_sim]
+        # A failed build must not prevent the other sim's run, analysis, and comparison
+        self.assertTrue(self.instance.execute_all(max_concurrent=4))
+        self.assertEqual(good_run.run_job.get_status(), Job.Status.SUCCESS)
+        self.assertEqual(good_run.analysis.get_status(), Job.Status.SUCCESS)
+        self.assertEqual(good_run.comparisons[0].status, Job.Status.SUCCESS)
+        self.assertEqual(bad_sim.build_job.get_status(), Job.Status.FAILED)
+        self.assertEqual(bad_run.run_job.get_status(), Job.Status.NOT_STARTED)
+        self.assertEqual(bad_run.analysis.get_status(), Job.Status.NOT_STARTED)
+        self.assertEqual(bad_run.comparisons[0].status, Job.Status.NOT_STARTED)
+        # Runs must not start before their sim's build has finished
+        self.assertGreaterEqual(good_run.run_job._start_time, good_sim.build_job._stop_time)
+        os.remove('/tmp/TrickWorkflowTestCase_good_ran')
+
+    def test_skip_unchanged_builds(self):
+        sim_dir = tempfile.mkdtemp()
+        def write(path, contents):
+            with open(os.path.join(sim_dir, path), 'w') as f:
+                f.write(contents)
+        os.mkdir(os.path.join(sim_dir, 'build'))
+        write('S_define', '#include "model.hh"\n')
+        write('model.hh', 'int x;\n')
+        write('S_main_test.exe', 'binary')
+        write('build/S_source.d', 'build/S_source.o: build/S_source.cpp \\\n model.hh\n\nmodel.hh:\n')
+        self.instance.skip_unchanged_builds = True
+        def build():
+            # Each build uses a new job, as a new workflow would
+            sim = TrickWorkflow.Sim(name='skip', sim_dir=sim_dir, binary='S_main_test.exe',
+              build_cmd='touch built', log_dir='/tmp')
+            self.instance.sims = [sim]
+            self.assertFalse(self.instance.execute_jobs([sim.get_build_job()]))
+            built = os.path.exists(os.path.join(sim_dir, 'built'))
+            if built:
+                os.remove(os.path.join(sim_dir, 'built'))
+            self.assertEqual(built, not sim.build_skipped)
+            return built
+        try:
+            self.assertTrue(build())   # Nothing stored yet
+            self.assertFalse(build())
+            write('model.hh', 'double x;\n')
+            self.assertTrue(build())   # A dependency changed
+            self.assertFalse(build())
+            os.environ['TRICK_CXXFLAGS_SKIP_TEST'] = '-O2'
+            try:
+                self.assertTrue(build())   # The environment changed
+            finally:
+                del os.environ['TRICK_CXXFLAGS_SKIP_TEST']
+            self.assertTrue(build())
+            self.instance.skip_unchanged_builds = False
+            self.assertTrue(build())
+        finally:
+            shutil.rmtree(sim_dir)
+            os.remove(os.path.join('/tmp', unixify_string(sim_dir) + '_build.txt'))
@@ -71,3 +71,26 @@ class TrickWorkflowYamlVerifierTestCase(unittest.TestCase):
         self.assertEqual(len(non_sim_keys), 2)  # Expect 2 non-SIM.*: dict key
         self.assertEqual(len(sim_keys), 56)     # Expect 56 SIM.*: dict keys
         self.assertEqual(len(twyv.get_parsing_errors()), 0)
+
+    def test_tolerances(self):
+        import tempfile
+        with tempfile.NamedTemporaryFile('w', suffix='.yml') as config:
+            config.write(
+              "SIM_ball_L1:\n"
+              "    path: trick_sims/Ball/SIM_ball_L1\n"
+              "    runs:\n"
+              "        RUN_test/input.py:\n"
+              "            tolerances:\n"
+              "                '*': [0, 1.0e-9]\n"
+              "                dyn.x: [1.0e-6, 0]\n"
+              "                dyn.y: 1.0e-6    # Should be a list\n"
+              "                dyn.z: [-1, 0]   # Should not be negative\n"
+              "        RUN_other/input.py:\n")
+            config.flush()
+            twyv = TrickWorkflowYamlVerifier(config_file=config.name)
+            twyv.verify()
+        runs = twyv.config['SIM_ball_L1']['runs']
+        self.assertEqual(runs['RUN_test/input.py']['tolerances'],
+          {'*': [0, 1.0e-9], 'dyn.x': [1.0e-6, 0]})
+        self.assertIsNone(runs['RUN_other/input.py']['tolerances'])
+        self.assertEqual(len(twyv.get_parsing_errors()), 2)
@@ -97,3 +97,61 @@ class WorkflowCommonTestCase(unittest.TestCase):
         f = open('/tmp/WorkflowCommonTestCase_hi.txt', 'r')
         self.assertTrue(f.readlines()[0].strip() == 'hi')
         f.close()
+
+    def test_execute_jobs_concurrently(self):
+        jobs = [Job(name='sleep' + str(i), command='sleep 0.5',
+          log_file='/tmp/WorkflowCommonTestCase_sleep{0}.txt'.format(i))
+          for i in range(8)]
+        failed = self.instance.execute_jobs(jobs, max_concurrent=4)
+        self.assertFalse(failed)
+        self.assertTrue(all(job.get_status() == Job.Status.SUCCESS for job in jobs))
+        # Count the jobs running when each job started: up to four run at
+        # once, and the limit is reached
+        running = [sum(1 for other in jobs
+                       if other._start_time <= job._start_time < other._stop_time)
+                   for job in jobs]
+        self.assertEqual(max(running), 4)
+        for i in range(8):
+            os.remove('/tmp/WorkflowCommonTestCase_sleep{0}.txt'.format(i))
+
+    def test_execute_jobs_failure(self):
+        job = Job(name='fails', command='exit 3',
+          log_file='/tmp/WorkflowCommonTestCase_fails.txt')
+        self.assertTrue(self.instance.execute_jobs([job, self.job_nominal]))
+        self.assertTrue(job.get_status() == Job.Status.FAILED)
+        self.assertEqual(job.get_exit_status(), 3)
+        self.assertTrue(self.job_nominal.get_status() == Job.Status.SUCCESS)
+        os.remove('/tmp/WorkflowCommonTestCase_fails.txt')
+
+    def test_execute_jobs_killed(self):
+        job = Job(name='killed', command='kill -9 $$',
+          log_file='/tmp/WorkflowCommonTestCase_killed.txt')
+        self.assertTrue(self.instance.execute_jobs([job]))
+        self.assertTrue(job.get_status() == Job.Status.FAILED)
+        self.assertEqual(job.get_exit_status(), -9)
+        os.remove('/tmp/WorkflowCommonTestCase_killed.txt')
+
+    def test_execute_jobs_without_wait4(self):
+        # Where wait4 is missing, jobs still finish but use isn't measured
+        wait4 = os.wait4
+        del os.wait4
+        try:
+            job = Job(name='fails', command='exit 3',
+              log_file='/tmp/WorkflowCommonTestCase_fails.txt')
+            self.assertTrue(self.instance.execute_jobs([job]))
+            self.assertEqual(job.get_exit_status(), 3)
+            self.assertEqual(job.get_peak_rss(), None)
+        finally:
+            os.wait4 = wait4
+        os.remove('/tmp/WorkflowCommonTestCase_fails.txt')
+
+    def test_execute_jobs_timeout(self):
+        job = Job(name='hangs', command='sleep 30',
+          log_file='/tmp/WorkflowCommonTestCase_hangs.txt')
+        start = time.time()
+        self.assertTrue(self.instance.execute_jobs(
+          [job, self.job_nominal], max_concurrent=1, job_timeout=0.5))
+        self.assertTrue(time.time() - start < 5)
+        self.assertTrue(job.get_status() == Job.Status.TIMEOUT)
+        self.assertTrue(self.job_nominal.get_status() == Job.Status.SUCCESS)
+        os.remove('/tmp/WorkflowCommonTestCase_hangs.txt')
@@ -198,6 +198,33 @@ trick.add_read(3.5, """manual12.manual_fire()""")
 expected.append(3.5)
 result.append(0)
 
+# TEST 13: cyclic event, change the condition and action strings so they are compiled again
+event13 = trick.new_event("event13")
+event13.condition(0, "trick.exec_get_sim_time() < 0.0")
+event13.action(0, "print (\"event13\"); result[13] += 1");
+event13.action(1, "event13.activate()")
+event13.set_cycle(1.0)
+event13.activate() 
+trick.add_event(event13)
+#condition will be true during sim time 2.0 and 3.0, the action changes at 3.0
+trick.add_read(2.0, """event13.condition(0, "trick.exec_get_sim_time() >= 2.0")""")
+trick.add_read(3.0, """event13.action(0, \"print (\\\"event13_changed\\\"); result[13] += 10\")""")
+trick.add_read(4.0, """event13.condition(0, "trick.exec_get_sim_time() < 4.0")""")
+expected.append(11)
+result.append(0)
+
+# TEST 14: cyclic event, condition with a statement is not an expression, so it is parsed every time
+event14 = trick.new_event("event14")
+event14.condition(0, "ev.cond_var_true ; event14_parsed = True")
+event14.action(0, "print (\"event14\"); result[14] += 1");
+event14.action(1, "event14.activate()")
+event14.set_cycle(1.0)
+event14.activate() 
+trick.add_event(event14)
+event14_parsed = False
+expected.append(1+stop_time)
+result.append(0)
+
 ##########################################################
 # TEST RESULTS AT SHUTDOWN
 result_event = trick.new_event("result_event")
@@ -219,6 +246,9 @@ TRICK_EXPECT_EQ(result[9], expected[9], test_suite, "event9")
 TRICK_EXPECT_EQ(result[10], expected[10], test_suite, "manual10")
 TRICK_EXPECT_EQ(result[11], expected[11], test_suite, "manual11")
 TRICK_EXPECT_EQ(result[12], expected[12], test_suite, "manual12")
+TRICK_EXPECT_EQ(result[13], expected[13], test_suite, "event13")
+TRICK_EXPECT_EQ(result[14], expected[14], test_suite, "event14")
+TRICK_EXPECT_TRUE(event14_parsed, test_suite, "event14_parsed")
 """)
 result_event.activate() 
 trick.add_event_after(result_event, "ev.shutdown")
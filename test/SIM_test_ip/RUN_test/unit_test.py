@@ -3013,6 +3013,19 @@ def main():
     TRICK_EXPECT_EQ( test_so.obj.foo1.bar.z, 5, test_suite , "template member access" )
     TRICK_EXPECT_EQ( test_so.obj.foo2.bar.z, 6, test_suite , "template member access" )
 
+######################################################################################################################
+
+    test_suite = "named allocations"
+
+    # Sim objects and named allocations are bound to python names when the input processor starts
+    TRICK_EXPECT_TRUE( isinstance(test_so, trick.testSimObject), test_suite , "sim object bound to its type" )
+    TRICK_EXPECT_TRUE( isinstance(ip_named_obj, trick.ClassOfEverything), test_suite , "allocation bound to its type" )
+
+    test_so.named_obj.i = 42
+    TRICK_EXPECT_EQ( ip_named_obj.i , 42, test_suite , "allocation bound to its address" )
+    ip_named_obj.d = 3
+    TRICK_EXPECT_NEAR( test_so.named_obj.d , 3 , 0.000001 , test_suite , "allocation bound to its address" )
+
 ######################################################################################################################
 
 if __name__ == "__main__":
@@ -43,6 +43,7 @@ Trick::Executive::Executive() {
     num_classes = 0 ;
     num_sim_objects = 0 ;
     rt_nap = true ;
+    time_indexed_queues = false ;
     scheduled_start_index = 1000 ;
     num_scheduled_job_classes = 0 ;
     signal_caused_term = false ;
@@ -94,6 +95,7 @@ Trick::Executive::Executive() {
     freeze_job = NULL ;
     advance_sim_time_job = NULL ;
     curr_job = NULL ;
+    progress_data = NULL ;
 
     /** @li Map non-scheduled job class strings to job queues. */
     class_map["default_data"] = num_classes ;
@@ -275,6 +277,10 @@ int Trick::Executive::get_time_tic_value() {
     return(time_tic_value) ;
 }
 
+bool Trick::Executive::get_time_indexed_queues() {
+    return(time_indexed_queues) ;
+}
+
 long long Trick::Executive::get_freeze_time_tics() {
     return(freeze_time_tics) ;
 }
@@ -323,6 +329,7 @@ void Trick::Executive::reset_job_call_times() {
             }
         }
     }
+    Trick::JobData::schedule_changes++ ;
     return ;
 }
 
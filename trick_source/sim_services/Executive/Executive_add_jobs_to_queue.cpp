@@ -82,6 +82,7 @@ int Trick::Executive::add_jobs_to_queue( Trick::SimObject * in_sim_object , bool
         if ( (temp_job->thread + 1) > threads.size() ) {
             for ( kk = threads.size() ; kk <= temp_job->thread ; kk++ ) {
                 curr_thread = new Trick::Threads(kk, rt_nap) ;
+                curr_thread->job_queue.set_time_indexed(time_indexed_queues) ;
                 threads.push_back(curr_thread) ;
             }
         }
@@ -12,6 +12,7 @@
    -# If the thread next_job_call_time is less than the overall time, set the overall time to
       the thread next_jobs_call_time.
 -# Set the next job call time of this job to the simulation time
+-# Publish the new simulation time to the progress file, if any
 */
 int Trick::Executive::advance_sim_time() {
 
@@ -70,6 +71,8 @@ int Trick::Executive::advance_sim_time() {
     /* Set the main thread current time to the simulation time tics value, used with Executive::get_sim_time() */
     threads[0]->curr_time_tics = time_tics ;
 
+    update_progress() ;
+
     return(0) ;
 }
 
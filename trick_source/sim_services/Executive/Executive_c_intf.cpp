@@ -330,6 +330,18 @@ extern "C" long long exec_get_time_tics() {
     return -1 ;
 }
 
+/**
+ * @relates Trick::Executive
+ * @copydoc Trick::Executive::get_time_indexed_queues
+ * C wrapper for Trick::Executive::get_time_indexed_queues
+ */
+extern "C" int exec_get_time_indexed_queues() {
+    if ( the_exec != NULL ) {
+        return (int)the_exec->get_time_indexed_queues() ;
+    }
+    return -1 ;
+}
+
 /**
  * @relates Trick::Executive
  * @copydoc Trick::Executive::get_freeze_time_tics
@@ -581,6 +593,18 @@ extern "C" int exec_set_time_tic_value( int in_time_tics ) {
     return -1 ;
 }
 
+/**
+ * @relates Trick::Executive
+ * @copydoc Trick::Executive::set_time_indexed_queues
+ * C wrapper for Trick::Executive::set_time_indexed_queues
+ */
+extern "C" int exec_set_time_indexed_queues( int on_off ) {
+    if ( the_exec != NULL ) {
+        return the_exec->set_time_indexed_queues((bool)on_off) ;
+    }
+    return -1 ;
+}
+
 /**
  * @relates Trick::Executive
  * @copydoc Trick::Executive::set_trap_sigbus
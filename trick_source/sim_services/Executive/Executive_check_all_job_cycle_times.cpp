@@ -27,6 +27,7 @@ int Trick::Executive::check_all_job_cycle_times() {
             temp_job->disabled = true ;
             temp_job->cycle_tics = TRICK_MAX_LONG_LONG ;
             temp_job->next_tics = TRICK_MAX_LONG_LONG ;
+            Trick::JobData::schedule_changes++ ;
             ret = -1 ;
         }
     }
@@ -16,6 +16,7 @@
 -# Record the cpu usage during initialization
 -# The scheduler initializes simulation timers.
    Requirement [@ref r_exec_time_1].
+-# Open the progress file if the TRICK_PROGRESS_FILE environment variable is set
 -# If an exception is caught, print as much error information available based
    on execption type caught and exit.
 -# If no execption is caught return 0
@@ -52,6 +53,9 @@ int Trick::Executive::init() {
         job_call_time_tics = next_frame_check_tics ;
         sim_start = get_sim_time();
 
+        /* Publish progress if a monitoring tool asked for it. */
+        open_progress_file() ;
+
         /* Record the cpu usage for initialization */
         getrusage(RUSAGE_SELF, &cpu_usage_buf);
         cpu_time = ((double) cpu_usage_buf.ru_utime.tv_sec) + ((double) cpu_usage_buf.ru_utime.tv_usec / 1000000.0);
@@ -13,6 +13,7 @@ int Trick::Executive::init_freeze_scheduled() {
     while ( (jd = freeze_scheduled_queue.get_next_job()) != NULL ) {
         jd->next_tics = 0 ;
     }
+    Trick::JobData::schedule_changes++ ;
 
     return 0 ;
 }
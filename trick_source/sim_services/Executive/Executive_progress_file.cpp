@@ -0,0 +1,72 @@
+
+#include <fcntl.h>
+#include <stdlib.h>
+#include <string.h>
+#include <string>
+#include <unistd.h>
+#include <sys/mman.h>
+
+#include "trick/Executive.hh"
+#include "trick/message_proto.h"
+#include "trick/message_type.h"
+
+/**
+@details
+-# If the TRICK_PROGRESS_FILE environment variable is not set, or the file is already open, return.
+-# Open the file, creating it if needed, and size it to hold the progress record.
+-# Map the file into memory so updates cost no more than a few stores.
+-# Unset TRICK_PROGRESS_FILE so child processes, like Monte Carlo slaves started by a master,
+   do not open and overwrite this simulation's record.
+-# Write the record's identifying tag and the current time.
+*/
+int Trick::Executive::open_progress_file() {
+
+    const char * env_file_name = getenv("TRICK_PROGRESS_FILE") ;
+    if ( env_file_name == NULL || progress_data != NULL ) {
+        return(0) ;
+    }
+    std::string file_name = env_file_name ;
+
+    size_t size = PROGRESS_RECORD_WORDS * sizeof(long long) ;
+    int fd = open(file_name.c_str(), O_RDWR | O_CREAT, 0644) ;
+    if ( fd >= 0 ) {
+        if ( ftruncate(fd, size) == 0 ) {
+            void * data = mmap(NULL, size, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0) ;
+            if ( data != MAP_FAILED ) {
+                progress_data = (volatile long long *)data ;
+            }
+        }
+        close(fd) ;
+    }
+    unsetenv("TRICK_PROGRESS_FILE") ;
+    if ( progress_data == NULL ) {
+        message_publish(MSG_WARNING, "Unable to map progress file %s\n", file_name.c_str()) ;
+        return(-1) ;
+    }
+
+    memcpy((void *)progress_data, "TRKPROG1", sizeof(long long)) ;
+    update_progress() ;
+
+    return(0) ;
+}
+
+/**
+@details
+-# If there is no progress file, return.
+-# Make the record's sequence number odd while it is being written.
+-# Write the time in tics, the time tic value, and the terminate time in tics.
+-# Make the sequence number even again. Readers retry until they see the same even
+   sequence number before and after reading the record.
+*/
+void Trick::Executive::update_progress() {
+
+    if ( progress_data != NULL ) {
+        progress_data[1]++ ;
+        __sync_synchronize() ;
+        progress_data[2] = time_tics ;
+        progress_data[3] = time_tic_value ;
+        progress_data[4] = terminate_time ;
+        __sync_synchronize() ;
+        progress_data[1]++ ;
+    }
+}
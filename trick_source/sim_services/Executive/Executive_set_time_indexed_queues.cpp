@@ -0,0 +1,19 @@
+
+#include "trick/Executive.hh"
+
+/**
+@design
+-# Set #time_indexed_queues to the incoming value.
+-# Turn the time index of each thread's scheduled job queue on or off to match.  Threads
+   created later are set to match when they are created.
+*/
+int Trick::Executive::set_time_indexed_queues(bool on_off) {
+
+    unsigned int ii ;
+
+    time_indexed_queues = on_off ;
+    for ( ii = 0 ; ii < threads.size() ; ii++ ) {
+        threads[ii]->job_queue.set_time_indexed(on_off) ;
+    }
+    return(0) ;
+}
@@ -96,6 +96,9 @@ int Trick::Executive::shutdown() {
         sim_mem = (double)cpu_usage_buf.ru_maxrss / 1024;
     #endif
 
+    /* Publish the final simulation time to the progress file, if any */
+    update_progress() ;
+
     /* Calculate simulation elapsed sim time and actual cpu time */
     sim_elapsed_time = get_sim_time() - sim_start;
     user_cpu_time = cpu_time - user_cpu_start;
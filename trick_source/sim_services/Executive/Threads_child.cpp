@@ -166,8 +166,12 @@ void * Trick::Threads::thread_body() {
                         job_queue.reset_curr_index() ;
                         while ( (curr_job = job_queue.get_next_job()) != NULL ) {
                             long long start_frame = amf_next_tics - amf_cycle_tics ;
-                            while ( curr_job->next_tics < start_frame ) {
-                                curr_job->next_tics += curr_job->cycle_tics ;
+                            if ( curr_job->next_tics < start_frame ) {
+                                while ( curr_job->next_tics < start_frame ) {
+                                    curr_job->next_tics += curr_job->cycle_tics ;
+                                }
+                                // let a time indexed job queue know the job moved.
+                                Trick::JobData::schedule_changes++ ;
                             }
                         }
 
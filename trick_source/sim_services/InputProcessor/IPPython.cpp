@@ -9,6 +9,7 @@
 
 #include <Python.h>
 #include <iostream>
+#include <map>
 #include <sstream>
 #include <vector>
 #include <string>
@@ -40,37 +41,86 @@ static PyThreadState *_save = NULL;
 -# Loops through all of the memorymanager allocations testing if a name handle was given.
  -# If a name and a user type_name were given to the allocation
   -# If the user_type_name is not a Trick core class, prefixed with "Trick::"
-  -# Create a python statement to assign the python name to an address: <name> = trick.castAsTYPE(int(<address>))
-  -# Run the statement in the python interpreter
+  -# Save the name, the name of the castAs function for the type, and the address.
+-# Bind all of the saved names in one pass holding the GIL once.
+ -# Skip the name if python already has a variable by that name that python owns, or that
+    is not a SWIG object.  Otherwise we could free the object we're trying to assign.
+ -# Look up trick.castAs<type>.  The castAs method may not exist if the class was hidden from
+    SWIG (#ifndef SWIG).  Whether each function exists is looked up once, and names whose
+    function does not exist are skipped.
+ -# Assign the python name to the address: <name> = trick.castAs<type>(int(<address>))
 */
 void Trick::IPPython::get_TMM_named_variables() {
     //std::cout << "top level names at initialization" << std::endl ;
     Trick::ALLOC_INFO_MAP_ITER aim_it ;
+    std::vector< std::pair< std::string , std::string > > names ;
+    std::vector< void * > addresses ;
     for ( aim_it = trick_MM->alloc_info_map_begin() ; aim_it != trick_MM->alloc_info_map_end() ; ++aim_it ) {
         ALLOC_INFO * alloc_info = (*aim_it).second ;
         if ( alloc_info->name != NULL and alloc_info->user_type_name != NULL ) {
-            std::stringstream ss ;
             std::string user_type_name = alloc_info->user_type_name ;
             size_t start_colon ;
             while ( ( start_colon = user_type_name.find("::") ) != std::string::npos ) {
                 user_type_name.replace( start_colon , 2 , "__" ) ;
             }
-            // The castAs method may not exist if the class was hidden from SWIG (#ifndef SWIG).
-            // Use a try/except block to test if the method exists or not.  If it doesn't exist
-            // don't worry about it.  Also only assign python variable if it is pointing to
-            // something python doesn't owns.  Otherwise we could free the object we're trying to assign.
-            ss << "try:" << std::endl ;
-            ss << "    if '" << alloc_info->name << "' not in globals() or " ;
-            ss << alloc_info->name << ".thisown == False:" <<  std::endl ;
-            ss << "        " << alloc_info->name << " = " ;
-            ss << "trick.castAs" << user_type_name << "(int(" << alloc_info->start << "))" << std::endl ;
-            ss << "except AttributeError:" << std::endl ;
-            ss << "    pass" << std::endl ;
-            PyGILState_STATE gstate = PyGILState_Ensure();
-            PyRun_SimpleString(ss.str().c_str()) ;
-            PyGILState_Release(gstate);
+            names.push_back(std::make_pair(std::string(alloc_info->name), "castAs" + user_type_name)) ;
+            addresses.push_back(alloc_info->start) ;
         }
     }
+    if ( names.empty() ) {
+        return ;
+    }
+
+    PyGILState_STATE gstate = PyGILState_Ensure();
+    PyObject * main_dict = PyModule_GetDict(PyImport_AddModule("__main__")) ;
+    PyObject * trick_module = PyDict_GetItemString(main_dict, "trick") ;
+    // castAs function for each type, NULL if the type has none.
+    std::map< std::string , PyObject * > cast_functions ;
+    std::map< std::string , PyObject * >::iterator cast_it ;
+    unsigned int ii ;
+
+    for ( ii = 0 ; trick_module != NULL and ii < names.size() ; ii++ ) {
+        const char * name = names[ii].first.c_str() ;
+        PyObject * existing = PyDict_GetItemString(main_dict, name) ;
+        if ( existing != NULL ) {
+            PyObject * thisown = PyObject_GetAttrString(existing, "thisown") ;
+            int owned = (thisown == NULL) ? -1 : PyObject_IsTrue(thisown) ;
+            Py_XDECREF(thisown) ;
+            if ( owned != 0 ) {
+                PyErr_Clear() ;
+                continue ;
+            }
+        }
+
+        cast_it = cast_functions.find(names[ii].second) ;
+        if ( cast_it == cast_functions.end() ) {
+            PyObject * cast_function = PyObject_GetAttrString(trick_module, names[ii].second.c_str()) ;
+            if ( cast_function == NULL ) {
+                PyErr_Clear() ;
+            }
+            cast_it = cast_functions.insert(std::make_pair(names[ii].second, cast_function)).first ;
+        }
+        if ( cast_it->second == NULL ) {
+            continue ;
+        }
+
+        PyObject * address = PyLong_FromVoidPtr(addresses[ii]) ;
+        PyObject * variable = PyObject_CallFunctionObjArgs(cast_it->second, address, NULL) ;
+        Py_DECREF(address) ;
+        if ( variable != NULL ) {
+            PyDict_SetItemString(main_dict, name, variable) ;
+            Py_DECREF(variable) ;
+        } else if ( PyErr_ExceptionMatches(PyExc_AttributeError) ) {
+            PyErr_Clear() ;
+        } else {
+            PyErr_Print() ;
+        }
+    }
+
+    for ( cast_it = cast_functions.begin() ; cast_it != cast_functions.end() ; ++cast_it ) {
+        Py_XDECREF(cast_it->second) ;
+    }
+    PyGILState_Release(gstate);
 }
 
 bool Trick::IPPython::get_units_conversion_msgs() {
@@ -196,6 +246,119 @@ int Trick::IPPython::parse_condition(std::string in_string, int & cond_return_va
 
 }
 
+/**
+ @details
+ Compiled code is run with the __main__ dictionary as its globals and locals, the same
+ namespace PyRun_SimpleString uses, and compiled with the same "<string>" file name so
+ tracebacks read the same as those of parse and parse_condition.
+
+-# Return NULL if python is not running.
+-# Compile the string using the given start symbol.
+-# If the string does not compile, clear the python error and return NULL.  The caller
+   falls back to parsing the string, which reports the error.
+*/
+static void * compile_string( std::string & in_string , int start ) {
+
+    PyObject * code ;
+
+    if ( ! Py_IsInitialized() ) {
+        return NULL ;
+    }
+    PyGILState_STATE gstate = PyGILState_Ensure();
+    code = Py_CompileString(in_string.c_str(), "<string>", start) ;
+    if ( code == NULL ) {
+        PyErr_Clear() ;
+    }
+    PyGILState_Release(gstate);
+    return code ;
+}
+
+/**
+ @details
+-# Evaluate the code in the __main__ dictionary.
+-# If the code raised an exception, print it like PyRun_SimpleString does.
+-# Return the result of the code, a new reference, or NULL if it raised an exception.
+   The caller must hold the GIL.
+*/
+static PyObject * run_code( void * code ) {
+
+    PyObject * main_dict = PyModule_GetDict(PyImport_AddModule("__main__")) ;
+#if PY_VERSION_HEX >= 0x03000000
+    PyObject * result = PyEval_EvalCode((PyObject *)code, main_dict, main_dict) ;
+#else
+    PyObject * result = PyEval_EvalCode((PyCodeObject *)code, main_dict, main_dict) ;
+#endif
+    if ( result == NULL ) {
+        PyErr_Print() ;
+    }
+    return result ;
+}
+
+//Compile the given string as a condition expression.
+void * Trick::IPPython::compile_condition(std::string in_string) {
+    return compile_string(in_string, Py_eval_input) ;
+}
+
+//Compile the given string as statements.
+void * Trick::IPPython::compile(std::string in_string) {
+    in_string += "\n" ;
+    return compile_string(in_string, Py_file_input) ;
+}
+
+/**
+ @details
+ Evaluates a condition compiled by compile_condition.  Unlike parse_condition the source
+ is not compiled again and the result is not assigned to #return_val through SWIG, its
+ python truth value is used directly.
+
+-# Evaluate the compiled condition.
+-# Set cond_return_val to the truth value of the result.
+-# Return -1 if the condition raised an exception, else 0.
+*/
+int Trick::IPPython::parse_compiled_condition(void * code, int & cond_return_val ) {
+
+    int py_ret = -1 ;
+    PyGILState_STATE gstate = PyGILState_Ensure();
+    PyObject * result = run_code(code) ;
+    if ( result != NULL ) {
+        int truth = PyObject_IsTrue(result) ;
+        Py_DECREF(result) ;
+        if ( truth < 0 ) {
+            PyErr_Print() ;
+        } else {
+            cond_return_val = truth ;
+            py_ret = 0 ;
+        }
+    }
+    PyGILState_Release(gstate);
+
+    return py_ret ;
+}
+
+//Run statements compiled by compile.
+int Trick::IPPython::parse_compiled(void * code) {
+
+    int py_ret = -1 ;
+    PyGILState_STATE gstate = PyGILState_Ensure();
+    PyObject * result = run_code(code) ;
+    if ( result != NULL ) {
+        Py_DECREF(result) ;
+        py_ret = 0 ;
+    }
+    PyGILState_Release(gstate);
+
+    return py_ret ;
+}
+
+//Release code returned by compile_condition or compile.
+void Trick::IPPython::free_compiled(void * code) {
+    if ( code != NULL and Py_IsInitialized() ) {
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        Py_DECREF((PyObject *)code) ;
+        PyGILState_Release(gstate);
+    }
+}
+
 //Restart job that reloads event_list from checkpointable structures
 int Trick::IPPython::restart() {
     /* Make shortcut names for all known sim_objects. */
@@ -39,6 +39,7 @@ Trick::condition_t::condition_t() {
     fired_time = -1.0 ;
     ref = NULL ;
     job = NULL ;
+    code = NULL ;
 }
 
 Trick::action_t::action_t() {
@@ -48,6 +49,17 @@ Trick::action_t::action_t() {
     ran_time = -1.0 ;
     job = NULL ;
     act_type = 0 ;
+    code = NULL ;
+}
+
+/* Entries are deleted by the memory manager without the event, for instance when a checkpoint
+   is restored, so each entry releases its own compiled code. */
+Trick::condition_t::~condition_t() {
+    Trick::IPPythonEvent::free_compiled(code) ;
+}
+
+Trick::action_t::~action_t() {
+    Trick::IPPythonEvent::free_compiled(code) ;
 }
 
 //Constructor
@@ -104,6 +116,12 @@ void Trick::IPPythonEvent::set_python_processor(Trick::IPPython * in_ip) {
     ip = in_ip ;
 }
 
+void Trick::IPPythonEvent::free_compiled(void * code) {
+    if ( ip != NULL ) {
+        ip->free_compiled(code) ;
+    }
+}
+
 void Trick::IPPythonEvent::set_mtv(Trick::MTV * in_mtv) {
     mtv = in_mtv ;
 }
@@ -578,9 +596,19 @@ bool Trick::IPPythonEvent::process_user_event( long long curr_time ) {
                     return_val = condition_list[ii]->job->call();
                     condition_list[ii]->job->disabled = save_disabled_state;
                 } else {
-                // otherwise use python to evaluate string
-                    std::string full_in_string ;
-                    int python_ret = ip->parse_condition(condition_list[ii]->str, return_val) ;
+                // otherwise use python to evaluate string, compiled when first evaluated or changed
+                    condition_t * cond = condition_list[ii] ;
+                    int python_ret ;
+                    if (cond->code_str != cond->str) {
+                        ip->free_compiled(cond->code) ;
+                        cond->code = ip->compile_condition(cond->str) ;
+                        cond->code_str = cond->str ;
+                    }
+                    if (cond->code != NULL) {
+                        python_ret = ip->parse_compiled_condition(cond->code, return_val) ;
+                    } else {
+                        python_ret = ip->parse_condition(cond->str, return_val) ;
+                    }
                     if (python_ret != 0 && terminate_sim_on_event_python_error) {
                         exec_terminate_with_return( python_ret , __FILE__ , __LINE__ , "Python error in event condition processing" ) ;
                     }
@@ -650,8 +678,19 @@ bool Trick::IPPythonEvent::process_user_event( long long curr_time ) {
                         break;
                 }
             } else {
-                // otherwise use python to evaluate string
-                int ret = ip->parse(action_list[ii]->str) ;
+                // otherwise use python to run string, compiled when first run or changed
+                action_t * act = action_list[ii] ;
+                int ret ;
+                if (act->code_str != act->str) {
+                    ip->free_compiled(act->code) ;
+                    act->code = ip->compile(act->str) ;
+                    act->code_str = act->str ;
+                }
+                if (act->code != NULL) {
+                    ret = ip->parse_compiled(act->code) ;
+                } else {
+                    ret = ip->parse(act->str) ;
+                }
                 if (ret != 0 && terminate_sim_on_event_python_error) {
                     exec_terminate_with_return( ret , __FILE__ , __LINE__ , "Python error in event action processing" ) ;
                 }
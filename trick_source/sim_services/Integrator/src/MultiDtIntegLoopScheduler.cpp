@@ -250,6 +250,7 @@ int MultiDtIntegLoopScheduler::initialize_rates()
     Trick::JobData * found_job = find_integ_loop_job();
     double next_time = (double)next_tic / (double)Trick::JobData::time_tic_value;
     found_job->next_tics = next_tic;
+    Trick::JobData::schedule_changes++;
     next_cycle = next_time - exec_get_sim_time();
     return ret;
 }
@@ -316,6 +317,7 @@ int MultiDtIntegLoopScheduler::set_integ_rate(const size_t rate_idx, const doubl
         next_tic = calculate_next_integ_tic();
         double next_time = (double)next_tic / (double)Trick::JobData::time_tic_value;
         found_job->next_tics = next_tic;
+        Trick::JobData::schedule_changes++;
         next_cycle = next_time - exec_get_sim_time();
         if(rate_idx == 0)
         {
@@ -30,6 +30,8 @@ Trick::MemoryManager::MemoryManager()
     // start counter at 0.  This forces extern vars to appear in front of actual allocations in checkpoint.
     extern_alloc_info_map_counter = 0 ;
     pthread_mutex_init(&mm_mutex, NULL);
+    ref_cache_generation = 0 ;
+    ref_cache_valid_generation = 0 ;
 
     defaultCheckPointAgent = new ClassicCheckPointAgent( this);
     defaultCheckPointAgent->set_reduced_checkpoint( reduced_checkpoint);
@@ -94,6 +96,7 @@ Trick::MemoryManager::~MemoryManager() {
         free(ai_ptr) ;
     }
     alloc_info_map.clear() ;
+    clear_ref_cache() ;
 }
 
 #include <sstream>
@@ -43,6 +43,7 @@ int Trick::MemoryManager::set_name_at( void* addr , const char * name ) {
             ret = -1 ;
         } else {
             variable_map[name] = pos->second ;
+            ref_cache_generation++ ;
         }
         pthread_mutex_unlock(&mm_mutex);
     } else {
@@ -191,6 +191,7 @@ void* Trick::MemoryManager::declare_var( TRICK_TYPE type,
             key-value pair into the variable map.*/
         if (new_alloc->name) {
             variable_map[new_alloc->name] = new_alloc;
+            ref_cache_generation++ ;
         }
         pthread_mutex_unlock(&mm_mutex);
     } else {
@@ -63,6 +63,7 @@ int Trick::MemoryManager::delete_var(void* address ) {
         if (alloc_info->name ) {
             pthread_mutex_lock(&mm_mutex);
             variable_map.erase( alloc_info->name);
+            ref_cache_generation++ ;
             pthread_mutex_unlock(&mm_mutex);
             free(alloc_info->name);
         }
@@ -175,6 +175,11 @@ void* Trick::MemoryManager::resize_array( void *address, int n_cdims, int *cdims
     }
     alloc_info->num = new_n_elems;
 
+    /** @li If the allocation is named, references to it that were resolved by ref_attributes are out of date. */
+    if (alloc_info->name) {
+        ref_cache_generation++ ;
+    }
+
     /** @li Insert the new <address, ALLOC_INFO> key-value pair into the alloc_info_map.*/
     alloc_info_map[alloc_info->start] = alloc_info;
     pthread_mutex_unlock(&mm_mutex);
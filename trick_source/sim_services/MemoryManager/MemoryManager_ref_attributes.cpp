@@ -5,16 +5,137 @@
 #include <sstream>
 #include "trick/MemoryManager.hh"
 #include "trick/RefParseContext.hh"
+#include "trick/memorymanager_c_intf.h"
 
 extern int REF_debug;
 
+/* The most references ref_attributes caches. Names looked up after the cache is full are parsed every time. */
+static const unsigned int max_ref_cache_size = 10000 ;
+
+/*
+ Make a copy of a reference that owns its own reference name, address path and
+ reference attributes.
+*/
+static REF2 * copy_ref( REF2 * ref ) {
+
+    REF2 * copy = (REF2 *)malloc(sizeof(REF2)) ;
+    memcpy(copy, ref, sizeof(REF2)) ;
+
+    if ( ref->reference ) {
+        copy->reference = strdup(ref->reference) ;
+    }
+    if ( ref->ref_attr ) {
+        copy->ref_attr = (ATTRIBUTES *)malloc(sizeof(ATTRIBUTES)) ;
+        memcpy(copy->ref_attr, ref->ref_attr, sizeof(ATTRIBUTES)) ;
+        if ( ref->attr == ref->ref_attr ) {
+            copy->attr = copy->ref_attr ;
+        }
+    }
+    if ( ref->address_path ) {
+        DLLPOS list_pos = DLL_GetHeadPosition(ref->address_path) ;
+        copy->address_path = DLL_Create() ;
+        while ( list_pos != NULL ) {
+            ADDRESS_NODE * address_node = (ADDRESS_NODE *)DLL_GetNext(&list_pos, ref->address_path) ;
+            DLL_AddTail(new ADDRESS_NODE(*address_node), copy->address_path) ;
+        }
+    }
+    return copy ;
+}
+
+/*
+ Free a reference made by copy_ref.
+*/
+static void free_ref_copy( REF2 * ref ) {
+    ref_free(ref) ;
+    if ( ref->ref_attr ) {
+        free(ref->ref_attr) ;
+    }
+    free(ref) ;
+}
+
+/*
+ Recalculate the address of a copy of a cached reference by following its address path,
+ which dereferences any pointers along the reference again. Returns false if one of
+ the pointers is NULL, in which case the reference has to be parsed again to find out
+ whether it is still valid.
+*/
+static bool follow_cached_path( REF2 * ref ) {
+
+    DLLPOS list_pos ;
+    ADDRESS_NODE * address_node ;
+    char * address = NULL ;
+    bool dereferenced = false ;
+
+    list_pos = DLL_GetHeadPosition(ref->address_path) ;
+    while ( list_pos != NULL ) {
+        address_node = (ADDRESS_NODE *)DLL_GetNext(&list_pos, ref->address_path) ;
+        switch ( address_node->operator_ ) {
+            case AO_ADDRESS:
+                address = (char *)address_node->operand.address ;
+                break ;
+            case AO_DEREFERENCE:
+                address = *(char **)address ;
+                if ( address == NULL ) {
+                    return false ;
+                }
+                dereferenced = true ;
+                break ;
+            case AO_OFFSET:
+                address += address_node->operand.offset ;
+                break ;
+        }
+    }
+
+    /* Without a pointer along the way the cached address is still good. */
+    if ( dereferenced ) {
+        ref->address = address ;
+    }
+    return true ;
+}
+
+void Trick::MemoryManager::clear_ref_cache() {
+
+    REF_CACHE::iterator pos ;
+
+    for ( pos = ref_cache.begin() ; pos != ref_cache.end() ; ++pos ) {
+        free_ref_copy(pos->second) ;
+    }
+    ref_cache.clear() ;
+}
+
 REF2 *Trick::MemoryManager::ref_attributes(const char* name) {
 
     std::stringstream reference_sstream;
     REF2 * result = NULL;
     RefParseContext* context = NULL;
+    REF_CACHE::iterator pos ;
+    unsigned int generation ;
 
     /** @par Design Details: */
+
+    /** @li If named allocations changed since the cached references were resolved, empty the cache. */
+    pthread_mutex_lock(&mm_mutex);
+    if ( ref_cache_valid_generation != ref_cache_generation ) {
+        clear_ref_cache() ;
+        ref_cache_valid_generation = ref_cache_generation ;
+    }
+    generation = ref_cache_generation ;
+
+    /** @li If the reference is cached, return a copy of it with any pointers along it followed again. */
+    pos = ref_cache.find(name) ;
+    if ( pos != ref_cache.end() ) {
+        result = copy_ref(pos->second) ;
+    }
+    pthread_mutex_unlock(&mm_mutex);
+
+    if ( result != NULL ) {
+        if ( follow_cached_path(result) ) {
+            return ( result);
+        }
+        free_ref_copy(result) ;
+        result = NULL ;
+    }
+
     reference_sstream << name;
 
     REF_debug = 0;
@@ -37,7 +158,17 @@ REF2 *Trick::MemoryManager::ref_attributes(const char* name) {
         delete( context);
     }
 
+    /** @li Cache a copy of the reference, unless named allocations changed while it was parsed
+           or the cache is full. */
+    if ( result != NULL ) {
+        pthread_mutex_lock(&mm_mutex);
+        if ( generation == ref_cache_generation and ref_cache.size() < max_ref_cache_size and
+             ref_cache.find(name) == ref_cache.end() ) {
+            ref_cache[name] = copy_ref(result) ;
+        }
+        pthread_mutex_unlock(&mm_mutex);
+    }
+
     /** @li Return the the REF2 object.*/
     return ( result);
 }
-
@@ -52,6 +52,7 @@ int Trick::MemoryManager::read_checkpoint( std::istream *is, bool do_restore_stl
 
                 // 1) Unregister the associated variable.
                 variable_map.erase( name);
+                ref_cache_generation++ ;
 
                 // 2) free the name
                 free( alloc_info->name);
@@ -149,6 +149,13 @@ param: NAME {
 
     if ( $2 == 1) {
         // we have an ARROW, so dereference the address.
+        $$.pointer_present = 1 ;
+        if ( $$.create_add_path ) {
+            ADDRESS_NODE * address_node = new ADDRESS_NODE ;
+            address_node->operator_ = AO_DEREFERENCE ;
+            address_node->operand.address = NULL ;
+            DLL_AddTail(address_node , $$.address_path) ;
+        }
         $$.address = *(void**)$$.address;
         $$.num_index ++; 
     }
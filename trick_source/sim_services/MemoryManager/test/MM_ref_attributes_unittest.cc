@@ -2,6 +2,7 @@
 #include <gtest/gtest.h>
 #include "MM_test.hh"
 #include "MM_user_defined_types.hh"
+#include "trick/memorymanager_c_intf.h"
 
 
 /*
@@ -188,3 +189,89 @@ TEST_F(MM_ref_attributes, FailureCases) {
 
 
 }
+
+TEST_F(MM_ref_attributes, CachedReferences) {
+    REF2 *ref;
+    UDT1  udt1;
+    UDT1  other_udt1;
+    UDT2  udt2;
+    UDT3  udt3;
+    UDT3  other_udt3;
+
+    udt3.udt1_p = &udt1;
+    udt3.udt2_p = &udt2;
+    udt2.udt1_p = &udt1;
+
+    UDT3* udt3_p = (UDT3*)memmgr->declare_extern_var(&udt3, "UDT3 udt3");
+    ASSERT_TRUE(udt3_p != NULL);
+
+    // The second reference to a name comes from the cache.
+    ref = memmgr->ref_attributes("udt3.M2[2][3]");
+    ASSERT_TRUE(ref != NULL);
+    free( ref);
+    ref = memmgr->ref_attributes("udt3.M2[2][3]");
+    ASSERT_TRUE(ref != NULL);
+    EXPECT_EQ( &udt3.M2[2][3], ref->address);
+    EXPECT_STREQ( "udt3.M2[2][3]", ref->reference);
+    ASSERT_TRUE(ref->attr != NULL);
+    EXPECT_STREQ( "M2", ref->attr->name);
+    free( ref);
+
+    // Pointers along a cached reference are followed again.
+    ref = memmgr->ref_attributes("udt3.udt2_p->udt1_p->y");
+    ASSERT_TRUE(ref != NULL);
+    EXPECT_EQ( &udt1.y, ref->address);
+    free( ref);
+
+    udt2.udt1_p = &other_udt1;
+    ref = memmgr->ref_attributes("udt3.udt2_p->udt1_p->y");
+    ASSERT_TRUE(ref != NULL);
+    EXPECT_EQ( &other_udt1.y, ref->address);
+    free( ref);
+
+    std::cout << ISO_6429_White_Background
+              << ISO_6429_Blue_Foreground
+              << ISO_6429_Underline
+              << "NOTE: An error message is expected in this test."
+              << ISO_6429_Restore_Default
+              << std::endl;
+
+    udt3.udt2_p = NULL;
+    ref = memmgr->ref_attributes("udt3.udt2_p->udt1_p->y");
+    ASSERT_TRUE(ref == NULL);
+
+    // Cached references are dropped when the named allocation is replaced.
+    memmgr->delete_extern_var("udt3");
+    udt3_p = (UDT3*)memmgr->declare_extern_var(&other_udt3, "UDT3 udt3");
+    ASSERT_TRUE(udt3_p != NULL);
+    ref = memmgr->ref_attributes("udt3.M2[2][3]");
+    ASSERT_TRUE(ref != NULL);
+    EXPECT_EQ( &other_udt3.M2[2][3], ref->address);
+    free( ref);
+}
+
+TEST_F(MM_ref_attributes, CachedArrowReferences) {
+    REF2 *ref;
+    UDT1  udt1;
+    UDT1  other_udt1;
+    UDT3  udt3;
+
+    udt3.udt1_p = &udt1;
+
+    UDT3* udt3_p = (UDT3*)memmgr->declare_extern_var(&udt3, "UDT3 udt3");
+    ASSERT_TRUE(udt3_p != NULL);
+
+    // The "->" is recorded in the address path, so the path follows the pointer.
+    ref = memmgr->ref_attributes("udt3.udt1_p->z");
+    ASSERT_TRUE(ref != NULL);
+    EXPECT_EQ( &udt1.z, ref->address);
+    EXPECT_EQ( 1, ref->pointer_present);
+    EXPECT_EQ( &udt1.z, follow_address_path(ref));
+    free( ref);
+
+    udt3.udt1_p = &other_udt1;
+    ref = memmgr->ref_attributes("udt3.udt1_p->z");
+    ASSERT_TRUE(ref != NULL);
+    EXPECT_EQ( &other_udt1.z, ref->address);
+    free( ref);
+}
@@ -15,6 +15,7 @@
 -# Set #list_list to 0
 -# Set #curr_index to 0
 -# Set #next_job_time to TRICK_MAX_LONG_LONG
+-# Turn off the time index
 */
 Trick::ScheduledJobQueue::ScheduledJobQueue( ) {
 
@@ -22,6 +23,11 @@ Trick::ScheduledJobQueue::ScheduledJobQueue( ) {
     list_size = 0 ;
     curr_index = 0 ;
     next_job_time = TRICK_MAX_LONG_LONG ;
+    time_indexed = false ;
+    time_index_valid = false ;
+    time_index_changes = 0 ;
+    due_time = TRICK_MAX_LONG_LONG ;
+    due_cursor = 0 ;
 
 }
 
@@ -71,6 +77,7 @@ static bool compare_job_data(const Trick::JobData *a, const Trick::JobData *b) {
 -# Move the jobs after the insertion point to the right by one.
 -# Insert the new job at the insertion point.
 -# Increment the size of the queue.
+-# Mark the time index as out of date.
 */
 int Trick::ScheduledJobQueue::push( JobData * new_job ) {
 
@@ -96,6 +103,7 @@ int Trick::ScheduledJobQueue::push( JobData * new_job ) {
     if(new_job_index < curr_index) {
         curr_index++;	
     }
+    time_index_valid = false ;
 
     return(0) ;
 
@@ -133,6 +141,7 @@ int Trick::ScheduledJobQueue::push_ignore_sim_object( JobData * new_job ) {
   -# Decrement the size of the list
   -# Free the memory associated with the current list
   -# Point the current list to the newly allocated list
+  -# Mark the time index as out of date
 */
 int Trick::ScheduledJobQueue::remove( JobData * delete_job ) {
 
@@ -160,6 +169,7 @@ int Trick::ScheduledJobQueue::remove( JobData * delete_job ) {
             free(list) ;
             /* Assign the queue pointer to the new space */
             list = new_list ;
+            time_index_valid = false ;
             return 0 ;
         }
     }
@@ -219,6 +229,7 @@ bool Trick::ScheduledJobQueue::empty() {
 -# Set #list_list to 0
 -# Set #curr_index to 0
 -# Set #next_job_time to TRICK_MAX_LONG_LONG
+-# Empty the time index
 */
 int Trick::ScheduledJobQueue::clear() {
 
@@ -231,6 +242,16 @@ int Trick::ScheduledJobQueue::clear() {
     list_size = 0 ;
     curr_index = 0 ;
     next_job_time = TRICK_MAX_LONG_LONG ;
+    time_index_valid = false ;
+    group_jobs.clear() ;
+    group_time.clear() ;
+    group_cycle.clear() ;
+    free_groups.clear() ;
+    time_heap.clear() ;
+    due_groups.clear() ;
+    due_jobs.clear() ;
+    system_jobs.clear() ;
+    due_cursor = 0 ;
     return(0) ;
 }
 
@@ -280,6 +301,45 @@ Trick::JobData * Trick::ScheduledJobQueue::get_next_job() {
 
 /**
 @design
+-# If the job class is not a system class job, calculate the next
+   time it will be called by current time + job cycle.
+-# Set the next job call time to TRICK_MAX_LONG_LONG if the next job call time
+   is greater than the stop time.
+-# If the job's next job call time is lower than the overall next job call time
+   set the overall job call time to the current job's next job call time.
+*/
+void Trick::ScheduledJobQueue::advance_job_call_time( JobData * curr_job ) {
+
+    long long next_call ;
+
+    /* If the job does not reschedule itself (system_job_classes), calculate the next time it will be called. */
+    if ( ! curr_job->system_job_class ) {
+        // calculate the next job call time
+        next_call = curr_job->next_tics + curr_job->cycle_tics ;
+        /* If the next time does not exceed the stop time, set the next call time for the module */
+        if (next_call > curr_job->stop_tics) {
+            curr_job->next_tics = TRICK_MAX_LONG_LONG ;
+        } else {
+            curr_job->next_tics = next_call;
+        }
+        /* Track next lowest job call time after the current time for jobs that match the current time. */
+        if ( curr_job->next_tics <  next_job_time ) {
+            next_job_time = curr_job->next_tics ;
+        }
+    }
+}
+
+/**
+@design
+-# If the queue is time indexed
+    -# Find the jobs due at the incoming simulation time
+    -# For each due job at or after the #curr_index
+        -# If the job next call matches the incoming simulation time
+            -# Advance the job's next call time
+            -# Set the #curr_index to just after the job.
+            -# Return the current job if the job is enabled.
+    -# Track the next lowest job call time of the due jobs and the time index.
+    -# Set the #curr_index to the #list_size and return NULL.
 -# While the list #curr_list is less than the list size
     -# If the current queue job next call matches the incoming simulation time
         -# If the job class is not a system class job, calculate the next
@@ -299,7 +359,25 @@ Trick::JobData * Trick::ScheduledJobQueue::get_next_job() {
 Trick::JobData * Trick::ScheduledJobQueue::find_next_job(long long time_tics ) {
 
     JobData * curr_job ;
-    long long next_call ;
+
+    if ( time_indexed ) {
+        find_due_jobs(time_tics) ;
+        /* Only visit the due jobs from curr_index on. */
+        for ( due_cursor = seek_due_jobs() ; due_cursor < due_jobs.size() ; ) {
+            unsigned int position = due_jobs[due_cursor++] ;
+            curr_job = list[position] ;
+            if ( curr_job->next_tics == time_tics ) {
+                advance_job_call_time(curr_job) ;
+                curr_index = position + 1 ;
+                if ( !curr_job->disabled ) {
+                    return(curr_job) ;
+                }
+            }
+        }
+        track_indexed_next_job_call_time(time_tics) ;
+        curr_index = list_size ;
+        return(NULL) ;
+    }
 
     /* Search through the rest of the queue starting at curr_index looking for
        the next job with it's next execution time is equal to the current simulation time. */
@@ -309,21 +387,7 @@ Trick::JobData * Trick::ScheduledJobQueue::find_next_job(long long time_tics ) {
 
         if ( curr_job->next_tics == time_tics ) {
 
-            /* If the job does not reschedule itself (system_job_classes), calculate the next time it will be called. */
-            if ( ! curr_job->system_job_class ) {
-                // calculate the next job call time
-                next_call = curr_job->next_tics + curr_job->cycle_tics ;
-                /* If the next time does not exceed the stop time, set the next call time for the module */
-                if (next_call > curr_job->stop_tics) {
-                    curr_job->next_tics = TRICK_MAX_LONG_LONG ;
-                } else {
-                    curr_job->next_tics = next_call;
-                }
-                /* Track next lowest job call time after the current time for jobs that match the current time. */
-                if ( curr_job->next_tics <  next_job_time ) {
-                    next_job_time = curr_job->next_tics ;
-                }
-            }
+            advance_job_call_time(curr_job) ;
             curr_index++ ;
             if ( !curr_job->disabled ) {
                 return(curr_job) ;
@@ -341,6 +405,11 @@ Trick::JobData * Trick::ScheduledJobQueue::find_next_job(long long time_tics ) {
 
 /**
 @design
+-# If the queue is time indexed
+    -# Find the jobs due at the incoming simulation time
+    -# Return the first enabled due job at or after the #curr_index whose next call matches
+       the incoming simulation time, setting the #curr_index to just after it.
+    -# Set the #curr_index to the #list_size and return NULL if there is none.
 -# While the list #curr_list is less than the list size
     -# If the current queue job next call matches the incoming simulation time
         -# Increment the #curr_index.
@@ -351,6 +420,20 @@ Trick::JobData * Trick::ScheduledJobQueue::find_next_job(long long time_tics ) {
 Trick::JobData* Trick::ScheduledJobQueue::find_job(long long time_tics) {
     JobData * curr_job ;
 
+    if ( time_indexed ) {
+        find_due_jobs(time_tics) ;
+        for ( due_cursor = seek_due_jobs() ; due_cursor < due_jobs.size() ; ) {
+            unsigned int position = due_jobs[due_cursor++] ;
+            curr_job = list[position] ;
+            if ( curr_job->next_tics == time_tics and !curr_job->disabled ) {
+                curr_index = position + 1 ;
+                return(curr_job) ;
+            }
+        }
+        curr_index = list_size ;
+        return(NULL) ;
+    }
+
     /* Search through the rest of the queue starting at curr_index looking for             */
     /* the next job with it's next execution time is equal to the current simulation time. */
     while (curr_index < list_size) {
@@ -0,0 +1,253 @@
+
+#include <algorithm>
+#include <functional>
+#include <map>
+
+#include "trick/ScheduledJobQueue.hh"
+#include "trick/TrickConstant.hh"
+
+/*
+   The time index keeps the non system class jobs of the queue in groups of jobs that have the
+   same next call time and cycle, and so stay due at the same times.  Each group holds the list
+   positions of its jobs in queue order.  The groups wait in a heap ordered by their next call
+   time, so finding the jobs due at a call time only touches the groups due at that time, and
+   merging their sorted positions keeps the jobs in queue order.
+*/
+
+typedef std::pair< long long, unsigned int > TimeIndexEntry ;
+
+/* Above this many sorted lists, concatenating and sorting the due jobs is cheaper than merging. */
+static const unsigned int max_due_merges = 8 ;
+
+/**
+@design
+-# Set #time_indexed to the incoming value.
+-# Mark the time index as out of date so it is rebuilt when next used.
+*/
+int Trick::ScheduledJobQueue::set_time_indexed( bool yes_no ) {
+    time_indexed = yes_no ;
+    time_index_valid = false ;
+    return(0) ;
+}
+
+/**
+@design
+-# Returns #time_indexed
+*/
+bool Trick::ScheduledJobQueue::get_time_indexed() {
+    return(time_indexed) ;
+}
+
+/**
+@design
+-# Reuse a free job group if there is one, else add a new one.
+-# Set the group's next call time and cycle.
+-# Return the group.
+*/
+unsigned int Trick::ScheduledJobQueue::new_job_group( long long time, long long cycle ) {
+    unsigned int group ;
+    if ( free_groups.empty() ) {
+        group = group_jobs.size() ;
+        group_jobs.push_back(std::vector< unsigned int >()) ;
+        group_time.push_back(time) ;
+        group_cycle.push_back(cycle) ;
+    } else {
+        group = free_groups.back() ;
+        free_groups.pop_back() ;
+        group_jobs[group].clear() ;
+        group_time[group] = time ;
+        group_cycle[group] = cycle ;
+    }
+    return(group) ;
+}
+
+/**
+@design
+-# If the group has jobs and a next call time, push it onto the time heap.
+-# Else free the group.
+*/
+void Trick::ScheduledJobQueue::schedule_job_group( unsigned int group ) {
+    if ( !group_jobs[group].empty() and group_time[group] != TRICK_MAX_LONG_LONG ) {
+        time_heap.push_back(TimeIndexEntry(group_time[group], group)) ;
+        std::push_heap(time_heap.begin(), time_heap.end(), std::greater< TimeIndexEntry >()) ;
+    } else {
+        free_groups.push_back(group) ;
+    }
+}
+
+/**
+@design
+-# Empty the time index.
+-# Save the positions of the system class jobs, which set their own call times and are
+   visited on every call time.
+-# Group every other job with a next call time by next call time and cycle.
+-# Push the groups onto the time heap.
+*/
+void Trick::ScheduledJobQueue::build_time_index() {
+
+    unsigned int ii ;
+    std::map< std::pair< long long, long long >, unsigned int > groups ;
+    std::map< std::pair< long long, long long >, unsigned int >::iterator it ;
+
+    time_heap.clear() ;
+    system_jobs.clear() ;
+    due_groups.clear() ;
+    free_groups.clear() ;
+    for ( ii = 0 ; ii < group_jobs.size() ; ii++ ) {
+        free_groups.push_back(ii) ;
+    }
+
+    for ( ii = 0 ; ii < list_size ; ii++ ) {
+        JobData * curr_job = list[ii] ;
+        if ( curr_job->system_job_class ) {
+            system_jobs.push_back(ii) ;
+        } else if ( curr_job->next_tics != TRICK_MAX_LONG_LONG ) {
+            std::pair< long long, long long > key(curr_job->next_tics, curr_job->cycle_tics) ;
+            it = groups.find(key) ;
+            if ( it == groups.end() ) {
+                it = groups.insert(std::make_pair(key, new_job_group(key.first, key.second))).first ;
+            }
+            group_jobs[it->second].push_back(ii) ;
+        }
+    }
+    for ( it = groups.begin() ; it != groups.end() ; ++it ) {
+        schedule_job_group(it->second) ;
+    }
+
+    time_index_valid = true ;
+    time_index_changes = Trick::JobData::schedule_changes ;
+}
+
+/**
+@design
+-# If the due jobs were already found for the incoming time and the index is up to date, return.
+-# If jobs were pushed or removed, or job call times were changed outside of the queue since
+   the index was built, rebuild the index.
+-# Else reschedule the groups that were due at the previous call time.
+    -# Jobs still in step with their group, which are those that were called and whose call time
+       was advanced by one cycle, stay in the group, and the group is pushed back onto the heap
+       at its next call time.
+    -# Any other job, such as a job that changed its own next call time while it was called or
+       reached its stop time, is moved to a new group of its own.
+-# Pop every group at or before the incoming time off of the heap.  Groups due at the incoming
+   time are due.  Groups before it are in the past, which happens when the incoming time skips
+   past their call time.  The jobs of a past group are regrouped by their current next call time.
+    -# Jobs due at the incoming time are moved to a new due group of their own.
+    -# Jobs due after the incoming time are moved to a new group of their own on the heap.
+    -# Jobs whose call time has passed are dropped from the index, as they would never be called
+       again by a queue that is not time indexed.  Moving them to a new call time increments
+       JobData::schedule_changes, which rebuilds the index.
+    -# The past group is freed.
+-# Merge the positions of the due groups' jobs and of the system class jobs into queue order.
+*/
+void Trick::ScheduledJobQueue::find_due_jobs( long long time_tics ) {
+
+    unsigned int ii , jj ;
+    bool changed = (time_index_changes != Trick::JobData::schedule_changes) ;
+
+    if ( time_index_valid and !changed and due_time == time_tics ) {
+        return ;
+    }
+
+    if ( !time_index_valid or changed ) {
+        build_time_index() ;
+    } else {
+        for ( ii = 0 ; ii < due_groups.size() ; ii++ ) {
+            unsigned int group = due_groups[ii] ;
+            long long next_time = group_time[group] + group_cycle[group] ;
+            unsigned int kept = 0 ;
+            /* new_job_group may reallocate group_jobs, so index it on every use */
+            for ( jj = 0 ; jj < group_jobs[group].size() ; jj++ ) {
+                unsigned int position = group_jobs[group][jj] ;
+                JobData * curr_job = list[position] ;
+                if ( curr_job->next_tics == next_time and curr_job->cycle_tics == group_cycle[group] ) {
+                    group_jobs[group][kept++] = position ;
+                } else if ( curr_job->next_tics != TRICK_MAX_LONG_LONG ) {
+                    unsigned int single = new_job_group(curr_job->next_tics, curr_job->cycle_tics) ;
+                    group_jobs[single].push_back(position) ;
+                    schedule_job_group(single) ;
+                }
+            }
+            group_jobs[group].resize(kept) ;
+            group_time[group] = next_time ;
+            schedule_job_group(group) ;
+        }
+    }
+
+    due_groups.clear() ;
+    while ( !time_heap.empty() and time_heap.front().first <= time_tics ) {
+        std::pop_heap(time_heap.begin(), time_heap.end(), std::greater< TimeIndexEntry >()) ;
+        TimeIndexEntry entry = time_heap.back() ;
+        time_heap.pop_back() ;
+        if ( entry.first == time_tics ) {
+            due_groups.push_back(entry.second) ;
+        } else {
+            unsigned int group = entry.second ;
+            for ( jj = 0 ; jj < group_jobs[group].size() ; jj++ ) {
+                unsigned int position = group_jobs[group][jj] ;
+                JobData * curr_job = list[position] ;
+                if ( curr_job->next_tics >= time_tics and curr_job->next_tics != TRICK_MAX_LONG_LONG ) {
+                    unsigned int single = new_job_group(curr_job->next_tics, curr_job->cycle_tics) ;
+                    group_jobs[single].push_back(position) ;
+                    if ( curr_job->next_tics == time_tics ) {
+                        due_groups.push_back(single) ;
+                    } else {
+                        schedule_job_group(single) ;
+                    }
+                }
+            }
+            free_groups.push_back(group) ;
+        }
+    }
+
+    due_jobs.assign(system_jobs.begin(), system_jobs.end()) ;
+    if ( due_groups.size() > max_due_merges ) {
+        for ( ii = 0 ; ii < due_groups.size() ; ii++ ) {
+            std::vector< unsigned int > & jobs = group_jobs[due_groups[ii]] ;
+            due_jobs.insert(due_jobs.end(), jobs.begin(), jobs.end()) ;
+        }
+        std::sort(due_jobs.begin(), due_jobs.end()) ;
+    } else {
+        for ( ii = 0 ; ii < due_groups.size() ; ii++ ) {
+            std::vector< unsigned int > & jobs = group_jobs[due_groups[ii]] ;
+            merged_jobs.resize(due_jobs.size() + jobs.size()) ;
+            std::merge(due_jobs.begin(), due_jobs.end(), jobs.begin(), jobs.end(), merged_jobs.begin()) ;
+            due_jobs.swap(merged_jobs) ;
+        }
+    }
+    due_cursor = 0 ;
+    due_time = time_tics ;
+}
+
+/**
+@design
+-# If the #curr_index was moved since the last due job was found, find the first due job at or
+   after it.
+-# Return the index into the due jobs from which to continue searching.
+*/
+unsigned int Trick::ScheduledJobQueue::seek_due_jobs() {
+    if ( (due_cursor > 0 and due_jobs[due_cursor - 1] >= curr_index) or
+         (due_cursor < due_jobs.size() and due_jobs[due_cursor] < curr_index) ) {
+        due_cursor = std::lower_bound(due_jobs.begin(), due_jobs.end(), curr_index) - due_jobs.begin() ;
+    }
+    return(due_cursor) ;
+}
+
+/**
+@design
+-# For each due job, if the job's next call time is after the incoming time and lower than
+   the overall next job call time, set the overall next job call time to it.
+-# If the earliest group on the time heap is lower than the overall next job call time, set
+   the overall next job call time to it.
+*/
+void Trick::ScheduledJobQueue::track_indexed_next_job_call_time( long long time_tics ) {
+
+    unsigned int ii ;
+
+    for ( ii = 0 ; ii < due_jobs.size() ; ii++ ) {
+        test_next_job_call_time(list[due_jobs[ii]], time_tics) ;
+    }
+    if ( !time_heap.empty() and time_heap.front().first < next_job_time ) {
+        next_job_time = time_heap.front().first ;
+    }
+}
@@ -1,15 +1,19 @@
 
 #include <iostream>
+#include <string>
+#include <vector>
 #include <sys/types.h>
 #include <signal.h>
 
 #include "gtest/gtest.h"
 #include "trick/ScheduledJobQueue.hh"
+#include "trick/TrickConstant.hh"
 //#include "trick/RequirementScribe.hh"
 
 namespace Trick {
 
-class ScheduledJobQueueTest : public ::testing::Test {
+// Each test is run against the unindexed queue (false) and the time indexed queue (true).
+class ScheduledJobQueueTest : public ::testing::TestWithParam<bool> {
 
     protected:
         Trick::ScheduledJobQueue sjq;
@@ -17,12 +21,12 @@ class ScheduledJobQueueTest : public ::testing::Test {
 
         ScheduledJobQueueTest() {}
         ~ScheduledJobQueueTest() {}
-        virtual void SetUp() {}
+        virtual void SetUp() { sjq.set_time_indexed(GetParam()) ; }
         virtual void TearDown() {}
 
 } ;
 
-TEST_F( ScheduledJobQueueTest , PushJobsbyJobOrder ) {
+TEST_P( ScheduledJobQueueTest , PushJobsbyJobOrder ) {
 	//req.add_requirement("815793485");
 
     Trick::JobData * job_ptr ;
@@ -70,7 +74,7 @@ TEST_F( ScheduledJobQueueTest , PushJobsbyJobOrder ) {
     EXPECT_TRUE( sjq.empty() ) ;
 }
 
-TEST_F( ScheduledJobQueueTest , PushJobOntoSameIndex_CurrIndex0 ) {
+TEST_P( ScheduledJobQueueTest , PushJobOntoSameIndex_CurrIndex0 ) {
 
     Trick::JobData * job_ptr ;
 
@@ -126,7 +130,7 @@ TEST_F( ScheduledJobQueueTest , PushJobOntoSameIndex_CurrIndex0 ) {
     EXPECT_TRUE( sjq.empty() ) ;
 }
 
-TEST_F( ScheduledJobQueueTest , PushJobOntoSameIndex_CurrIndex1 ) {
+TEST_P( ScheduledJobQueueTest , PushJobOntoSameIndex_CurrIndex1 ) {
 	
     Trick::JobData * job_ptr ;
 
@@ -181,7 +185,7 @@ TEST_F( ScheduledJobQueueTest , PushJobOntoSameIndex_CurrIndex1 ) {
     EXPECT_TRUE( sjq.empty() ) ;
 }
 
-TEST_F( ScheduledJobQueueTest , PushJobsbySimObjectOrder ) {
+TEST_P( ScheduledJobQueueTest , PushJobsbySimObjectOrder ) {
 	//req.add_requirement("512154259");
 
     Trick::JobData * job_ptr ;
@@ -224,7 +228,7 @@ TEST_F( ScheduledJobQueueTest , PushJobsbySimObjectOrder ) {
 
 }
 
-TEST_F( ScheduledJobQueueTest , PushJobsbyPhaseOrder ) {
+TEST_P( ScheduledJobQueueTest , PushJobsbyPhaseOrder ) {
 	//req.add_requirement("3144632784");
 
     Trick::JobData * job_ptr ;
@@ -267,7 +271,7 @@ TEST_F( ScheduledJobQueueTest , PushJobsbyPhaseOrder ) {
 
 }
 
-TEST_F( ScheduledJobQueueTest , PushJobsbyJobClassOrder ) {
+TEST_P( ScheduledJobQueueTest , PushJobsbyJobClassOrder ) {
 	//req.add_requirement("925196430");
 
     Trick::JobData * job_ptr ;
@@ -310,7 +314,7 @@ TEST_F( ScheduledJobQueueTest , PushJobsbyJobClassOrder ) {
 
 }
 
-TEST_F( ScheduledJobQueueTest , PushJobsIgnoreSimObject ) {
+TEST_P( ScheduledJobQueueTest , PushJobsIgnoreSimObject ) {
 	//req.add_requirement("815793485");
 
     Trick::JobData * job_ptr ;
@@ -353,7 +357,7 @@ TEST_F( ScheduledJobQueueTest , PushJobsIgnoreSimObject ) {
 
 }
 
-TEST_F( ScheduledJobQueueTest , TopJob ) {
+TEST_P( ScheduledJobQueueTest , TopJob ) {
 	//req.add_requirement("");
 
     Trick::JobData * job_ptr ;
@@ -395,7 +399,7 @@ TEST_F( ScheduledJobQueueTest , TopJob ) {
     EXPECT_STREQ( job_ptr->name.c_str() , "job_1") ;
 }
 
-TEST_F( ScheduledJobQueueTest , FindNextJob ) {
+TEST_P( ScheduledJobQueueTest , FindNextJob ) {
 	//req.add_requirement("3664773300 1758653947");
 
     Trick::JobData * job_ptr ;
@@ -509,7 +513,7 @@ TEST_F( ScheduledJobQueueTest , FindNextJob ) {
     EXPECT_TRUE( job_ptr == NULL ) ;
 }
 
-TEST_F( ScheduledJobQueueTest , TestNextJob ) {
+TEST_P( ScheduledJobQueueTest , TestNextJob ) {
 	//req.add_requirement("1758653947 3664773300");
 
     Trick::JobData * job_ptr ;
@@ -627,7 +631,7 @@ TEST_F( ScheduledJobQueueTest , TestNextJob ) {
     EXPECT_TRUE( job_ptr == NULL ) ;
 }
 
-TEST_F( ScheduledJobQueueTest , InstrumentBeforeAll ) {
+TEST_P( ScheduledJobQueueTest , InstrumentBeforeAll ) {
 	//req.add_requirement("3990429752");
 
     Trick::JobData * job_ptr ;
@@ -657,5 +661,152 @@ TEST_F( ScheduledJobQueueTest , InstrumentBeforeAll ) {
 
 }
 
+TEST_P( ScheduledJobQueueTest , FindsJobsAfterSkippedCallTimes ) {
+
+    Trick::JobData * job_1 , * job_2 ;
+    unsigned int changes ;
+
+    job_1 = new Trick::JobData(0, 1 , "class_100", NULL, 1.0 , "job_1") ;
+    job_1->job_class = 100 ;
+    job_1->cycle_tics = 10 ;
+    job_1->stop_tics = 1000 ;
+    sjq.push(job_1) ;
+
+    job_2 = new Trick::JobData(0, 2 , "class_100", NULL, 2.0 , "job_2") ;
+    job_2->job_class = 100 ;
+    job_2->cycle_tics = 20 ;
+    job_2->stop_tics = 1000 ;
+    sjq.push(job_2) ;
+
+    // Time = 0, both jobs are due.  Time = 10, only job_1 is due.
+    sjq.reset_curr_index() ;
+    EXPECT_EQ( sjq.find_next_job(0) , job_1 ) ;
+    EXPECT_EQ( sjq.find_next_job(0) , job_2 ) ;
+    EXPECT_TRUE( sjq.find_next_job(0) == NULL ) ;
+    sjq.reset_curr_index() ;
+    EXPECT_EQ( sjq.find_next_job(10) , job_1 ) ;
+    EXPECT_TRUE( sjq.find_next_job(10) == NULL ) ;
+
+    // Catch the jobs up past the call times that were skipped, like an asynchronous thread
+    // does, without telling the queue.  The jobs are still found at their new call times.
+    changes = Trick::JobData::schedule_changes ;
+    job_1->next_tics = 50 ;
+    job_2->next_tics = 60 ;
+    sjq.reset_curr_index() ;
+    sjq.set_next_job_call_time(TRICK_MAX_LONG_LONG) ;
+    EXPECT_EQ( sjq.find_next_job(50) , job_1 ) ;
+    EXPECT_TRUE( sjq.find_next_job(50) == NULL ) ;
+    EXPECT_EQ( sjq.get_next_job_call_time() , 60 ) ;
+    EXPECT_EQ( Trick::JobData::schedule_changes , changes ) ;
+
+    sjq.reset_curr_index() ;
+    sjq.set_next_job_call_time(TRICK_MAX_LONG_LONG) ;
+    EXPECT_EQ( sjq.find_next_job(60) , job_1 ) ;
+    EXPECT_EQ( sjq.find_next_job(60) , job_2 ) ;
+    EXPECT_TRUE( sjq.find_next_job(60) == NULL ) ;
+    EXPECT_EQ( sjq.get_next_job_call_time() , 70 ) ;
+
+    sjq.reset_curr_index() ;
+    EXPECT_EQ( sjq.find_next_job(80) , job_2 ) ;
+    EXPECT_TRUE( sjq.find_next_job(80) == NULL ) ;
+}
+
+INSTANTIATE_TEST_CASE_P( TimeIndexed , ScheduledJobQueueTest , ::testing::Bool() ) ;
+
+// Fill a queue with jobs of mixed classes, phases, and rates.
+static void push_mixed_jobs( Trick::ScheduledJobQueue & queue ) {
+    for ( int ii = 0 ; ii < 60 ; ii++ ) {
+        char name[16] ;
+        snprintf(name, sizeof(name), "job_%d", ii) ;
+        Trick::JobData * job_ptr = new Trick::JobData(0, ii , "class_100", NULL, (ii % 7) + 1.0 , name) ;
+        job_ptr->sim_object_id = ii % 5 ;
+        job_ptr->job_class = 100 + (ii % 3) ;
+        job_ptr->phase = ii % 4 ;
+        job_ptr->cycle_tics = (long long)(job_ptr->cycle * 1000000) ;
+        job_ptr->next_tics = (ii % 2) * 1000000 ;
+        job_ptr->stop_tics = 40000000 ;
+        job_ptr->disabled = (ii % 11 == 0) ;
+        queue.push(job_ptr) ;
+    }
+}
+
+TEST( ScheduledJobQueueTimeIndexTest , MatchesUnindexedQueue ) {
+
+    Trick::ScheduledJobQueue unindexed , indexed ;
+    Trick::JobData * job_ptr ;
+    long long unindexed_time = 0 , indexed_time = 0 ;
+
+    push_mixed_jobs(unindexed) ;
+    push_mixed_jobs(indexed) ;
+    indexed.set_time_indexed(true) ;
+
+    while ( unindexed_time < TRICK_MAX_LONG_LONG ) {
+        std::vector<std::string> unindexed_names , indexed_names ;
+
+        unindexed.reset_curr_index() ;
+        unindexed.set_next_job_call_time(TRICK_MAX_LONG_LONG) ;
+        while ( (job_ptr = unindexed.find_next_job(unindexed_time)) != NULL ) {
+            unindexed_names.push_back(job_ptr->name) ;
+        }
+        indexed.reset_curr_index() ;
+        indexed.set_next_job_call_time(TRICK_MAX_LONG_LONG) ;
+        while ( (job_ptr = indexed.find_next_job(indexed_time)) != NULL ) {
+            indexed_names.push_back(job_ptr->name) ;
+        }
+
+        EXPECT_EQ( unindexed_names , indexed_names ) ;
+        unindexed_time = unindexed.get_next_job_call_time() ;
+        indexed_time = indexed.get_next_job_call_time() ;
+        ASSERT_EQ( unindexed_time , indexed_time ) ;
+    }
 }
 
+TEST( ScheduledJobQueueTimeIndexTest , FollowsChangedCallTimes ) {
+
+    Trick::ScheduledJobQueue sjq ;
+    Trick::JobData * job_1 , * job_2 , * job_ptr ;
+
+    sjq.set_time_indexed(true) ;
+
+    job_1 = new Trick::JobData(0, 1 , "class_100", NULL, 1.0 , "job_1") ;
+    job_1->job_class = 100 ;
+    job_1->cycle_tics = 1000000 ;
+    job_1->stop_tics = 1000000000 ;
+    sjq.push(job_1) ;
+
+    job_2 = new Trick::JobData(0, 2 , "class_100", NULL, 5.0 , "job_2") ;
+    job_2->job_class = 100 ;
+    job_2->cycle_tics = 5000000 ;
+    job_2->stop_tics = 1000000000 ;
+    sjq.push(job_2) ;
+
+    // Time = 0.0, both jobs are due
+    sjq.reset_curr_index() ;
+    EXPECT_EQ( sjq.find_next_job(0) , job_1 ) ;
+    EXPECT_EQ( sjq.find_next_job(0) , job_2 ) ;
+    EXPECT_TRUE( sjq.find_next_job(0) == NULL ) ;
+
+    // A job that reschedules itself while it is called is found at its new time
+    sjq.reset_curr_index() ;
+    sjq.set_next_job_call_time(1000000000) ;
+    EXPECT_EQ( sjq.find_next_job(1000000) , job_1 ) ;
+    job_1->next_tics = 1500000 ;
+    EXPECT_TRUE( sjq.find_next_job(1000000) == NULL ) ;
+    EXPECT_EQ( sjq.get_next_job_call_time() , 1500000 ) ;
+
+    sjq.reset_curr_index() ;
+    EXPECT_EQ( sjq.find_next_job(1500000) , job_1 ) ;
+    EXPECT_TRUE( sjq.find_next_job(1500000) == NULL ) ;
+
+    // A job moved to an earlier time than it was indexed at is found at its new time
+    job_2->cycle_tics = 500000 ;
+    job_2->set_next_call_time(1500000) ;
+    EXPECT_EQ( job_2->next_tics , 2000000 ) ;
+    sjq.reset_curr_index() ;
+    job_ptr = sjq.find_next_job(2000000) ;
+    EXPECT_EQ( job_ptr , job_2 ) ;
+    EXPECT_TRUE( sjq.find_next_job(2000000) == NULL ) ;
+    EXPECT_EQ( job_2->next_tics , 2500000 ) ;
+}
+
+}
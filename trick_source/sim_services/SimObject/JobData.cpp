@@ -5,6 +5,7 @@
 #include "trick/SimObject.hh"
 
 long long Trick::JobData::time_tic_value = 0 ;
+std::atomic<unsigned int> Trick::JobData::schedule_changes(0) ;
 
 Trick::JobData::JobData() {
 
@@ -99,6 +100,7 @@ int Trick::JobData::set_cycle(double in_cycle) {
 
 int Trick::JobData::calc_cycle_tics() {
     cycle_tics  = (long long)round(cycle * time_tic_value) ;
+    schedule_changes++ ;
     return 0 ;
 }
 
@@ -108,6 +110,7 @@ int Trick::JobData::set_next_call_time(long long time_tics) {
     } else {
         next_tics = time_tics ;
     }
+    schedule_changes++ ;
     return 0 ;
 }
 
@@ -61,7 +61,7 @@ REF2* make_time_ref(double * time) {
     return new_ref;
 }
 
-Trick::VariableReference::VariableReference(std::string var_name, double* time) : _staged(false), _write_ready(false) {
+Trick::VariableReference::VariableReference(std::string var_name, double* time) : _staged(false), _write_ready(false), _last_written_buffer(NULL), _last_written_size(-1) {
     if (var_name != "time") {
         ASSERT(0);
     }
@@ -86,7 +86,7 @@ Trick::VariableReference::VariableReference(std::string var_name, double* time)
     _name = _var_info->reference;
 }
 
-Trick::VariableReference::VariableReference(std::string var_name) : _staged(false), _write_ready(false) {
+Trick::VariableReference::VariableReference(std::string var_name) : _staged(false), _write_ready(false), _last_written_buffer(NULL), _last_written_size(-1) {
 
     if (var_name == "time") {
         ASSERT(0);
@@ -187,6 +187,10 @@ Trick::VariableReference::~VariableReference() {
         free (_write_buffer);
         _write_buffer = NULL;
     }
+    if (_last_written_buffer != NULL) {
+        free (_last_written_buffer);
+        _last_written_buffer = NULL;
+    }
     if (_conversion_factor != NULL) {
         cv_free(_conversion_factor);
     }
@@ -276,6 +280,9 @@ int Trick::VariableReference::setRequestedUnits(std::string units_name) {
     
         // Set the requested units. This will cause the unit string to be printed in write_value_ascii
         _requested_units = new_units;
+
+        // The converted value will differ even if the raw value does not
+        resetWritten();
     }
     return 0;
 }
@@ -599,6 +606,30 @@ bool Trick::VariableReference::isWriteReady() const {
     return _write_ready;
 }
 
+bool Trick::VariableReference::hasChanged() const {
+    if (_last_written_size != _size) {
+        return true;
+    }
+    return memcmp(_write_buffer, _last_written_buffer, _size) != 0;
+}
+
+void Trick::VariableReference::markWritten() {
+    if (_last_written_buffer == NULL) {
+        // strings vary in size, so give them the same room as the stage and write buffers
+        int capacity = _size;
+        if (( _trick_type == TRICK_STRING ) || ( _trick_type == TRICK_WSTRING )) {
+            capacity = MAX_ARRAY_LENGTH ;
+        }
+        _last_written_buffer = calloc(capacity, 1) ;
+    }
+    memcpy(_last_written_buffer, _write_buffer, _size) ;
+    _last_written_size = _size;
+}
+
+void Trick::VariableReference::resetWritten() {
+    _last_written_size = -1;
+}
+
 int Trick::VariableReference::writeTypeBinary( std::ostream& out, bool byteswap ) const {
     int local_type = _trick_type;
     if (byteswap) {
@@ -38,6 +38,10 @@ Trick::VariableServerSession::VariableServerSession() {
     _byteswap = false;
     _binary_data_nonames = false;
 
+    _delta_mode = false;
+    _delta_keyframe_interval = 100;
+    _delta_frames_since_keyframe = -1;
+
     _exit_cmd = false;
     _pause_cmd = false;
 
@@ -26,6 +26,7 @@ int Trick::VariableServerSession::var_add(std::string in_name) {
     }
 
     _session_variables.push_back(new_var) ;
+    request_keyframe() ;
 
     return(0) ;
 }
@@ -79,6 +80,7 @@ int Trick::VariableServerSession::var_remove(std::string in_name) {
         if ( ! var_name.compare(in_name) ) {
             delete _session_variables[ii];
             _session_variables.erase(_session_variables.begin() + ii) ;
+            request_keyframe() ;
             break ;
         }
     }
@@ -95,6 +97,7 @@ int Trick::VariableServerSession::var_units(std::string var_name, std::string un
         return -1;
     }
 
+    request_keyframe() ;
     return variable->setRequestedUnits(units_name);
 }
 
@@ -143,11 +146,14 @@ int Trick::VariableServerSession::var_clear() {
         delete _session_variables.back();
         _session_variables.pop_back();
     }
+    request_keyframe() ;
 
     return(0) ;
 }
 
 int Trick::VariableServerSession::var_send() {
+    // In delta mode, an explicit request gets every value
+    request_keyframe() ;
     copy_sim_data();
     write_data();
     return(0) ;
@@ -176,17 +182,33 @@ int Trick::VariableServerSession::var_debug(int level) {
 
 int Trick::VariableServerSession::var_ascii() {
     _binary_data = 0 ;
+    request_keyframe() ;
     return(0) ;
 }
 
 int Trick::VariableServerSession::var_binary() {
     _binary_data = 1 ;
+    request_keyframe() ;
     return(0) ;
 }
 
 int Trick::VariableServerSession::var_binary_nonames() {
     _binary_data = 1 ;
     _binary_data_nonames = 1 ;
+    request_keyframe() ;
+    return(0) ;
+}
+
+void Trick::VariableServerSession::request_keyframe() {
+    pthread_mutex_lock(&_copy_mutex) ;
+    _delta_frames_since_keyframe = -1 ;
+    pthread_mutex_unlock(&_copy_mutex) ;
+}
+
+int Trick::VariableServerSession::var_delta(bool on_off, int keyframe_interval) {
+    _delta_mode = on_off ;
+    _delta_keyframe_interval = keyframe_interval < 0 ? 0 : keyframe_interval ;
+    request_keyframe() ;
     return(0) ;
 }
 
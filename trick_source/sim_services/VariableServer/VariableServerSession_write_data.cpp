@@ -47,7 +47,7 @@ int Trick::VariableServerSession::write_binary_data(const std::vector<VariableRe
         total_var_size += var->getSizeBinary();
 
         // Check if this variable will fit in a message at all
-        if (header_size + total_var_size > MAX_MSG_LEN) {
+        if (!fits_binary_message(var)) {
             message_publish(MSG_WARNING, "tag=<%s> Variable Server buffer[%d] too small (need %d) for symbol %s, SKIPPING IT.\n", 
                                 _connection->getClientTag().c_str(), MAX_MSG_LEN, header_size + total_var_size, var->getName().c_str());
             
@@ -121,12 +121,24 @@ int Trick::VariableServerSession::write_binary_data(const std::vector<VariableRe
         // Send it out!
         char write_buf[MAX_MSG_LEN];
         stream.read(write_buf, curr_message_size);
-        _connection->write(write_buf, curr_message_size);
+        int result = _connection->write(write_buf, curr_message_size);
+        if (result < 0) {
+            return result;
+        }
     }
 
     return 0;
 }
 
+bool Trick::VariableServerSession::fits_binary_message(VariableReference * var) {
+    // <message_indicator><message_size><num_vars>, then <namelength><name><type><size><value>
+    int size = 12 + 4 + 4 + var->getSizeBinary();
+    if (!_binary_data_nonames) {
+        size += 4 + var->getName().size();
+    }
+    return size <= MAX_MSG_LEN;
+}
+
 int Trick::VariableServerSession::write_ascii_data(const std::vector<VariableReference *>& given_vars, VS_MESSAGE_TYPE message_type ) {
     // Load message type first
     std::stringstream message_stream;
@@ -197,7 +209,175 @@ int Trick::VariableServerSession::write_ascii_data(const std::vector<VariableRef
     return result;
 }
 
+int Trick::VariableServerSession::write_binary_delta_data(std::vector<int>& indices) {
+    // Some constants to make size calculations more readable
+    static const int header_size = 16;
+    static const int index_size = 4;
+    static const int sizeof_size = 4;
+    static const int type_size = 4;
+
+    // Split the entries into messages the same way write_binary_data does. Each message also carries the
+    // number of entries in the whole delta, so the client knows when it has all of them. Entries too large
+    // to send are removed from indices so they are not marked as written.
+    std::vector<std::vector<int>> message_indices(1);
+    std::vector<int> message_sizes(1, header_size);
+    std::vector<int> sent;
+    int num_changes = 0;
+    for (int index : indices) {
+        VariableReference * var = _session_variables[index];
+        int total_var_size = index_size + type_size + sizeof_size + var->getSizeBinary();
+
+        if (header_size + total_var_size > MAX_MSG_LEN) {
+            message_publish(MSG_WARNING, "tag=<%s> Variable Server buffer[%d] too small (need %d) for symbol %s, SKIPPING IT.\n",
+                                _connection->getClientTag().c_str(), MAX_MSG_LEN, header_size + total_var_size, var->getName().c_str());
+            continue;
+        }
+
+        if (message_sizes.back() + total_var_size > MAX_MSG_LEN) {
+            message_indices.emplace_back();
+            message_sizes.push_back(header_size);
+        }
+        message_sizes.back() += total_var_size;
+        message_indices.back().push_back(index);
+        sent.push_back(index);
+        num_changes++;
+    }
+    indices.swap(sent);
+
+    for (int i = 0; i < message_indices.size(); i++) {
+        std::stringstream stream;
+
+        int written_message_type = VS_VAR_LIST_DELTA;
+        int written_header_size = message_sizes[i] - 4;
+        int written_num_vars = message_indices[i].size();
+        int written_num_changes = num_changes;
+
+        if (_byteswap) {
+            written_message_type = trick_byteswap_int(written_message_type);
+            written_header_size = trick_byteswap_int(written_header_size);
+            written_num_vars = trick_byteswap_int(written_num_vars);
+            written_num_changes = trick_byteswap_int(written_num_changes);
+        }
+
+        // Header format:
+        // <message_indicator><message_size><num_entries><num_changes>
+        stream.write((char *)(&written_message_type), sizeof(int)); 
+        stream.write((char *)(&written_header_size), sizeof(int)); 
+        stream.write((char *)(&written_num_vars), sizeof(int));
+        stream.write((char *)(&written_num_changes), sizeof(int));
+
+        // Each entry is formatted as:
+        // <index><type><size><value>
+        for (int index : message_indices[i]) {
+            int written_index = _byteswap ? trick_byteswap_int(index) : index;
+            stream.write((char *)(&written_index), sizeof(int));
+
+            VariableReference * var = _session_variables[index];
+            var->writeTypeBinary(stream, _byteswap);
+            var->writeSizeBinary(stream, _byteswap);
+            var->writeValueBinary(stream, _byteswap);
+        }
+
+        if (_debug >= 2) {
+            message_publish(MSG_DEBUG, "%p tag=<%s> var_server sending %u binary bytes containing %d changed variables.\n",
+                            _connection, _connection->getClientTag().c_str(), message_sizes[i], message_indices[i].size());
+        }
+
+        char write_buf[MAX_MSG_LEN];
+        stream.read(write_buf, message_sizes[i]);
+        int result = _connection->write(write_buf, message_sizes[i]);
+        if (result < 0) {
+            return result;
+        }
+    }
+
+    return 0;
+}
+
+int Trick::VariableServerSession::write_ascii_delta_data(const std::vector<int>& indices) {
+    // Format: 6 <num_entries> <index> <value> <index> <value> ... all tab separated.
+    // Like write_ascii_data, a long line is written in pieces but is still one message.
+    std::stringstream message_stream;
+    message_stream << (int)VS_VAR_LIST_DELTA << "\t" << indices.size();
+
+    int message_size = message_stream.str().size();
+
+    for (int index : indices) {
+        message_stream << "\t";
+
+        std::stringstream var_stream;
+        var_stream << index << "\t";
+        _session_variables[index]->writeValueAscii(var_stream);
+
+        std::string var_string = var_stream.str();
+        int var_size = var_string.size();
+
+        if (var_size + 2 > MAX_MSG_LEN) {
+            message_publish(MSG_WARNING, "tag=<%s> Variable Server buffer[%d] too small for symbol %s, TRUNCATED IT.\n",
+                            _connection->getClientTag().c_str(), MAX_MSG_LEN, _session_variables[index]->getName().c_str());
+            
+            var_string = var_string.substr(0, MAX_MSG_LEN-2);
+            var_size = var_string.size();
+        }
+
+        if (message_size + var_size + 2 > MAX_MSG_LEN) {
+            std::string message = message_stream.str();
+
+            if (_debug >= 2) {
+                message_publish(MSG_DEBUG, "%p tag=<%s> var_server sending %d ascii bytes:\n%s\n",
+                                _connection, _connection->getClientTag().c_str(), message_size, message.c_str());
+            }
+
+            int result = _connection->write(message);
+            if (result < 0) {
+                return result;
+            }
+
+            message_stream.str("");
+            message_size = 0;
+        }
+
+        message_stream << var_string;
+        message_size += var_size + 1;
+    }
+
+    message_stream << '\n';
+    std::string message = message_stream.str();
+
+    if (_debug >= 2) {
+        message_publish(MSG_DEBUG, "%p tag=<%s> var_server sending %d ascii bytes:\n%s\n",
+                        _connection, _connection->getClientTag().c_str(), message.size(), message.c_str());
+    }
+
+    return _connection->write(message);
+}
+
+bool Trick::VariableServerSession::prepare_for_write(std::vector<VariableReference *>& given_vars) {
+    if ( pthread_mutex_trylock(&_copy_mutex) != 0 ) {
+        return false;
+    }
+
+    // Check that all of the variables are staged
+    for (VariableReference * variable : given_vars ) {
+        if (!variable->isStaged()) {
+            pthread_mutex_unlock(&_copy_mutex) ;
+            return false;
+        }
+    }
+
+    // Swap buffer_in and buffer_out for each vars[ii].
+    for (VariableReference * variable : given_vars ) {
+        variable->prepareForWrite();
+    }
+
+    pthread_mutex_unlock(&_copy_mutex) ;
+    return true;
+}
+
 int Trick::VariableServerSession::write_data() {
+    if (_delta_mode) {
+        return write_delta_data();
+    }
     return write_data(_session_variables, VS_VAR_LIST);
 }
 
@@ -207,32 +387,81 @@ int Trick::VariableServerSession::write_data(std::vector<VariableReference *>& g
         return(0);
     }
 
+    if ( !prepare_for_write(given_vars) ) {
+        return(0);
+    }
+
+    // Send out in correct format
+    if (_binary_data) {
+        return write_binary_data(given_vars, message_type );
+    } else {
+        // ascii mode
+        return write_ascii_data(given_vars, message_type );
+    }
+}
+
+int Trick::VariableServerSession::write_delta_data() {
+    if ( _session_variables.size() == 0) {
+        return(0);
+    }
+
+    if ( !prepare_for_write(_session_variables) ) {
+        return(0);
+    }
+
     int result = 0;
 
-    if ( pthread_mutex_trylock(&_copy_mutex) == 0 ) {
-        // Check that all of the variables are staged
-        for (VariableReference * variable : given_vars ) {
-            if (!variable->isStaged()) {
-                pthread_mutex_unlock(&_copy_mutex) ;
-                return 0;
-            }
-        }
+    // Commands on the session's thread may require a keyframe at any time, so the frame is counted before
+    // it is written, where a required keyframe cannot be overwritten.
+    pthread_mutex_lock(&_copy_mutex) ;
+    bool keyframe = _delta_frames_since_keyframe < 0 ||
+                    (_delta_keyframe_interval > 0 && _delta_frames_since_keyframe >= _delta_keyframe_interval);
+    if (keyframe) {
+        _delta_frames_since_keyframe = 1;
+    } else {
+        _delta_frames_since_keyframe++;
+    }
+    pthread_mutex_unlock(&_copy_mutex) ;
 
-        // Swap buffer_in and buffer_out for each vars[ii].
-        for (VariableReference * variable : given_vars ) {
-            variable->prepareForWrite();
+    std::vector<int> written;
+    if (keyframe) {
+        // A keyframe is an ordinary var list message
+        if (_binary_data) {
+            result = write_binary_data(_session_variables, VS_VAR_LIST );
+        } else {
+            result = write_ascii_data(_session_variables, VS_VAR_LIST );
         }
 
-        pthread_mutex_unlock(&_copy_mutex) ;
+        for (int i = 0; i < _session_variables.size(); i++) {
+            // write_binary_data skips variables too large to send
+            if (!_binary_data || fits_binary_message(_session_variables[i])) {
+                written.push_back(i);
+            }
+        }
+    } else {
+        for (int i = 0; i < _session_variables.size(); i++) {
+            if (_session_variables[i]->hasChanged()) {
+                written.push_back(i);
+            }
+        }
 
-        // Send out in correct format
+        // An empty delta is still sent so the client knows the cycle happened
         if (_binary_data) {
-            result = write_binary_data(given_vars, message_type );
+            result = write_binary_delta_data(written);
         } else {
-            // ascii mode
-            result = write_ascii_data(given_vars, message_type );
+            result = write_ascii_delta_data(written);
         }
     }
 
+    if (result < 0) {
+        // The client may have missed any part of the frame, so start over with a keyframe
+        request_keyframe();
+        return result;
+    }
+
+    for (int index : written) {
+        _session_variables[index]->markWritten();
+    }
+
     return result;
 }
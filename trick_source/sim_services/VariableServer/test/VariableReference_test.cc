@@ -84,6 +84,55 @@ TEST_F(VariableReference_test, prepareForWrite_fails_if_not_staged) {
     EXPECT_EQ(ref.isWriteReady(), false);
 }
 
+TEST_F(VariableReference_test, hasChanged) {
+    // ARRANGE
+    // Create a variable to make a reference for
+    int test_a = 5;
+    (void) memmgr->declare_extern_var(&test_a, "int test_a");
+    Trick::VariableReference ref("test_a");
+
+    // ACT
+    // ASSERT
+    // Nothing has been written yet
+    ref.stageValue();
+    ref.prepareForWrite();
+    EXPECT_EQ(ref.hasChanged(), true);
+
+    ref.markWritten();
+    ref.stageValue();
+    ref.prepareForWrite();
+    EXPECT_EQ(ref.hasChanged(), false);
+
+    test_a = 6;
+    ref.stageValue();
+    ref.prepareForWrite();
+    EXPECT_EQ(ref.hasChanged(), true);
+
+    ref.markWritten();
+    ref.resetWritten();
+    EXPECT_EQ(ref.hasChanged(), true);
+}
+
+TEST_F(VariableReference_test, hasChanged_string) {
+    // ARRANGE
+    // Create a variable to make a reference for
+    std::string test_str = "abc";
+    (void) memmgr->declare_extern_var(&test_str, "std::string test_str");
+    Trick::VariableReference ref("test_str");
+
+    // ACT
+    ref.stageValue();
+    ref.prepareForWrite();
+    ref.markWritten();
+
+    test_str = "abcdef";
+    ref.stageValue();
+    ref.prepareForWrite();
+
+    // ASSERT
+    EXPECT_EQ(ref.hasChanged(), true);
+}
+
 TEST_F(VariableReference_test, writeValueAscii_fails_if_not_write_ready) {
     // ARRANGE
     // Create a variable to make a reference for
@@ -37,6 +37,7 @@ using ::testing::Return;
 using ::testing::Invoke;
 using ::testing::DoAll;
 using ::testing::SetArgReferee;
+using ::testing::InSequence;
 
 
 
@@ -277,6 +278,155 @@ TEST_F(VariableServerSession_test, large_message_binary) {
     }
 }
 
+TEST_F(VariableServerSession_test, delta_ascii) {
+    // ARRANGE
+    Trick::VariableServerSession session;
+    session.set_connection(&connection);
+
+    int delta_a = 1;
+    int delta_b = 2;
+    (void) memmgr.declare_extern_var(&delta_a, "int delta_a");
+    (void) memmgr.declare_extern_var(&delta_b, "int delta_b");
+
+    session.var_add("delta_a");
+    session.var_add("delta_b");
+    session.var_delta(true, 0);
+
+    {
+        InSequence seq;
+        // Keyframe with every value
+        EXPECT_CALL(connection, write(std::string("0\t1\t2\n")));
+        // Only delta_b changed
+        EXPECT_CALL(connection, write(std::string("6\t1\t1\t3\n")));
+        // Nothing changed
+        EXPECT_CALL(connection, write(std::string("6\t0\n")));
+        // var_send forces a keyframe
+        EXPECT_CALL(connection, write(std::string("0\t1\t3\n")));
+    }
+
+    // ACT
+    session.copy_sim_data();
+    session.write_data();
+
+    delta_b = 3;
+    session.copy_sim_data();
+    session.write_data();
+
+    session.copy_sim_data();
+    session.write_data();
+
+    session.var_send();
+}
+
+TEST_F(VariableServerSession_test, delta_keyframe_interval) {
+    // ARRANGE
+    Trick::VariableServerSession session;
+    session.set_connection(&connection);
+
+    int delta_c = 1;
+    (void) memmgr.declare_extern_var(&delta_c, "int delta_c");
+
+    session.var_add("delta_c");
+    session.var_delta(true, 2);
+
+    {
+        InSequence seq;
+        EXPECT_CALL(connection, write(std::string("0\t1\n")));
+        EXPECT_CALL(connection, write(std::string("6\t0\n")));
+        EXPECT_CALL(connection, write(std::string("0\t1\n")));
+    }
+
+    // ACT
+    for (int i = 0; i < 3; i++) {
+        session.copy_sim_data();
+        session.write_data();
+    }
+}
+
+TEST_F(VariableServerSession_test, delta_write_failure) {
+    // ARRANGE
+    Trick::VariableServerSession session;
+    session.set_connection(&connection);
+
+    int delta_f = 1;
+    (void) memmgr.declare_extern_var(&delta_f, "int delta_f");
+
+    session.var_add("delta_f");
+    session.var_delta(true, 0);
+
+    {
+        InSequence seq;
+        EXPECT_CALL(connection, write(std::string("0\t1\n")));
+        // The delta fails to send
+        EXPECT_CALL(connection, write(std::string("6\t1\t0\t2\n"))).WillOnce(Return(-1));
+        // So the next message is a keyframe, which sends the value again
+        EXPECT_CALL(connection, write(std::string("0\t2\n")));
+        EXPECT_CALL(connection, write(std::string("6\t0\n")));
+    }
+
+    // ACT
+    for (int i = 0; i < 4; i++) {
+        session.copy_sim_data();
+        session.write_data();
+        delta_f = 2;
+    }
+}
+
+TEST_F(VariableServerSession_test, delta_binary) {
+    // ARRANGE
+    Trick::VariableServerSession session;
+    session.set_connection(&connection);
+    session.var_binary_nonames();
+
+    int delta_d = 1;
+    double delta_e = 2.5;
+    (void) memmgr.declare_extern_var(&delta_d, "int delta_d");
+    (void) memmgr.declare_extern_var(&delta_e, "double delta_e");
+
+    session.var_add("delta_d");
+    session.var_add("delta_e");
+    session.var_delta(true, 0);
+
+    std::vector<std::vector<char>> messages;
+    auto save = [&] (char * message, int size) -> int {
+        messages.emplace_back(message, message + size);
+        return size;
+    };
+    EXPECT_CALL(connection, write(_, _)).Times(2).WillRepeatedly(Invoke(save));
+
+    // ACT
+    session.copy_sim_data();
+    session.write_data();
+
+    delta_e = 4.5;
+    session.copy_sim_data();
+    session.write_data();
+
+    // ASSERT
+    ASSERT_EQ(messages.size(), 2);
+
+    int header[3];
+    memcpy(header, messages[0].data(), sizeof(header));
+    EXPECT_EQ(header[0], VS_VAR_LIST);
+    EXPECT_EQ(header[2], 2);
+
+    // <indicator><size><num_entries><num_changes><index><type><size><value>
+    ASSERT_EQ(messages[1].size(), 16 + 12 + sizeof(double));
+    int entry[7];
+    memcpy(entry, messages[1].data(), sizeof(entry));
+    EXPECT_EQ(entry[0], VS_VAR_LIST_DELTA);
+    EXPECT_EQ(entry[1], (int)messages[1].size() - 4);
+    EXPECT_EQ(entry[2], 1);
+    EXPECT_EQ(entry[3], 1);
+    EXPECT_EQ(entry[4], 1);
+    EXPECT_EQ(entry[5], TRICK_DOUBLE);
+    EXPECT_EQ(entry[6], (int)sizeof(double));
+
+    double value;
+    memcpy(&value, messages[1].data() + sizeof(entry), sizeof(double));
+    EXPECT_EQ(value, 4.5);
+}
+
 TEST_F(VariableServerSession_test, log_on) {
     // ARRANGE
     int fake_logstream = 200;
@@ -190,6 +190,15 @@ int var_binary_nonames() {
     return(0) ;
 }
 
+int var_delta(int on_off, int keyframe_interval) {
+    Trick::VariableServerSession * session  = get_session();
+
+    if (session != NULL ) {
+        session->var_delta((bool)on_off, keyframe_interval) ;
+    }
+    return(0) ;
+}
+
 int var_set_copy_mode(int mode) {
     Trick::VariableServerSession * session = get_session();
     